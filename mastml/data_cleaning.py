@@ -28,6 +28,7 @@ except ImportError:
 from datetime import datetime
 
 from mastml.plots import Histogram
+from mastml.file_formats import save_data
 
 class DataCleaning():
     """
@@ -84,6 +85,8 @@ class DataCleaning():
 
                 savepath: (str), string containing the savepath information
 
+                file_extension: (str), file extension of the saved data files, e.g. '.csv'
+
                 kwargs: additional keyword arguments needed for the remove, imputation or ppca methods
 
             Returns:
@@ -143,24 +146,25 @@ class DataCleaning():
         X = df[[col for col in columns if col != target]]
         return X, y
 
-    def evaluate(self, X, y, method, savepath=None, make_new_dir=True, **kwargs):
+    def evaluate(self, X, y, method, savepath=None, make_new_dir=True, file_extension='.csv', **kwargs):
         if not savepath:
             savepath = os.getcwd()
         if make_new_dir is True:
             splitdir = self._setup_savedir(savepath=savepath)
             savepath = splitdir
         self.splitdir = splitdir
-        DataUtilities().flag_columns_with_strings(X=X, y=y, savepath=savepath)
-        DataUtilities().flag_outliers(X=X, y=y, savepath=savepath, n_stdevs=3)
+        DataUtilities().flag_columns_with_strings(X=X, y=y, savepath=savepath, file_extension=file_extension)
+        DataUtilities().flag_outliers(X=X, y=y, savepath=savepath, n_stdevs=3, file_extension=file_extension)
         df_orig = pd.concat([X, y], axis=1)
         self.cleaner = getattr(self, method)
         X, y = self.cleaner(X, y, **kwargs)
         df_cleaned = pd.concat([X, y], axis=1)
-        df_orig.to_excel(os.path.join(savepath, 'data_original.xlsx'), index=False)
-        df_cleaned.to_excel(os.path.join(savepath, 'data_cleaned.xlsx'), index=False)
+        save_data(df_orig, os.path.join(savepath, 'data_original'+file_extension), index=False)
+        save_data(df_cleaned, os.path.join(savepath, 'data_cleaned'+file_extension), index=False)
 
         # Make histogram of the input data
-        Histogram.plot_histogram(df=y, file_name='histogram_target_values', savepath=savepath, x_label='Target values')
+        Histogram.plot_histogram(df=y, file_name='histogram_target_values', savepath=savepath, x_label='Target values',
+                                 file_extension=file_extension)
 
         return X, y
 
@@ -197,6 +201,8 @@ class DataUtilities():
 
                 n_stdevs: (int), number of standard deviations to use as threshold value
 
+                file_extension: (str), file extension of the saved data files, e.g. '.csv'
+
             Returns:
                 None
 
@@ -208,11 +214,13 @@ class DataUtilities():
 
                 savepath: (str), string containing the save path directory
 
+                file_extension: (str), file extension of the saved data files, e.g. '.csv'
+
             Returns:
                 None
     """
     @classmethod
-    def flag_outliers(cls, X, y, savepath, n_stdevs=3):
+    def flag_outliers(cls, X, y, savepath, n_stdevs=3, file_extension='.csv'):
         df = pd.concat([X, y], axis=1)
         n_rows = df.shape[0]
         outlier_dict = dict()
@@ -235,25 +243,25 @@ class DataUtilities():
             outlier_rows_all.append(outlier_rows)
 
         # Save data to file
-        pd.DataFrame().from_dict(data=outlier_dict, orient='index',
-                                 columns=['Indices', 'Values']).to_excel(os.path.join(savepath, 'data_outliers_all.xlsx'))
+        save_data(pd.DataFrame().from_dict(data=outlier_dict, orient='index', columns=['Indices', 'Values']),
+                  os.path.join(savepath, 'data_outliers_all'+file_extension))
 
         # Also get values of rows that occur most often
         outlier_rows_all = np.concatenate(outlier_rows_all).ravel()
         outlier_counts = Counter(outlier_rows_all)
         # Save summary data of outlier counts to file
-        pd.DataFrame().from_dict(data=outlier_counts, orient='index',
-                                 columns=['Number of occurrences']).to_excel(os.path.join(savepath, 'data_outliers_summary.xlsx'))
+        save_data(pd.DataFrame().from_dict(data=outlier_counts, orient='index', columns=['Number of occurrences']),
+                  os.path.join(savepath, 'data_outliers_summary'+file_extension))
 
         return
 
     @classmethod
-    def flag_columns_with_strings(cls, X, y, savepath):
+    def flag_columns_with_strings(cls, X, y, savepath, file_extension='.csv'):
         df = pd.concat([X, y], axis=1)
         str_summary = pd.DataFrame(df.applymap(type).eq(str).any())
         str_columns = str_summary.index[str_summary[0] == True].tolist()
         d = {'columns with strings': str_columns}
-        pd.DataFrame().from_dict(data=d).to_excel(os.path.join(savepath, 'data_columns_with_strings.xlsx'))
+        save_data(pd.DataFrame().from_dict(data=d), os.path.join(savepath, 'data_columns_with_strings'+file_extension))
         return
 
 
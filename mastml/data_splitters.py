@@ -56,10 +56,13 @@ import sklearn
 import inspect
 from pprint import pprint
 import joblib
-from math import ceil
+from math import ceil, comb
 import warnings
 import shutil
 import itertools
+import tempfile
+import time
+from collections import OrderedDict
 from scipy.spatial.distance import minkowski
 try:
     import keras
@@ -73,8 +76,10 @@ except:
           'do pip install matminer pymatgen')
 
 import sklearn.model_selection as ms
+from sklearn.base import clone, BaseEstimator
 from sklearn.utils import check_random_state
 from sklearn.neighbors import NearestNeighbors
+from sklearn.metrics import pairwise_distances_argmin_min
 import sklearn_extra.cluster
 
 from mastml.plots import make_plots
@@ -85,6 +90,121 @@ from mastml.preprocessing import NoPreprocessor
 from mastml.baseline_tests import Baseline_tests
 from mastml.domain import Domain
 from mastml.mastml import parallel
+from mastml.split_results import SplitResults
+from mastml.split_plan import SplitPlan, PackedSplits
+from mastml.file_formats import save_data, load_data, check_file_extension
+from mastml.shared_data import share_data, load_shared_data
+from mastml.task_graph import TaskGraph
+from mastml.run_journal import RunJournal
+from mastml.stage_timer import StageTimer
+from mastml.profiler import Profiler
+
+
+def _split_key(splitdir, split_name):
+    # Splits are identified by their name and outer split (for nested CV), which are the same for all models
+    outer_name = os.path.basename(splitdir)
+    if 'split_outer' not in outer_name:
+        outer_name = None
+    return outer_name, split_name
+
+
+def _clone_model(model):
+    # Get an unfitted copy of a model with the same parameters. The MAST-ML model wrappers (e.g. SklearnModel) can't be
+    # cloned themselves, as their parameters are those of the estimator they wrap, so the wrapped estimator is cloned
+    if isinstance(getattr(model, 'model', None), BaseEstimator):
+        model_clone = copy.copy(model)
+        model_clone.model = clone(model.model)
+        return model_clone
+    return clone(model)
+
+
+def _evaluate_split_task(data, config, task):
+    # Evaluate one split in a worker (or the main process, for a serial run). The task only holds the row indices of
+    # the split and what it evaluates, and config the settings shared by all the tasks, so neither holds the splitter
+    # or the data. For a parallel run, the data is read from the memory-mapped files it is shared through
+    X, y, X_extra, groups, X_force_train, y_force_train = load_shared_data(data)
+    train_rows, test_rows, train_ind, test_ind, split_count, splitdir, split_prepared, job_id, job = task
+    model, model_name, selector, hyperopt, has_model_errors = job
+    # TODO: not copying this causes issues with KerasRegressor when doing different split types. But, doing this breaks BaggingRegressor with KerasRegressor networks
+    #model_orig = copy.deepcopy(model)
+    # The selector is fit in place, so use a copy of it. The preprocessor and model are copied in _evaluate_split
+    # and the hyperopt isn't modified by fitting it
+    selector_orig = copy.deepcopy(selector)
+
+    # Make the train/test data of this split from the row indices. The y data is taken from the array of its values,
+    # and made into series with the same (range) index as y_pred, so the residuals are computed without aligning them
+    X_train = X.iloc[train_rows]
+    X_test = X.iloc[test_rows]
+    y_values = np.asarray(y).ravel()
+    y_train = y_values[train_rows]
+    has_force_train = X_force_train is not None and y_force_train is not None
+    if has_force_train is True:
+        X_train = pd.concat([X_train, X_force_train])
+        y_train = np.concatenate([y_train, np.asarray(y_force_train).ravel()])
+    y_train = pd.Series(y_train, name='y_train')
+    y_test = pd.Series(y_values[test_rows], name='y_test')
+
+    if X_extra is not None:
+        # The extra data has the same rows as X, so it is taken by position, unless rows of the forced training data
+        # were added to the training data
+        if has_force_train is True:
+            X_extra_train = X_extra.loc[X_train.index.values, :]
+        else:
+            X_extra_train = X_extra.iloc[train_rows]
+        X_extra_test = X_extra.iloc[test_rows]
+    else:
+        X_extra_train = None
+        X_extra_test = None
+
+    if groups is not None:
+        group = pd.Series(np.array(groups)[test_rows])
+        group_train = pd.Series(np.array(groups)[train_rows])
+    else:
+        group = None
+        group_train = None
+
+    split_name = 'split_' + str(split_count)
+    splitpath = os.path.join(splitdir, split_name)
+    # The directory of a split left unfinished by an interrupted run is made again
+    if os.path.exists(splitpath):
+        shutil.rmtree(splitpath)
+    os.mkdir(splitpath)
+
+    # Optionally profile the split evaluation, saving its profiles in the split directory
+    with Profiler(profile=config['profile']).record(savepath=splitpath, name='profile'):
+        results = config['splitter']._evaluate_split(X_train, X_test, y_train, y_test, model, model_name,
+                                                     config['mastml'], config['preprocessor'], selector_orig, hyperopt,
+                                                     config['metrics'], config['plots'], group, group_train, splitpath,
+                                                     has_model_errors, X_extra_train, X_extra_test,
+                                                     config['error_method'], config['remove_outlier_learners'],
+                                                     config['verbosity'], config['baseline_test'],
+                                                     config['distance_metric'], config['domain_distance'],
+                                                     config['file_extension'], config['image_dpi'],
+                                                     write_split_files=config['write_split_files'],
+                                                     prepared=split_prepared, fit_cache=config['fit_cache'],
+                                                     keep_model=_split_key(splitdir, split_name)[0] is not None,
+                                                     **config['kwargs'])
+
+    # Keep the test data indices and train data indices with the split results
+    results['test_inds'] = test_ind
+    results['train_inds'] = train_ind
+
+    # Keep the row indices and selected features instead of the X data of the split, which is rebuilt from the
+    # full data when needed, so the split frames are freed once the split is evaluated
+    results['train_rows'] = train_rows
+    results['test_rows'] = test_rows
+    results['selected_features'] = results['X_train'].columns.tolist()
+    for key in ['X_train', 'X_test', 'X_extra_train', 'X_extra_test']:
+        results.pop(key, None)
+
+    # Save the split results, so a resumed run can reload them. The fitted model is already saved in the split
+    # directory, and only the model of the best split is loaded back
+    if config['write_checkpoint'] is True:
+        joblib.dump({key: value for key, value in results.items() if key != 'model'},
+                    os.path.join(splitpath, 'split_results.pkl'))
+
+    return job_id, splitdir, split_name, results
+
 
 class BaseSplitter(ms.BaseCrossValidator):
     """
@@ -107,7 +227,22 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 y_splits: (list), list of dataframes for y splits
 
-        evaluate: main method to evaluate a sequence of models, selectors, and hyperparameter optimizers, build directories and perform analysis and output plots
+        make_split_plan: method to make the splits of the data once, as a plan (see mastml.split_plan) that can be saved and passed as the split_plan of evaluate to evaluate other models on the same splits, without remaking them
+            Args:
+                X: (pd.DataFrame), dataframe of X features
+
+                y: (pd.Series), series of y target data
+
+                groups: (pd.Series), series of group designations
+
+                nested_CV: (bool), whether to make the splits of nested cross-validation, see evaluate. Default False.
+
+                leaveout_inds: (list), list of arrays containing indices of data to be held out, see evaluate. Default None.
+
+            Returns:
+                split_plan: (mastml.split_plan.SplitPlan), the plan of the splits, fingerprinted against X, y and groups
+
+        evaluate: main method to evaluate a sequence of models, selectors, and hyperparameter optimizers, build directories and perform analysis and output plots. The splits are made once and used for all the models, and the preprocessing and feature selection of each split are done once per selector and reused by all the models. The splits of all the models and selectors are evaluated together (on a single pool of workers for a parallel run), and each model and selector pair is summarized as soon as its splits are done. The time spent in each stage of each split (e.g. preprocessing, model fit, predict, plots and file writes) is recorded, saved as stage_times in the save directory of each pair and in the metadata, and kept on the splitter as the stage_times dataframe (one row per split) and the stage_times_summary dataframe (summed over the splits of each model and selector pair). The peak memory (RSS) of the worker evaluating each split is also recorded, saved as memory_report in the save directory of each pair, and kept on the splitter as the memory_report dataframe. With racing=True, the model and selector pairs are raced by successive halving: all the pairs are evaluated on a first few splits, the worst are dropped, and the others are evaluated on more splits, until the winners are evaluated (and summarized) on all the splits. With adaptive_repeats=True and a splitter of repeated splits (e.g. RepeatedKFold), the splits are evaluated one repeat at a time, and each pair stops once the standard error of the mean of its best_run_metric is below a tolerance, or a time budget runs out
             Args:
                 X: (pd.DataFrame), dataframe of X features
 
@@ -151,71 +286,155 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 domain_distance: (str), distance metric to perform domain evaluation of test data
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
 
                 image_dpi: (int), determines output image quality
 
                 remove_split_dirs: (bool), whether to remove all the inner split directories after data and plots saved
 
+                write_split_files: (bool), whether to write the data of each individual split (e.g. y_pred, residuals, X_train, preprocessed and selected X data) to files in its split directory. The aggregation over all splits is done in memory either way. Default True.
+
+                n_jobs: (int), number of worker processes used when parallel_run is True. The splits of all the models and selectors (and for nested CV, the inner splits of all the outer splits) share this pool of workers. Default None uses all available cores.
+
+                fit_cache: (mastml.fit_cache.FitCache), on-disk cache of fitted models. Splits whose model was already fit on the same data (with the same selected features, preprocessor, model parameters and hyperopt) reuse the cached model and predictions rather than refitting the model. Default None means the models are always fit.
+
+                checkpoint: (bool), whether to record the splits and the work done in a run journal in savepath (see mastml.run_journal), and save the results of each split in its directory, so the run can be resumed if it is interrupted. Default False.
+
+                resume: (bool), whether to resume an interrupted run saved to savepath with checkpoint=True. The splits of the interrupted run are used, the jobs (model and selector pairs) already done are skipped, the results of the splits already evaluated are reloaded, and only the missing splits are evaluated before summarizing each job. The run keeps being recorded, so it can be resumed again. Default False.
+
+                profile: (bool or str), whether to profile the evaluation of each split, and what to profile: True or 'all' for the time (cProfile) and memory (tracemalloc), 'cpu' for the time only, 'memory' for the memory only, or 'sampling' for the time with the pyinstrument sampling profiler, if installed (see mastml.profiler). The profiles of each split are saved in its directory as profile.pstats and profile_allocations.csv, and merged into profile_merged files for each model and selector pair and for the whole run (in savepath). Default None means no profiling.
+
+                memory_budget: (float), total memory in GB the workers of a parallel run may use. The first split is evaluated alone, then the number of splits evaluated at once is capped at the budget divided by the largest peak memory of the workers on the splits done so far, so fewer workers run at once when each split needs a lot of memory (e.g. for large random forests). Default None evaluates n_jobs splits at once.
+
+                memory_limit: (float), hard memory limit in GB of the worker evaluating each split (or, for a serial run, of the memory the split adds to the main process). A split going over it is stopped and fails rather than running the machine out of memory, and the splits of the other models that would have reused its preprocessing and feature selection do their own. Each model and selector pair is summarized over the splits that didn't fail, with a warning, and the failed splits are listed in its memory_report and metadata. With checkpoint=True, the run can then be resumed with a higher limit to only evaluate the failed splits. Default None uses memory_budget as the limit, if given, and otherwise means no limit.
+
+                time_limit: (float), time limit in seconds of the evaluation of each split. A split going over it is stopped and fails like a split going over memory_limit, so one slow or hung split doesn't stall the run. In a parallel run, a split that can't be stopped (e.g. hung in compiled code) is killed with its worker a few seconds later. Default None means no limit.
+
+                split_plan: (mastml.split_plan.SplitPlan), plan of the splits to evaluate, made by make_split_plan (possibly in an earlier run, and loaded with SplitPlan.load). The splits of the plan are used rather than made by the splitter, and nested_CV is ignored, as the plan holds the splits of the nested cross-validation (and left-out data) it was made with. A ValueError is raised if the plan was made for different data, or if leaveout_inds are also given. Default None makes the splits.
+
+                batch_time: (float), time in seconds to aim for when sending quick splits (e.g. of a linear model on small data, or the many splits of leave-one-out style splitters) to the workers of a parallel run in batches, so they don't each pay the cost of sending a task to a worker. The time of each split is measured as the run goes, and slow splits are still sent one at a time. Splits aren't batched with a time_limit. Default 0.5. None sends every split alone.
+
+                racing: (bool), whether to race the model and selector pairs by successive halving rather than evaluating them all on all the splits. Each round evaluates the pairs left on more splits (the splits done in earlier rounds are kept), ranks them by the average of best_run_metric over their test splits, and drops the worst, until the last round evaluates the winners on all the splits. Only the winners are summarized (and registered in the catalog). The save directory of each dropped pair holds its racing_results, and a resumed run doesn't race it again. Each round is saved as racing_results in savepath, and kept on the splitter as the racing_results dataframe. Not supported with nested_CV or left-out data. Default False.
+
+                racing_keep: (float), fraction of the pairs kept after each round, between 0 and 1. The number of splits of each round grows by 1/racing_keep. Default 0.5, i.e. successive halving.
+
+                racing_min_splits: (int), number of splits of the first round. Default None picks it so the last round, with a single winner, evaluates all the splits.
+
+                adaptive_repeats: (bool), whether to evaluate the repeats of a splitter of repeated splits (e.g. RepeatedKFold or RepeatedStratifiedKFold, or LeaveOutPercent) adaptively, rather than all of them. The first min_repeats repeats are evaluated, then one more repeat at a time for each model and selector pair until the standard error of the mean of best_run_metric over its test splits is at most repeats_tolerance, the time budget runs out, or all the n_repeats of the splitter (the most repeats) are evaluated. Each pair is summarized over the repeats it was evaluated on, and each round is saved as repeats_results in savepath, and kept on the splitter as the repeats_results dataframe. Not supported with racing, nested_CV or left-out data. Default False.
+
+                repeats_tolerance: (float), standard error of the mean of best_run_metric at which a pair stops being evaluated on more repeats, in the units of the metric. Default None uses 1% of the absolute value of the mean.
+
+                repeats_time_budget: (float), time in seconds after which no more repeats are started. The repeats being evaluated are finished. Default None means no time limit.
+
+                min_repeats: (int), number of repeats evaluated before the standard error is checked. Default 3.
+
+                catalog: (mastml.results_catalog.ResultsCatalog), catalog of run results to register each (model, selector) pair evaluated into, with its configuration, dataset hash, timing, the test and train metrics (or left-out metrics for nested CV) of each split and their summary, and the paths of its model and stats summary files. Default None means the results are not registered.
+
                 **kwargs: (str), extra argument for domain_distance, eg. minkowsi requires additional arg p
 
             Returns:
                 None
 
-        _evaluate_split_sets: method to evaluate a set of train/test splits. At the end of the split set, the left-out data (if any) is evaluated using the best model from the train/test splits
+        _get_split_tasks: method to lazily make the split tasks (the row indices and save directory of each split) of a set of train/test splits
             Args:
-                X_splits: (list), list of dataframes for X splits
+                splits: (list or mastml.split_plan.PackedSplits), sequence of (train, test) arrays of indices of each split
 
-                y_splits: (list), list of dataframes for y splits
+                splitdir: (str), string denoting the split path in the save directory
 
-                train_inds: (list), list of arrays of indices denoting the training data
+                rows: (np.ndarray), positions in the full data of the data that was split (e.g. the data not left out of an outer split). Default None means the full data was split.
 
-                test_inds: (list), list of arrays of indices denoting the testing data
+                start: (int), position of the first split to make tasks for. Default 0.
 
-                model: (mastml.models instance), an estimator for fitting data
+                stop: (int), position after the last split to make tasks for. Default None makes tasks up to the last split.
 
-                model_name: (str), class name of the model being evaluated
+            Returns:
+                tasks: (generator), generator of tuples of the row indices of each split, to pass to _evaluate_split_jobs
 
-                selector: (mastml.selector), a feature selector to select features in each split
+        _get_nested_splits: method to make the inner train/test splits of each outer split of nested CV, so they are made once and used for all the models
+            Args:
+                X: (pd.DataFrame), dataframe of X features
 
-                preprocessor: (mastml.preprocessor), mastml.preprocessor object to normalize the training data in each split.
+                y: (pd.Series), series of y target data
+
+                groups: (pd.Series), series of group designations
+
+                leaveout_inds: (list), list of arrays of indices of the left-out data of each outer split
+
+            Returns:
+                inner_splits: (list), list of the (train, test) splits of the data not left out of each outer split
+
+        _get_nested_split_tasks: method to lazily make the split tasks of the inner train/test splits of each outer split of nested CV
+            Args:
+                X: (pd.DataFrame), dataframe of X features
+
+                leaveout_inds: (list), list of arrays of indices of the left-out data of each outer split
+
+                inner_splits: (list), list of the inner splits of each outer split, made with _get_nested_splits
+
+                splitouterpaths: (list), list of the directories of each outer split
+
+            Returns:
+                tasks: (generator), generator of tuples of the row indices of each inner split, to pass to _evaluate_split_jobs
+
+        _evaluate_split_jobs: method to evaluate the split tasks of several jobs (e.g. each model and selector pair of evaluate) together, either serially or on a single pool of parallel workers. The tasks of all the jobs are run as one graph (see mastml.task_graph), where the task of a split that is already preprocessed and feature selected for an earlier job with the same prepared cache runs once that split is done, and reuses it. For a parallel run, X, y, X_extra and groups are shared with the workers through memory-mapped files (see mastml.shared_data), so the tasks only hold split indices
+            Args:
+                jobs: (list), list of dicts of each job, holding its model, model_name, selector, hyperopt, has_model_errors, tasks (made with _get_split_tasks or _get_nested_split_tasks) and prepared cache (dict, may be shared by several jobs). When resuming a run, a job also holds its journal key and splits_done, the set of its splits whose results are reloaded rather than evaluated. Other items are kept as is.
+
+                X: (pd.DataFrame), dataframe of X features
+
+                y: (pd.Series), series of y target data
 
                 X_extra: (pd.DataFrame), dataframe of extra X data not used in model fitting
 
                 groups: (pd.Series), series of group designations
 
-                splitdir: (str), string denoting the split path in the save directory
+                X_force_train: (pd.DataFrame), dataframe of X features added to the training data of every split
 
-                hyperopt: (mastml.hyperopt), mastml.hyperopt instance to perform model hyperparameter optimization in each split
+                y_force_train: (pd.Series), series of y data added to the training data of every split
 
-                metrics: (list), list of metric names to evaluate true vs. pred data in each split
+                mastml: (mastml.mastml.Mastml), the run whose metadata is updated with each split, or None
 
-                plots: (list), list of names denoting which types of plots to make. Valid names are 'Scatter', 'Error', and 'Histogram'
+                parallel_run: (bool), whether to evaluate the split tasks in parallel
 
-                has_model_errors: (bool), whether the model used has error bars (uncertainty quantification)
+                n_jobs: (int), number of worker processes used when parallel_run is True. Default None uses all available cores.
 
-                error_method: (str), the type of model error evaluation method to perform. Only applies to certain models. Valid names are 'stdev_weak_learners' and 'jackknife_after_bootstrap'
+                fit_cache: (mastml.fit_cache.FitCache), on-disk cache of fitted models. Default None means the models are always fit.
 
-                remove_outlier_learners: (bool), whether to remove weak learners from ensemble models whose predictions are found to be outliers. Default False.
+                journal: (mastml.run_journal.RunJournal), run journal recording each evaluated split. The results of each split are also saved in its directory. Default None means nothing is recorded.
 
-                recalibrate_errors: (bool), whether to perform the predicted error bar recalibration method of Palmer et al. Default False.
+                profile: (bool or str), whether to profile the evaluation of each split, and what to profile (see mastml.profiler.Profiler). Default None means no profiling.
 
-                verbosity: (int), the output plotting verbosity. Default is 1. Valid choices are 0, 1, 2, and 3.
+                memory_budget: (float), total memory in GB the workers of a parallel run may use, see evaluate. Default None means no budget.
 
-                baseline_test: (list), list of arrays containing base line tests to run.
+                memory_limit: (float), hard memory limit in GB of the worker evaluating each split, see evaluate. Default None means no limit.
 
-                distance_metric: (str), distance metric to use in baseline_test's test_nearest_neighbour_cdist method
+                time_limit: (float), time limit in seconds of the evaluation of each split, see evaluate. Default None means no limit.
 
-                domain_distance: (str), distance metric to perform domain evaluation of test data
+                batch_time: (float), time in seconds to aim for when sending quick splits to the workers in batches, see evaluate. Default 0.5.
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                (the other arguments are the same as _evaluate_split)
 
-                image_dpi: (int), determines output image quality
+            Returns:
+                job_results: (generator), generator of (job, split_results) tuples, where split_results is a dict of split set directory to mastml.split_results.SplitResults instance. The jobs are returned in order, each as soon as all its splits are evaluated. The splits that failed (went over the memory or time limit) are recorded as failed in the SplitResults. Once all the splits are done, the peak memory and status of each split is kept as the memory_report dataframe and saved as memory_report in the save directory of each job (if it has a splitdir)
 
-                **kwargs: (str), extra argument for domain_distance, eg. minkowsi requires additional arg p
+        _summarize_split_sets: method to save, recalibrate and plot the data of a set of evaluated train/test splits over all the splits, and update the metadata
+            Args:
+                split_results: (mastml.split_results.SplitResults), in-memory results of each evaluated split of the split set
+
+                X_extra: (pd.DataFrame), dataframe of extra X data not used in model fitting
+
+                groups: (pd.Series), series of group designations
+
+                splitdir: (str), string denoting the split path in the save directory
+
+                recalibrate_errors: (bool), whether to perform the predicted error bar recalibration method of Palmer et al. Default False.
+
+                (the other arguments are the same as _evaluate_split)
 
             Returns:
-                None
+                outerdir: (str), name of the directory of the split set, used as the metadata key
+
+                split_results: (mastml.split_results.SplitResults), in-memory results of each evaluated split
 
         _evaluate_split: method to evaluate a single data split, i.e. fit model, predict test data, and perform some plots and analysis
             Args:
@@ -263,14 +482,22 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 domain_distance: (str), distance metric to perform domain evaluation of test data
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
 
                 image_dpi: (int), determines output image quality
 
+                write_split_files: (bool), whether to save the preprocessed and selected data of the split to files in its split directory. Default True.
+
+                prepared: (dict), preprocessing and feature selection of this split already done for another model (selected_features, fitted preprocessor, and the split path and names of the output files to copy). Default None means the split is preprocessed and selected here.
+
+                fit_cache: (mastml.fit_cache.FitCache), on-disk cache of fitted models. On a cache hit, the hyperopt and model fit are skipped and the cached model and predictions are used. Default None means the model is always fit.
+
+                keep_model: (bool), whether to keep the fitted model with the split results, e.g. for the inner splits of nested CV, whose best model predicts the left-out data. Otherwise the model is only saved in the split directory. Default False.
+
                 **kwargs: (str), extra argument for domain_distance, eg. minkowsi requires additional arg p
 
             Returns:
-                None
+                results: (dict), dictionary of the split data, predictions, residuals, model errors and stats, keyed by data name (e.g. 'y_pred', 'test_stats')
 
         _setup_savedir: method to create a save directory based on model/selector/preprocessor names
             Args:
@@ -282,6 +509,17 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 savepath: (str), string denoting the save path of the file
 
+        _get_data_files: method to get the paths of the data files saved for a split or split set, which are recorded in the metadata
+            Args:
+                savepath: (str), string denoting the save path of the files
+
+                keys: (list), list of the names of the data, e.g. 'y_pred' or 'model_errors_test_cal'
+
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', the data file type
+
+            Returns:
+                data_files: (OrderedDict), dict of the name of each data that was saved and the path of its file
+
         _save_split_data: method to save the X and y split data to excel files
             Args:
                 df: (pd.DataFrame), dataframe of X or y data to save to file
@@ -292,7 +530,7 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 columns: (list), list of dataframe column names, e.g. X feature names
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
 
             Returns:
                 None
@@ -303,7 +541,7 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 savepath: (str), string denoting the save path of the file
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
 
                 iterdirs: (bool), whether to recursively search within directories to collect data or just look in cwd
 
@@ -316,7 +554,7 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 savepath: (str), string denoting the save path of the file
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
 
             Returns:
                 data: (list), list containing flattened array of all data of a given type over many splits, e.g. all Xtest data
@@ -331,10 +569,12 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 model_name: (str), class name of model being evaluated
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
+
+                split_results: (mastml.split_results.SplitResults), in-memory split results to find the best split from. If None, the test_stats_summary file of each split is read
 
             Returns:
-                best_split_dict: (dict), dictionary containing the path locations of the best model and corresponding preprocessor and selected feature list
+                best_split_dict: (dict), dictionary containing the path locations of the best model and corresponding preprocessor and selected feature list, and the name of the best split
 
         _get_average_recalibration_params: method to get the average and standard deviation of the recalibration factors in all train/test CV sets
             Args:
@@ -342,7 +582,9 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 data_type: (str), string denoting the type of data to examine (e.g. test or leftout)
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
+
+                split_results: (mastml.split_results.SplitResults), in-memory results of each split set holding its recalibration parameters. If None, the parameters are read from file
 
             Returns:
                 recalibrate_avg_dict: (dict): dictionary of average recalibration parameters
@@ -355,11 +597,160 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 data_type: (str), string denoting the type of data to examine (e.g. test or leftout)
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
 
             Returns:
                 recalibrate_dict: (dict): dictionary of recalibration parameters
 
+        _get_group_indices: method to get the row indices of each group, used by the group splitters to build their splits without scanning all the rows for each split
+            Args:
+                groups: (numpy array), array of group labels
+
+            Returns:
+                group_inds: (OrderedDict), dict of the sorted row indices of each group, with the groups in sorted order
+
+        _get_stage_times: method to get the stage times of the splits of an evaluated (model, selector) pair
+            Args:
+                split_results: (mastml.split_results.SplitResults), the results of the splits
+
+                model_name: (str), class name of the model evaluated
+
+                selector: (mastml.feature_selectors instance), the feature selector used
+
+                splitdir: (str), the save directory of the evaluated pair
+
+                prefix: (str), prefix of the split names, used for the inner splits of nested CV. Default ''
+
+            Returns:
+                df_stage_times: (pd.DataFrame), dataframe of the time in seconds of each stage (columns) of each split and of the summary over the splits (rows)
+
+        _merge_profiles: method to merge the split profiles of an evaluated (model, selector) pair into profile_merged files in its save directory
+            Args:
+                profiler: (mastml.profiler.Profiler), the profiler used for the splits
+
+                splitdir: (str), the save directory of the evaluated pair
+
+            Returns:
+                None
+
+        _race_split_jobs: method to race jobs by successive halving, evaluating all the jobs on a first few splits, then only the best of them on more splits each round, until the winners are evaluated on all the splits
+            Args:
+                jobs: (list), list of dicts of each job, see _evaluate_split_jobs. The jobs must have a splitdir
+
+                splits: (list), list of (train, test) arrays of indices of each split
+
+                best_run_metric: (str), name of the metric the jobs are ranked by, averaged over their test splits
+
+                racing_keep: (float), fraction of the jobs kept after each round
+
+                racing_min_splits: (int), number of splits of the first round, or None to pick it so the last round, with a single winner, evaluates all the splits
+
+                savepath: (str), path to save the racing results to
+
+                evaluate_args: (dict), the arguments of _evaluate_split_jobs other than jobs, by name
+
+            Returns:
+                job_results: (generator), generator of (job, split_results) tuples of the winners, as returned by _evaluate_split_jobs
+
+        _repeat_split_jobs: method to evaluate jobs on the repeats of a splitter of repeated splits one repeat at a time, until the standard error of the mean of the metric of each job is below a tolerance, a time budget runs out or the repeats run out
+            Args:
+                jobs: (list), list of dicts of each job, see _evaluate_split_jobs. The jobs must have a splitdir
+
+                splits: (list), list of (train, test) arrays of indices of each split, ordered by repeat
+
+                n_repeats: (int), number of repeats in splits
+
+                best_run_metric: (str), name of the metric whose standard error is checked, over the test splits of each job
+
+                repeats_tolerance: (float), standard error at which a job is stopped, or None for 1% of the absolute value of the mean
+
+                repeats_time_budget: (float), time in seconds after which no more repeats are started, or None for no limit
+
+                min_repeats: (int), number of repeats of the first round
+
+                savepath: (str), path to save the repeats results to
+
+                evaluate_args: (dict), the arguments of _evaluate_split_jobs other than jobs, by name
+
+            Returns:
+                job_results: (generator), generator of (job, split_results) tuples of all the jobs, as returned by _evaluate_split_jobs
+
+        _evaluate_split_round: method to evaluate some of the jobs on a range of the splits, used for each round of racing or adaptive repeats
+            Args:
+                jobs: (list), list of dicts of each job, see _evaluate_split_jobs
+
+                job_ids: (list), indices of the jobs to evaluate
+
+                splits: (list), list of (train, test) arrays of indices of each split
+
+                start: (int), index of the first split to evaluate
+
+                stop: (int), index after the last split to evaluate
+
+                job_splits: (dict), dict of {job index: mastml.split_results.SplitResults} the results of the splits are added to
+
+                evaluate_args: (dict), the arguments of _evaluate_split_jobs other than jobs, by name
+
+            Returns:
+                memory_report: (pd.DataFrame), the peak memory of each split evaluated, see _save_memory_report
+
+        _get_round_results: method to save the memory report of all the rounds of racing or adaptive repeats, and return the results of the jobs over the splits they were evaluated on
+            Args:
+                jobs: (list), list of dicts of each job, see _evaluate_split_jobs
+
+                job_ids: (list), indices of the jobs to return
+
+                job_splits: (dict), dict of {job index: mastml.split_results.SplitResults}
+
+                memory_reports: (list), list of the memory report dataframes of each round
+
+                file_extension: (str), file extension of the saved memory reports
+
+            Returns:
+                job_results: (generator), generator of (job, split_results) tuples, as returned by _evaluate_split_jobs
+
+        _save_memory_report: method to keep the peak memory and status of each evaluated split as the memory_report dataframe, and save it in the save directory of each job
+            Args:
+                graph: (mastml.task_graph.TaskGraph), the task graph the splits were evaluated with
+
+                jobs: (list), list of dicts of each job, see _evaluate_split_jobs
+
+                task_names: (dict), dict of {task id: (job index, split name)}
+
+                file_extension: (str), file extension of the saved memory reports
+
+            Returns:
+                None
+
+        _add_to_catalog: method to register the results of an evaluated (model, selector) pair in a results catalog
+            Args:
+                catalog: (mastml.results_catalog.ResultsCatalog), the results catalog
+
+                dataset_hash: (str), hash of the X and y data evaluated
+
+                time_started: (float), time the evaluate run started, in seconds since the epoch
+
+                splitdir: (str), the save directory of the evaluated pair
+
+                model: (mastml.models instance), the model evaluated
+
+                model_name: (str), class name of the model evaluated
+
+                preprocessor: (mastml.preprocessing instance), the preprocessor used
+
+                selector: (mastml.feature_selectors instance), the feature selector used
+
+                hyperopt: (mastml.hyperopt instance), the hyperparameter optimizer used, or None
+
+                split_results: (mastml.split_results.SplitResults), the results of the splits
+
+                data_types: (list), the data types of the metrics to register, e.g. ['test', 'train']
+
+                file_extension: (str), file extension of the saved stats summary files
+
+            Returns:
+                run_id: (int), the id of the registered run in the catalog
+
         help: method to output key information on class use, e.g. methods and parameters
             Args:
                 None
@@ -395,20 +786,54 @@ class BaseSplitter(ms.BaseCrossValidator):
                 #train_inds.append(np.concatenate([train, train_inds_extra]))
         return X_splits, y_splits, train_inds, test_inds
 
+    def make_split_plan(self, X, y=None, groups=None, nested_CV=False, leaveout_inds=None):
+        # Make the splits like evaluate does
+        if leaveout_inds is None:
+            leaveout_inds = list()
+        if nested_CV == True:
+            leaveout_inds = [test for train, test in self.split(X, y, groups)] + list(leaveout_inds)
+        if len(leaveout_inds) > 0:
+            inner_splits = self._get_nested_splits(X, y, groups, leaveout_inds)
+            splits = None
+        else:
+            leaveout_inds = None
+            inner_splits = None
+            splits = PackedSplits(self.split(X, y, groups))
+        splitter_name = self.splitter if isinstance(self.splitter, str) else self.splitter.__class__.__name__
+        return SplitPlan(splits=splits, leaveout_inds=leaveout_inds, inner_splits=inner_splits, n_rows=X.shape[0],
+                         fingerprint=SplitPlan.get_fingerprint(X, y, groups), splitter_name=splitter_name)
+
     def evaluate(self, X, y, models, mastml=None, preprocessor=None, groups=None, hyperopts=None, selectors=None, metrics=None,
                  plots=None, savepath=None, X_extra=None, X_force_train=None, y_force_train=None, leaveout_inds=list(list()),
                  best_run_metric=None, nested_CV=False, error_method='stdev_weak_learners', remove_outlier_learners=False,
                  recalibrate_errors=False, verbosity=1, baseline_test = None, distance_metric="euclidean",
-                 domain_distance=None, file_extension='.csv', image_dpi=250, parallel_run=False, remove_split_dirs=False, **kwargs):
-
-        if nested_CV == True:
+                 domain_distance=None, file_extension='.csv', image_dpi=250, parallel_run=False, remove_split_dirs=False,
+                 write_split_files=True, n_jobs=None, fit_cache=None, checkpoint=False, resume=False, catalog=None,
+                 profile=None, memory_budget=None, memory_limit=None, racing=False, racing_keep=0.5,
+                 racing_min_splits=None, adaptive_repeats=False, repeats_tolerance=None, repeats_time_budget=None,
+                 min_repeats=3, time_limit=None, batch_time=0.5, split_plan=None, **kwargs):
+
+        file_extension = check_file_extension(file_extension)
+        # Splitters saving files of their own while splitting (e.g. LeaveOutTwinCV) save them with the extension of the run
+        self.file_extension = file_extension
+        time_started = time.time()
+        if not 0 < racing_keep < 1:
+            raise ValueError('racing_keep must be between 0 and 1, not '+str(racing_keep))
+
+        if split_plan is not None:
+            # The plan holds the splits of the nested cross-validation (if any) it was made with
+            if len(leaveout_inds) > 0:
+                raise ValueError('leaveout_inds can not be given with a split_plan, which holds the left-out data it was '
+                                 'made with. Pass the leaveout_inds to make_split_plan instead')
+            split_plan.check(X, y, groups)
+            leaveout_inds = split_plan.leaveout_inds if split_plan.leaveout_inds is not None else list()
+        elif nested_CV == True:
             if self.__class__.__name__ == 'NoSplit':
                 print('Warning: NoSplit does not support nested cross validation.')
             else:
                 # Get set of X_leaveout, y_leaveout for testing. Append them to user-specified X_leaveout tests
-                X_splits, y_splits, train_inds, test_inds = self.split_asframe(X=X, y=y, groups=groups, X_force_train=X_force_train, y_force_train=y_force_train)
                 leaveout_inds_orig = leaveout_inds
-                leaveout_inds = [i for i in test_inds]
+                leaveout_inds = [test for train, test in self.split(X, y, groups)]
                 if len(leaveout_inds_orig) > 0:
                     for i in leaveout_inds_orig:
                         leaveout_inds.append(i)
@@ -444,6 +869,48 @@ class BaseSplitter(ms.BaseCrossValidator):
         if not savepath:
             savepath = os.getcwd()
 
+        if catalog is not None:
+            dataset_hash = catalog.get_dataset_hash(X, y)
+
+        # Record the work done in a run journal, so the run can be resumed if it is interrupted
+        if checkpoint is True or resume is True:
+            journal = RunJournal(savepath)
+            run_name = journal.get_run_name(self)
+        else:
+            journal = None
+            run_name = None
+
+        # Make the splits once, so all the models and selectors are evaluated on the same splits, and the preprocessing
+        # and feature selection of each split done for the first model can be reused by the other models. The split
+        # generator is consumed one split at a time into compact int32 index arrays (see mastml.split_plan), rather than
+        # into a list of all the index arrays. A resumed run uses the splits of the interrupted run
+        if resume is True:
+            saved_splits = journal.load_splits(run_name)
+        else:
+            saved_splits = None
+        if saved_splits is not None:
+            leaveout_inds = saved_splits.leaveout_inds if saved_splits.leaveout_inds is not None else list()
+            inner_splits = saved_splits.inner_splits
+            splits = saved_splits.splits
+        else:
+            if split_plan is not None:
+                inner_splits = split_plan.inner_splits
+                splits = split_plan.splits
+            elif len(leaveout_inds) > 0:
+                inner_splits = self._get_nested_splits(X, y, groups, leaveout_inds)
+                splits = None
+            else:
+                inner_splits = None
+                splits = PackedSplits(self.split(X, y, groups))
+            if journal is not None:
+                journal.start_run(run_name)
+                journal.save_splits(run_name, SplitPlan(splits=splits, leaveout_inds=leaveout_inds if len(leaveout_inds) > 0
+                                                        else None, inner_splits=inner_splits, n_rows=X.shape[0]))
+        prepared_splits = [dict() for selector in selectors]
+
+        # Set up the save directories of each (model, selector) pair, or job, to evaluate
+        jobs = list()
+        job_count = 0
         self.splitdirs = list()
         for model, hyperopt in zip(models, hyperopts):
 
@@ -467,801 +934,988 @@ class BaseSplitter(ms.BaseCrossValidator):
                           'error estimation. Automatically changing to set recalibrate_errors = False')
                     recalibrate_errors = False
 
-            for selector in selectors:
-                splitdir = self._setup_savedir(model=model, selector=selector, preprocessor=preprocessor, savepath=savepath)
-                self.splitdirs.append(splitdir)
-                split_outer_count = 0
+            for selector, prepared in zip(selectors, prepared_splits):
+                # A resumed run reuses the save directory of each job of the interrupted run, and skips the jobs that
+                # were already done
+                if journal is not None:
+                    job_key = journal.get_job_key(run_name, job_count, model, selector, preprocessor, hyperopt)
+                    splitdir = journal.get_splitdir(job_key)
+                else:
+                    job_key = None
+                    splitdir = None
+                job_count += 1
+                if splitdir is not None and os.path.exists(splitdir):
+                    self.splitdirs.append(splitdir)
+                    if journal.is_job_done(job_key):
+                        continue
+                else:
+                    splitdir = self._setup_savedir(model=model, selector=selector, preprocessor=preprocessor, savepath=savepath)
+                    self.splitdirs.append(splitdir)
+                    if journal is not None:
+                        journal.add_job(job_key, splitdir)
+                splitouterpaths = list()
                 if len(leaveout_inds) > 0:
-                    # HERE is parallel step needed for nested CV, but having issues with "daemonic processes are not allowed to have children".
-                    '''
-                    def run_outer_loop_serial(leaveout_ind, X, y, X_extra, groups, splitdir, preprocessor):
-                        X_subsplit = X.loc[~X.index.isin(leaveout_ind)]
-                        y_subsplit = y.loc[~y.index.isin(leaveout_ind)]
-                        X_leaveout = X.loc[X.index.isin(leaveout_ind)]
-                        y_leaveout = y.loc[y.index.isin(leaveout_ind)]
-                        if X_extra is not None:
-                            X_extra_subsplit = X_extra.loc[~X_extra.index.isin(leaveout_ind)]
-                            X_extra_leaveout = X_extra.loc[X_extra.index.isin(leaveout_ind)]
-                        else:
-                            X_extra_subsplit = None
-                            X_extra_leaveout = None
-
-                        dataset_stdev = np.std(y_subsplit)
-
-                        if groups is not None:
-                            groups_subsplit = groups.loc[~groups.index.isin(leaveout_ind)]
-                            groups_leaveout = groups.loc[groups.index.isin(leaveout_ind)]
-                        else:
-                            groups_subsplit = None
-
-                        X_splits, y_splits, train_inds, test_inds = self.split_asframe(X=X_subsplit, y=y_subsplit,
-                                                                                       groups=groups_subsplit)
-
+                    for split_outer_count, leaveout_ind in enumerate(leaveout_inds):
                         # make the individual split directory
-                        # infer the split outer number based on how many folders exist
-                        folders = os.listdir(splitdir)
-                        folders = [i for i in folders if 'split_outer_' in i]
-                        split_outer_count = len(folders)
                         splitouterpath = os.path.join(splitdir, 'split_outer_' + str(split_outer_count))
                         # make the feature selector directory for this split directory
-                        os.mkdir(splitouterpath)
+                        if not os.path.exists(splitouterpath):
+                            os.mkdir(splitouterpath)
+                        splitouterpaths.append(splitouterpath)
 
                         # Save the left-out data indices
-                        if file_extension == '.xlsx':
-                            pd.DataFrame({'leaveout_inds': leaveout_ind}).to_excel(
-                                os.path.join(splitouterpath, 'leaveout_inds' + file_extension), index=False)
-                        elif file_extension == '.csv':
-                            pd.DataFrame({'leaveout_inds': leaveout_ind}).to_csv(
-                                os.path.join(splitouterpath, 'leaveout_inds' + file_extension), index=False)
+                        save_data(pd.DataFrame({'leaveout_inds': leaveout_ind}), os.path.join(splitouterpath, 'leaveout_inds' + file_extension), index=False)
 
                         # Save the left-out data groups
                         if groups is not None:
-                            groups_leaveout.name = 'leaveout_groups'
-                            if file_extension == '.xlsx':
-                                groups_leaveout.to_excel(
-                                    os.path.join(splitouterpath, 'leaveout_groups' + file_extension), index=False)
-                            elif file_extension == '.csv':
-                                groups_leaveout.to_csv(os.path.join(splitouterpath, 'leaveout_groups' + file_extension),
-                                                       index=False)
-
-                        outerdir = self._evaluate_split_sets(X_splits,
-                                                             y_splits,
-                                                             train_inds,
-                                                             test_inds,
-                                                             model,
-                                                             model_name,
-                                                             mastml,
-                                                             selector,
-                                                             preprocessor,
-                                                             X_extra_subsplit,
-                                                             groups_subsplit,  # groups subsplit??? Used to be "groups"
-                                                             splitouterpath,
-                                                             hyperopt,
-                                                             metrics,
-                                                             plots,
-                                                             has_model_errors,
-                                                             error_method,
-                                                             remove_outlier_learners,
-                                                             recalibrate_errors,
-                                                             verbosity,
-                                                             baseline_test,
-                                                             distance_metric,
-                                                             domain_distance,
-                                                             file_extension,
-                                                             image_dpi,
-                                                             parallel_run,
-                                                             **kwargs)
-                        #split_outer_count += 1
-
-                        best_split_dict = self._get_best_split(savepath=splitouterpath,
-                                                               preprocessor=preprocessor,
-                                                               best_run_metric=best_run_metric,
-                                                               model_name=model_name,
-                                                               file_extension=file_extension)
-                        # Copy the best model, selected features and preprocessor to this outer directory
-                        shutil.copy(best_split_dict['preprocessor'], splitouterpath)
-                        shutil.copy(best_split_dict['model'], splitouterpath)
-                        shutil.copy(best_split_dict['features'], splitouterpath)
-
-                        # Load in the best model, preprocessor and evaluate the left-out data stats
-                        best_model = joblib.load(best_split_dict['model'])
-                        preprocessor = joblib.load(best_split_dict['preprocessor'])
-                        if file_extension == '.xlsx':
-                            X_train_bestmodel = preprocessor.transform(pd.read_excel(best_split_dict['X_train'],
-                                                                                     engine='openpyxl'))  # Need to preprocess the Xtrain data
-                        elif file_extension == '.csv':
-                            X_train_bestmodel = preprocessor.transform(
-                                pd.read_csv(best_split_dict['X_train']))  # Need to preprocess the Xtrain data
-
-                        with open(os.path.join(splitouterpath, 'selected_features.txt')) as f:
-                            selected_features = [line.rstrip() for line in f]
-                        X_leaveout = X_leaveout[selected_features]
-                        X_leaveout_preprocessed = preprocessor.transform(X=X_leaveout)
-                        y_pred_leaveout = best_model.predict(X=X_leaveout_preprocessed)
-                        y_pred_leaveout = pd.Series(y_pred_leaveout, name='y_pred_leaveout')
-                        stats_dict_leaveout = Metrics(metrics_list=metrics).evaluate(y_true=y_leaveout,
-                                                                                     y_pred=y_pred_leaveout)
-                        df_stats_leaveout = pd.DataFrame().from_records([stats_dict_leaveout])
-                        if file_extension == '.xlsx':
-                            df_stats_leaveout.to_excel(
-                                os.path.join(splitouterpath, 'leaveout_stats_summary' + file_extension), index=False)
-                        elif file_extension == '.csv':
-                            df_stats_leaveout.to_csv(
-                                os.path.join(splitouterpath, 'leaveout_stats_summary' + file_extension), index=False)
-                        # At level of splitouterpath, do analysis over all splits (e.g. parity plot over all splits)
-                        if groups is not None:
-                            groups_leaveout_all = self._collect_data(filename='leaveout_groups',
-                                                                     savepath=splitouterpath,
-                                                                     file_extension=file_extension, iterdirs=False)
-                        else:
-                            groups_leaveout_all = None
-                        y_test_all = self._collect_data(filename='y_test', savepath=splitouterpath,
-                                                        file_extension=file_extension)
-                        y_train_all = self._collect_data(filename='y_train', savepath=splitouterpath,
-                                                         file_extension=file_extension)
-                        y_pred_all = self._collect_data(filename='y_pred', savepath=splitouterpath,
-                                                        file_extension=file_extension)
-                        y_pred_train_all = self._collect_data(filename='y_pred_train', savepath=splitouterpath,
-                                                              file_extension=file_extension)
-                        residuals_test_all = self._collect_data(filename='residuals_test', savepath=splitouterpath,
-                                                                file_extension=file_extension)
-                        residuals_train_all = self._collect_data(filename='residuals_train', savepath=splitouterpath,
-                                                                 file_extension=file_extension)
-                        X_train_all = self._collect_df_data(filename='X_train', savepath=splitouterpath,
-                                                            file_extension=file_extension)
-                        X_test_all = self._collect_df_data(filename='X_test', savepath=splitouterpath,
-                                                           file_extension=file_extension)
-
-                        # Save the data gathered over all the splits
-                        self._save_split_data(df=X_train_all, filename='X_train', savepath=splitouterpath,
-                                              columns=X_train_all.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=X_test_all, filename='X_test', savepath=splitouterpath,
-                                              columns=X_test_all.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=y_test_all, filename='y_test', savepath=splitouterpath,
-                                              columns='y_test', file_extension=file_extension)
-                        self._save_split_data(df=y_train_all, filename='y_train', savepath=splitouterpath,
-                                              columns='y_train', file_extension=file_extension)
-                        self._save_split_data(df=y_pred_all, filename='y_pred', savepath=splitouterpath,
-                                              columns='y_pred', file_extension=file_extension)
-                        self._save_split_data(df=y_pred_train_all, filename='y_pred_train', savepath=splitouterpath,
-                                              columns='y_pred_train', file_extension=file_extension)
-                        self._save_split_data(df=residuals_test_all, filename='residuals_test', savepath=splitouterpath,
-                                              columns='residuals', file_extension=file_extension)
-                        self._save_split_data(df=residuals_train_all, filename='residuals_train',
-                                              savepath=splitouterpath, columns='residuals',
-                                              file_extension=file_extension)
-
-                        if has_model_errors is True:
-                            model_errors_leaveout, num_removed_learners_leaveout = ErrorUtils()._get_model_errors(
-                                model=best_model,
-                                X=X_leaveout_preprocessed,
-                                X_train=X_train_bestmodel,
-                                X_test=X_leaveout_preprocessed,
-                                error_method=error_method,
-                                remove_outlier_learners=remove_outlier_learners)
-                            self._save_split_data(df=model_errors_leaveout, filename='model_errors_leaveout',
-                                                  savepath=splitouterpath, columns='model_errors',
-                                                  file_extension=file_extension)
-                            self._save_split_data(df=num_removed_learners_leaveout,
-                                                  filename='num_removed_learners_leaveout',
-                                                  savepath=splitouterpath, columns='num_removed_learners',
-                                                  file_extension=file_extension)
-                        else:
-                            model_errors_leaveout = None
-
-                        # Remake the leaveout y data series to reset the index
-                        y_leaveout = pd.Series(np.array(y_leaveout))
-                        y_pred_leaveout = pd.Series(np.array(y_pred_leaveout))
-
-                        self._save_split_data(df=X_leaveout, filename='X_leaveout', savepath=splitouterpath,
-                                              columns=X_leaveout.columns.tolist(), file_extension=file_extension)
-                        if X_extra is not None:
-                            self._save_split_data(df=X_extra_leaveout, filename='X_extra_leaveout',
-                                                  savepath=splitouterpath, columns=X_extra_leaveout.columns.tolist(),
-                                                  file_extension=file_extension)
-                        self._save_split_data(df=y_leaveout, filename='y_leaveout', savepath=splitouterpath,
-                                              columns='y_leaveout', file_extension=file_extension)
-                        self._save_split_data(df=y_pred_leaveout, filename='y_pred_leaveout', savepath=splitouterpath,
-                                              columns='y_pred_leaveout', file_extension=file_extension)
-
-                        residuals_leaveout = y_pred_leaveout - y_leaveout
-                        self._save_split_data(df=residuals_leaveout, filename='residuals_leaveout',
-                                              savepath=splitouterpath, columns='residuals',
-                                              file_extension=file_extension)
-
-                        if recalibrate_errors is True:
-                            recalibrate_dict = self._get_recalibration_params(savepath=splitouterpath,
-                                                                              data_type='test',
-                                                                              file_extension=file_extension)
-                            model_errors_leaveout_cal = recalibrate_dict['a'] * model_errors_leaveout + \
-                                                        recalibrate_dict['b']
-                            self._save_split_data(df=model_errors_leaveout_cal,
-                                                  filename='model_errors_leaveout_calibrated',
-                                                  savepath=splitouterpath, columns='model_errors',
-                                                  file_extension=file_extension)
-                        else:
-                            model_errors_leaveout_cal = None
-
-                        if verbosity > 0:
-                            make_plots(plots=plots,
-                                       y_true=y_leaveout,
-                                       y_pred=y_pred_leaveout,
-                                       X_test=X_leaveout,
-                                       groups=groups_leaveout_all,
-                                       data_type='leaveout',
-                                       dataset_stdev=dataset_stdev,
-                                       has_model_errors=has_model_errors,
-                                       metrics=metrics,
-                                       model=model,
-                                       model_errors=model_errors_leaveout,
-                                       residuals=residuals_leaveout,
-                                       savepath=splitouterpath,
-                                       show_figure=False,
-                                       recalibrate_errors=recalibrate_errors,
-                                       model_errors_cal=model_errors_leaveout_cal,
-                                       splits_summary=True,
-                                       file_extension=file_extension,
-                                       image_dpi=image_dpi)
-
-                        # Update the MASTML metadata file to include the leftout data info
-                        if mastml is not None:
-                            mastml._update_metadata(outerdir=outerdir,
-                                                    split_name='split_summary',
-                                                    leaveout_stats=df_stats_leaveout,
-                                                    X_leaveout=X_leaveout,
-                                                    X_extra_leaveout=X_extra_leaveout,
-                                                    y_leaveout=y_leaveout,
-                                                    y_pred_leaveout=y_pred_leaveout,
-                                                    residuals_leaveout=residuals_leaveout,
-                                                    model_errors_leaveout=model_errors_leaveout,
-                                                    model_errors_leaveout_cal=model_errors_leaveout_cal,
-                                                    )
-                            mastml._save_mastml_metadata()
-
-                        return
-
-                    if parallel_run == True:
-                        parallel(run_outer_loop_serial, x=leaveout_inds, X=X, y=y, X_extra=X_extra, groups=groups, splitdir=splitdir, preprocessor=preprocessor)
-                    else:
-                        [run_outer_loop_serial(i, X, y, X_extra, groups, splitdir, preprocessor) for i in leaveout_inds]
-                    '''
-
-                    for leaveout_ind in leaveout_inds:
-                        X_subsplit = X.loc[~X.index.isin(leaveout_ind)]
-                        y_subsplit = y.loc[~y.index.isin(leaveout_ind)]
-                        X_leaveout = X.loc[X.index.isin(leaveout_ind)]
-                        y_leaveout = y.loc[y.index.isin(leaveout_ind)]
-                        if X_extra is not None:
-                            X_extra_subsplit = X_extra.loc[~X_extra.index.isin(leaveout_ind)]
-                            X_extra_leaveout = X_extra.loc[X_extra.index.isin(leaveout_ind)]
-                        else:
-                            X_extra_subsplit = None
-                            X_extra_leaveout = None
-
-                        dataset_stdev = np.std(y_subsplit)
-
-                        if groups is not None:
-                            groups_subsplit = groups.loc[~groups.index.isin(leaveout_ind)]
                             groups_leaveout = groups.loc[groups.index.isin(leaveout_ind)]
-                        else:
-                            groups_subsplit = None
-
-                        X_splits, y_splits, train_inds, test_inds = self.split_asframe(X=X_subsplit, y=y_subsplit,
-                                                                                       groups=groups_subsplit,
-                                                                                       X_force_train=X_force_train,
-                                                                                       y_force_train=y_force_train)
+                            groups_leaveout.name = 'leaveout_groups'
+                            save_data(groups_leaveout, os.path.join(splitouterpath, 'leaveout_groups'+file_extension), index=False)
 
-                        # make the individual split directory
-                        splitouterpath = os.path.join(splitdir, 'split_outer_' + str(split_outer_count))
-                        # make the feature selector directory for this split directory
-                        os.mkdir(splitouterpath)
+                    # For nested CV, the inner train/test splits of all the outer splits are evaluated
+                    tasks = self._get_nested_split_tasks(X, leaveout_inds, inner_splits, splitouterpaths)
+                else:
+                    tasks = self._get_split_tasks(splits, splitdir)
+
+                jobs.append({'model': model, 'model_name': model_name, 'selector': selector, 'hyperopt': hyperopt,
+                             'has_model_errors': has_model_errors, 'recalibrate_errors': recalibrate_errors,
+                             'splitdir': splitdir, 'splitouterpaths': splitouterpaths, 'tasks': tasks,
+                             'prepared': prepared, 'key': job_key,
+                             'splits_done': journal.get_splits_done(job_key) if journal is not None else set()})
+
+        # The splits of all the jobs are evaluated together, so a parallel run keeps one pool of workers busy over all the
+        # models, selectors and splits rather than running one job (or outer split) at a time, or nesting pools, which
+        # daemonic workers can't do. Each job is summarized here as soon as all its splits are evaluated
+        evaluate_args = dict(X=X, y=y, X_extra=X_extra, groups=groups, X_force_train=X_force_train,
+                             y_force_train=y_force_train, mastml=mastml, preprocessor=preprocessor, metrics=metrics,
+                             plots=plots, error_method=error_method, remove_outlier_learners=remove_outlier_learners,
+                             verbosity=verbosity, baseline_test=baseline_test, distance_metric=distance_metric,
+                             domain_distance=domain_distance, file_extension=file_extension, image_dpi=image_dpi,
+                             parallel_run=parallel_run, write_split_files=write_split_files, n_jobs=n_jobs,
+                             fit_cache=fit_cache, journal=journal, profile=profile, memory_budget=memory_budget,
+                             memory_limit=memory_limit, time_limit=time_limit, batch_time=batch_time, **kwargs)
+        if racing is True and len(leaveout_inds) > 0:
+            print('Warning: racing is not supported with nested cross validation or left-out data. All the models '
+                  'are evaluated on all the splits')
+            racing = False
+        if adaptive_repeats is True:
+            # The repeats are read from the scikit-learn splitter (e.g. n_repeats of RepeatedKFold), or from the MAST-ML
+            # splitter itself (e.g. LeaveOutPercent), whose splitter is only its name, and the splits are ordered by repeat
+            splitter = getattr(self, 'splitter', None)
+            if splitter is None or isinstance(splitter, str):
+                n_repeats = getattr(self, 'n_repeats', None)
+            else:
+                n_repeats = getattr(splitter, 'n_repeats', None)
+            if racing is True or len(leaveout_inds) > 0:
+                print('Warning: adaptive_repeats is not supported with racing, nested cross validation or left-out '
+                      'data. All the repeats are evaluated')
+                adaptive_repeats = False
+            elif n_repeats is None or len(splits) % n_repeats != 0:
+                print('Warning: adaptive_repeats needs a splitter of repeated splits with an n_repeats parameter, e.g. '
+                      'RepeatedKFold. All the splits are evaluated')
+                adaptive_repeats = False
+        if racing is True and len(jobs) > 1:
+            job_results = self._race_split_jobs(jobs, splits, best_run_metric, racing_keep, racing_min_splits, savepath,
+                                                evaluate_args)
+        elif adaptive_repeats is True:
+            job_results = self._repeat_split_jobs(jobs, splits, n_repeats, best_run_metric, repeats_tolerance,
+                                                  repeats_time_budget, min_repeats, savepath, evaluate_args)
+        else:
+            job_results = self._evaluate_split_jobs(jobs, **evaluate_args)
+        stage_times = list()
+        profiler = Profiler(profile=profile)
+        job_profiles = list()
+        for job, job_split_results in job_results:
+            model = job['model']
+            model_name = job['model_name']
+            selector = job['selector']
+            hyperopt = job['hyperopt']
+            has_model_errors = job['has_model_errors']
+            recalibrate_errors = job['recalibrate_errors']
+            splitdir = job['splitdir']
+            splitouterpaths = job['splitouterpaths']
+            # A pair none of whose splits could be evaluated (e.g. they all went over the time or memory limit) can't be
+            # summarized
+            if all([len(r) == 0 for r in job_split_results.values()]):
+                print('Warning: all the splits of '+splitdir+' failed to be evaluated, so it is not summarized. See its '
+                      'memory_report for why they failed')
+                continue
+            if len(leaveout_inds) > 0:
+                inner_results_all = job_split_results
+                outer_results = SplitResults()
+                for leaveout_ind, splitouterpath in zip(leaveout_inds, splitouterpaths):
+                    if len(inner_results_all[splitouterpath]) == 0:
+                        print('Warning: all the splits of '+splitouterpath+' failed to be evaluated, so it is left out '
+                              'of the summary. See the memory_report of '+splitdir+' for why they failed')
+                        continue
+                    y_subsplit = y.loc[~y.index.isin(leaveout_ind)]
+                    X_leaveout = X.loc[X.index.isin(leaveout_ind)]
+                    y_leaveout = y.loc[y.index.isin(leaveout_ind)]
+                    if X_extra is not None:
+                        X_extra_leaveout = X_extra.loc[X_extra.index.isin(leaveout_ind)]
+                    else:
+                        X_extra_leaveout = None
 
-                        # Save the left-out data indices
-                        if file_extension == '.xlsx':
-                            pd.DataFrame({'leaveout_inds': leaveout_ind}).to_excel(os.path.join(splitouterpath, 'leaveout_inds'+file_extension), index=False)
-                        elif file_extension == '.csv':
-                            pd.DataFrame({'leaveout_inds': leaveout_ind}).to_csv(os.path.join(splitouterpath, 'leaveout_inds' + file_extension), index=False)
+                    dataset_stdev = np.std(y_subsplit)
 
-                        # Save the left-out data groups
-                        if groups is not None:
-                            groups_leaveout.name = 'leaveout_groups'
-                            if file_extension == '.xlsx':
-                                groups_leaveout.to_excel(os.path.join(splitouterpath, 'leaveout_groups'+file_extension), index=False)
-                            elif file_extension == '.csv':
-                                groups_leaveout.to_csv(os.path.join(splitouterpath, 'leaveout_groups'+file_extension), index=False)
-
-                        outerdir = self._evaluate_split_sets(X_splits,
-                                                             y_splits,
-                                                             train_inds,
-                                                             test_inds,
-                                                             model,
-                                                             model_name,
-                                                             mastml,
-                                                             selector,
-                                                             preprocessor,
-                                                             X_extra_subsplit,
-                                                             groups_subsplit, #groups subsplit??? Used to be "groups"
-                                                             splitouterpath,
-                                                             hyperopt,
-                                                             metrics,
-                                                             plots,
-                                                             has_model_errors,
-                                                             error_method,
-                                                             remove_outlier_learners,
-                                                             recalibrate_errors,
-                                                             verbosity,
-                                                             baseline_test,
-                                                             distance_metric,
-                                                             domain_distance,
-                                                             file_extension,
-                                                             image_dpi,
-                                                             parallel_run,
-                                                             **kwargs)
-                        split_outer_count += 1
-
-                        best_split_dict = self._get_best_split(savepath=splitouterpath,
-                                                               model=model,
-                                                               preprocessor=preprocessor,
-                                                               best_run_metric=best_run_metric,
-                                                               model_name=model_name,
-                                                               file_extension=file_extension)
-                        # Copy the best model, selected features and preprocessor to this outer directory
-                        shutil.copy(best_split_dict['preprocessor'], splitouterpath)
-                        if model_name == 'KerasRegressor':
-                            try:
-                                shutil.move(best_split_dict['model'], splitouterpath)
-                            except:
-                                print('Warning: could not move best Keras model to splitdir')
-                        elif model_name == 'BaggingRegressor':
-                            if model.base_estimator_ == 'KerasRegressor':
-                                for m in best_split_dict['model']:
-                                    shutil.move(m, splitouterpath)
-                        else:
-                            try:
-                                shutil.copy(best_split_dict['model'], splitouterpath)
-                            except:
-                                print('Warning: could not copy best model to splitdir')
-                        #shutil.copy(best_split_dict['model'], splitouterpath)
-                        shutil.copy(best_split_dict['features'], splitouterpath)
-
-                        # Load in the best model, preprocessor and evaluate the left-out data stats
-                        if model_name == 'BaggingRegressor':
-                            if model.base_estimator_ == 'KerasRegressor':
-                                # Need to rebuild the ensemble of Keras models
-                                import tensorflow as tf
-                                keras_dirs = [d for d in os.listdir(splitouterpath) if 'keras_model' in d]
-                                estimators = [tf.keras.models.load_model(os.path.join(splitouterpath, d)) for d in keras_dirs]
-                                estimator_features = list()
-                                for e in estimators:
-                                    estimator_features.append(np.arange(0, X.shape[1]))
-                                model.model.estimators_ = estimators
-                                model.model.estimators_features_ = estimator_features
-                                best_model = model
-                            else:
-                                best_model = joblib.load(best_split_dict['model'])
-                        else:
-                            best_model = joblib.load(best_split_dict['model'])
-                        preprocessor = joblib.load(best_split_dict['preprocessor'])
-                        if file_extension == '.xlsx':
-                            X_train_bestmodel = preprocessor.transform(pd.read_excel(best_split_dict['X_train'], engine='openpyxl')) # Need to preprocess the Xtrain data
-                        elif file_extension == '.csv':
-                            X_train_bestmodel = preprocessor.transform(pd.read_csv(best_split_dict['X_train']))  # Need to preprocess the Xtrain data
-
-                        with open(os.path.join(splitouterpath, 'selected_features.txt')) as f:
-                            selected_features = [line.rstrip() for line in f]
-                        X_leaveout = X_leaveout[selected_features]
-                        X_leaveout_preprocessed = preprocessor.transform(X=X_leaveout)
-                        y_pred_leaveout = best_model.predict(X=X_leaveout_preprocessed)
-                        y_pred_leaveout = pd.Series(y_pred_leaveout, name='y_pred_leaveout')
-                        stats_dict_leaveout = Metrics(metrics_list=metrics).evaluate(y_true=y_leaveout,
-                                                                                     y_pred=y_pred_leaveout)
-                        df_stats_leaveout = pd.DataFrame().from_records([stats_dict_leaveout])
-                        if file_extension == '.xlsx':
-                            df_stats_leaveout.to_excel(os.path.join(splitouterpath, 'leaveout_stats_summary'+file_extension), index=False)
-                        elif file_extension == '.csv':
-                            df_stats_leaveout.to_csv(os.path.join(splitouterpath, 'leaveout_stats_summary' + file_extension), index=False)
-                        # At level of splitouterpath, do analysis over all splits (e.g. parity plot over all splits)
-                        if groups is not None:
-                            groups_leaveout_all = self._collect_data(filename='leaveout_groups', savepath=splitouterpath, file_extension=file_extension, iterdirs=False)
-                        else:
-                            groups_leaveout_all = None
-                        y_test_all = self._collect_data(filename='y_test', savepath=splitouterpath, file_extension=file_extension)
-                        y_train_all = self._collect_data(filename='y_train', savepath=splitouterpath, file_extension=file_extension)
-                        y_pred_all = self._collect_data(filename='y_pred', savepath=splitouterpath, file_extension=file_extension)
-                        y_pred_train_all = self._collect_data(filename='y_pred_train', savepath=splitouterpath, file_extension=file_extension)
-                        residuals_test_all = self._collect_data(filename='residuals_test', savepath=splitouterpath, file_extension=file_extension)
-                        residuals_train_all = self._collect_data(filename='residuals_train', savepath=splitouterpath, file_extension=file_extension)
-                        X_train_all = self._collect_df_data(filename='X_train', savepath=splitouterpath, file_extension=file_extension)
-                        X_test_all = self._collect_df_data(filename='X_test', savepath=splitouterpath, file_extension=file_extension)
-
-                        # Save the data gathered over all the splits
-                        self._save_split_data(df=X_train_all, filename='X_train', savepath=splitouterpath, columns=X_train_all.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=X_test_all, filename='X_test', savepath=splitouterpath, columns=X_test_all.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=y_test_all, filename='y_test', savepath=splitouterpath, columns='y_test', file_extension=file_extension)
-                        self._save_split_data(df=y_train_all, filename='y_train', savepath=splitouterpath, columns='y_train', file_extension=file_extension)
-                        self._save_split_data(df=y_pred_all, filename='y_pred', savepath=splitouterpath, columns='y_pred', file_extension=file_extension)
-                        self._save_split_data(df=y_pred_train_all, filename='y_pred_train', savepath=splitouterpath, columns='y_pred_train', file_extension=file_extension)
-                        self._save_split_data(df=residuals_test_all, filename='residuals_test', savepath=splitouterpath, columns='residuals', file_extension=file_extension)
-                        self._save_split_data(df=residuals_train_all, filename='residuals_train', savepath=splitouterpath, columns='residuals', file_extension=file_extension)
-
-                        if has_model_errors is True:
-                            model_errors_leaveout, num_removed_learners_leaveout = ErrorUtils()._get_model_errors(model=best_model,
-                                                                                    X=X_leaveout_preprocessed,
-                                                                                    X_train=X_train_bestmodel,
-                                                                                    X_test=X_leaveout_preprocessed,
-                                                                                   error_method=error_method,
-                                                                                    remove_outlier_learners=remove_outlier_learners)
-                            self._save_split_data(df=model_errors_leaveout, filename='model_errors_leaveout',
-                                                  savepath=splitouterpath, columns='model_errors', file_extension=file_extension)
-                            self._save_split_data(df=num_removed_learners_leaveout, filename='num_removed_learners_leaveout',
-                                                  savepath=splitouterpath, columns='num_removed_learners', file_extension=file_extension)
-                        else:
-                            model_errors_leaveout = None
-
-                        # Remake the leaveout y data series to reset the index
-                        y_leaveout = pd.Series(np.array(y_leaveout))
-                        y_pred_leaveout = pd.Series(np.array(y_pred_leaveout))
-
-                        self._save_split_data(df=X_leaveout, filename='X_leaveout', savepath=splitouterpath, columns=X_leaveout.columns.tolist(), file_extension=file_extension)
-                        if X_extra is not None:
-                            self._save_split_data(df=X_extra_leaveout, filename='X_extra_leaveout', savepath=splitouterpath, columns=X_extra_leaveout.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=y_leaveout, filename='y_leaveout', savepath=splitouterpath, columns='y_leaveout', file_extension=file_extension)
-                        self._save_split_data(df=y_pred_leaveout, filename='y_pred_leaveout', savepath=splitouterpath, columns='y_pred_leaveout', file_extension=file_extension)
-
-                        residuals_leaveout = y_pred_leaveout-y_leaveout
-                        self._save_split_data(df=residuals_leaveout, filename='residuals_leaveout', savepath=splitouterpath, columns='residuals', file_extension=file_extension)
-
-                        if recalibrate_errors is True:
-                            recalibrate_dict = self._get_recalibration_params(savepath=splitouterpath,
-                                                                              data_type='test', file_extension=file_extension)
-                            model_errors_leaveout_cal = recalibrate_dict['a']*model_errors_leaveout+recalibrate_dict['b']
-                            self._save_split_data(df=model_errors_leaveout_cal, filename='model_errors_leaveout_calibrated',
-                                                  savepath=splitouterpath, columns='model_errors', file_extension=file_extension)
+                    if groups is not None:
+                        groups_leaveout = groups.loc[groups.index.isin(leaveout_ind)]
+
+                    outerdir, inner_results = self._summarize_split_sets(inner_results_all[splitouterpath],
+                                                                         model,
+                                                                         mastml,
+                                                                         selector,
+                                                                         preprocessor,
+                                                                         X_extra,
+                                                                         groups,
+                                                                         splitouterpath,
+                                                                         hyperopt,
+                                                                         metrics,
+                                                                         plots,
+                                                                         has_model_errors,
+                                                                         recalibrate_errors,
+                                                                         verbosity,
+                                                                         domain_distance,
+                                                                         file_extension,
+                                                                         image_dpi,
+                                                                         write_split_files=write_split_files)
+                    split_outer_name = os.path.basename(splitouterpath)
+                    timer = StageTimer()
+
+                    best_split_dict = self._get_best_split(savepath=splitouterpath,
+                                                           model=model,
+                                                           preprocessor=preprocessor,
+                                                           best_run_metric=best_run_metric,
+                                                           model_name=model_name,
+                                                           file_extension=file_extension,
+                                                           split_results=inner_results)
+                    # Copy the best model, selected features and preprocessor to this outer directory
+                    shutil.copy(best_split_dict['preprocessor'], splitouterpath)
+                    if model_name == 'KerasRegressor':
+                        try:
+                            shutil.move(best_split_dict['model'], splitouterpath)
+                        except:
+                            print('Warning: could not move best Keras model to splitdir')
+                    elif model_name == 'BaggingRegressor':
+                        if model.base_estimator_ == 'KerasRegressor':
+                            for m in best_split_dict['model']:
+                                shutil.move(m, splitouterpath)
+                    else:
+                        try:
+                            shutil.copy(best_split_dict['model'], splitouterpath)
+                        except:
+                            print('Warning: could not copy best model to splitdir')
+                    #shutil.copy(best_split_dict['model'], splitouterpath)
+                    shutil.copy(best_split_dict['features'], splitouterpath)
+                    timer.lap('save_files')
+
+                    # Get the best model, preprocessor and selected features, which are kept in memory with the split
+                    # results, and evaluate the left-out data stats
+                    best_results = inner_results[best_split_dict['split_name']]
+                    if model_name == 'BaggingRegressor':
+                        if model.base_estimator_ == 'KerasRegressor':
+                            # Need to rebuild the ensemble of Keras models
+                            import tensorflow as tf
+                            keras_dirs = [d for d in os.listdir(splitouterpath) if 'keras_model' in d]
+                            estimators = [tf.keras.models.load_model(os.path.join(splitouterpath, d)) for d in keras_dirs]
+                            estimator_features = list()
+                            for e in estimators:
+                                estimator_features.append(np.arange(0, X.shape[1]))
+                            model.model.estimators_ = estimators
+                            model.model.estimators_features_ = estimator_features
+                            best_model = model
                         else:
-                            model_errors_leaveout_cal = None
-
-                        if verbosity > 0:
-                            make_plots(plots=plots,
-                                       y_true=y_leaveout,
-                                       y_pred=y_pred_leaveout,
-                                       X_test=X_leaveout,
-                                       groups=groups_leaveout_all,
-                                       data_type='leaveout',
-                                       dataset_stdev=dataset_stdev,
-                                       has_model_errors=has_model_errors,
-                                       metrics=metrics,
-                                       model=model,
-                                       model_errors=model_errors_leaveout,
-                                       residuals=residuals_leaveout,
-                                       savepath=splitouterpath,
-                                       show_figure=False,
-                                       recalibrate_errors=recalibrate_errors,
-                                       model_errors_cal=model_errors_leaveout_cal,
-                                       splits_summary=True,
-                                       file_extension=file_extension,
-                                       image_dpi=image_dpi)
-
-                        # Update the MASTML metadata file to include the leftout data info
-                        if mastml is not None:
-                            mastml._update_metadata(outerdir=outerdir,
-                                                    split_name='split_summary',
-                                                    leaveout_stats=df_stats_leaveout,
-                                                    X_leaveout=X_leaveout,
-                                                    X_extra_leaveout=X_extra_leaveout,
-                                                    y_leaveout=y_leaveout,
-                                                    y_pred_leaveout=y_pred_leaveout,
-                                                    residuals_leaveout=residuals_leaveout,
-                                                    model_errors_leaveout=model_errors_leaveout,
-                                                    model_errors_leaveout_cal=model_errors_leaveout_cal,
-                                                    )
-                            mastml._save_mastml_metadata()
-
-                    # At level of splitdir, collect and save all leaveout data
+                            best_model = best_results['model']
+                    elif 'model' in best_results:
+                        best_model = best_results['model']
+                    else:
+                        best_model = joblib.load(best_split_dict['model'])
+                    best_preprocessor = best_results['preprocessor']
+                    X_train_best = inner_results.get(best_split_dict['split_name'], 'X_train')
+                    X_train_bestmodel = best_preprocessor.transform(X_train_best) # Need to preprocess the Xtrain data
+
+                    # The models of the other inner splits are no longer needed
+                    for results in inner_results.splits.values():
+                        results.pop('model', None)
+
+                    selected_features = best_results['selected_features']
+                    X_leaveout = X_leaveout[selected_features]
+                    X_leaveout_preprocessed = best_preprocessor.transform(X=X_leaveout)
+                    y_pred_leaveout = best_model.predict(X=X_leaveout_preprocessed)
+                    y_pred_leaveout = pd.Series(y_pred_leaveout, name='y_pred_leaveout')
+                    timer.lap('predict')
+                    stats_dict_leaveout = Metrics(metrics_list=metrics).evaluate(y_true=y_leaveout,
+                                                                                 y_pred=y_pred_leaveout)
+                    df_stats_leaveout = pd.DataFrame().from_records([stats_dict_leaveout])
+                    save_data(df_stats_leaveout, os.path.join(splitouterpath, 'leaveout_stats_summary' + file_extension), index=False)
+                    # At level of splitouterpath, do analysis over all splits (e.g. parity plot over all splits)
                     if groups is not None:
-                        groups_leaveout_all = self._collect_data(filename='leaveout_groups', savepath=splitdir, file_extension=file_extension)
+                        groups_leaveout_all = pd.Series(np.array(groups_leaveout))
                     else:
                         groups_leaveout_all = None
-                    y_leaveout_all = self._collect_data(filename='y_leaveout', savepath=splitdir, file_extension=file_extension)
-                    y_pred_leaveout_all = self._collect_data(filename='y_pred_leaveout', savepath=splitdir, file_extension=file_extension)
-                    residuals_leaveout_all = self._collect_data(filename='residuals_leaveout', savepath=splitdir, file_extension=file_extension)
-                    self._save_split_data(df=residuals_leaveout_all, filename='residuals_leaveout', savepath=splitdir, columns='residuals', file_extension=file_extension)
-                    self._save_split_data(df=y_leaveout_all, filename='y_leaveout', savepath=splitdir, columns='y_leaveout', file_extension=file_extension)
-                    self._save_split_data(df=y_pred_leaveout_all, filename='y_pred_leaveout', savepath=splitdir, columns='y_pred_leaveout', file_extension=file_extension)
-
-                    # At level of splitodir, collect and save all train/test data
-                    y_test_all = self._collect_data(filename='y_test', savepath=splitdir, file_extension=file_extension)
-                    y_train_all = self._collect_data(filename='y_train', savepath=splitdir, file_extension=file_extension)
-                    y_pred_all = self._collect_data(filename='y_pred', savepath=splitdir, file_extension=file_extension)
-                    y_pred_train_all = self._collect_data(filename='y_pred_train', savepath=splitdir, file_extension=file_extension)
-                    residuals_test_all = self._collect_data(filename='residuals_test', savepath=splitdir, file_extension=file_extension)
-                    residuals_train_all = self._collect_data(filename='residuals_train', savepath=splitdir, file_extension=file_extension)
-                    X_train_all = self._collect_df_data(filename='X_train', savepath=splitdir, file_extension=file_extension)
-                    X_test_all = self._collect_df_data(filename='X_test', savepath=splitdir, file_extension=file_extension)
-                    X_leaveout_all = self._collect_df_data(filename='X_leaveout', savepath=splitdir, file_extension=file_extension)
-                    if X_extra is not None:
-                        X_extra_train_all = self._collect_df_data(filename='X_extra_train', savepath=splitdir, file_extension=file_extension)
-                        X_extra_test_all = self._collect_df_data(filename='X_extra_test', savepath=splitdir, file_extension=file_extension)
-                        X_extra_leaveout_all = self._collect_df_data(filename='X_extra_leaveout', savepath=splitdir, file_extension=file_extension)
-                    self._save_split_data(df=X_train_all, filename='X_train', savepath=splitdir, columns=X_train_all.columns.tolist(), file_extension=file_extension)
-                    self._save_split_data(df=X_test_all, filename='X_test', savepath=splitdir, columns=X_test_all.columns.tolist(), file_extension=file_extension)
-                    self._save_split_data(df=X_leaveout_all, filename='X_leaveout', savepath=splitdir, columns=X_leaveout_all.columns.tolist(), file_extension=file_extension)
-                    if X_extra is not None:
-                        self._save_split_data(df=X_extra_train_all, filename='X_train', savepath=splitdir, columns=X_extra_train_all.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=X_extra_test_all, filename='X_test', savepath=splitdir, columns=X_extra_test_all.columns.tolist(), file_extension=file_extension)
-                        self._save_split_data(df=X_extra_leaveout_all, filename='X_leaveout', savepath=splitdir, columns=X_extra_leaveout_all.columns.tolist(), file_extension=file_extension)
-                    self._save_split_data(df=y_test_all, filename='y_test', savepath=splitdir, columns='y_test', file_extension=file_extension)
-                    self._save_split_data(df=y_train_all, filename='y_train', savepath=splitdir,  columns='y_train', file_extension=file_extension)
-                    self._save_split_data(df=y_pred_all, filename='y_pred', savepath=splitdir, columns='y_pred', file_extension=file_extension)
-                    self._save_split_data(df=y_pred_train_all, filename='y_pred_train', savepath=splitdir, columns='y_pred_train', file_extension=file_extension)
-                    self._save_split_data(df=residuals_test_all, filename='residuals_test', savepath=splitdir, columns='residuals', file_extension=file_extension)
-                    self._save_split_data(df=residuals_train_all, filename='residuals_train', savepath=splitdir, columns='residuals', file_extension=file_extension)
-
-                    # Remake the Series so that indices are sequential (needed for math)
-                    y_leaveout_all = pd.Series(np.array(y_leaveout_all))
-                    y_pred_leaveout_all = pd.Series(np.array(y_pred_leaveout_all))
+                    y_test_all = inner_results.collect('y_test')
+                    y_train_all = inner_results.collect('y_train')
+                    y_pred_all = inner_results.collect('y_pred')
+                    y_pred_train_all = inner_results.collect('y_pred_train')
+                    residuals_test_all = inner_results.collect('residuals_test')
+                    residuals_train_all = inner_results.collect('residuals_train')
+
+                    # Save the data gathered over all the splits
+                    self._save_split_data(df=residuals_test_all, filename='residuals_test', savepath=splitouterpath, columns='residuals', file_extension=file_extension)
+                    self._save_split_data(df=residuals_train_all, filename='residuals_train', savepath=splitouterpath, columns='residuals', file_extension=file_extension)
 
                     if has_model_errors is True:
-                        model_errors_leaveout_all = self._collect_data(filename='model_errors_leaveout', savepath=splitdir, file_extension=file_extension)
-                        num_removed_learners_leaveout_all = self._collect_data(filename='num_removed_learners_leaveout', savepath=splitdir, file_extension=file_extension)
-                        self._save_split_data(df=model_errors_leaveout_all, filename='model_errors_leaveout', savepath=splitdir, columns='model_errors', file_extension=file_extension)
-                        self._save_split_data(df=num_removed_learners_leaveout_all, filename='num_removed_learners_leaveout', savepath=splitdir, columns='num_removed_learners', file_extension=file_extension)
-                        if recalibrate_errors is True:
-                            model_errors_leaveout_all_calibrated = self._collect_data(filename='model_errors_leaveout_calibrated', savepath=splitdir, file_extension=file_extension)
-                            self._save_split_data(df=model_errors_leaveout_all_calibrated, filename='model_errors_leaveout_calibrated', savepath=splitdir, columns='model_errors', file_extension=file_extension)
-                        else:
-                            model_errors_leaveout_all_calibrated = None
+                        timer.lap('save_files')
+                        model_errors_leaveout, num_removed_learners_leaveout = ErrorUtils()._get_model_errors(model=best_model,
+                                                                                X=X_leaveout_preprocessed,
+                                                                                X_train=X_train_bestmodel,
+                                                                                X_test=X_leaveout_preprocessed,
+                                                                               error_method=error_method,
+                                                                                remove_outlier_learners=remove_outlier_learners)
+                        timer.lap('model_errors')
+                        self._save_split_data(df=model_errors_leaveout, filename='model_errors_leaveout',
+                                              savepath=splitouterpath, columns='model_errors', file_extension=file_extension)
+                        self._save_split_data(df=num_removed_learners_leaveout, filename='num_removed_learners_leaveout',
+                                              savepath=splitouterpath, columns='num_removed_learners', file_extension=file_extension)
                     else:
-                        model_errors_leaveout_all = None
-                        model_errors_leaveout_all_calibrated = None
+                        model_errors_leaveout = None
+                        num_removed_learners_leaveout = None
+
+                    # Remake the leaveout y data series to reset the index
+                    y_leaveout = pd.Series(np.array(y_leaveout))
+                    y_pred_leaveout = pd.Series(np.array(y_pred_leaveout))
+
+                    self._save_split_data(df=X_leaveout, filename='X_leaveout', savepath=splitouterpath, columns=X_leaveout.columns.tolist(), file_extension=file_extension)
+                    if X_extra is not None:
+                        self._save_split_data(df=X_extra_leaveout, filename='X_extra_leaveout', savepath=splitouterpath, columns=X_extra_leaveout.columns.tolist(), file_extension=file_extension)
+                    self._save_split_data(df=y_leaveout, filename='y_leaveout', savepath=splitouterpath, columns='y_leaveout', file_extension=file_extension)
+                    self._save_split_data(df=y_pred_leaveout, filename='y_pred_leaveout', savepath=splitouterpath, columns='y_pred_leaveout', file_extension=file_extension)
+
+                    residuals_leaveout = y_pred_leaveout-y_leaveout
+                    self._save_split_data(df=residuals_leaveout, filename='residuals_leaveout', savepath=splitouterpath, columns='residuals', file_extension=file_extension)
+
+                    if recalibrate_errors is True:
+                        recalibrate_dict = inner_results.summary['recalibration_parameters_test']
+                        model_errors_leaveout_cal = recalibrate_dict['a']*model_errors_leaveout+recalibrate_dict['b']
+                        self._save_split_data(df=model_errors_leaveout_cal, filename='model_errors_leaveout_calibrated',
+                                              savepath=splitouterpath, columns='model_errors', file_extension=file_extension)
+                    else:
+                        model_errors_leaveout_cal = None
+                    timer.lap('save_files')
 
-                    # Gather the recalibration dicts from each split set and save average and stdev of recalibrations
-                    if has_model_errors is True and recalibrate_errors is True:
-                        recalibrate_avg_dict, recalibrate_stdev_dict = self._get_average_recalibration_params(savepath=splitdir,
-                                                                                                              data_type='test', file_extension=file_extension)
-                        if file_extension == '.xlsx':
-                            pd.DataFrame(recalibrate_avg_dict, index=[0]).to_excel(os.path.join(splitdir, 'recalibration_parameters_average_test'+file_extension))
-                            pd.DataFrame(recalibrate_stdev_dict, index=[0]).to_excel(os.path.join(splitdir, 'recalibration_parameters_stdev_test'+file_extension))
-                        elif file_extension == '.csv':
-                            pd.DataFrame(recalibrate_avg_dict, index=[0]).to_csv(os.path.join(splitdir, 'recalibration_parameters_average_test'+file_extension))
-                            pd.DataFrame(recalibrate_stdev_dict, index=[0]).to_csv(os.path.join(splitdir, 'recalibration_parameters_stdev_test'+file_extension))
-                    # Make all leaveout data plots
                     if verbosity > 0:
                         make_plots(plots=plots,
-                                   y_true=y_leaveout_all,
-                                   y_pred=y_pred_leaveout_all,
-                                   X_test=X_leaveout_all,
+                                   y_true=y_leaveout,
+                                   y_pred=y_pred_leaveout,
+                                   X_test=X_leaveout,
                                    groups=groups_leaveout_all,
                                    data_type='leaveout',
-                                   dataset_stdev=np.std(y_leaveout_all),
+                                   dataset_stdev=dataset_stdev,
                                    has_model_errors=has_model_errors,
                                    metrics=metrics,
                                    model=model,
-                                   model_errors=model_errors_leaveout_all,
-                                   residuals=residuals_leaveout_all,
-                                   savepath=splitdir,
+                                   model_errors=model_errors_leaveout,
+                                   residuals=residuals_leaveout,
+                                   savepath=splitouterpath,
                                    show_figure=False,
                                    recalibrate_errors=recalibrate_errors,
-                                   model_errors_cal=model_errors_leaveout_all_calibrated,
+                                   model_errors_cal=model_errors_leaveout_cal,
                                    splits_summary=True,
                                    file_extension=file_extension,
                                    image_dpi=image_dpi)
+                        timer.lap('plots')
 
-                    # Update the MASTML metadata file
-                    try:
-                        if file_extension == '.xlsx':
-                            df_stats_leaveout = pd.read_excel(os.path.join(splitdir, 'leaveout_average_stdev_stats_summary'+file_extension))
-                        elif file_extension == '.csv':
-                            df_stats_leaveout = pd.read_csv(os.path.join(splitdir, 'leaveout_average_stdev_stats_summary' + file_extension))
-                    except:
-                        df_stats_leaveout = None
-
+                    # Update the MASTML metadata file to include the leftout data info
                     if mastml is not None:
-                        outerdir = splitdir.split('/')[-1]
-                        if 'split_outer' in outerdir:
-                            # For nested CV or left out data runs with outer and inner splits, need the model dir one level up
-                            outerdir = os.path.join(splitdir.split('/')[-2], splitdir.split('/')[-1])
+                        data_files = self._get_data_files(splitouterpath, ['X_leaveout', 'X_extra_leaveout', 'y_leaveout',
+                                                                           'y_pred_leaveout', 'residuals_leaveout',
+                                                                           'model_errors_leaveout',
+                                                                           'model_errors_leaveout_cal'], file_extension)
                         mastml._update_metadata(outerdir=outerdir,
-                                                split_name='split_outer_summary',
-                                                model=model,
-                                                splitter=self,
-                                                preprocessor=preprocessor,
-                                                selector=selector,
-                                                hyperopt=hyperopt,
-                                                train_stats=None,
-                                                test_stats=None,
+                                                split_name='split_summary',
                                                 leaveout_stats=df_stats_leaveout,
-                                                X_train=pd.DataFrame(np.array(X_train_all), columns=X_train_all.columns.tolist()),
-                                                X_test=pd.DataFrame(np.array(X_test_all), columns=X_test_all.columns.tolist()),
-                                                X_leaveout=pd.DataFrame(np.array(X_leaveout_all), columns=X_leaveout_all.columns.tolist()),
-                                                X_extra_train=pd.DataFrame(np.array(X_extra_train_all), columns=X_extra_train_all.columns.tolist()) if X_extra is not None else None,
-                                                X_extra_test=pd.DataFrame(np.array(X_extra_test_all), columns=X_extra_test_all.columns.tolist()) if X_extra is not None else None,
-                                                X_extra_leaveout=pd.DataFrame(np.array(X_extra_leaveout_all), columns=X_extra_leaveout_all.columns.tolist()) if X_extra is not None else None,
-                                                y_train=y_train_all,
-                                                y_test=y_test_all,
-                                                y_leaveout=y_leaveout_all,
-                                                y_pred_train=y_pred_train_all,
-                                                y_pred=y_pred_all,
-                                                y_pred_leaveout=y_pred_leaveout_all,
-                                                residuals_train=residuals_train_all,
-                                                residuals_test=residuals_test_all,
-                                                residuals_leaveout=residuals_leaveout_all,
-                                                model_errors_train=None,
-                                                model_errors_test=None,
-                                                model_errors_leaveout=model_errors_leaveout_all,
-                                                model_errors_train_cal=None,
-                                                model_errors_test_cal=None,
-                                                model_errors_leaveout_cal=model_errors_leaveout_all_calibrated,
-                                                dataset_stdev=None)
-                        mastml._save_mastml_metadata()
-
-                    # Remove all the splitdirs if set to True
-                    if remove_split_dirs == True:
-                        ds = os.listdir(splitdir)
-                        splitdirs = [d for d in ds if 'split_' in d and '.png' not in d]
-                        for d in splitdirs:
-                            shutil.rmtree(os.path.join(splitdir, d))
-
+                                                data_files=data_files)
+                        timer.lap('metadata')
+
+                    # Keep the data of this outer split for the analysis over all outer splits
+                    outer_results.add(split_outer_name, {'leaveout_inds': np.array(leaveout_ind),
+                                                         'leaveout_groups': groups_leaveout_all,
+                                                         'leaveout_stats': stats_dict_leaveout,
+                                                         'split_results': inner_results,
+                                                         'X_leaveout': X_leaveout,
+                                                         'X_extra_leaveout': X_extra_leaveout,
+                                                         'y_test': y_test_all,
+                                                         'y_train': y_train_all,
+                                                         'y_pred': y_pred_all,
+                                                         'y_pred_train': y_pred_train_all,
+                                                         'y_leaveout': y_leaveout,
+                                                         'y_pred_leaveout': y_pred_leaveout,
+                                                         'residuals_test': residuals_test_all,
+                                                         'residuals_train': residuals_train_all,
+                                                         'residuals_leaveout': residuals_leaveout,
+                                                         'model_errors_leaveout': model_errors_leaveout,
+                                                         'num_removed_learners_leaveout': num_removed_learners_leaveout,
+                                                         'model_errors_leaveout_calibrated': model_errors_leaveout_cal,
+                                                         'recalibration_parameters_test': inner_results.summary.get('recalibration_parameters_test'),
+                                                         'stage_times': timer.get_times()})
+
+                # At level of splitdir, collect and save all leaveout data
+                timer = StageTimer()
+                if groups is not None:
+                    groups_leaveout_all = outer_results.collect('leaveout_groups')
                 else:
-                    X_splits, y_splits, train_inds, test_inds = self.split_asframe(X=X, y=y, groups=groups,
-                                                                                   X_force_train=X_force_train,
-                                                                                   y_force_train=y_force_train)
-
-                    self._evaluate_split_sets(X_splits,
-                                              y_splits,
-                                              train_inds,
-                                              test_inds,
-                                              model,
-                                              model_name,
-                                              mastml,
-                                              selector,
-                                              preprocessor,
-                                              X_extra,
-                                              groups,
-                                              splitdir,
-                                              hyperopt,
-                                              metrics,
-                                              plots,
-                                              has_model_errors,
-                                              error_method,
-                                              remove_outlier_learners,
-                                              recalibrate_errors,
-                                              verbosity,
-                                              baseline_test,
-                                              distance_metric,
-                                              domain_distance,
-                                              file_extension,
-                                              image_dpi,
-                                              parallel_run,
-                                              **kwargs)
-                    best_split_dict = self._get_best_split(savepath=splitdir,
-                                                           model=model,
-                                                           preprocessor=preprocessor,
-                                                           best_run_metric=best_run_metric,
-                                                           model_name=model_name,
-                                                           file_extension=file_extension)
-                    # Copy the best model, selected features and preprocessor to this outer directory
+                    groups_leaveout_all = None
+                y_leaveout_all = outer_results.collect('y_leaveout')
+                y_pred_leaveout_all = outer_results.collect('y_pred_leaveout')
+                residuals_leaveout_all = outer_results.collect('residuals_leaveout')
+                self._save_split_data(df=residuals_leaveout_all, filename='residuals_leaveout', savepath=splitdir, columns='residuals', file_extension=file_extension)
+                self._save_split_data(df=y_leaveout_all, filename='y_leaveout', savepath=splitdir, columns='y_leaveout', file_extension=file_extension)
+                self._save_split_data(df=y_pred_leaveout_all, filename='y_pred_leaveout', savepath=splitdir, columns='y_pred_leaveout', file_extension=file_extension)
+
+                # At level of splitodir, collect and save all train/test data
+                y_test_all = outer_results.collect('y_test')
+                y_train_all = outer_results.collect('y_train')
+                y_pred_all = outer_results.collect('y_pred')
+                y_pred_train_all = outer_results.collect('y_pred_train')
+                residuals_test_all = outer_results.collect('residuals_test')
+                residuals_train_all = outer_results.collect('residuals_train')
+                X_train_all = outer_results.collect_df('X_train')
+                X_test_all = outer_results.collect_df('X_test')
+                X_leaveout_all = outer_results.collect_df('X_leaveout')
+                if X_extra is not None:
+                    X_extra_train_all = outer_results.collect_df('X_extra_train')
+                    X_extra_test_all = outer_results.collect_df('X_extra_test')
+                    X_extra_leaveout_all = outer_results.collect_df('X_extra_leaveout')
+                self._save_split_data(df=X_train_all, filename='X_train', savepath=splitdir, columns=X_train_all.columns.tolist(), file_extension=file_extension)
+                self._save_split_data(df=X_test_all, filename='X_test', savepath=splitdir, columns=X_test_all.columns.tolist(), file_extension=file_extension)
+                self._save_split_data(df=X_leaveout_all, filename='X_leaveout', savepath=splitdir, columns=X_leaveout_all.columns.tolist(), file_extension=file_extension)
+                if X_extra is not None:
+                    self._save_split_data(df=X_extra_train_all, filename='X_extra_train', savepath=splitdir, columns=X_extra_train_all.columns.tolist(), file_extension=file_extension)
+                    self._save_split_data(df=X_extra_test_all, filename='X_extra_test', savepath=splitdir, columns=X_extra_test_all.columns.tolist(), file_extension=file_extension)
+                    self._save_split_data(df=X_extra_leaveout_all, filename='X_extra_leaveout', savepath=splitdir, columns=X_extra_leaveout_all.columns.tolist(), file_extension=file_extension)
+                self._save_split_data(df=y_test_all, filename='y_test', savepath=splitdir, columns='y_test', file_extension=file_extension)
+                self._save_split_data(df=y_train_all, filename='y_train', savepath=splitdir,  columns='y_train', file_extension=file_extension)
+                self._save_split_data(df=y_pred_all, filename='y_pred', savepath=splitdir, columns='y_pred', file_extension=file_extension)
+                self._save_split_data(df=y_pred_train_all, filename='y_pred_train', savepath=splitdir, columns='y_pred_train', file_extension=file_extension)
+                self._save_split_data(df=residuals_test_all, filename='residuals_test', savepath=splitdir, columns='residuals', file_extension=file_extension)
+                self._save_split_data(df=residuals_train_all, filename='residuals_train', savepath=splitdir, columns='residuals', file_extension=file_extension)
+
+                if has_model_errors is True:
+                    model_errors_leaveout_all = outer_results.collect('model_errors_leaveout')
+                    num_removed_learners_leaveout_all = outer_results.collect('num_removed_learners_leaveout')
+                    self._save_split_data(df=model_errors_leaveout_all, filename='model_errors_leaveout', savepath=splitdir, columns='model_errors', file_extension=file_extension)
+                    self._save_split_data(df=num_removed_learners_leaveout_all, filename='num_removed_learners_leaveout', savepath=splitdir, columns='num_removed_learners', file_extension=file_extension)
+                    if recalibrate_errors is True:
+                        model_errors_leaveout_all_calibrated = outer_results.collect('model_errors_leaveout_calibrated')
+                        self._save_split_data(df=model_errors_leaveout_all_calibrated, filename='model_errors_leaveout_calibrated', savepath=splitdir, columns='model_errors', file_extension=file_extension)
+                    else:
+                        model_errors_leaveout_all_calibrated = None
+                else:
+                    model_errors_leaveout_all = None
+                    model_errors_leaveout_all_calibrated = None
+
+                # Gather the recalibration dicts from each split set and save average and stdev of recalibrations
+                if has_model_errors is True and recalibrate_errors is True:
+                    recalibrate_avg_dict, recalibrate_stdev_dict = self._get_average_recalibration_params(savepath=splitdir,
+                                                                                                          data_type='test', file_extension=file_extension,
+                                                                                                          split_results=outer_results)
+                    save_data(pd.DataFrame(recalibrate_avg_dict, index=[0]), os.path.join(splitdir, 'recalibration_parameters_average_test'+file_extension))
+                    save_data(pd.DataFrame(recalibrate_stdev_dict, index=[0]), os.path.join(splitdir, 'recalibration_parameters_stdev_test'+file_extension))
+                timer.lap('save_files')
+                # Make all leaveout data plots
+                if verbosity > 0:
+                    make_plots(plots=plots,
+                               y_true=y_leaveout_all,
+                               y_pred=y_pred_leaveout_all,
+                               X_test=X_leaveout_all,
+                               groups=groups_leaveout_all,
+                               data_type='leaveout',
+                               dataset_stdev=np.std(y_leaveout_all),
+                               has_model_errors=has_model_errors,
+                               metrics=metrics,
+                               model=model,
+                               model_errors=model_errors_leaveout_all,
+                               residuals=residuals_leaveout_all,
+                               savepath=splitdir,
+                               show_figure=False,
+                               recalibrate_errors=recalibrate_errors,
+                               model_errors_cal=model_errors_leaveout_all_calibrated,
+                               splits_summary=True,
+                               file_extension=file_extension,
+                               image_dpi=image_dpi,
+                               split_results=outer_results)
+                    timer.lap('plots')
+
+                # Update the MASTML metadata file
+                df_stats_leaveout = outer_results.get_average_stdev_stats(data_type='leaveout')
+                timer.lap('stats')
+
+                if mastml is not None:
+                    outerdir = splitdir.split('/')[-1]
+                    if 'split_outer' in outerdir:
+                        # For nested CV or left out data runs with outer and inner splits, need the model dir one level up
+                        outerdir = os.path.join(splitdir.split('/')[-2], splitdir.split('/')[-1])
+                    mastml._update_metadata(outerdir=outerdir,
+                                            split_name='split_outer_summary',
+                                            model=model,
+                                            splitter=self,
+                                            preprocessor=preprocessor,
+                                            selector=selector,
+                                            hyperopt=hyperopt,
+                                            train_stats=None,
+                                            test_stats=None,
+                                            leaveout_stats=df_stats_leaveout,
+                                            train_columns=X_train_all.columns.tolist(),
+                                            data_files=self._get_data_files(splitdir, ['X_train', 'X_test', 'X_leaveout',
+                                                                                       'X_extra_train', 'X_extra_test',
+                                                                                       'X_extra_leaveout', 'y_train',
+                                                                                       'y_test', 'y_leaveout',
+                                                                                       'y_pred_train', 'y_pred',
+                                                                                       'y_pred_leaveout',
+                                                                                       'residuals_train',
+                                                                                       'residuals_test',
+                                                                                       'residuals_leaveout',
+                                                                                       'model_errors_leaveout',
+                                                                                       'model_errors_leaveout_cal'],
+                                                                            file_extension),
+                                            dataset_stdev=None,
+                                            stage_times=timer.get_times())
+                    timer.lap('metadata')
+                outer_results.summary['stage_times'] = timer.get_times()
+
+                if catalog is not None:
+                    self._add_to_catalog(catalog, dataset_hash, time_started, splitdir, model, model_name,
+                                         preprocessor, selector, hyperopt, outer_results, ['leaveout'], file_extension)
+
+                job_stage_times = self._get_stage_times(outer_results, model_name, selector, splitdir)
+
+                # Merge the profiles of the splits of this job
+                if profile:
+                    self._merge_profiles(profiler, splitdir)
+                    job_profiles.append(os.path.join(splitdir, 'profile_merged'))
+
+                # Remove all the splitdirs if set to True
+                if remove_split_dirs == True:
+                    ds = os.listdir(splitdir)
+                    splitdirs = [d for d in ds if 'split_' in d and '.png' not in d]
+                    for d in splitdirs:
+                        shutil.rmtree(os.path.join(splitdir, d))
+
+            else:
+                outerdir, split_results = self._summarize_split_sets(job_split_results[splitdir], model, mastml,
+                                                                     selector, preprocessor, X_extra, groups, splitdir,
+                                                                     hyperopt, metrics, plots, has_model_errors,
+                                                                     recalibrate_errors, verbosity, domain_distance,
+                                                                     file_extension, image_dpi, write_split_files)
+                best_split_dict = self._get_best_split(savepath=splitdir,
+                                                       model=model,
+                                                       preprocessor=preprocessor,
+                                                       best_run_metric=best_run_metric,
+                                                       model_name=model_name,
+                                                       file_extension=file_extension,
+                                                       split_results=split_results)
+                # Copy the best model, selected features and preprocessor to this outer directory
+                try:
+                    shutil.copy(best_split_dict['preprocessor'], splitdir)
+                except:
+                    print('Warning: could not copy best preprocessor to splitdir')
+
+                if model_name == 'KerasRegressor':
                     try:
-                        shutil.copy(best_split_dict['preprocessor'], splitdir)
+                        shutil.move(best_split_dict['model'], splitdir)
                     except:
-                        print('Warning: could not copy best preprocessor to splitdir')
-
-                    if model_name == 'KerasRegressor':
-                        try:
-                            shutil.move(best_split_dict['model'], splitdir)
-                        except:
-                            print('Warning: could not move best Keras model to splitdir')
-                    elif model_name == 'BaggingRegressor':
-                        if model.base_estimator_ == 'KerasRegressor':
-                            for m in best_split_dict['model']:
-                                shutil.move(m, splitdir)
-                    else:
-                        try:
-                            shutil.copy(best_split_dict['model'], splitdir)
-                        except:
-                            print('Warning: could not copy best model to splitdir')
+                        print('Warning: could not move best Keras model to splitdir')
+                elif model_name == 'BaggingRegressor':
+                    if model.base_estimator_ == 'KerasRegressor':
+                        for m in best_split_dict['model']:
+                            shutil.move(m, splitdir)
+                else:
                     try:
-                        shutil.copy(best_split_dict['features'], splitdir)
+                        shutil.copy(best_split_dict['model'], splitdir)
                     except:
-                        print('Warning: could not copy best feature set to splitdir')
+                        print('Warning: could not copy best model to splitdir')
+                try:
+                    shutil.copy(best_split_dict['features'], splitdir)
+                except:
+                    print('Warning: could not copy best feature set to splitdir')
+
+                if catalog is not None:
+                    self._add_to_catalog(catalog, dataset_hash, time_started, splitdir, model, model_name,
+                                         preprocessor, selector, hyperopt, split_results, ['test', 'train'],
+                                         file_extension)
+
+                job_stage_times = self._get_stage_times(split_results, model_name, selector, splitdir)
+
+                # Merge the profiles of the splits of this job
+                if profile:
+                    self._merge_profiles(profiler, splitdir)
+                    job_profiles.append(os.path.join(splitdir, 'profile_merged'))
+
+                # Remove all the splitdirs if set to True
+                if remove_split_dirs == True:
+                    ds = os.listdir(splitdir)
+                    splitdirs = [d for d in ds if 'split_' in d and '.png' not in d]
+                    for d in splitdirs:
+                        shutil.rmtree(os.path.join(splitdir, d))
+
+            # Save the time spent in each stage of each split of this job
+            save_data(job_stage_times, os.path.join(splitdir, 'stage_times'+file_extension), index=False)
+            stage_times.append(job_stage_times)
+
+            if journal is not None:
+                journal.add_job_done(job['key'])
 
-                    # Remove all the splitdirs if set to True
-                    if remove_split_dirs == True:
-                        ds = os.listdir(splitdir)
-                        splitdirs = [d for d in ds if 'split_' in d and '.png' not in d]
-                        for d in splitdirs:
-                            shutil.rmtree(os.path.join(splitdir, d))
+        # Collect the stage times of all the jobs, and their sum over the splits of each job
+        if len(stage_times) > 0:
+            self.stage_times = pd.concat(stage_times, ignore_index=True).fillna(0.0)
+        else:
+            self.stage_times = pd.DataFrame(columns=['model', 'selector', 'splitdir', 'split'])
+        self.stage_times_summary = self.stage_times.groupby(['model', 'selector', 'splitdir'], sort=False).sum(numeric_only=True)
+        self.stage_times_summary['total'] = self.stage_times_summary.sum(axis=1)
+        self.stage_times_summary = self.stage_times_summary.reset_index()
+
+        # Merge the profiles of all the jobs into a run-level profile
+        if profile:
+            profiler.merge(job_profiles, savepath=savepath, name='profile_merged')
 
         return
 
-    def _evaluate_split_sets(self, X_splits, y_splits, train_inds, test_inds, model, model_name, mastml, selector, preprocessor,
-                             X_extra, groups, splitdir, hyperopt, metrics, plots, has_model_errors, error_method,
-                             remove_outlier_learners, recalibrate_errors, verbosity, baseline_test, distance_metric,
-                             domain_distance, file_extension, image_dpi, parallel_run, **kwargs):
-        def _evaluate_split_sets_serial(data, groups=None):
-            Xs, ys, train_ind, test_ind, split_count = data
-            # TODO: not copying this causes issues with KerasRegressor when doing different split types. But, doing this breaks BaggingRegressor with KerasRegressor networks
-            #model_orig = copy.deepcopy(model)
-            selector_orig = copy.deepcopy(selector)
-            preprocessor_orig = copy.deepcopy(preprocessor)
-            hyperopt_orig = copy.deepcopy(hyperopt)
-
-            X_train = Xs[0]
-            X_test = Xs[1]
-            y_train = pd.Series(np.array(ys[0]).ravel(), name='y_train')
-            y_test = pd.Series(np.array(ys[1]).ravel(), name='y_test')  # Make it so the y_test and y_pred have same indices so can be subtracted to get residual
-
-            if X_extra is not None:
-                X_extra_train = X_extra.loc[X_train.index.values, :]
-                X_extra_test = X_extra.loc[X_test.index.values, :]
+    def _race_split_jobs(self, jobs, splits, best_run_metric, racing_keep, racing_min_splits, savepath, evaluate_args):
+        X = evaluate_args['X']
+        X_extra = evaluate_args['X_extra']
+        X_force_train = evaluate_args['X_force_train']
+        file_extension = evaluate_args['file_extension']
+        journal = evaluate_args['journal']
+        n_splits = len(splits)
+        greater_is_better = Metrics(metrics_list=[best_run_metric])._metric_zoo()[best_run_metric][0]
+        if racing_min_splits is None:
+            # Successive halving: the jobs are cut to racing_keep of them each round as their splits grow by
+            # 1/racing_keep, so the round leaving a single job evaluates all the splits
+            n_rounds = int(np.ceil(np.log(len(jobs)) / np.log(1/racing_keep)))
+            racing_min_splits = max(1, int(n_splits * racing_keep**n_rounds))
+
+        alive = list(range(len(jobs)))
+        job_splits = {job_id: SplitResults(X=X, X_extra=X_extra, X_force_train=X_force_train) for job_id in alive}
+        rows = list()
+        memory_reports = list()
+        n_done = 0
+        n_round_splits = racing_min_splits
+        round_count = 0
+        while True:
+            # The jobs left are evaluated on all the splits once there is one left, or the splits run out
+            last_round = len(alive) == 1 or n_round_splits >= n_splits
+            if last_round:
+                n_round_splits = n_splits
+            memory_reports.append(self._evaluate_split_round(jobs, alive, splits, n_done, n_round_splits, job_splits,
+                                                             evaluate_args))
+
+            scores = dict()
+            for job_id in alive:
+                scores[job_id] = np.mean([r['test_stats'][best_run_metric] for r in job_splits[job_id].splits.values()])
+            if last_round:
+                kept = alive
             else:
-                X_extra_train = None
-                X_extra_test = None
+                # Rank the best jobs first, and the jobs whose metric couldn't be computed last
+                ranked = sorted(alive, key=lambda job_id: np.inf if np.isnan(scores[job_id]) else
+                                (-scores[job_id] if greater_is_better else scores[job_id]))
+                kept = sorted(ranked[:max(1, int(ceil(len(alive)*racing_keep)))])
+            for job_id in alive:
+                if last_round:
+                    status = 'winner'
+                elif job_id in kept:
+                    status = 'kept'
+                else:
+                    status = 'dropped'
+                rows.append(OrderedDict([('round', round_count),
+                                         ('n_splits', n_round_splits),
+                                         ('model', jobs[job_id]['model_name']),
+                                         ('selector', jobs[job_id]['selector'].__class__.__name__),
+                                         ('splitdir', jobs[job_id]['splitdir']),
+                                         (best_run_metric, scores[job_id]),
+                                         ('status', status)]))
+            if last_round:
+                break
+            for job_id in alive:
+                if job_id not in kept:
+                    del job_splits[job_id]
+                    # A dropped job isn't summarized. Its save directory holds its racing results, and it is done as far
+                    # as the journal is concerned, so a resumed run doesn't race it again
+                    job_rows = pd.DataFrame([row for row in rows if row['splitdir'] == jobs[job_id]['splitdir']])
+                    save_data(job_rows, os.path.join(jobs[job_id]['splitdir'], 'racing_results'+file_extension),
+                              index=False)
+                    if journal is not None:
+                        journal.add_job_done(jobs[job_id]['key'])
+            alive = kept
+            n_done = n_round_splits
+            n_round_splits = int(ceil(n_round_splits/racing_keep))
+            round_count += 1
+
+        self.racing_results = pd.DataFrame(rows)
+        save_data(self.racing_results, os.path.join(savepath, 'racing_results'+file_extension), index=False)
+
+        # Summarize the winners, evaluated on all the splits
+        yield from self._get_round_results(jobs, alive, job_splits, memory_reports, file_extension)
+        return
+
+    def _repeat_split_jobs(self, jobs, splits, n_repeats, best_run_metric, repeats_tolerance, repeats_time_budget,
+                           min_repeats, savepath, evaluate_args):
+        X = evaluate_args['X']
+        X_extra = evaluate_args['X_extra']
+        X_force_train = evaluate_args['X_force_train']
+        file_extension = evaluate_args['file_extension']
+        n_repeat_splits = len(splits) // n_repeats
+        time_started = time.time()
+
+        active = list(range(len(jobs)))
+        job_splits = {job_id: SplitResults(X=X, X_extra=X_extra, X_force_train=X_force_train) for job_id in active}
+        rows = list()
+        memory_reports = list()
+        n_done = 0
+        n_round_repeats = max(1, min(min_repeats, n_repeats))
+        round_count = 0
+        while len(active) > 0:
+            memory_reports.append(self._evaluate_split_round(jobs, active, splits, n_done*n_repeat_splits,
+                                                             (n_done+n_round_repeats)*n_repeat_splits, job_splits,
+                                                             evaluate_args))
+            n_done += n_round_repeats
+            out_of_time = repeats_time_budget is not None and time.time() - time_started >= repeats_time_budget
+            stopped = list()
+            for job_id in active:
+                scores = np.array([r['test_stats'][best_run_metric] for r in job_splits[job_id].splits.values()],
+                                  dtype=float)
+                scores = scores[~np.isnan(scores)]
+                mean = np.mean(scores) if scores.shape[0] > 0 else np.nan
+                # The standard error is unknown, and the job not converged, until there are two scores
+                stderr = np.std(scores, ddof=1) / np.sqrt(scores.shape[0]) if scores.shape[0] > 1 else np.nan
+                tolerance = repeats_tolerance if repeats_tolerance is not None else 0.01*abs(mean)
+                if stderr <= tolerance:
+                    status = 'converged'
+                elif n_done >= n_repeats:
+                    status = 'max_repeats'
+                elif out_of_time:
+                    status = 'time_budget'
+                else:
+                    status = 'continued'
+                if status != 'continued':
+                    stopped.append(job_id)
+                rows.append(OrderedDict([('round', round_count),
+                                         ('n_repeats', n_done),
+                                         ('n_splits', n_done*n_repeat_splits),
+                                         ('model', jobs[job_id]['model_name']),
+                                         ('selector', jobs[job_id]['selector'].__class__.__name__),
+                                         ('splitdir', jobs[job_id]['splitdir']),
+                                         (best_run_metric, mean),
+                                         (best_run_metric+'_stderr', stderr),
+                                         ('status', status)]))
+            active = [job_id for job_id in active if job_id not in stopped]
+            n_round_repeats = 1
+            round_count += 1
+
+        self.repeats_results = pd.DataFrame(rows)
+        save_data(self.repeats_results, os.path.join(savepath, 'repeats_results'+file_extension), index=False)
+
+        # Summarize each job over the repeats it was evaluated on
+        yield from self._get_round_results(jobs, list(range(len(jobs))), job_splits, memory_reports, file_extension)
+        return
+
+    def _evaluate_split_round(self, jobs, job_ids, splits, start, stop, job_splits, evaluate_args):
+        round_jobs = [dict(jobs[job_id], tasks=self._get_split_tasks(splits, jobs[job_id]['splitdir'], start=start,
+                                                                     stop=stop))
+                      for job_id in job_ids]
+        # The jobs are returned in order. The generator is run to its end, which saves the memory report
+        for (job, split_results), job_id in zip(self._evaluate_split_jobs(round_jobs, **evaluate_args),
+                                                job_ids):
+            job_splits[job_id].splits.update(split_results[job['splitdir']].splits)
+            job_splits[job_id].failed.update(split_results[job['splitdir']].failed)
+        return self.memory_report
+
+    def _get_round_results(self, jobs, job_ids, job_splits, memory_reports, file_extension):
+        # Keep the memory used by the splits of all the rounds
+        self.memory_report = pd.concat(memory_reports, ignore_index=True)
+        for splitdir, df in self.memory_report.groupby('splitdir', sort=False):
+            save_data(df, os.path.join(splitdir, 'memory_report'+file_extension), index=False)
+
+        for job_id in job_ids:
+            yield jobs[job_id], {jobs[job_id]['splitdir']: job_splits.pop(job_id)}
+        return
+
+    def _save_memory_report(self, graph, jobs, task_names, file_extension):
+        # One row per evaluated split, with the peak memory of the worker evaluating it
+        rows = list()
+        for task_id, (job_id, split_name) in task_names.items():
+            report = graph.failed.get(task_id, graph.memory_reports.get(task_id))
+            if report is None:
+                continue
+            rows.append(OrderedDict([('model', jobs[job_id]['model_name']),
+                                     ('selector', jobs[job_id]['selector'].__class__.__name__),
+                                     ('splitdir', jobs[job_id].get('splitdir')),
+                                     ('split', split_name),
+                                     ('pid', report.get('pid')),
+                                     ('rss_start_mb', report.get('rss_start_mb')),
+                                     ('rss_peak_mb', report.get('rss_peak_mb')),
+                                     ('status', report['status'])]))
+        self.memory_report = pd.DataFrame(rows, columns=['model', 'selector', 'splitdir', 'split', 'pid', 'rss_start_mb',
+                                                         'rss_peak_mb', 'status'])
+        for splitdir, df in self.memory_report.groupby('splitdir', sort=False):
+            save_data(df, os.path.join(splitdir, 'memory_report'+file_extension), index=False)
+        return
+
+    def _merge_profiles(self, profiler, splitdir):
+        # The split profiles are in the split directories, or the inner split directories for nested CV
+        paths = list()
+        for root, dirs, files in os.walk(splitdir):
+            dirs.sort()
+            if 'profile.pstats' in files or 'profile_allocations.csv' in files:
+                paths.append(os.path.join(root, 'profile'))
+        profiler.merge(paths, savepath=splitdir, name='profile_merged')
+        return
 
+    def _get_stage_times(self, split_results, model_name, selector, splitdir, prefix=''):
+        # One row per split, and one for the summary over the splits. The inner splits of nested CV are named after
+        # their outer split, e.g. split_outer_0/split_1
+        rows = list()
+        for split_name, results in split_results.splits.items():
+            if results.get('split_results') is not None:
+                rows += self._get_stage_times(results['split_results'], model_name, selector, splitdir,
+                                              prefix=prefix+split_name+'/').to_dict('records')
+            if results.get('stage_times') is not None:
+                rows.append(OrderedDict([('model', model_name), ('selector', selector.__class__.__name__),
+                                         ('splitdir', splitdir), ('split', prefix+split_name)]+list(results['stage_times'].items())))
+        if split_results.summary.get('stage_times') is not None:
+            rows.append(OrderedDict([('model', model_name), ('selector', selector.__class__.__name__),
+                                     ('splitdir', splitdir), ('split', prefix+'summary')]+list(split_results.summary['stage_times'].items())))
+        return pd.DataFrame(rows).fillna(0.0)
+
+    def _add_to_catalog(self, catalog, dataset_hash, time_started, splitdir, model, model_name, preprocessor, selector,
+                        hyperopt, split_results, data_types, file_extension):
+        config = {'model': catalog.get_params(model),
+                  'splitter': catalog.get_params(self),
+                  'preprocessor': catalog.get_params(preprocessor),
+                  'selector': catalog.get_params(selector),
+                  'hyperopt': catalog.get_params(hyperopt)}
+        run_id = catalog.add_run(kind='evaluate',
+                                 savepath=splitdir,
+                                 dataset_hash=dataset_hash,
+                                 model=catalog.get_name(model),
+                                 splitter=catalog.get_name(self),
+                                 preprocessor=catalog.get_name(preprocessor),
+                                 selector=catalog.get_name(selector),
+                                 hyperopt=catalog.get_name(hyperopt),
+                                 config=config,
+                                 time_started=time_started)
+        for data_type in data_types:
+            for split_name, stats in split_results.get_stats(data_type=data_type).items():
+                catalog.add_metrics(run_id, stats, data_type=data_type, split=split_name)
+            catalog.add_metrics(run_id, split_results.get_average_stdev_stats(data_type=data_type), data_type=data_type)
+            stats_path = os.path.join(splitdir, data_type+'_average_stdev_stats_summary'+file_extension)
+            if os.path.exists(stats_path):
+                catalog.add_artifact(run_id, data_type+'_stats_summary', stats_path)
+        if os.path.exists(os.path.join(splitdir, model_name+'.pkl')):
+            catalog.add_artifact(run_id, 'model', os.path.join(splitdir, model_name+'.pkl'))
+        return run_id
+
+    def _get_split_tasks(self, splits, splitdir, rows=None, start=0, stop=None):
+        if stop is None:
+            stop = len(splits)
+        for split_count in range(start, stop):
+            train_ind, test_ind = splits[split_count]
+            if rows is not None:
+                train_rows = rows[train_ind]
+                test_rows = rows[test_ind]
+            else:
+                train_rows = train_ind
+                test_rows = test_ind
+            yield train_rows, test_rows, train_ind, test_ind, split_count, splitdir
+
+    def _get_nested_splits(self, X, y, groups, leaveout_inds):
+        inner_splits = list()
+        for leaveout_ind in leaveout_inds:
+            X_subsplit = X.loc[~X.index.isin(leaveout_ind)]
+            y_subsplit = y.loc[~y.index.isin(leaveout_ind)]
             if groups is not None:
-                group = pd.Series(np.array(groups)[test_ind])
-                group_train = pd.Series(np.array(groups)[train_ind])
+                groups_subsplit = groups.loc[~groups.index.isin(leaveout_ind)]
             else:
-                group = None
-                group_train = None
-
-            splitpath = os.path.join(splitdir, 'split_' + str(split_count))
-            os.mkdir(splitpath)
-
-            # Save the test data indices and train data indices
-            if file_extension == '.xlsx':
-                pd.DataFrame({'test_inds': test_ind}).to_excel(os.path.join(splitpath, 'test_inds'+file_extension), index=False)
-                pd.DataFrame({'train_inds': train_ind}).to_excel(os.path.join(splitpath, 'train_inds'+file_extension), index=False)
-            elif file_extension == '.csv':
-                pd.DataFrame({'test_inds': test_ind}).to_csv(os.path.join(splitpath, 'test_inds' + file_extension), index=False)
-                pd.DataFrame({'train_inds': train_ind}).to_csv(os.path.join(splitpath, 'train_inds' + file_extension), index=False)
-
-            self._evaluate_split(X_train, X_test, y_train, y_test, model, model_name, mastml, preprocessor_orig,
-                                 selector_orig,
-                                 hyperopt_orig, metrics, plots, group, group_train,
-                                 splitpath, has_model_errors, X_extra_train, X_extra_test, error_method,
-                                 remove_outlier_learners,
-                                 verbosity, baseline_test, distance_metric, domain_distance, file_extension, image_dpi,
-                                 **kwargs)
-
-            #self._evaluate_split(X_train, X_test, y_train, y_test, model_orig, model_name, mastml, preprocessor_orig, selector_orig,
-            #                     hyperopt_orig, metrics, plots, group, group_train,
-            #                     splitpath, has_model_errors, X_extra_train, X_extra_test, error_method, remove_outlier_learners,
-            #                     verbosity, baseline_test, distance_metric, domain_distance, file_extension, image_dpi, **kwargs)
-            return
-
-        split_counts = list(range(len(y_splits)))
-        data = list(zip(X_splits, y_splits, train_inds, test_inds, split_counts))
-
-        # Parallel
+                groups_subsplit = None
+            inner_splits.append(PackedSplits(self.split(X_subsplit, y_subsplit, groups_subsplit)))
+        return inner_splits
+
+    def _get_nested_split_tasks(self, X, leaveout_inds, inner_splits, splitouterpaths):
+        for leaveout_ind, splits, splitouterpath in zip(leaveout_inds, inner_splits, splitouterpaths):
+            # The split indices are positions in the subsplit data, so also get their positions in the full data
+            subsplit_rows = np.where(~X.index.isin(leaveout_ind))[0]
+            yield from self._get_split_tasks(splits, splitouterpath, rows=subsplit_rows)
+
+    def _evaluate_split_jobs(self, jobs, X, y, X_extra, groups, X_force_train, y_force_train, mastml, preprocessor,
+                             metrics, plots, error_method, remove_outlier_learners, verbosity, baseline_test,
+                             distance_metric, domain_distance, file_extension, image_dpi, parallel_run,
+                             write_split_files=True, n_jobs=None, fit_cache=None, journal=None, profile=None,
+                             memory_budget=None, memory_limit=None, time_limit=None, batch_time=0.5, **kwargs):
+        def _get_prepared(splitdir, split_name, results):
+            return {'selected_features': results['selected_features'],
+                    'preprocessor': results['preprocessor'],
+                    'splitpath': os.path.join(splitdir, split_name),
+                    'files': results['prepared_files']}
+
+        # The settings shared by all the split tasks. The tasks get a bare copy of the splitter without its caches or the
+        # results of earlier runs, as it is only used to evaluate the split and name it in the metadata
+        splitter = self.__class__.__new__(self.__class__)
+        splitter.splitter = self.splitter
+        config = {'splitter': splitter, 'mastml': mastml, 'preprocessor': preprocessor, 'metrics': metrics,
+                  'plots': plots, 'error_method': error_method, 'remove_outlier_learners': remove_outlier_learners,
+                  'verbosity': verbosity, 'baseline_test': baseline_test, 'distance_metric': distance_metric,
+                  'domain_distance': domain_distance, 'file_extension': file_extension, 'image_dpi': image_dpi,
+                  'write_split_files': write_split_files, 'fit_cache': fit_cache, 'profile': profile,
+                  'write_checkpoint': journal is not None, 'kwargs': kwargs}
+
+        def _make_task(task, job_id, job):
+            # Task of a split preprocessed and selected for an earlier job, made once that split is done
+            def _task(dependency_result):
+                return task + (_get_prepared(*dependency_result[1:]), job_id, job['spec'])
+            return _task
+
+        data = [X, y, X_extra, groups, X_force_train, y_force_train]
+
+        # Flatten the splits of all the jobs into one graph of tasks. A split is preprocessed and feature selected once
+        # for all the jobs sharing the same prepared cache (i.e. the same selector). So the tasks of a split of the
+        # later jobs depend on the task of that split of the first job, and reuse its preprocessing and selection
         if parallel_run is True:
-            parallel(_evaluate_split_sets_serial, x=data, groups=groups)
-
-        # Serial
+            shared_dir = tempfile.mkdtemp(prefix='mastml_shared_')
+            graph = TaskGraph(_evaluate_split_task, share_data(data, savepath=shared_dir), config)
         else:
-            [_evaluate_split_sets_serial(data=i, groups=groups) for i in data]
+            shared_dir = None
+            graph = TaskGraph(_evaluate_split_task, data, config)
+        preparing = dict()
+        num_tasks = list()
+        task_counts = dict()
+        task_names = dict()
+        job_results = [list() for job in jobs]
+        job_failed = [list() for job in jobs]
+        for job_id, job in enumerate(jobs):
+            if job.get('prepared') is None:
+                job['prepared'] = dict()
+            job['spec'] = (job['model'], job['model_name'], job['selector'], job['hyperopt'], job['has_model_errors'])
+            num_tasks.append(0)
+            for task_count, task in enumerate(job['tasks']):
+                num_tasks[job_id] += 1
+                split_key = _split_key(task[5], 'split_'+str(task[4]))
+                # Reload the results of the splits done by an interrupted run
+                if split_key in job.get('splits_done', set()):
+                    try:
+                        results = joblib.load(os.path.join(task[5], split_key[1], 'split_results.pkl'))
+                    except (FileNotFoundError, EOFError):
+                        results = None
+                    if results is not None:
+                        job_results[job_id].append((task_count, task[5], split_key[1], results))
+                        if split_key not in job['prepared']:
+                            job['prepared'][split_key] = _get_prepared(task[5], split_key[1], results)
+                        continue
+                key = (id(job['prepared']), split_key)
+                split_prepared = job['prepared'].get(split_key)
+                if split_prepared is None and key in preparing:
+                    # If the split fails for the earlier job, this job preprocesses and selects it itself
+                    task_id = graph.add(_make_task(task, job_id, job), depends_on=[preparing[key]],
+                                        fallback=task + (None, job_id, job['spec']))
+                else:
+                    task_id = graph.add(task + (split_prepared, job_id, job['spec']))
+                    if split_prepared is None:
+                        preparing[key] = task_id
+                task_counts[task_id] = (task_count, task[5], split_key[1])
+                task_names[task_id] = (job_id, '/'.join([k for k in split_key if k is not None]))
+
+        # Run the tasks (in parallel, on a single pool of workers, with the data shared through memory-mapped files), and
+        # return the results of each job, in order, as soon as all its splits are done. This way the aggregation of the
+        # done jobs runs while the workers evaluate the splits of the other jobs
+
+        def _add_failed():
+            # Record the splits that failed since the last call, so their job is done without them
+            for task_id in [task_id for task_id in graph.failed if task_id in task_counts]:
+                job_failed[task_names[task_id][0]].append(task_counts.pop(task_id) + (graph.failed[task_id]['status'],))
+
+        def _get_done_jobs(next_job):
+            while next_job < len(jobs) and len(job_results[next_job]) + len(job_failed[next_job]) == num_tasks[next_job]:
+                # Add the splits in the order they were made, whichever order they were evaluated in
+                split_results = OrderedDict()
+                for task_count, splitdir, split_name, results in sorted(job_results[next_job] + job_failed[next_job],
+                                                                        key=lambda r: r[0]):
+                    if splitdir not in split_results:
+                        split_results[splitdir] = SplitResults(X=X, X_extra=X_extra, X_force_train=X_force_train)
+                    if isinstance(results, str):
+                        split_results[splitdir].add_failed(split_name, results)
+                    else:
+                        split_results[splitdir].add(split_name, results)
+                job_results[next_job] = None
+                yield next_job, split_results
+                next_job += 1
+
+        next_job = 0
+        try:
+            for job_id, split_results in _get_done_jobs(next_job):
+                next_job = job_id + 1
+                yield jobs[job_id], split_results
+            if memory_limit is None:
+                memory_limit = memory_budget
+            for task_id, (job_id, splitdir, split_name, results) in graph.run(parallel_run=parallel_run, n_jobs=n_jobs,
+                                                                               memory_budget=memory_budget,
+                                                                               memory_limit=memory_limit,
+                                                                               time_limit=time_limit,
+                                                                               batch_time=batch_time):
+                job_results[job_id].append((task_counts.pop(task_id)[0], splitdir, split_name, results))
+                key = _split_key(splitdir, split_name)
+                if key not in jobs[job_id]['prepared']:
+                    jobs[job_id]['prepared'][key] = _get_prepared(splitdir, split_name, results)
+                if journal is not None:
+                    journal.add_split(jobs[job_id]['key'], key)
+                _add_failed()
+                for done_job_id, split_results in _get_done_jobs(next_job):
+                    next_job = done_job_id + 1
+                    yield jobs[done_job_id], split_results
+            # The last splits to be done may have failed
+            _add_failed()
+            for done_job_id, split_results in _get_done_jobs(next_job):
+                next_job = done_job_id + 1
+                yield jobs[done_job_id], split_results
+            self._save_memory_report(graph, jobs, task_names, file_extension)
+        finally:
+            if shared_dir is not None:
+                shutil.rmtree(shared_dir, ignore_errors=True)
+
+    def _summarize_split_sets(self, split_results, model, mastml, selector, preprocessor, X_extra, groups, splitdir,
+                              hyperopt, metrics, plots, has_model_errors, recalibrate_errors, verbosity, domain_distance,
+                              file_extension, image_dpi, write_split_files=True):
+        # Time each stage of the summary, like the stages of each split
+        timer = StageTimer()
+
+        if len(split_results.failed) > 0:
+            print('Warning: '+str(len(split_results.failed))+' splits of '+splitdir+' failed to be evaluated and are '
+                  'left out of its summary: '+', '.join([name+' ('+status+')' for name, status in split_results.failed.items()]))
+
+        # Optionally write out the data of each individual split
+        if write_split_files is True:
+            split_results.export(savepath=splitdir, file_extension=file_extension)
+            timer.lap('export')
 
         # At level of splitdir, do analysis over all splits (e.g. parity plot over all splits)
         if groups is not None:
-            groups_test_all = self._collect_data(filename='test_groups', savepath=splitdir, file_extension=file_extension)
-            groups_train_all = self._collect_data(filename='train_groups', savepath=splitdir, file_extension=file_extension)
+            groups_test_all = split_results.collect('test_groups')
+            groups_train_all = split_results.collect('train_groups')
         else:
             groups_test_all = None
             groups_train_all = None
 
-        y_test_all = self._collect_data(filename='y_test', savepath=splitdir, file_extension=file_extension)
-        y_train_all = self._collect_data(filename='y_train', savepath=splitdir, file_extension=file_extension)
-        y_pred_all = self._collect_data(filename='y_pred', savepath=splitdir, file_extension=file_extension)
-        y_pred_train_all = self._collect_data(filename='y_pred_train', savepath=splitdir, file_extension=file_extension)
-        residuals_test_all = self._collect_data(filename='residuals_test', savepath=splitdir, file_extension=file_extension)
-        residuals_train_all = self._collect_data(filename='residuals_train', savepath=splitdir, file_extension=file_extension)
-        X_train_all = self._collect_df_data(filename='X_train', savepath=splitdir, file_extension=file_extension)
-        X_test_all = self._collect_df_data(filename='X_test', savepath=splitdir, file_extension=file_extension)
+        y_test_all = split_results.collect('y_test')
+        y_train_all = split_results.collect('y_train')
+        y_pred_all = split_results.collect('y_pred')
+        y_pred_train_all = split_results.collect('y_pred_train')
+        residuals_test_all = split_results.collect('residuals_test')
+        residuals_train_all = split_results.collect('residuals_train')
+        X_train_all = split_results.collect_df('X_train')
+        X_test_all = split_results.collect_df('X_test')
         if X_extra is not None:
-            X_extra_train_all = self._collect_df_data(filename='X_extra_train', savepath=splitdir, file_extension=file_extension)
-            X_extra_test_all = self._collect_df_data(filename='X_extra_test', savepath=splitdir, file_extension=file_extension)
+            X_extra_train_all = split_results.collect_df('X_extra_train')
+            X_extra_test_all = split_results.collect_df('X_extra_test')
         if domain_distance:
-            y_test_domain_all = self._collect_data(filename='y_test_domain', savepath=splitdir, file_extension=file_extension)
-            y_combined_all = self._collect_df_data(filename='y_combined', savepath=splitdir, file_extension=file_extension)
+            y_test_domain_all = split_results.collect('y_test_domain')
+            y_combined_all = split_results.collect_df('y_combined')
 
         # Save the data gathered over all the splits
         self._save_split_data(df=X_train_all, filename='X_train', savepath=splitdir, columns=X_train_all.columns.tolist(), file_extension=file_extension)
@@ -1280,10 +1934,10 @@ class BaseSplitter(ms.BaseCrossValidator):
                                   columns=y_combined_all.columns.tolist(), file_extension=file_extension)
 
         if has_model_errors is True:
-            model_errors_test_all = self._collect_data(filename='model_errors_test', savepath=splitdir, file_extension=file_extension)
-            model_errors_train_all = self._collect_data(filename='model_errors_train', savepath=splitdir, file_extension=file_extension)
-            num_removed_learners_test_all = self._collect_data(filename='num_removed_learners_test', savepath=splitdir, file_extension=file_extension)
-            num_removed_learners_train_all = self._collect_data(filename='num_removed_learners_train', savepath=splitdir, file_extension=file_extension)
+            model_errors_test_all = split_results.collect('model_errors_test')
+            model_errors_train_all = split_results.collect('model_errors_train')
+            num_removed_learners_test_all = split_results.collect('num_removed_learners_test')
+            num_removed_learners_train_all = split_results.collect('num_removed_learners_train')
             # Save all the uncalibrated model errors data
             self._save_split_data(df=model_errors_test_all, filename='model_errors_test', savepath=splitdir, columns='model_errors', file_extension=file_extension)
             self._save_split_data(df=model_errors_train_all, filename='model_errors_train', savepath=splitdir, columns='model_errors', file_extension=file_extension)
@@ -1292,32 +1946,30 @@ class BaseSplitter(ms.BaseCrossValidator):
         else:
             model_errors_test_all = None
             model_errors_train_all = None
+        timer.lap('save_files')
 
         if recalibrate_errors is True:
             model_errors_test_all_cal, a, b = ErrorUtils()._recalibrate_errors(model_errors=model_errors_test_all, residuals=residuals_test_all)
+            split_results.summary['recalibration_parameters_test'] = {'a': a, 'b': b}
 
             # Write the recalibration values to file
             recal_df = pd.DataFrame({'slope (a)': a, 'intercept (b)': b}, index=[0])
-            if file_extension == '.xlsx':
-                recal_df.to_excel(os.path.join(splitdir, 'recalibration_parameters_'+str('test')+file_extension), index=False)
-            elif file_extension == '.csv':
-                recal_df.to_csv(os.path.join(splitdir, 'recalibration_parameters_' + str('test') + file_extension), index=False)
+            save_data(recal_df, os.path.join(splitdir, 'recalibration_parameters_' + str('test') + file_extension), index=False)
 
             # Write the calibrated model errors to file
             self._save_split_data(df=model_errors_test_all_cal, filename='model_errors_test_calibrated', savepath=splitdir, columns='model_errors', file_extension=file_extension)
 
             model_errors_train_all_cal, a, b = ErrorUtils()._recalibrate_errors(model_errors=model_errors_train_all,
                                                                                 residuals=residuals_train_all)
+            split_results.summary['recalibration_parameters_train'] = {'a': a, 'b': b}
 
             # Write the recalibration values to file
             recal_df = pd.DataFrame({'slope (a)': a, 'intercept (b)': b}, index=[0])
-            if file_extension == '.xlsx':
-                recal_df.to_excel(os.path.join(splitdir, 'recalibration_parameters_' + str('train') + file_extension), index=False)
-            elif file_extension == '.csv':
-                recal_df.to_csv(os.path.join(splitdir, 'recalibration_parameters_' + str('train') + file_extension), index=False)
+            save_data(recal_df, os.path.join(splitdir, 'recalibration_parameters_' + str('train') + file_extension), index=False)
             # Write the calibrated model errors to file
             self._save_split_data(df=model_errors_train_all_cal, filename='model_errors_train_calibrated', savepath=splitdir,
                                   columns='model_errors', file_extension=file_extension)
+            timer.lap('recalibration')
         else:
             model_errors_test_all_cal = None
             model_errors_train_all_cal = None
@@ -1343,7 +1995,8 @@ class BaseSplitter(ms.BaseCrossValidator):
                        model_errors_cal=model_errors_test_all_cal,
                        splits_summary=True,
                        file_extension=file_extension,
-                       image_dpi=image_dpi)
+                       image_dpi=image_dpi,
+                       split_results=split_results)
 
         # Make all train data plots
         dataset_stdev = np.std(np.unique(y_train_all))
@@ -1366,22 +2019,13 @@ class BaseSplitter(ms.BaseCrossValidator):
                        model_errors_cal=model_errors_train_all_cal,
                        splits_summary=True,
                        file_extension=file_extension,
-                       image_dpi=image_dpi)
+                       image_dpi=image_dpi,
+                       split_results=split_results)
+        timer.lap('plots')
 
-        try:
-            if file_extension == '.xlsx':
-                df_stats = pd.read_excel(os.path.join(splitdir, 'test_average_stdev_stats_summary'+file_extension))
-            elif file_extension == '.csv':
-                df_stats = pd.read_csv(os.path.join(splitdir, 'test_average_stdev_stats_summary' + file_extension))
-        except:
-            df_stats = None
-        try:
-            if file_extension == '.xlsx':
-                df_stats_train = pd.read_excel(os.path.join(splitdir, 'train_average_stdev_stats_summary'+file_extension))
-            elif file_extension == '.csv':
-                df_stats_train = pd.read_csv(os.path.join(splitdir, 'train_average_stdev_stats_summary' + file_extension))
-        except:
-            df_stats_train = None
+        df_stats = split_results.get_average_stdev_stats(data_type='test')
+        df_stats_train = split_results.get_average_stdev_stats(data_type='train')
+        timer.lap('stats')
 
         # Update the MASTML metadata file
         outerdir = splitdir.split('/')[-1]
@@ -1398,78 +2042,155 @@ class BaseSplitter(ms.BaseCrossValidator):
                                     hyperopt=hyperopt,
                                     train_stats=df_stats_train,
                                     test_stats=df_stats,
-                                    X_train=pd.DataFrame(np.array(X_train_all), columns=X_train_all.columns.tolist()),
-                                    X_test=pd.DataFrame(np.array(X_test_all), columns=X_test_all.columns.tolist()),
-                                    X_extra_train=pd.DataFrame(np.array(X_extra_train_all), columns=X_extra_train_all.columns.tolist()) if X_extra is not None else None,
-                                    X_extra_test=pd.DataFrame(np.array(X_extra_test_all), columns=X_extra_test_all.columns.tolist()) if X_extra is not None else None,
-                                    y_train=y_train_all,
-                                    y_test=y_test_all,
-                                    y_test_domain=y_test_domain_all if domain_distance is not None else None,
-                                    y_pred_train=y_pred_train_all,
-                                    y_pred=y_pred_all,
-                                    residuals_train=residuals_train_all,
-                                    residuals_test=residuals_test_all,
-                                    model_errors_train=model_errors_train_all,
-                                    model_errors_test=model_errors_test_all,
-                                    model_errors_train_cal=model_errors_train_all_cal,
-                                    model_errors_test_cal=model_errors_test_all_cal,
-                                    dataset_stdev=dataset_stdev)
-            mastml._save_mastml_metadata()
-
-        return outerdir
+                                    train_columns=X_train_all.columns.tolist(),
+                                    data_files=self._get_data_files(splitdir, ['X_train', 'X_test', 'X_extra_train',
+                                                                               'X_extra_test', 'y_train', 'y_test',
+                                                                               'y_test_domain', 'y_pred_train', 'y_pred',
+                                                                               'residuals_train', 'residuals_test',
+                                                                               'model_errors_train', 'model_errors_test',
+                                                                               'model_errors_train_cal',
+                                                                               'model_errors_test_cal'], file_extension),
+                                    dataset_stdev=dataset_stdev,
+                                    stage_times=timer.get_times(),
+                                    failed_splits=split_results.failed if len(split_results.failed) > 0 else None)
+            timer.lap('metadata')
+        split_results.summary['stage_times'] = timer.get_times()
+
+        return outerdir, split_results
 
     def _evaluate_split(self, X_train, X_test, y_train, y_test, model, model_name, mastml, preprocessor, selector, hyperopt,
                         metrics, plots, groups, groups_train, splitpath, has_model_errors, X_extra_train, X_extra_test,
                         error_method, remove_outlier_learners, verbosity, baseline_test, distance_metric,
-                        domain_distance, file_extension, image_dpi, **kwargs):
-
-        X_train_orig = copy.deepcopy(X_train)
-        X_test_orig = copy.deepcopy(X_test)
-
-        preprocessor1 = copy.deepcopy(preprocessor)
-        preprocessor2 = copy.deepcopy(preprocessor)
-
-        # Preprocess the full split data
-        X_train = preprocessor1.evaluate(X_train, savepath=splitpath, file_name='train', file_extension=file_extension)
-        X_test = preprocessor1.evaluate(X_test, savepath=splitpath, file_name='test', file_extension=file_extension)
-
-        # run feature selector to get new Xtrain, Xtest
-        X_train = selector.evaluate(X=X_train, y=y_train, savepath=splitpath)
-        selected_features = selector.selected_features
-
-        X_train = preprocessor2.evaluate(X_train_orig[selected_features], savepath=splitpath, file_name='train_selected', file_extension=file_extension)
-        X_test = preprocessor2.transform(X_test_orig[selected_features])
-
-        self._save_split_data(df=X_train_orig[selected_features], filename='X_train', savepath=splitpath, columns=selected_features, file_extension=file_extension)
-        self._save_split_data(df=X_test_orig[selected_features], filename='X_test', savepath=splitpath, columns=selected_features, file_extension=file_extension)
-        self._save_split_data(df=y_train, filename='y_train', savepath=splitpath, columns='y_train', file_extension=file_extension)
-        self._save_split_data(df=y_test, filename='y_test', savepath=splitpath, columns='y_test', file_extension=file_extension)
+                        domain_distance, file_extension, image_dpi, write_split_files=True, prepared=None, fit_cache=None,
+                        keep_model=False, **kwargs):
+
+        # Time each stage of the split evaluation
+        timer = StageTimer()
+
+        # The split data is made for this split only, and the preprocessors and selector return new data rather than
+        # modifying their input, so the original split data is kept without copying it
+        X_train_orig = X_train
+        X_test_orig = X_test
+
+        # Fit an unfitted clone of the model, so the fitted model of this split can be kept with the results without
+        # copying it after fitting. Keras models are fit as is, see the TODO in _evaluate_split_task
+        is_keras = model_name == 'KerasRegressor' or (model_name == 'BaggingRegressor' and model.base_estimator_ == 'KerasRegressor')
+        if is_keras is False:
+            model = _clone_model(model)
+
+        if prepared is None:
+            preprocessor1 = copy.deepcopy(preprocessor)
+            preprocessor2 = copy.deepcopy(preprocessor)
+
+            # Preprocess the full split data. The preprocessed test data is only saved to file, as the test data is
+            # transformed below with the preprocessor fit on the selected training features
+            X_train = preprocessor1.evaluate(X_train, savepath=splitpath, file_name='train', file_extension=file_extension,
+                                             write_data=write_split_files)
+            if write_split_files is True:
+                preprocessor1.evaluate(X_test, savepath=splitpath, file_name='test', file_extension=file_extension)
+            timer.lap('preprocessing')
+
+            # run feature selector to get new Xtrain, Xtest
+            X_train = selector.evaluate(X=X_train, y=y_train, savepath=splitpath, write_data=write_split_files)
+            selected_features = selector.selected_features
+            timer.lap('feature_selection')
+
+            # Only reindex the split data if the selector removed features
+            if selected_features != X_train_orig.columns.tolist():
+                X_train_orig = X_train_orig[selected_features]
+                X_test_orig = X_test_orig[selected_features]
+
+            X_train = preprocessor2.evaluate(X_train_orig, savepath=splitpath, file_name='train_selected', file_extension=file_extension,
+                                             write_data=write_split_files)
+            X_test = preprocessor2.transform(X_test_orig)
+            timer.lap('preprocessing')
+
+            # So far the split directory only holds the preprocessing and feature selection output files. Keep their
+            # names so they can be copied when other models are evaluated on this split
+            prepared_files = os.listdir(splitpath)
+        else:
+            # Reuse the preprocessing and feature selection of this split done for a previous model. Copy its output
+            # files and save the fitted preprocessor, then just transform the split data with it. The previous model
+            # may be summarized meanwhile, which removes the preprocessors of non-best splits (and all the split
+            # directories with remove_split_dirs), so the preprocessor is saved again here and missing files skipped
+            selected_features = prepared['selected_features']
+            preprocessor2 = prepared['preprocessor']
+            prepared_files = prepared['files']
+            preprocessor_name = str(preprocessor2.preprocessor.__class__.__name__) + ".pkl"
+            for f in prepared_files:
+                if f != preprocessor_name:
+                    try:
+                        shutil.copy(os.path.join(prepared['splitpath'], f), splitpath)
+                    except FileNotFoundError:
+                        pass
+            joblib.dump(preprocessor2, os.path.join(splitpath, preprocessor_name))
+
+            if selected_features != X_train_orig.columns.tolist():
+                X_train_orig = X_train_orig[selected_features]
+                X_test_orig = X_test_orig[selected_features]
+
+            X_train = preprocessor2.transform(X_train_orig)
+            X_test = preprocessor2.transform(X_test_orig)
+            timer.lap('preprocessing')
+
+        # Collect the split data in memory. Per-split files are written afterwards by SplitResults.export, if requested
+        results = dict()
+        results['X_train'] = X_train_orig
+        results['X_test'] = X_test_orig
+        results['y_train'] = y_train
+        results['y_test'] = y_test
+        results['preprocessor'] = preprocessor2
+        results['prepared_files'] = prepared_files
 
         if X_extra_train is not None and X_extra_test is not None:
-            self._save_split_data(df=X_extra_train, filename='X_extra_train', savepath=splitpath, columns=X_extra_train.columns.tolist(), file_extension=file_extension)
-            self._save_split_data(df=X_extra_test, filename='X_extra_test', savepath=splitpath, columns=X_extra_test.columns.tolist(), file_extension=file_extension)
+            results['X_extra_train'] = X_extra_train
+            results['X_extra_test'] = X_extra_test
         else:
             X_extra_train = None
             X_extra_test = None
 
-        # Here evaluate hyperopt instance, if provided, and get updated model instance
-        if hyperopt is not None:
-            model = hyperopt.fit(X=X_train, y=y_train, model=model, cv=5, savepath=splitpath)
-
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-        y_pred_train = model.predict(X_train)
+        # Get the fitted model and its predictions from the fit cache, if used and the same model was already fit on the
+        # same split data. Keras models aren't cached, as they can't be pickled
+        if fit_cache is not None and is_keras is False:
+            fit_key = fit_cache.get_key(X_train=X_train_orig, y_train=y_train, X_test=X_test_orig, model=model,
+                                        preprocessor=preprocessor, hyperopt=hyperopt)
+            fit_cached = fit_cache.load(fit_key)
+            timer.lap('fit_cache')
+        else:
+            fit_key = None
+            fit_cached = None
 
+        if fit_cached is not None:
+            model = fit_cached['model']
+            y_pred = fit_cached['y_pred']
+            y_pred_train = fit_cached['y_pred_train']
+        else:
+            # Here evaluate hyperopt instance, if provided, and get updated model instance
+            if hyperopt is not None:
+                model = hyperopt.fit(X=X_train, y=y_train, model=model, cv=5, savepath=splitpath, file_extension=file_extension)
+                timer.lap('hyperopt')
+
+            model.fit(X_train, y_train)
+            timer.lap('model_fit')
+            y_pred = model.predict(X_test)
+            y_pred_train = model.predict(X_train)
+            timer.lap('predict')
+            if fit_key is not None:
+                fit_cache.save(fit_key, {'model': model, 'y_pred': y_pred, 'y_pred_train': y_pred_train})
+                timer.lap('fit_cache')
+
+        # The predictions and residuals are computed on arrays, and only made into series for the results
+        y_pred = np.asarray(y_pred).ravel()
+        y_pred_train = np.asarray(y_pred_train).ravel()
+        residuals_test = pd.Series(y_pred-y_test.values)
+        residuals_train = pd.Series(y_pred_train-y_train.values)
         y_pred = pd.Series(y_pred, name='y_pred')
         y_pred_train = pd.Series(y_pred_train, name='y_pred_train')
 
-        residuals_test = y_pred-y_test
-        residuals_train = y_pred_train-y_train
-
-        self._save_split_data(df=y_pred, filename='y_pred', savepath=splitpath, columns='y_pred', file_extension=file_extension)
-        self._save_split_data(df=y_pred_train, filename='y_pred_train', savepath=splitpath, columns='y_pred_train', file_extension=file_extension)
-        self._save_split_data(df=residuals_test, filename='residuals_test', savepath=splitpath, columns='residuals', file_extension=file_extension)
-        self._save_split_data(df=residuals_train, filename='residuals_train', savepath=splitpath, columns='residuals', file_extension=file_extension)
+        results['y_pred'] = y_pred
+        results['y_pred_train'] = y_pred_train
+        results['residuals_test'] = residuals_test
+        results['residuals_train'] = residuals_train
 
         if has_model_errors is True:
             model_errors_test, num_removed_learners_test = ErrorUtils()._get_model_errors(model=model,
@@ -1478,37 +2199,33 @@ class BaseSplitter(ms.BaseCrossValidator):
                                                                 X_test=X_test,
                                                                error_method=error_method,
                                                                remove_outlier_learners=remove_outlier_learners)
-            self._save_split_data(df=model_errors_test, filename='model_errors_test', savepath=splitpath, columns='model_errors', file_extension=file_extension)
-            self._save_split_data(df=num_removed_learners_test, filename='num_removed_learners_test', savepath=splitpath, columns='num_removed_learners', file_extension=file_extension)
             model_errors_train, num_removed_learners_train = ErrorUtils()._get_model_errors(model=model,
                                                                 X=X_train,
                                                                 X_train=X_train,
                                                                 X_test=X_train, #predicting on train data so test/train is same
                                                                 error_method=error_method,
                                                                 remove_outlier_learners=remove_outlier_learners)
-            self._save_split_data(df=model_errors_train, filename='model_errors_train', savepath=splitpath, columns='model_errors', file_extension=file_extension)
-            self._save_split_data(df=num_removed_learners_train, filename='num_removed_learners_train', savepath=splitpath, columns='num_removed_learners', file_extension=file_extension)
+            timer.lap('model_errors')
         else:
             model_errors_test = None
             model_errors_train = None
             num_removed_learners_train = None
             num_removed_learners_test = None
+        results['model_errors_test'] = model_errors_test
+        results['model_errors_train'] = model_errors_train
+        results['num_removed_learners_test'] = num_removed_learners_test
+        results['num_removed_learners_train'] = num_removed_learners_train
 
-        # Save summary stats data for this split
+        # Summary stats data for this split
         stats_dict = Metrics(metrics_list=metrics).evaluate(y_true=y_test, y_pred=y_pred)
-        df_stats = pd.DataFrame().from_records([stats_dict])
         stats_dict_train = Metrics(metrics_list=metrics).evaluate(y_true=y_train, y_pred=y_pred_train)
-        df_stats_train = pd.DataFrame().from_records([stats_dict_train])
-
-        if file_extension == '.xlsx':
-            df_stats.to_excel(os.path.join(splitpath, 'test_stats_summary' + file_extension), index=False)
-            df_stats_train.to_excel(os.path.join(splitpath, 'train_stats_summary'+file_extension), index=False)
-        elif file_extension == '.csv':
-            df_stats.to_csv(os.path.join(splitpath, 'test_stats_summary' + file_extension), index=False)
-            df_stats_train.to_csv(os.path.join(splitpath, 'train_stats_summary'+file_extension), index=False)
+        results['test_stats'] = stats_dict
+        results['train_stats'] = stats_dict_train
+        timer.lap('stats')
 
         # Make all test data plots
         dataset_stdev = np.std(y_train)
+        results['dataset_stdev'] = dataset_stdev
         if verbosity > 2:
             make_plots(plots=plots,
                        y_true=y_test,
@@ -1550,18 +2267,15 @@ class BaseSplitter(ms.BaseCrossValidator):
                        splits_summary=False,
                        file_extension=file_extension,
                        image_dpi=image_dpi)
+            timer.lap('plots')
 
         # Write the test group to a text file,
         if groups is not None:
             unique_groups = np.unique(groups)
             groups.name = 'test_groups'
             groups_train.name = 'train_groups'
-            if file_extension == '.xlsx':
-                groups.to_excel(os.path.join(splitpath, 'test_groups.xlsx'), index=False)
-                groups_train.to_excel(os.path.join(splitpath, 'train_groups.xlsx'), index=False)
-            elif file_extension == '.csv':
-                groups.to_csv(os.path.join(splitpath, 'test_groups.csv'), index=False)
-                groups_train.to_csv(os.path.join(splitpath, 'train_groups.csv'), index=False)
+            results['test_groups'] = groups
+            results['train_groups'] = groups_train
             with open(os.path.join(splitpath, 'test_group.txt'), 'w') as f:
                 for group in unique_groups:
                     f.write(str(group)+'\n')
@@ -1586,8 +2300,16 @@ class BaseSplitter(ms.BaseCrossValidator):
                 #print('Warning: unable to save pickled model of ensemble of KerasRegressor models. Passing through...')
             else:
                 joblib.dump(model, os.path.join(splitpath, str(model_name) + ".pkl"))
+                if keep_model is True:
+                    results['model'] = model
         else:
             joblib.dump(model, os.path.join(splitpath, str(model_name) + ".pkl"))
+            # Keep the fitted model of this split if asked, so the best model of the split set can be used without
+            # reloading it from file. Otherwise the model isn't sent back from the worker or held for the whole job
+            if keep_model is True:
+                results['model'] = model
+
+        timer.lap('save_files')
 
         # If using a Keras model, need to clear the session so training multiple models doesn't slow training down
         if model_name == 'KerasRegressor':
@@ -1605,48 +2327,47 @@ class BaseSplitter(ms.BaseCrossValidator):
 
                 if (i == "test_mean"):
                     df_res = baseline.test_mean(X_train, X_test, y_train, y_test, model, metrics)
-                    self._save_split_data(df_res, "test_mean", splitpath, columns, file_extension)
 
                 elif (i == "test_permuted"):
                     df_res = baseline.test_permuted(X_train, X_test, y_train, y_test, model, metrics)
-                    self._save_split_data(df_res, "test_permuted", splitpath, columns, file_extension)
 
                 elif (i == "test_nearest_neighbour_kdTree"):
                     df_res = baseline.test_nearest_neighbour_kdtree(X_train, X_test, y_train, y_test, model, metrics)
-                    self._save_split_data(df_res, "test_nearest_neighbour_kdTree", splitpath, columns, file_extension)
 
                 elif (i == "test_nearest_neighbour_cdist"):
                     df_res = baseline.test_nearest_neighbour_cdist(X_train, X_test, y_train, y_test, model, metrics,
                                                                    distance_metric)
-                    self._save_split_data(df_res, "test_nearest_neighbour_cdist", splitpath, columns, file_extension)
 
                 elif (i == "test_classifier_random"):
                     df_res = baseline.test_classifier_random(X_train, X_test, y_train, y_test, model, metrics)
-                    self._save_split_data(df_res, "test_classifier_random", splitpath, columns, file_extension)
 
                 elif (i == "test_classifier_dominant"):
                     df_res = baseline.test_classifier_dominant(X_train, X_test, y_train, y_test, model, metrics)
-                    self._save_split_data(df_res, "test_classifier_dominant", splitpath, columns, file_extension)
+
+                else:
+                    continue
+                df_res.columns = columns
+                results[i] = df_res
+            timer.lap('baseline_tests')
 
         if domain_distance is not None:
             y_test_domain = Domain()
             df_res = y_test_domain.distance(X_train, X_test, domain_distance, **kwargs)
-            self._save_split_data(df_res, "y_test_domain", splitpath, columns=["y_test_domain"], file_extension=file_extension)
-
-            # Make combined spreadsheet that contains: y_test, y_pred, X_extra_test, y_domain_test
-            y_combined = []
-            for i in range(len(df_res)):
-                y_combined.append((y_test.iloc[i], y_pred.iloc[i], X_extra_test, df_res.iloc[i].values[0]))
-            self._save_split_data(pd.DataFrame(y_combined), "y_combined", splitpath,
-                                  columns=["y_test", "y_pred", "X_extra_test", "y_domain"], file_extension=file_extension)
-
-        # Make combined spreadsheet that contains: y_test, y_pred, X_extra_test if user doesn't specify domain
+            df_res.columns = ["y_test_domain"]
+            results['y_test_domain'] = df_res
+            timer.lap('domain')
+
+        # Make combined spreadsheet that contains: y_test, y_pred, the X_extra_test columns and y_domain (if the
+        # domain is evaluated), one row per test data point
+        y_combined = pd.DataFrame({'y_test': np.array(y_test), 'y_pred': np.array(y_pred)})
+        if X_extra_test is not None:
+            y_combined = pd.concat([y_combined, X_extra_test.reset_index(drop=True)], axis=1)
         else:
-            y_combined = []
-            for i in range(len(y_test)):
-                y_combined.append((y_test.iloc[i], y_pred.iloc[i], X_extra_test))
-            self._save_split_data(pd.DataFrame(y_combined), "y_combined", splitpath,
-                                  columns=["y_test", "y_pred", "X_extra_test"], file_extension=file_extension)
+            y_combined['X_extra_test'] = None
+        if domain_distance is not None:
+            y_combined['y_domain'] = np.array(df_res['y_test_domain'])
+        results['y_combined'] = y_combined
+        timer.lap('other')
 
         # Update the MASTML metadata file
         if mastml is not None:
@@ -1654,6 +2375,16 @@ class BaseSplitter(ms.BaseCrossValidator):
             if 'split_outer' in outerdir:
                 # For nested CV or left out data runs with outer and inner splits, need the model dir one level up
                 outerdir = os.path.join(splitpath.split('/')[-3], splitpath.split('/')[-2])
+            # The data of the split is saved to the split directory by SplitResults.export once the split set is
+            # evaluated, if the split files are written, so the metadata holds the paths of those files
+            if write_split_files is True:
+                data_files = OrderedDict([(key, os.path.join(splitpath, key+file_extension))
+                                          for key in ['X_train', 'X_test', 'X_extra_train', 'X_extra_test', 'y_train',
+                                                      'y_test', 'y_pred_train', 'y_pred', 'residuals_train',
+                                                      'residuals_test', 'model_errors_train', 'model_errors_test']
+                                          if results.get(key) is not None])
+            else:
+                data_files = None
             mastml._update_metadata(outerdir=outerdir,
                                     split_name=splitpath.split('/')[-1],
                                     model=model,
@@ -1661,24 +2392,16 @@ class BaseSplitter(ms.BaseCrossValidator):
                                     preprocessor=preprocessor,
                                     selector=selector,
                                     hyperopt=hyperopt,
-                                    test_stats=df_stats,
-                                    train_stats=df_stats_train,
-                                    X_train=X_train,
-                                    X_test=X_test,
-                                    X_extra_train=X_extra_train,
-                                    X_extra_test=X_extra_test,
-                                    y_train=y_train,
-                                    y_test=y_test,
-                                    y_pred_train=y_pred_train,
-                                    y_pred=y_pred,
-                                    residuals_train=residuals_train,
-                                    residuals_test=residuals_test,
-                                    model_errors_train=model_errors_train,
-                                    model_errors_test=model_errors_test,
-                                    dataset_stdev=dataset_stdev)
-            mastml._save_mastml_metadata()
+                                    test_stats=pd.DataFrame().from_records([stats_dict]),
+                                    train_stats=pd.DataFrame().from_records([stats_dict_train]),
+                                    train_columns=X_train.columns.tolist(),
+                                    data_files=data_files,
+                                    dataset_stdev=dataset_stdev,
+                                    stage_times=timer.get_times())
+            timer.lap('metadata')
+        results['stage_times'] = timer.get_times()
 
-        return
+        return results
 
     def _setup_savedir(self, model, selector, preprocessor, savepath):
         now = datetime.now()
@@ -1702,15 +2425,24 @@ class BaseSplitter(ms.BaseCrossValidator):
             pass
         return splitdir
 
+    def _get_data_files(self, savepath, keys, file_extension):
+        # Get the paths of the data files saved in savepath for the metadata, skipping the data that wasn't saved (e.g.
+        # model errors of a model without them). The calibrated model errors are saved as e.g.
+        # model_errors_test_calibrated
+        data_files = OrderedDict()
+        for key in keys:
+            filename = key[:-len('_cal')]+'_calibrated' if key.endswith('_cal') else key
+            path = os.path.join(savepath, filename+file_extension)
+            if os.path.exists(path):
+                data_files[key] = path
+        return data_files
+
     def _save_split_data(self, df, filename, savepath, columns, file_extension):
         if type(df) == pd.core.frame.DataFrame:
             df.columns = columns
         if type(df) == pd.core.series.Series:
             df.name = columns
-        if file_extension == '.xlsx':
-            df.to_excel(os.path.join(savepath, filename)+'.xlsx', index=False)
-        elif file_extension == '.csv':
-            df.to_csv(os.path.join(savepath, filename) + '.csv', index=False)
+        save_data(df, os.path.join(savepath, filename) + file_extension, index=False)
         return
 
     def _collect_data(self, filename, savepath, file_extension, iterdirs=True):
@@ -1731,16 +2463,10 @@ class BaseSplitter(ms.BaseCrossValidator):
 
         # Condition to evaluate in parallel
         if self.parallel_run is True:
-            if file_extension == '.xlsx':
-                data = parallel(lambda d: np.array(pd.read_excel(os.path.join(savepath, os.path.join(d, filename)+'.xlsx'), engine='openpyxl')[col_name]), dirs)
-            elif file_extension == '.csv':
-                data = parallel(lambda d: np.array(pd.read_csv(os.path.join(savepath, os.path.join(d, filename) + '.csv'))[col_name]), dirs)
+            data = parallel(lambda d: np.array(load_data(os.path.join(savepath, os.path.join(d, filename) + file_extension))[col_name]), dirs)
         else:
             for d in dirs:
-                if file_extension == '.xlsx':
-                    data.append(np.array(pd.read_excel(os.path.join(savepath, os.path.join(d, filename)+'.xlsx'), engine='openpyxl')[col_name]))
-                elif file_extension == '.csv':
-                    data.append(np.array(pd.read_csv(os.path.join(savepath, os.path.join(d, filename) + '.csv'))[col_name]))
+                data.append(np.array(load_data(os.path.join(savepath, os.path.join(d, filename) + file_extension))[col_name]))
         df = pd.Series(np.concatenate(data).ravel())
         return df
 
@@ -1750,49 +2476,45 @@ class BaseSplitter(ms.BaseCrossValidator):
 
         # Condition to evaluate in parallel
         if self.parallel_run is True:
-            if file_extension == '.xlsx':
-                data = parallel(lambda d: pd.read_excel(os.path.join(savepath, os.path.join(d, filename)+'.xlsx'), engine='openpyxl'), dirs)
-            elif file_extension == '.csv':
-                data = parallel(lambda d: pd.read_csv(os.path.join(savepath, os.path.join(d, filename) + '.csv')), dirs)
+            data = parallel(lambda d: load_data(os.path.join(savepath, os.path.join(d, filename) + file_extension)), dirs)
         else:
             for d in dirs:
-                if file_extension == '.xlsx':
-                    data.append(pd.read_excel(os.path.join(savepath, os.path.join(d, filename)+'.xlsx'), engine='openpyxl'))
-                elif file_extension == '.csv':
-                    data.append(pd.read_csv(os.path.join(savepath, os.path.join(d, filename) + '.csv')))
+                data.append(load_data(os.path.join(savepath, os.path.join(d, filename) + file_extension)))
         df = pd.concat(data)
         return df
 
-    def _get_best_split(self, savepath, model, preprocessor, best_run_metric, model_name, file_extension):
-        dirs = os.listdir(savepath)
-        splitdirs = [d for d in dirs if 'split_' in d and '.png' not in d]
-
-        stats_files_dict = dict()
-        for splitdir in splitdirs:
-            if file_extension == '.xlsx':
-                stats_files_dict[os.path.join(savepath, splitdir)] = pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'test_stats_summary.xlsx'), engine='openpyxl').to_dict('records')[0]
-            elif file_extension == '.csv':
-                stats_files_dict[os.path.join(savepath, splitdir)] = pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'test_stats_summary.csv')).to_dict('records')[0]
-        # Find best/worst splits based on specified best run metric
-        all_metrics = Metrics(metrics_list=[best_run_metric])._metric_zoo()
-        greater_is_better = all_metrics[best_run_metric][0]
-
-        if greater_is_better == False:
-            metric_best = 10**20
+    def _get_best_split(self, savepath, model, preprocessor, best_run_metric, model_name, file_extension, split_results=None):
+        if split_results is not None:
+            # Use the split stats already held in memory
+            splitdirs = list(split_results.splits.keys())
+            best_split = os.path.join(savepath, split_results.get_best_split(best_run_metric=best_run_metric))
         else:
-            metric_best = 0
+            dirs = os.listdir(savepath)
+            splitdirs = [d for d in dirs if 'split_' in d and '.png' not in d]
+
+            stats_files_dict = dict()
+            for splitdir in splitdirs:
+                stats_files_dict[os.path.join(savepath, splitdir)] = load_data(os.path.join(os.path.join(savepath, splitdir), 'test_stats_summary'+file_extension)).to_dict('records')[0]
+            # Find best/worst splits based on specified best run metric
+            all_metrics = Metrics(metrics_list=[best_run_metric])._metric_zoo()
+            greater_is_better = all_metrics[best_run_metric][0]
 
-        # Start with best_split being the first split so doesn't throw an error later
-        best_split = list(stats_files_dict.keys())[0]
-        for split, stats_dict in stats_files_dict.items():
             if greater_is_better == False:
-                if stats_dict[best_run_metric] < metric_best:
-                    best_split = split
-                    metric_best = stats_dict[best_run_metric]
+                metric_best = 10**20
             else:
-                if stats_dict[best_run_metric] > metric_best:
-                    best_split = split
-                    metric_best = stats_dict[best_run_metric]
+                metric_best = 0
+
+            # Start with best_split being the first split so doesn't throw an error later
+            best_split = list(stats_files_dict.keys())[0]
+            for split, stats_dict in stats_files_dict.items():
+                if greater_is_better == False:
+                    if stats_dict[best_run_metric] < metric_best:
+                        best_split = split
+                        metric_best = stats_dict[best_run_metric]
+                else:
+                    if stats_dict[best_run_metric] > metric_best:
+                        best_split = split
+                        metric_best = stats_dict[best_run_metric]
 
         # Get the preprocessor, model, and features for the best split
         best_split_dict = dict()
@@ -1829,6 +2551,7 @@ class BaseSplitter(ms.BaseCrossValidator):
             best_split_dict['model'] = os.path.join(best_split, model_name)
         best_split_dict['features'] = os.path.join(best_split, 'selected_features.txt')
         best_split_dict['X_train'] = os.path.join(best_split, 'X_train'+file_extension)
+        best_split_dict['split_name'] = os.path.basename(best_split)
 
         # Remove the saved models and preprocessors from other split dirs that are not the best (save storage space)
         for splitdir in splitdirs:
@@ -1844,35 +2567,39 @@ class BaseSplitter(ms.BaseCrossValidator):
 
         return best_split_dict
 
-    def _get_average_recalibration_params(self, savepath, data_type, file_extension):
-        dirs = os.listdir(savepath)
-        splitdirs = [d for d in dirs if 'split_' in d and '.png' not in d]
-
+    def _get_average_recalibration_params(self, savepath, data_type, file_extension, split_results=None):
         recalibrate_a_vals = list()
         recalibrate_b_vals = list()
-        for splitdir in splitdirs:
-            if file_extension == '.xlsx':
-                recalibrate_dict = pd.read_excel(os.path.join(os.path.join(savepath, splitdir),
-                                                          'recalibration_parameters_'+str(data_type)+'.xlsx'), engine='openpyxl').to_dict('records')[0]
-            elif file_extension == '.csv':
-                recalibrate_dict = pd.read_csv(os.path.join(os.path.join(savepath, splitdir),
-                                                          'recalibration_parameters_'+str(data_type)+'.csv')).to_dict('records')[0]
-            recalibrate_a_vals.append(recalibrate_dict['slope (a)'])
-            recalibrate_b_vals.append(recalibrate_dict['intercept (b)'])
+        if split_results is not None:
+            for results in split_results.splits.values():
+                recalibrate_a_vals.append(results['recalibration_parameters_'+str(data_type)]['a'])
+                recalibrate_b_vals.append(results['recalibration_parameters_'+str(data_type)]['b'])
+        else:
+            dirs = os.listdir(savepath)
+            splitdirs = [d for d in dirs if 'split_' in d and '.png' not in d]
+            for splitdir in splitdirs:
+                recalibrate_dict = load_data(os.path.join(os.path.join(savepath, splitdir),
+                                                          'recalibration_parameters_'+str(data_type)+file_extension)).to_dict('records')[0]
+                recalibrate_a_vals.append(recalibrate_dict['slope (a)'])
+                recalibrate_b_vals.append(recalibrate_dict['intercept (b)'])
         recalibrate_avg_dict = {'a': np.mean(recalibrate_a_vals), 'b': np.mean(recalibrate_b_vals)}
         recalibrate_stdev_dict = {'a': np.std(recalibrate_a_vals), 'b': np.std(recalibrate_b_vals)}
         return recalibrate_avg_dict, recalibrate_stdev_dict
 
     def _get_recalibration_params(self, savepath, data_type, file_extension):
-        if file_extension == '.xlsx':
-            recalibrate_dict = pd.read_excel(os.path.join(savepath, 'recalibration_parameters_'+str(data_type)+'.xlsx'), engine='openpyxl').to_dict('records')[0]
-        elif file_extension == '.csv':
-            recalibrate_dict = pd.read_csv(os.path.join(savepath, 'recalibration_parameters_' + str(data_type) + '.csv')).to_dict('records')[0]
+        recalibrate_dict = load_data(os.path.join(savepath, 'recalibration_parameters_' + str(data_type) + file_extension)).to_dict('records')[0]
         recalibrate_dict_ = dict()
         recalibrate_dict_['a'] = recalibrate_dict['slope (a)']
         recalibrate_dict_['b'] = recalibrate_dict['intercept (b)']
         return recalibrate_dict_
 
+    def _get_group_indices(self, groups):
+        unique_groups, group_ids = np.unique(np.asarray(groups), return_inverse=True)
+        # A stable sort keeps the rows of each group in order
+        order = np.argsort(group_ids, kind='stable')
+        bounds = np.cumsum(np.bincount(group_ids, minlength=len(unique_groups)))[:-1]
+        return OrderedDict(zip(unique_groups, np.split(order, bounds)))
+
     def help(self):
         print('Documentation for', self.splitter)
         pprint(dict(inspect.getmembers(self.splitter))['__doc__'])
@@ -2006,7 +2733,9 @@ class NoSplit(BaseSplitter):
 class JustEachGroup(BaseSplitter):
     """
     Class to train the model on one group at a time and test it on the rest of the data
-    This class wraps scikit-learn's LeavePGroupsOut with P set to n-1. More information is available at:
+    This class makes the same splits as scikit-learn's LeavePGroupsOut with P set to n-1, in the same order, but
+    builds them from the row indices of each group rather than from all the combinations of n-1 groups. More
+    information is available at:
     http://scikit-learn.org/stable/modules/generated/sklearn.model_selection.LeavePGroupsOut.html
 
     Args:
@@ -2048,11 +2777,14 @@ class JustEachGroup(BaseSplitter):
         return np.unique(groups).shape[0]
 
     def split(self, X, y, groups):
-        n_groups = self.get_n_splits(groups=groups)
-        lpgo = ms.LeavePGroupsOut(n_groups=n_groups-1)
+        group_inds = self._get_group_indices(groups)
+        n_rows = len(groups)
         trains_tests = list()
-        for train_index, test_index in lpgo.split(X, y, groups):
-            trains_tests.append((train_index, test_index))
+        # LeavePGroupsOut leaves out the combinations of n-1 groups in order, so it trains on the last group first
+        for train_index in reversed(list(group_inds.values())):
+            is_test = np.ones(n_rows, dtype=bool)
+            is_test[train_index] = False
+            trains_tests.append((train_index, np.flatnonzero(is_test)))
         return trains_tests
 
 
@@ -2067,6 +2799,10 @@ class LeaveCloseCompositionsOut(BaseSplitter):
     Consequently, this splitter requires a list of compositions as the input to `split` rather
     than the features.
 
+    The element fraction vectors are computed once and cached on the splitter, the entries close to each test
+    point are found with batched radius queries, and the splits are yielded one at a time rather than held in
+    memory, as there are as many splits as entries.
+
     Attributes:
         parallel_run: an attribute definining wheteher to run splits with all available computer cores
 
@@ -2093,33 +2829,37 @@ class LeaveCloseCompositionsOut(BaseSplitter):
         self.composition_df = composition_df
         self.dist_threshold = dist_threshold
         self.nn_kwargs = nn_kwargs
+        self._elem_fracs_cache = None
 
     def split(self, X, y=None, groups=None):
 
         # Generate the composition vectors
-        frac_computer = ElementFraction()
-        elem_fracs = frac_computer.featurize_many(list(map(Composition, self.composition_df[self.composition_df.columns[0]])), pbar=False)
+        elem_fracs = self._get_element_fractions()
 
         # Generate the nearest-neighbor lookup tool
         neigh = NearestNeighbors(**self.nn_kwargs)
         neigh.fit(elem_fracs)
 
-        # Generate a list of all entries
-        all_inds = np.arange(0, self.composition_df.shape[0], 1)
-
-        # Loop through each entry in X
-        trains_tests = list()
-        for i, x in enumerate(elem_fracs):
-
-            # Get all the entries within the threshold distance of the test point
-            too_close, = neigh.radius_neighbors([x], self.dist_threshold, return_distance=False)
-
-            # Get the training set as "not these points"
-            train_inds = np.setdiff1d(all_inds, too_close)
-            test_inds = np.setdiff1d(all_inds, train_inds)
-
-            trains_tests.append((np.asarray(train_inds), np.asarray(test_inds)))
-        return trains_tests
+        # Get the entries within the threshold distance of each test point, querying a batch of test points at a time so
+        # the neighbors of only one batch are held in memory
+        n_entries = elem_fracs.shape[0]
+        batch_size = 1000
+        for start in range(0, n_entries, batch_size):
+            too_close = neigh.radius_neighbors(elem_fracs[start:start+batch_size], self.dist_threshold,
+                                               return_distance=False)
+            for inds in too_close:
+                # The test set is the entries too close to the test point, and the training set all the others
+                is_test = np.zeros(n_entries, dtype=bool)
+                is_test[inds] = True
+                yield np.flatnonzero(~is_test), np.flatnonzero(is_test)
+
+    def _get_element_fractions(self):
+        # The element fractions are computed once for the composition_df of the splitter
+        if self._elem_fracs_cache is None or self._elem_fracs_cache[0] is not self.composition_df:
+            frac_computer = ElementFraction()
+            elem_fracs = frac_computer.featurize_many(list(map(Composition, self.composition_df[self.composition_df.columns[0]])), pbar=False)
+            self._elem_fracs_cache = (self.composition_df, np.array(elem_fracs, dtype=float))
+        return self._elem_fracs_cache[1]
 
     def get_n_splits(self, X=None, y=None, groups=None):
         return len(X)
@@ -2134,6 +2874,8 @@ class LeaveOutPercent(BaseSplitter):
 
         n_repeats (int): number of repeated splits to perform (must be >= 1)
 
+        random_state (int): seed of the random splits, so they can be reproduced. Default None uses numpy's global random state
+
     Attributes:
         parallel_run: an attribute definining wheteher to run splits with all available computer cores
 
@@ -2158,7 +2900,7 @@ class LeaveOutPercent(BaseSplitter):
 
     """
 
-    def __init__(self, percent_leave_out=0.2, n_repeats=5, **kwargs):
+    def __init__(self, percent_leave_out=0.2, n_repeats=5, random_state=None, **kwargs):
 
         # Compensate for parallel mode
         self.parallel_run = False
@@ -2169,6 +2911,7 @@ class LeaveOutPercent(BaseSplitter):
         super(LeaveOutPercent, self).__init__()
         self.percent_leave_out = percent_leave_out
         self.n_repeats = n_repeats
+        self.random_state = random_state
 
     def get_n_splits(self, X=None, y=None, groups=None):
         return self.n_repeats
@@ -2176,15 +2919,21 @@ class LeaveOutPercent(BaseSplitter):
     def split(self, X, y=None, groups=None):
         indices = range(X.shape[0])
         split = list()
+        rng = check_random_state(self.random_state)
         for i in range(self.n_repeats):
-            trains, tests = ms.train_test_split(indices, test_size=self.percent_leave_out, random_state=np.random.randint(1, 1000), shuffle=True)
+            # Each repeat draws its split from the same random state, so the repeats are all different
+            trains, tests = ms.train_test_split(indices, test_size=self.percent_leave_out, random_state=rng, shuffle=True)
             split.append((trains, tests))
         return split
 
 
 class LeaveOutTwinCV(BaseSplitter):
     """
-    Class to remove data twins from the test data.
+    Class to remove data twins from the test data. Two data points are twins if their distance is at most the threshold,
+    so the twins are the points whose nearest neighbor is within the threshold. The nearest neighbor distances are found
+    with a tree (or blocked brute force, for many features) search rather than comparing every pair of points, and exact
+    duplicates are found by hashing the rows when the threshold is 0. The twins found for the last data split are
+    cached, so get_n_splits and split don't search twice.
 
     Args:
         threshold: (int), the threshold at which two data points are considered twins. Default 0.
@@ -2219,6 +2968,15 @@ class LeaveOutTwinCV(BaseSplitter):
 
             Returns:
                 (numpy array), array of train and test indices
+
+        _get_twins: method to find the twins of the data, and the number of twins at each threshold tried by auto_threshold
+            Args:
+                X: (numpy array), array of X features
+
+            Returns:
+                twins: (numpy array), boolean array of whether each data point is a twin
+
+                autothreshold_num_twins: (list), list of [threshold, number of twins] of each threshold tried, empty if auto_threshold is False
     """
 
     def __init__(self, threshold=0, ord=2, debug=False, auto_threshold=False, ceiling=0, **kwargs):
@@ -2238,6 +2996,7 @@ class LeaveOutTwinCV(BaseSplitter):
         self.auto_threshold = auto_threshold
         self.ceiling = ceiling
         self.splitdir = None
+        self._twins_cache = None
         if self.debug:
             for k, v in params.items():
                 print(f"{k}\t\t{v}")
@@ -2259,37 +3018,7 @@ class LeaveOutTwinCV(BaseSplitter):
 
     def split(self, X, y, X_noinput=None, groups=None):
         X = np.array(X)
-        y = np.array(y)
-        origIdx = set(np.arange(X.shape[0]))
-        twinIdx = set()
-
-        l = len(X)
-        n = max(int(self.ceiling * l), 2)
-
-        autothreshold_num_twins = []
-
-        threshold = self.threshold
-
-        # compute all twins
-        while (len(twinIdx) < n):
-            for i, a in enumerate(X):
-                for j, b in enumerate(X):
-                    if (i != j and j > i):
-                        # calculate distance
-                        if (minkowski(a, b, self.ord) <= threshold):
-                            if i not in twinIdx:
-                                twinIdx.add(i)
-                            if j not in twinIdx:
-                                twinIdx.add(j)
-            # update threshold if needed
-            if (not self.auto_threshold):
-                break
-            autothreshold_num_twins.append([threshold, len(twinIdx)])
-            if threshold <= 0:
-                threshold = 0.1
-            threshold *= 1.1
-            if self.debug:
-                print(threshold)
+        twins, autothreshold_num_twins = self._get_twins(X)
 
         if self.debug:
             print("Thresholds / Number of Twins")
@@ -2305,14 +3034,12 @@ class LeaveOutTwinCV(BaseSplitter):
         if self.splitdir != None:
             autothreshold_num_twins = pd.DataFrame(data=autothreshold_num_twins, columns=["Threshold", "n_twins"])
             filename = "autothreshold_num_twins"
-            autothreshold_num_twins.to_excel(os.path.join(self.splitdir, filename)+'.xlsx', index=False)
+            save_data(autothreshold_num_twins, os.path.join(self.splitdir, filename)+getattr(self, 'file_extension', '.xlsx'),
+                      index=False)
 
-        # remove twins from original indices
-        twinIdx = list(twinIdx)
-        for t in twinIdx:
-            if t in origIdx:
-                origIdx.remove(t)
-        origIdx = list(origIdx)
+        # The indices are in ascending order
+        origIdx = np.flatnonzero(~twins).tolist()
+        twinIdx = np.flatnonzero(twins).tolist()
 
         if self.debug:
             print("Non-Twins / Twins")
@@ -2329,14 +3056,67 @@ class LeaveOutTwinCV(BaseSplitter):
         splits.append([twinIdx, origIdx])
         return splits
 
+    def _get_twins(self, X):
+        key = joblib.hash((X, self.threshold, self.ord, self.auto_threshold, self.ceiling))
+        if self._twins_cache is not None and self._twins_cache[0] == key:
+            return self._twins_cache[1], list(self._twins_cache[2])
+
+        l = len(X)
+        n = max(int(self.ceiling * l), 2)
+        autothreshold_num_twins = []
+        if l < 2:
+            twins = np.zeros(l, dtype=bool)
+        elif self.threshold == 0 and not self.auto_threshold:
+            # Exact duplicates are found by hashing the rows
+            twins = pd.DataFrame(X).duplicated(keep=False).values
+        else:
+            # Distance of each point to its nearest other point (an exact duplicate, if any, is at distance 0)
+            if self.ord >= 1:
+                nn = NearestNeighbors(n_neighbors=2, metric='minkowski', p=self.ord)
+            else:
+                nn = NearestNeighbors(n_neighbors=2, algorithm='brute', metric=minkowski, metric_params={'p': self.ord})
+            nn_distances = nn.fit(X).kneighbors(X)[0][:, 1]
+            threshold = self.threshold
+            if self.auto_threshold:
+                # Grow the threshold by 1.1x until at least ceiling of the data (or all the points that can be) are twins,
+                # counting the twins at each threshold from the sorted nearest neighbor distances
+                sorted_distances = np.sort(nn_distances[~np.isnan(nn_distances)])
+                n = min(n, len(sorted_distances))
+                while True:
+                    num_twins = int(np.searchsorted(sorted_distances, threshold, side='right'))
+                    autothreshold_num_twins.append([threshold, num_twins])
+                    if num_twins >= n:
+                        break
+                    if threshold <= 0:
+                        threshold = 0.1
+                    threshold *= 1.1
+                    if self.debug:
+                        print(threshold)
+            twins = nn_distances <= threshold
+
+        self._twins_cache = (key, twins, autothreshold_num_twins)
+        return twins, list(autothreshold_num_twins)
+
 
 class LeaveOutClusterCV(BaseSplitter):
     """
-    Class to generate train/test split using clustering.
+    Class to generate train/test split using clustering. The cluster labels are cached for the last X clustered, so
+    get_n_splits, split and labels only fit the clustering once. For large data, use a clustering that scales, e.g.
+    MiniBatchKMeans, or set sample_size to fit the clustering on random samples of the data (e.g. CLARA-style sampled
+    KMedoids, which otherwise needs the n x n distance matrix of the data)
 
     Args:
         cluster: clustering method from sklearn.cluster used to generate train/test split
 
+        sample_size: (int), number of data points to fit the clustering on. The clustering is fit on n_samplings random
+            samples of this size, and all the points are assigned to the closest cluster (with the predict method of the
+            clustering, or else the cluster of the closest sampled point). The sampling whose cluster centers are
+            closest to all the points is kept. The samples are drawn with the random_state of the clustering, if it
+            has one. Default None fits the clustering on all the data
+
+        n_samplings: (int), number of random samples to fit the clustering on when sample_size is set. Only one sample is
+            used for clusterings without cluster centers to compare. Default 5
+
         kwargs: takes in any other key argument for optional cluster parameters
 
     Attributes:
@@ -2375,9 +3155,16 @@ class LeaveOutClusterCV(BaseSplitter):
 
                 Returns:
                     (numpy array), array of cluster labels
+
+        _fit_labels: method to fit the clustering to X features, on samples of them if sample_size is set, and get their cluster labels
+            Args:
+                X: (numpy array), array of X features
+
+            Returns:
+                (numpy array), array of cluster labels
     """
 
-    def __init__(self, cluster, **kwargs):
+    def __init__(self, cluster, sample_size=None, n_samplings=5, **kwargs):
 
         # Compensate for parallel mode
         self.parallel_run = False
@@ -2392,6 +3179,9 @@ class LeaveOutClusterCV(BaseSplitter):
             self.cluster = getattr(sklearn.cluster, cluster)(**kwargs)
         except AttributeError:
             self.cluster = getattr(sklearn_extra.cluster, cluster)(**kwargs)
+        self.sample_size = sample_size
+        self.n_samplings = n_samplings
+        self._labels_cache = None
 
     # gets number of splits or clusters
     def get_n_splits(self, X, y=None, groups=None):
@@ -2401,15 +3191,8 @@ class LeaveOutClusterCV(BaseSplitter):
     # splits data into train and test based on clusters
     def split(self, X, y=None, groups=None):
 
-        # trains cluster object
-        fit_cluster = self.cluster.fit(X)
-
-        # checks if cluster object has either labels_ or row_labels_
-        if hasattr(fit_cluster, 'labels_'):
-            labels = fit_cluster.labels_
-
-        elif hasattr(fit_cluster, 'row_labels_'):
-            labels = fit_cluster.row_labels_
+        # gets the cluster labels, fitting the cluster object if X wasn't clustered already
+        labels = self.labels(X)
 
         # set up split list to return
         trains_tests = list()
@@ -2430,9 +3213,43 @@ class LeaveOutClusterCV(BaseSplitter):
     # returns cluster labels
     def labels(self, X, y=None, groups=None):
 
-        # trains cluster
-        fit_cluster = self.cluster.fit(X)
+        # the labels are cached for the data and the clustering parameters they were fit with
+        key = joblib.hash((np.asarray(X), self.cluster.get_params(), self.sample_size, self.n_samplings))
+        if self._labels_cache is None or self._labels_cache[0] != key:
+            self._labels_cache = (key, self._fit_labels(X))
 
+        # return labels
+        return self._labels_cache[1]
+
+    def _fit_labels(self, X):
+        if self.sample_size is None or self.sample_size >= len(X):
+            return self._get_fit_labels(self.cluster.fit(X))
+
+        X = np.asarray(X)
+        rng = check_random_state(getattr(self.cluster, 'random_state', None))
+        best_labels = None
+        best_cost = np.inf
+        for _ in range(self.n_samplings):
+            sample = rng.choice(X.shape[0], size=self.sample_size, replace=False)
+            fit_cluster = self.cluster.fit(X[sample])
+            # assign all the points to the closest cluster
+            if hasattr(fit_cluster, 'predict'):
+                labels = fit_cluster.predict(X)
+            else:
+                neigh = NearestNeighbors(n_neighbors=1).fit(X[sample])
+                labels = self._get_fit_labels(fit_cluster)[neigh.kneighbors(X, return_distance=False)[:, 0]]
+            # without cluster centers, the samplings can't be compared
+            if not hasattr(fit_cluster, 'cluster_centers_'):
+                return labels
+            # keep the sampling whose cluster centers are the closest to all the points, in chunks of rows
+            cost = pairwise_distances_argmin_min(X, fit_cluster.cluster_centers_,
+                                                 metric=getattr(fit_cluster, 'metric', 'euclidean'))[1].sum()
+            if cost < best_cost:
+                best_cost = cost
+                best_labels = labels
+        return best_labels
+
+    def _get_fit_labels(self, fit_cluster):
         # checks if cluster object has either labels_ or row_labels_
         if hasattr(fit_cluster, 'labels_'):
             labels = fit_cluster.labels_
@@ -2440,7 +3257,6 @@ class LeaveOutClusterCV(BaseSplitter):
         elif hasattr(fit_cluster, 'row_labels_'):
             labels = fit_cluster.row_labels_
 
-        # return labels
         return labels
 
 
@@ -2451,6 +3267,13 @@ class LeaveMultiGroupOut(BaseSplitter):
     Args:
         multigroup_size: (int), size of the groups to be made for leave out.
 
+        max_splits: (int), maximum number of splits to make. If there are more combinations of multigroup_size groups
+            than this, a random subset of max_splits of them is left out, in sorted order. Default None leaves out
+            all the combinations
+
+        random_state: (int), seed of the random subset of combinations left out when there are more than max_splits.
+            Default None
+
     Attributes:
         parallel_run: an attribute definining wheteher to run splits with all available computer cores
 
@@ -2460,7 +3283,7 @@ class LeaveMultiGroupOut(BaseSplitter):
                 groups: (numpy array), array of group labels
 
             Returns:
-                (int), number of unique groups, indicating number of splits to perform
+                (int), number of combinations of multigroup_size unique groups (at most max_splits), indicating number of splits to perform
 
         split: method to perform split into train indices and test indices
             Args:
@@ -2473,11 +3296,20 @@ class LeaveMultiGroupOut(BaseSplitter):
             Returns:
                 (numpy array), array of train and test indices
 
+        _get_super_groups: method to get the combinations of multigroup_size groups to leave out, or a random subset of max_splits of them
+            Args:
+                unique_groups: (numpy array), array of the unique group labels
+
+            Returns:
+                super_groups: (list), list of tuples of the indices in unique_groups of the groups of each combination
+
     """
 
-    def __init__(self, multigroup_size=2, **kwargs):
+    def __init__(self, multigroup_size=2, max_splits=None, random_state=None, **kwargs):
         super(LeaveMultiGroupOut, self).__init__()
         self.multigroup_size = multigroup_size
+        self.max_splits = max_splits
+        self.random_state = random_state
         # Compensate for parallel mode
         self.parallel_run = False
         if 'parallel_run' in kwargs.keys():
@@ -2485,34 +3317,48 @@ class LeaveMultiGroupOut(BaseSplitter):
             del kwargs['parallel_run']  # Remove key to not break self.splitter
 
     def get_n_splits(self, X=None, y=None, groups=None):
-        return len(list(itertools.combinations(groups, self.multigroup_size)))
+        n_splits = comb(len(np.unique(groups)), self.multigroup_size)
+        if self.max_splits is not None:
+            n_splits = min(n_splits, self.max_splits)
+        return n_splits
 
     def split(self, X, y, groups):
-        unique_groups = np.unique(groups)
-        super_groups = list(itertools.combinations(unique_groups, self.multigroup_size))
-        inds = np.arange(0, X.shape[0])
-
         # Need to get the indices of the data corresponding to each regular group
-        group_ind_dict = dict()
-        for group in unique_groups:
-            group_inds = np.where(groups == group)[0]
-            group_ind_dict[group] = group_inds
+        group_ind_dict = self._get_group_indices(groups)
+        group_inds = list(group_ind_dict.values())
+        super_groups = self._get_super_groups(np.array(list(group_ind_dict.keys())))
+        n_rows = X.shape[0]
 
-        # Build the train/test index sets by looping over the super groups and finding indices of each normal group
+        # Build the train/test index sets from the indices of the groups in each super group
         trains_tests = list()
         for super_group in super_groups:
-            group_inds = list()
-            for k, v in group_ind_dict.items():
-                if k in super_group:
-                    group_inds.append(v)
-            group_inds = np.concatenate(group_inds)
-            tests = group_inds
-            trains = [i for i in inds if i not in tests]
-            trains = np.array(trains)
-            trains_tests.append((trains, tests))
+            tests = np.concatenate([group_inds[i] for i in super_group])
+            is_train = np.ones(n_rows, dtype=bool)
+            is_train[tests] = False
+            trains_tests.append((np.flatnonzero(is_train), tests))
 
         return trains_tests
 
+    def _get_super_groups(self, unique_groups):
+        n_groups = len(unique_groups)
+        n_combs = comb(n_groups, self.multigroup_size)
+        if self.max_splits is None or n_combs <= self.max_splits:
+            return list(itertools.combinations(range(n_groups), self.multigroup_size))
+
+        rng = check_random_state(self.random_state)
+        if n_combs <= 2*self.max_splits:
+            # With few combinations, pick from all of them
+            combs = list(itertools.combinations(range(n_groups), self.multigroup_size))
+            picked = rng.choice(n_combs, size=self.max_splits, replace=False)
+            return [combs[i] for i in sorted(picked)]
+
+        # Otherwise draw random combinations until there are max_splits distinct ones, which takes at most twice as
+        # many draws on average
+        super_groups = set()
+        while len(super_groups) < self.max_splits:
+            super_groups.add(tuple(sorted(int(i) for i in rng.choice(n_groups, size=self.multigroup_size, replace=False))))
+        return sorted(super_groups)
+
 
 class Bootstrap(BaseSplitter):
     """
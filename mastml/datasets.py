@@ -38,6 +38,9 @@ from mdf_forge import Forge
 
 from matminer.datasets.dataset_retrieval import load_dataset, get_available_datasets
 
+# save_data is imported under another name, as it is also the name of an argument of the download_data methods
+from mastml.file_formats import load_data, get_file_extensions, save_data as save_data_file
+
 try:
     from figshare.figshare.figshare import Figshare
 except:
@@ -181,19 +184,14 @@ class LocalDatasets():
 
     def _import(self):
         fname, ext = os.path.splitext(self.file_path)
-        if ext == '.csv':
-            df = pd.read_csv(self.file_path)
-        elif ext == '.xlsx':
-            try:
-                df = pd.read_excel(self.file_path)
-            except:
-                df = pd.read_excel(self.file_path, engine='openpyxl')
+        if ext in get_file_extensions():
+            df = load_data(self.file_path)
         elif ext == '.pickle':
             with open(self.file_path, "rb") as input_file:
                 data = pickle.load(input_file)
                 df = pd.DataFrame(data)
         else:
-            raise ValueError('file_path must be .csv, .xlsx or .pickle for data local data import')
+            raise ValueError('file_path must be .pickle or one of '+str(get_file_extensions())+' for data local data import')
         return df
 
     def _get_features(self, df):
@@ -363,6 +361,8 @@ class MatminerDatasets():
 
                 save_data: (bool), whether to save the downloaded data to the current working directory
 
+                file_extension: (str), file extension of the saved data file, see mastml.file_formats. Default '.xlsx'
+
             Returns:
                 df: (dataframe), dataframe of downloaded data
 
@@ -377,10 +377,10 @@ class MatminerDatasets():
     def __init__(self):
         pass
 
-    def download_data(self, name, save_data=True):
+    def download_data(self, name, save_data=True, file_extension='.xlsx'):
         df = load_dataset(name=name)
         if save_data == True:
-            df.to_excel(name+'.xlsx', index=False)
+            save_data_file(df, name+file_extension, index=False)
             with open('%s.pickle' % name, 'wb') as data_file:
                 pickle.dump(df, data_file)
         return df
@@ -18,6 +18,9 @@ import sys
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
+
+from mastml.file_formats import load_data
+
 try:
     from forestci import random_forest_error
 except:
@@ -39,6 +42,8 @@ class ErrorUtils():
 
                 data_type: (str), string denoting the data type analyzed, e.g. train, test, leftout
 
+                file_extension: (str), file extension of the saved split data files, e.g. '.csv'
+
             Returns:
                 model_errors: (pd.Series), series containing the predicted model errors
 
@@ -108,7 +113,7 @@ class ErrorUtils():
 
     '''
     @classmethod
-    def _collect_error_data(cls, savepath, data_type):
+    def _collect_error_data(cls, savepath, data_type, file_extension='.csv'):
         if data_type not in ['train', 'test', 'leaveout']:
             print('Error: data_test_type must be one of "train", "test" or "leaveout"')
             exit()
@@ -126,23 +131,23 @@ class ErrorUtils():
                 splits.append(folder)
 
         for path in splits:
-            if os.path.exists(os.path.join(path, 'model_errors_'+str(data_type)+'.xlsx')):
-                error_files_to_parse.append(os.path.join(path, 'model_errors_' + str(data_type) + '.xlsx'))
-            if os.path.exists(os.path.join(path, 'residuals_' + str(data_type) + '.xlsx')):
-                residuals_files_to_parse.append(os.path.join(path, 'residuals_' + str(data_type) + '.xlsx'))
-            if os.path.exists(os.path.join(path, 'y_train.xlsx')):
-                ytrue_files_to_parse.append(os.path.join(path, 'y_train.xlsx'))
+            if os.path.exists(os.path.join(path, 'model_errors_'+str(data_type)+file_extension)):
+                error_files_to_parse.append(os.path.join(path, 'model_errors_' + str(data_type) + file_extension))
+            if os.path.exists(os.path.join(path, 'residuals_' + str(data_type) + file_extension)):
+                residuals_files_to_parse.append(os.path.join(path, 'residuals_' + str(data_type) + file_extension))
+            if os.path.exists(os.path.join(path, 'y_train'+file_extension)):
+                ytrue_files_to_parse.append(os.path.join(path, 'y_train'+file_extension))
 
         for file in residuals_files_to_parse:
-            df = pd.read_excel(file)
+            df = load_data(file)
             dfs_residuals.append(np.array(df['residuals']))
 
         for file in error_files_to_parse:
-            df = pd.read_excel(file)
+            df = load_data(file)
             dfs_error.append(np.array(df['model_errors']))
 
         for file in ytrue_files_to_parse:
-            df = pd.read_excel(file)
+            df = load_data(file)
             dfs_ytrue.append(np.array(df['y_train']))
 
         ytrue_all = np.concatenate(dfs_ytrue).ravel()
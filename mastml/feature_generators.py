@@ -61,6 +61,9 @@ import pickle
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import PolynomialFeatures, OneHotEncoder
 
+from mastml.file_formats import save_data
+from mastml.profiler import Profiler
+
 try:
     import matminer
     import matminer.featurizers.structure
@@ -108,6 +111,8 @@ class BaseGenerator(BaseEstimator, TransformerMixin):
 
                 savepath: (str) string denoting the main save path directory
 
+                file_extension: (str), file extension of the saved generated feature data, e.g. '.xlsx'
+
             Returns:
                 X: (pd.DataFrame), dataframe of X features containing newly generated features
 
@@ -126,7 +131,7 @@ class BaseGenerator(BaseEstimator, TransformerMixin):
     def __init__(self):
         pass
 
-    def evaluate(self, X, y, savepath=None, make_new_dir=True):
+    def evaluate(self, X, y, savepath=None, make_new_dir=True, file_extension='.xlsx'):
         X_orig = copy(X)
         if not savepath:
             savepath = os.getcwd()
@@ -138,7 +143,7 @@ class BaseGenerator(BaseEstimator, TransformerMixin):
         X = pd.concat([X_orig, X], axis=1)
         df = pd.concat([X, y], axis=1)
         try:
-            df.to_excel(os.path.join(savepath, 'generated_features.xlsx'), index=False)
+            save_data(df, os.path.join(savepath, 'generated_features'+file_extension), index=False)
         except ValueError:
             print('Warning! Excel file too large to save.')
         with open(os.path.join(savepath, 'generated_features.pickle'), 'wb') as f:
@@ -171,6 +176,9 @@ class ElementalFeatureGenerator(BaseGenerator):
 
         remove_constant_columns: (bool), whether to remove constant columns from the generated feature set
 
+        profile: (bool or str), whether to profile the feature generation, and what to profile (see mastml.profiler.Profiler).
+            Default None means no profiling
+
     Methods:
         fit: pass through, copies input columns as pre-generated features
             Args:
@@ -180,7 +188,11 @@ class ElementalFeatureGenerator(BaseGenerator):
 
         transform: generate the elemental feature matrix from composition strings
             Args:
-                None.
+                profile: (bool or str), whether to profile the feature generation, and what to profile (see
+                    mastml.profiler.Profiler). Default None uses the profile set for the generator
+
+                savepath: (str), directory to save the profiles to, as ElementalFeatureGenerator_profile files. Default
+                    None uses the save directory made by evaluate, or the current directory
 
             Returns:
                 X: (dataframe), output dataframe containing generated features
@@ -188,13 +200,14 @@ class ElementalFeatureGenerator(BaseGenerator):
                 y: (series), output y data as series
     """
 
-    def __init__(self, composition_df, feature_types=None, remove_constant_columns=False):
+    def __init__(self, composition_df, feature_types=None, remove_constant_columns=False, profile=None):
         super(BaseGenerator, self).__init__()
         self.composition_df = composition_df
         if type(self.composition_df) == pd.Series:
             self.composition_df = pd.DataFrame(self.composition_df)
         self.feature_types = feature_types
         self.remove_constant_columns = remove_constant_columns
+        self.profile = profile
         if self.feature_types is None:
             self.feature_types = ['composition_avg', 'arithmetic_avg', 'max', 'min', 'difference']
 
@@ -204,18 +217,23 @@ class ElementalFeatureGenerator(BaseGenerator):
         #self.original_features = self.df.columns
         return self
 
-    def transform(self, X=None):
+    def transform(self, X=None, profile=None, savepath=None):
+        if profile is None:
+            profile = self.profile
+        if savepath is None:
+            savepath = getattr(self, 'splitdir', None)
 
-        df = self.generate_magpie_features()
+        with Profiler(profile=profile).record(savepath=savepath, name='ElementalFeatureGenerator_profile'):
+            df = self.generate_magpie_features()
 
-        # delete missing values, generation makes a lot of garbage.
-        df = DataframeUtilities().clean_dataframe(df)
-        df = df.select_dtypes(['number']).dropna(axis=1)
+            # delete missing values, generation makes a lot of garbage.
+            df = DataframeUtilities().clean_dataframe(df)
+            df = df.select_dtypes(['number']).dropna(axis=1)
 
-        if self.remove_constant_columns is True:
-            df = DataframeUtilities().remove_constant_columns(dataframe=df)
+            if self.remove_constant_columns is True:
+                df = DataframeUtilities().remove_constant_columns(dataframe=df)
 
-        df = df[sorted(df.columns.tolist())]
+            df = df[sorted(df.columns.tolist())]
         return df, self.y
 
     def generate_magpie_features(self):
@@ -1640,12 +1658,14 @@ class DataframeUtilities(object):
             Returns:
                 dataframe: (dataframe), dataframe containing same data as input, with columns labeled with features
 
-        save_all_dataframe_statistics : obtain dataframe statistics and save it to a csv file
+        save_all_dataframe_statistics : obtain dataframe statistics and save it to a data file
             Args:
                 dataframe: (dataframe), a pandas dataframe object
 
                 data_path: (str), file path to save dataframe statistics to
 
+                file_extension: (str), file extension of the saved data file, see mastml.file_formats. Default '.csv'
+
             Returns:
                 fname: (str), name of file dataframe stats saved to
 
@@ -1713,7 +1733,7 @@ class DataframeUtilities(object):
         return dataframe
 
     @classmethod
-    def save_all_dataframe_statistics(cls, dataframe, configdict):
+    def save_all_dataframe_statistics(cls, dataframe, configdict, file_extension='.csv'):
         dataframe_stats = cls.get_dataframe_statistics(dataframe=dataframe)
         # Need configdict to get save path
         #if not configfile_path:
@@ -1724,8 +1744,8 @@ class DataframeUtilities(object):
         #else:
         #    configdict = ConfigFileParser(configfile=configfile_name).get_config_dict(path_to_file=configfile_path)
         data_path_name = configdict['General Setup']['target_feature'] # TODO
-        fname = configdict['General Setup']['save_path'] + "/" + 'input_data_statistics_'+data_path_name+'.csv'
-        dataframe_stats.to_csv(fname, index=True)
+        fname = configdict['General Setup']['save_path'] + "/" + 'input_data_statistics_'+data_path_name+file_extension
+        save_data(dataframe_stats, fname, index=True)
         return fname
 
     @classmethod
@@ -49,6 +49,7 @@ from sklearn.model_selection import KFold
 import matplotlib.pyplot as plt
 
 from mastml.metrics import root_mean_squared_error
+from mastml.file_formats import save_data
 
 
 class BaseSelector(BaseEstimator, TransformerMixin):
@@ -85,7 +86,9 @@ class BaseSelector(BaseEstimator, TransformerMixin):
                 savepath: (str), string denoting savepath to save selected features and associated files (if
                 applicable) to.
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
+
+                write_data: (bool), whether to save the selected X data to file. The list of selected features and the selector-specific files are saved either way. Default True.
 
             Returns:
 
@@ -102,7 +105,7 @@ class BaseSelector(BaseEstimator, TransformerMixin):
     def transform(self, X):
         return X
 
-    def evaluate(self, X, y, savepath=None, make_new_dir=False, file_extension='.csv'):
+    def evaluate(self, X, y, savepath=None, make_new_dir=False, file_extension='.csv', write_data=True):
         if savepath is None:
             savepath = os.getcwd()
         self.fit(X=X, y=y)
@@ -115,55 +118,30 @@ class BaseSelector(BaseEstimator, TransformerMixin):
         with open(os.path.join(savepath, 'selected_features.txt'), 'w') as f:
             for feature in self.selected_features:
                 f.write(str(feature) + '\n')
-        if file_extension == '.xlsx':
-            if self.__class__.__name__ == 'EnsembleModelFeatureSelector':
-                self.feature_importances_sorted.to_excel(
-                    os.path.join(savepath, 'EnsembleModelFeatureSelector_feature_importances.xlsx'))
-            if self.__class__.__name__ == 'PearsonSelector':
-                self.full_correlation_matrix.to_excel(os.path.join(savepath, 'PearsonSelector_fullcorrelationmatrix.xlsx'))
-                self.highly_correlated_features.to_excel(
-                    os.path.join(savepath, 'PearsonSelector_highlycorrelatedfeatures.xlsx'))
-                self.highly_correlated_features_flagged.to_excel(
-                    os.path.join(savepath, 'PearsonSelector_highlycorrelatedfeaturesflagged.xlsx'))
-                self.features_highly_correlated_with_target.to_excel(
-                    os.path.join(savepath, 'PearsonSelector_highlycorrelatedwithtarget.xlsx'))
-            if self.__class__.__name__ == 'MASTMLFeatureSelector':
-                self.mastml_forward_selection_df.to_excel(
-                    os.path.join(savepath, 'MASTMLFeatureSelector_featureselection_data.xlsx'))
-
-            if self.__class__.__name__ == 'ShapFeatureSelector':
-                self.feature_imp_shap.to_excel(
-                    os.path.join(savepath, 'ShapFeatureSelector_sorted_features.xlsx'))
-                if (self.make_plot == True):
-                    shap.plots.beeswarm(self.shap_values, max_display=self.max_display, show=False)
-                    plt.savefig(os.path.join(savepath, 'SHAP_features_selected.png'), dpi = 150, bbox_inches = "tight")
-        elif file_extension == '.csv':
-            if self.__class__.__name__ == 'EnsembleModelFeatureSelector':
-                self.feature_importances_sorted.to_csv(
-                    os.path.join(savepath, 'EnsembleModelFeatureSelector_feature_importances.csv'))
-            if self.__class__.__name__ == 'PearsonSelector':
-                self.full_correlation_matrix.to_csv(
-                    os.path.join(savepath, 'PearsonSelector_fullcorrelationmatrix.csv'))
-                self.highly_correlated_features.to_csv(
-                    os.path.join(savepath, 'PearsonSelector_highlycorrelatedfeatures.csv'))
-                self.highly_correlated_features_flagged.to_csv(
-                    os.path.join(savepath, 'PearsonSelector_highlycorrelatedfeaturesflagged.csv'))
-                self.features_highly_correlated_with_target.to_csv(
-                    os.path.join(savepath, 'PearsonSelector_highlycorrelatedwithtarget.csv'))
-            if self.__class__.__name__ == 'MASTMLFeatureSelector':
-                self.mastml_forward_selection_df.to_csv(
-                    os.path.join(savepath, 'MASTMLFeatureSelector_featureselection_data.csv'))
-
-            if self.__class__.__name__ == 'ShapFeatureSelector':
-                self.feature_imp_shap.to_csv(
-                    os.path.join(savepath, 'ShapFeatureSelector_sorted_features.csv'))
-                if (self.make_plot == True):
-                    shap.plots.beeswarm(self.shap_values, max_display=self.max_display, show=False)
-                    plt.savefig(os.path.join(savepath, 'SHAP_features_selected.png'), dpi=150, bbox_inches="tight")
-        if file_extension == '.xlsx':
-            X_select.to_excel(os.path.join(savepath, 'selected_features.xlsx'), index=False)
-        elif file_extension == '.csv':
-            X_select.to_csv(os.path.join(savepath, 'selected_features.csv'), index=False)
+        if self.__class__.__name__ == 'EnsembleModelFeatureSelector':
+            save_data(self.feature_importances_sorted,
+                os.path.join(savepath, 'EnsembleModelFeatureSelector_feature_importances'+file_extension))
+        if self.__class__.__name__ == 'PearsonSelector':
+            save_data(self.full_correlation_matrix,
+                os.path.join(savepath, 'PearsonSelector_fullcorrelationmatrix'+file_extension))
+            save_data(self.highly_correlated_features,
+                os.path.join(savepath, 'PearsonSelector_highlycorrelatedfeatures'+file_extension))
+            save_data(self.highly_correlated_features_flagged,
+                os.path.join(savepath, 'PearsonSelector_highlycorrelatedfeaturesflagged'+file_extension))
+            save_data(self.features_highly_correlated_with_target,
+                os.path.join(savepath, 'PearsonSelector_highlycorrelatedwithtarget'+file_extension))
+        if self.__class__.__name__ == 'MASTMLFeatureSelector':
+            save_data(self.mastml_forward_selection_df,
+                os.path.join(savepath, 'MASTMLFeatureSelector_featureselection_data'+file_extension))
+
+        if self.__class__.__name__ == 'ShapFeatureSelector':
+            save_data(self.feature_imp_shap,
+                os.path.join(savepath, 'ShapFeatureSelector_sorted_features'+file_extension))
+            if (self.make_plot == True):
+                shap.plots.beeswarm(self.shap_values, max_display=self.max_display, show=False)
+                plt.savefig(os.path.join(savepath, 'SHAP_features_selected.png'), dpi=150, bbox_inches="tight")
+        if write_data is True:
+            save_data(X_select, os.path.join(savepath, 'selected_features'+file_extension), index=False)
 
         return X_select
 
@@ -788,7 +766,7 @@ class ShapFeatureSelector(BaseSelector):
         X_select = X[self.selected_features]
         return X_select
 
-def selected_features_correlation(X, savepath, features_x_path, features_y_path):
+def selected_features_correlation(X, savepath, features_x_path, features_y_path, file_extension='.xlsx'):
     '''
     Function to get the correlation between two sets of features selected from two different methods of feature selection
 
@@ -801,6 +779,9 @@ def selected_features_correlation(X, savepath, features_x_path, features_y_path)
 
         features_y_path: (str), string denoting the path to the second selected_features.txt
 
+        file_extension: (str), file extension of the saved pearson and related_features data files, see
+            mastml.file_formats. Default '.xlsx'
+
     Returns:
         None.
 
@@ -822,7 +803,7 @@ def selected_features_correlation(X, savepath, features_x_path, features_y_path)
         array_data.append(col)
     array_df = pd.DataFrame(array_data, index=x_selected_features[:len(x_selected_features)], 
                             columns=y_selected_features[:len(y_selected_features)])
-    array_df.to_excel(os.path.join(savepath, 'pearson')+'.xlsx', index=True)
+    save_data(array_df, os.path.join(savepath, 'pearson')+file_extension, index=True)
     hCorr = dict()
     same_features = list()
     for i in range(len(array_df)):
@@ -840,7 +821,7 @@ def selected_features_correlation(X, savepath, features_x_path, features_y_path)
     for i in hCorr_sorted:
         arr.append((i[0][0], i[0][1], i[1]))
     arr_df = pd.DataFrame(arr, columns=['feature_1', 'feature_2', 'correlation'])
-    arr_df.to_excel(os.path.join(savepath, 'related_features') + '.xlsx', index=True)
+    save_data(arr_df, os.path.join(savepath, 'related_features') + file_extension, index=True)
 
     with open(os.path.join(savepath, 'same_features.txt'), 'w') as f:
         for feature in same_features:
@@ -0,0 +1,331 @@
+"""
+This module contains the writer/reader layer used to save and load the tabular data (e.g. X, y, predictions,
+residuals, statistics summaries) produced by MAST-ML. All modules save and load their data files through the save_data
+and load_data functions here, and the file format is determined by the file extension. Text formats (.csv, .xlsx) are
+convenient for inspecting the output, while the binary columnar formats (.parquet, .feather, .npz) keep the column
+dtypes, are compressed, and are much faster to load.
+
+FileFormat:
+    Base class of a file format backend. Each backend implements a write and a read method for a pandas dataframe.
+
+CsvFormat:
+    Class to write and read comma-separated text files (.csv)
+
+ExcelFormat:
+    Class to write and read Excel spreadsheets (.xlsx)
+
+ParquetFormat:
+    Class to write and read compressed, typed Apache Parquet files (.parquet). Requires pyarrow.
+
+FeatherFormat:
+    Class to write and read compressed, typed Apache Arrow Feather files (.feather). Requires pyarrow.
+
+NpzFormat:
+    Class to write and read compressed numpy archives (.npz), with one array per column. The files hold no pickled
+    objects, so loading one can't run arbitrary code.
+
+register_file_format:
+    Function to add (or replace) the backend used for a file extension
+
+get_file_format:
+    Function to get the backend used for a file extension
+
+get_file_extensions:
+    Function to get the list of supported file extensions
+
+check_file_extension:
+    Function to check that a file extension is supported, falling back to .csv if it is not
+
+save_data:
+    Function to save a dataframe or series to a file, using the backend matching the file extension
+
+load_data:
+    Function to load a dataframe from a file, using the backend matching the file extension
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except:
+    pyarrow = None
+
+
+class FileFormat():
+    """
+    Base class of a file format backend used to save and load dataframes
+
+    Args:
+        None
+
+    Methods:
+        is_available: method to check whether the packages needed by the file format are installed
+            Args:
+                None
+
+            Returns:
+                (bool), whether the file format can be used
+
+        write: method to write a dataframe to file
+            Args:
+                df: (pd.DataFrame), dataframe to save
+
+                filepath: (str), path of the file to write, including the file extension
+
+                index: (bool), whether to save the dataframe index
+
+                kwargs: additional keyword arguments passed to the pandas writer (text formats only)
+
+            Returns:
+                None
+
+        read: method to read a dataframe from file
+            Args:
+                filepath: (str), path of the file to read, including the file extension
+
+                kwargs: additional keyword arguments passed to the pandas reader (text formats only)
+
+            Returns:
+                df: (pd.DataFrame), the loaded dataframe
+    """
+    def is_available(self):
+        return True
+
+    def write(self, df, filepath, index=True, **kwargs):
+        raise NotImplementedError
+
+    def read(self, filepath, **kwargs):
+        raise NotImplementedError
+
+
+class CsvFormat(FileFormat):
+    """
+    Class to write and read comma-separated text files (.csv). See FileFormat for the methods.
+    """
+    def write(self, df, filepath, index=True, **kwargs):
+        df.to_csv(filepath, index=index, **kwargs)
+        return
+
+    def read(self, filepath, **kwargs):
+        return pd.read_csv(filepath, **kwargs)
+
+
+class ExcelFormat(FileFormat):
+    """
+    Class to write and read Excel spreadsheets (.xlsx). See FileFormat for the methods.
+    """
+    def write(self, df, filepath, index=True, **kwargs):
+        df.to_excel(filepath, index=index, **kwargs)
+        return
+
+    def read(self, filepath, **kwargs):
+        kwargs.setdefault('engine', 'openpyxl')
+        return pd.read_excel(filepath, **kwargs)
+
+
+class ParquetFormat(FileFormat):
+    """
+    Class to write and read compressed, typed Apache Parquet files (.parquet). See FileFormat for the methods.
+    """
+    def is_available(self):
+        return pyarrow is not None
+
+    def write(self, df, filepath, index=True, **kwargs):
+        df = df.copy()
+        # Parquet requires string column names
+        df.columns = [str(c) for c in df.columns]
+        df.to_parquet(filepath, index=index)
+        return
+
+    def read(self, filepath, **kwargs):
+        return pd.read_parquet(filepath)
+
+
+class FeatherFormat(FileFormat):
+    """
+    Class to write and read compressed, typed Apache Arrow Feather files (.feather). See FileFormat for the methods.
+    """
+    def is_available(self):
+        return pyarrow is not None
+
+    def write(self, df, filepath, index=True, **kwargs):
+        # Feather does not store an index, so it is saved as a regular column if requested
+        df = df.reset_index(drop=not index)
+        df.columns = [str(c) for c in df.columns]
+        df.to_feather(filepath)
+        return
+
+    def read(self, filepath, **kwargs):
+        return pd.read_feather(filepath)
+
+
+class NpzFormat(FileFormat):
+    """
+    Class to write and read compressed numpy archives (.npz), with one array per column. See FileFormat for the methods.
+    The files are loaded without pickle, so they can't run code when opened. Object columns (e.g. strings) are saved
+    as fixed-width unicode arrays with a mask of their missing values, and the column names as unicode with their type
+    (int, float or str).
+    """
+    def write(self, df, filepath, index=True, **kwargs):
+        arrays = {'columns': np.array([str(c) for c in df.columns], dtype=str),
+                  'column_types': np.array([self._get_name_type(c) for c in df.columns], dtype=str)}
+        if index == True:
+            self._add_array(arrays, 'index', df.index)
+        for i in range(df.shape[1]):
+            self._add_array(arrays, 'col_'+str(i), df.iloc[:, i])
+        with open(filepath, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        return
+
+    def read(self, filepath, **kwargs):
+        with np.load(filepath, allow_pickle=False) as f:
+            name_types = {'i': int, 'f': float, 's': str}
+            columns = [name_types[t](c) for c, t in zip(f['columns'], f['column_types'])]
+            df = pd.DataFrame(dict((i, self._get_array(f, 'col_'+str(i))) for i in range(len(columns))))
+            df.columns = columns
+            if 'index' in f.files:
+                df.index = self._get_array(f, 'index')
+        return df
+
+    def _get_name_type(self, name):
+        if isinstance(name, (int, np.integer)) and not isinstance(name, bool):
+            return 'i'
+        if isinstance(name, (float, np.floating)):
+            return 'f'
+        return 's'
+
+    def _add_array(self, arrays, name, values):
+        values = np.asarray(values)
+        if values.dtype.kind != 'O':
+            arrays[name] = values
+            return
+        # Object arrays can only be saved with pickle, so they are saved as strings, with a mask of the missing values
+        missing = np.asarray(pd.isnull(values), dtype=bool)
+        arrays[name] = np.array(['' if m else str(v) for v, m in zip(values, missing)], dtype=str)
+        arrays[name+'_missing'] = missing
+        return
+
+    def _get_array(self, f, name):
+        values = f[name]
+        if name+'_missing' in f.files:
+            values = values.astype(object)
+            values[f[name+'_missing']] = None
+        return values
+
+
+_file_formats = {'.csv': CsvFormat(),
+                 '.xlsx': ExcelFormat(),
+                 '.parquet': ParquetFormat(),
+                 '.feather': FeatherFormat(),
+                 '.npz': NpzFormat()}
+
+
+def register_file_format(file_extension, file_format):
+    '''
+    Function to add (or replace) the backend used to save and load files with a given extension
+
+    Args:
+        file_extension: (str), the file extension, e.g. '.h5'
+
+        file_format: (FileFormat), instance of a FileFormat subclass implementing the write and read methods
+
+    Returns:
+        None
+    '''
+    _file_formats[file_extension] = file_format
+    return
+
+
+def get_file_format(file_extension):
+    '''
+    Function to get the backend used to save and load files with a given extension
+
+    Args:
+        file_extension: (str), the file extension, e.g. '.csv'
+
+    Returns:
+        file_format: (FileFormat), the file format backend
+    '''
+    try:
+        return _file_formats[file_extension]
+    except KeyError:
+        raise ValueError('Unsupported file extension '+str(file_extension)+'. Supported file extensions are '+
+                         str(get_file_extensions()))
+
+
+def get_file_extensions():
+    '''
+    Function to get the list of supported file extensions
+
+    Args:
+        None
+
+    Returns:
+        file_extensions: (list), list of the supported file extensions
+    '''
+    return list(_file_formats.keys())
+
+
+def check_file_extension(file_extension):
+    '''
+    Function to check that a file extension is supported and its needed packages are installed
+
+    Args:
+        file_extension: (str), the file extension, e.g. '.parquet'
+
+    Returns:
+        file_extension: (str), the file extension if it can be used, otherwise '.csv'
+    '''
+    if file_extension not in _file_formats:
+        print('Warning: unsupported file extension '+str(file_extension)+', data files will be saved as .csv. '
+              'Supported file extensions are '+str(get_file_extensions()))
+        return '.csv'
+    if not _file_formats[file_extension].is_available():
+        print('Warning: pyarrow is an optional dependency needed to save '+str(file_extension)+' files. If you want to '
+              'use this file format, do "pip install pyarrow". Data files will be saved as .csv')
+        return '.csv'
+    return file_extension
+
+
+def save_data(data, filepath, index=True, **kwargs):
+    '''
+    Function to save a dataframe, series or array to file, with the file format determined by the file extension
+
+    Args:
+        data: (pd.DataFrame, pd.Series or np.ndarray), the data to save
+
+        filepath: (str), path of the file to write, including the file extension
+
+        index: (bool), whether to save the data index
+
+        kwargs: additional keyword arguments passed to the pandas writer (text formats only)
+
+    Returns:
+        None
+    '''
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    elif not isinstance(data, pd.DataFrame):
+        data = pd.DataFrame(data)
+    file_format = get_file_format(os.path.splitext(filepath)[1])
+    file_format.write(data, filepath, index=index, **kwargs)
+    return
+
+
+def load_data(filepath, **kwargs):
+    '''
+    Function to load a dataframe from file, with the file format determined by the file extension
+
+    Args:
+        filepath: (str), path of the file to read, including the file extension
+
+        kwargs: additional keyword arguments passed to the pandas reader (text formats only)
+
+    Returns:
+        df: (pd.DataFrame), the loaded dataframe
+    '''
+    file_format = get_file_format(os.path.splitext(filepath)[1])
+    return file_format.read(filepath, **kwargs)
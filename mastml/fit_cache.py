@@ -0,0 +1,150 @@
+"""
+This module contains an on-disk cache of fitted models, so re-running the same evaluation (e.g. to change the plots or
+metrics over a fixed benchmark) doesn't refit the same model on the same data. Entries are keyed by a hash of their
+content: the training (and test) data of the split, with its selected features, the preprocessor, the model class and
+parameters (including its random seed) and the hyperparameter optimizer. Each entry holds the fitted model and its
+predictions. The cache has a maximum size, above which the least recently used entries are removed.
+
+FitCache:
+    Class to get and save fitted models and their predictions in a cache directory
+
+"""
+
+import os
+import tempfile
+import joblib
+
+
+class FitCache():
+    """
+    Class to get and save fitted models and their predictions in a cache directory, keyed by a hash of the data and
+    model that were fit
+
+    Args:
+        cache_dir: (str), path of the directory holding the cache. It is made if it doesn't exist, and can be shared by
+            several runs
+
+        max_size: (float), maximum size of the cache, in MB. When saving an entry makes the cache larger than this, the
+            least recently used entries are removed. Default None means the cache size isn't limited
+
+    Methods:
+        get_key: method to get the cache key of a model fit
+            Args:
+                X_train: (pd.DataFrame), dataframe of X features (i.e. the selected features, before preprocessing) the
+                    model is fit on
+
+                y_train: (pd.Series), series of y data the model is fit on
+
+                X_test: (pd.DataFrame), dataframe of X features predicted with the fitted model
+
+                model: (mastml.models instance), the unfitted model
+
+                preprocessor: (mastml.preprocessing instance), the unfitted preprocessor of the X data
+
+                hyperopt: (mastml.hyperopt instance), the hyperparameter optimizer used to fit the model, or None
+
+            Returns:
+                key: (str), the hash of the model fit
+
+        load: method to get a cache entry. Loading an entry marks it as recently used
+            Args:
+                key: (str), the cache key, made with get_key
+
+            Returns:
+                entry: (dict), dict of the cached fitted model and its predictions, or None if the key isn't cached
+
+        save: method to save a cache entry, and remove the least recently used entries if the cache is too large
+            Args:
+                key: (str), the cache key, made with get_key
+
+                entry: (dict), dict of the fitted model and its predictions
+
+            Returns:
+                None
+
+        clear: method to invalidate the cache by removing all its entries
+            Args:
+                None
+
+            Returns:
+                None
+
+        get_size: method to get the size of the cache
+            Args:
+                None
+
+            Returns:
+                size: (float), the total size of the cache entries, in MB
+    """
+    def __init__(self, cache_dir, max_size=None):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, X_train, y_train, X_test, model, preprocessor, hyperopt=None):
+        # The model and preprocessor are hashed unfitted, so their hash covers their class and parameters (e.g. the
+        # random seed). The data is hashed with its columns, so the selected features are part of the key
+        return joblib.hash([X_train, y_train, X_test, model, preprocessor, hyperopt])
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key+'.pkl')
+
+    def load(self, key):
+        path = self._get_path(key)
+        try:
+            entry = joblib.load(path)
+        except (FileNotFoundError, EOFError):
+            return None
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def save(self, key, entry):
+        # Write to a temporary file first, so other processes sharing the cache never load a partly written entry
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        os.close(fd)
+        joblib.dump(entry, temp_path)
+        os.replace(temp_path, self._get_path(key))
+        if self.max_size is not None:
+            self._evict()
+        return
+
+    def _get_entries(self):
+        entries = list()
+        for f in os.listdir(self.cache_dir):
+            if f.endswith('.pkl'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, f))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, f))
+        return entries
+
+    def _evict(self):
+        # Remove the least recently used entries until the cache fits in max_size
+        entries = sorted(self._get_entries())
+        size = sum([e[1] for e in entries])
+        max_size = self.max_size*1e6
+        for mtime, entry_size, f in entries:
+            if size <= max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, f))
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        return
+
+    def clear(self):
+        for mtime, size, f in self._get_entries():
+            try:
+                os.remove(os.path.join(self.cache_dir, f))
+            except FileNotFoundError:
+                pass
+        return
+
+    def get_size(self):
+        return sum([e[1] for e in self._get_entries()])/1e6
@@ -28,10 +28,12 @@ import scipy.stats
 import pandas as pd
 import numpy as np
 import os
+import time
 from ast import literal_eval
 
 from mastml.models import SklearnModel
 from mastml.metrics import Metrics
+from mastml.file_formats import save_data
 
 class HyperOptUtils():
     """
@@ -50,12 +52,35 @@ class HyperOptUtils():
             Returns:
                 params_: (dict), dict of {param_name : param_value} pairs.
 
-        _save_output : saves hyperparameter optimization output and best values to csv file
+        _save_output : saves hyperparameter optimization output and best values to file
             Args:
                 savepath: (str), path of output directory
 
                 data: (dict), dict of {estimator_name : hyper_opt.GridSearch.fit()} object, or equivalent
 
+                file_extension: (str), file extension of the saved output files, e.g. '.csv'
+
+            Returns:
+                None
+
+        _add_to_catalog : registers the hyperparameter optimization in a results catalog, with the mean and stdev CV score of each parameter set (split 'params_<i>' for the i-th set of the params in the run config) and of the best parameter set as the summary
+            Args:
+                catalog: (mastml.results_catalog.ResultsCatalog), the results catalog
+
+                data: (dict), dict of {estimator_name : hyper_opt.GridSearch.fit()} object, or equivalent
+
+                X: (pd.DataFrame), dataframe of X feature data
+
+                y: (pd.Series), series of target y data
+
+                cv: (scikit-learn cross-validation object), the cross-validation object used
+
+                savepath: (str), path of output directory
+
+                time_started: (float), time the optimization started, in seconds since the epoch
+
+                file_extension: (str), file extension of the saved output files, e.g. '.csv'
+
             Returns:
                 None
 
@@ -116,7 +141,7 @@ class HyperOptUtils():
                 params_[param_name] = param_vals
         return params_
 
-    def _save_output(self, savepath, data):
+    def _save_output(self, savepath, data, file_extension='.csv'):
         for key in data:
             d = data[key]
             c = dict((k, d.cv_results_[k]) for k in ('mean_test_score', 'std_test_score'))
@@ -127,8 +152,44 @@ class HyperOptUtils():
                 best = pd.DataFrame(d.best_params_, index=['Best Parameters'])
             except:
                 best = pd.DataFrame(d.best_params_)
-            out.to_excel(os.path.join(savepath, self.__class__.__name__+"_"+str(key)+'_output.xlsx'))
-            best.to_excel(os.path.join(savepath, self.__class__.__name__+"_"+str(key)+'_bestparams.xlsx'))
+            # Index of parameter dicts is saved as text so it can be written to the typed binary file formats
+            out.index = out.index.astype(str)
+            save_data(out, os.path.join(savepath, self.__class__.__name__+"_"+str(key)+'_output'+file_extension))
+            save_data(best, os.path.join(savepath, self.__class__.__name__+"_"+str(key)+'_bestparams'+file_extension))
+        return
+
+    def _add_to_catalog(self, catalog, data, X, y, cv, savepath, time_started, file_extension='.csv'):
+        if self.scoring is None:
+            scoring = 'mean_absolute_error'
+        else:
+            scoring = self.scoring
+        # The scorers of error metrics are negated by sklearn, so the scores are flipped back to the metric values
+        sign = 1 if Metrics(metrics_list=None)._metric_zoo()[scoring][0] else -1
+        for key in data:
+            d = data[key]
+            run_id = catalog.add_run(kind='hyperopt',
+                                     savepath=savepath,
+                                     dataset_hash=catalog.get_dataset_hash(X, y),
+                                     model=str(key),
+                                     splitter=catalog.get_name(cv),
+                                     hyperopt=self.__class__.__name__,
+                                     config={'model': d.best_estimator_.get_params(),
+                                             'cv': str(cv),
+                                             'scoring': scoring,
+                                             'params': list(d.cv_results_['params']),
+                                             'best_params': d.best_params_},
+                                     time_started=time_started)
+            means = d.cv_results_['mean_test_score']
+            stdevs = d.cv_results_['std_test_score']
+            for i in range(len(means)):
+                catalog.add_metrics(run_id, pd.DataFrame({scoring: [sign*means[i], stdevs[i]]}), data_type='test',
+                                    split='params_'+str(i))
+            catalog.add_metrics(run_id, pd.DataFrame({scoring: [sign*means[d.best_index_], stdevs[d.best_index_]]}),
+                                data_type='test')
+            catalog.add_artifact(run_id, 'output',
+                                 os.path.join(savepath, self.__class__.__name__+"_"+str(key)+'_output'+file_extension))
+            catalog.add_artifact(run_id, 'bestparams',
+                                 os.path.join(savepath, self.__class__.__name__+"_"+str(key)+'_bestparams'+file_extension))
         return
 
     def _get_grid_param_dict(self):
@@ -257,6 +318,10 @@ class GridSearch(HyperOptUtils):
 
                 savepath: (str), path of output directory
 
+                file_extension: (str), file extension of the saved output files, e.g. '.csv'
+
+                catalog: (mastml.results_catalog.ResultsCatalog), catalog of run results to register the optimization into, with the CV score of each parameter set. Default None means the optimization is not registered.
+
             Returns:
                 best_estimator (mastml.models object) : the optimized MAST-ML model
 
@@ -268,7 +333,8 @@ class GridSearch(HyperOptUtils):
         self.scoring = scoring
         self.n_jobs = int(n_jobs)
 
-    def fit(self, X, y, model, cv=None, savepath=None):
+    def fit(self, X, y, model, cv=None, savepath=None, file_extension='.csv', catalog=None):
+        time_started = time.time()
         rst = dict()
         param_dict = self._get_grid_param_dict()
 
@@ -307,7 +373,9 @@ class GridSearch(HyperOptUtils):
 
         best_estimator = rst[estimator_name].best_estimator_
 
-        self._save_output(savepath, rst)
+        self._save_output(savepath, rst, file_extension=file_extension)
+        if catalog is not None:
+            self._add_to_catalog(catalog, rst, X, y, cv, savepath, time_started, file_extension=file_extension)
 
         # Need to rebuild the estimator as SklearnModel
         best_estimator = SklearnModel(model=best_estimator.__class__.__name__, **best_estimator.get_params())
@@ -342,6 +410,10 @@ class RandomizedSearch(HyperOptUtils):
 
                 savepath: (str), path of output directory
 
+                file_extension: (str), file extension of the saved output files, e.g. '.csv'
+
+                catalog: (mastml.results_catalog.ResultsCatalog), catalog of run results to register the optimization into, with the CV score of each parameter set. Default None means the optimization is not registered.
+
             Returns:
                 best_estimator (mastml.models object) : the optimized MAST-ML model
 
@@ -355,7 +427,8 @@ class RandomizedSearch(HyperOptUtils):
         self.n_iter = int(n_iter)
         self.n_jobs = int(n_jobs)
 
-    def fit(self, X, y, model, cv=None, savepath=None, refit=True):
+    def fit(self, X, y, model, cv=None, savepath=None, refit=True, file_extension='.csv', catalog=None):
+        time_started = time.time()
         rst = dict()
         param_dict = self._get_randomized_param_dict()
 
@@ -397,7 +470,9 @@ class RandomizedSearch(HyperOptUtils):
         # Need to rebuild the best estimator back into SklearnModel object
         best_estimator = SklearnModel(model=best_estimator.__class__.__name__, **best_estimator.get_params())
 
-        self._save_output(savepath, rst)
+        self._save_output(savepath, rst, file_extension=file_extension)
+        if catalog is not None:
+            self._add_to_catalog(catalog, rst, X, y, cv, savepath, time_started, file_extension=file_extension)
         return best_estimator
 
 # NOTE: there is a known problem where BayesSearchCV in skopt doesn't work with sklearn 0.24 (deprecated iid parameter).
@@ -430,6 +505,10 @@ class BayesianSearch(HyperOptUtils):
 
                 savepath: (str), path of output directory
 
+                file_extension: (str), file extension of the saved output files, e.g. '.csv'
+
+                catalog: (mastml.results_catalog.ResultsCatalog), catalog of run results to register the optimization into, with the CV score of each parameter set. Default None means the optimization is not registered.
+
             Returns:
                 best_estimator (mastml.models object) : the optimized MAST-ML model
     """
@@ -446,7 +525,8 @@ class BayesianSearch(HyperOptUtils):
         self.n_iter = int(n_iter)
         self.n_jobs = int(n_jobs)
 
-    def fit(self, X, y, model, cv, savepath=None):
+    def fit(self, X, y, model, cv, savepath=None, file_extension='.csv', catalog=None):
+        time_started = time.time()
         rst = dict()
         param_dict = self._get_bayesian_param_dict()
 
@@ -488,7 +568,9 @@ class BayesianSearch(HyperOptUtils):
         # Need to rebuild the estimator as SklearnModel
         best_estimator = SklearnModel(model=best_estimator.__class__.__name__, **best_estimator.get_params())
 
-        self._save_output(savepath, rst)
+        self._save_output(savepath, rst, file_extension=file_extension)
+        if catalog is not None:
+            self._add_to_catalog(catalog, rst, X, y, cv, savepath, time_started, file_extension=file_extension)
         return best_estimator
 
     @property
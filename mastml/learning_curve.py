@@ -12,6 +12,7 @@ import numpy as np
 import pandas as pd
 import os
 import sys
+import time
 from datetime import datetime
 
 from sklearn.model_selection import learning_curve
@@ -21,6 +22,7 @@ from sklearn.model_selection import KFold
 from mastml.metrics import Metrics
 from mastml.feature_selectors import SklearnFeatureSelector
 from mastml.plots import Line
+from mastml.file_formats import save_data
 
 class LearningCurve():
     """
@@ -53,6 +55,10 @@ class LearningCurve():
 
                 make_plot: (bool), whether or not to make the learning curve plots
 
+                file_extension: (str), file extension of the saved learning curve data, e.g. '.csv'
+
+                catalog: (mastml.results_catalog.ResultsCatalog), catalog of run results to register the learning curves into, with the train and test scores at each training data size and number of features. The summary scores are those at the largest training data size. Default None means the learning curves are not registered.
+
         data_learning_curve: Method that calculates the model CV score as a function of amount of training data used
             Args:
                 model: (SklearnModel or EnsembleModel), a model made in MAST-ML
@@ -73,8 +79,10 @@ class LearningCurve():
 
                 make_plot: (bool), whether or not to make the learning curve plots
 
+                file_extension: (str), file extension of the saved learning curve data, e.g. '.csv'
+
             Returns:
-                None
+                df: (pd.DataFrame), dataframe of the data learning curve, i.e. the mean and standard deviation of the train and test scores at each training data size
 
         feature_learning_curve: Method that calculates the model CV score as a function of the number of features used
             Args:
@@ -96,8 +104,10 @@ class LearningCurve():
 
                 make_plot: (bool), whether or not to make the learning curve plots
 
+                file_extension: (str), file extension of the saved learning curve data, e.g. '.csv'
+
             Returns:
-                None
+                df: (pd.DataFrame), dataframe of the feature learning curve, i.e. the mean and standard deviation of the train and test scores for each number of features
 
         _setup_savedir: Method to create the output save directory for learning curve data
             Args:
@@ -106,19 +116,29 @@ class LearningCurve():
             Returns:
                 splitdir: (str), path where learning curve data will be saved to
 
+        _add_to_catalog: Method to register the data and feature learning curves in a results catalog
+            Args:
+                catalog: (mastml.results_catalog.ResultsCatalog), the results catalog
+
+                see evaluate for the other args, plus the learning curve dataframes and the time the run started
+
+            Returns:
+                run_id: (int), the id of the registered run in the catalog
+
     """
     def __init__(self):
         pass
 
     def evaluate(self, model, X, y, savepath=None, groups=None, train_sizes=None, cv=None, scoring=None, selector=None,
-                            make_plot=True, make_new_dir=True):
+                            make_plot=True, make_new_dir=True, file_extension='.csv', catalog=None):
+        time_started = time.time()
         if savepath is None:
             savepath = os.getcwd()
         if make_new_dir is True:
             splitdir = self._setup_savedir(savepath=savepath)
             self.splitdir = splitdir
             savepath = splitdir
-        self.data_learning_curve(model=model,
+        df_data = self.data_learning_curve(model=model,
                                  X=X,
                                  y=y,
                                  savepath=savepath,
@@ -126,8 +146,9 @@ class LearningCurve():
                                  train_sizes=train_sizes,
                                  cv=cv,
                                  scoring=scoring,
-                                 make_plot=make_plot)
-        self.feature_learning_curve(model=model,
+                                 make_plot=make_plot,
+                                 file_extension=file_extension)
+        df_features = self.feature_learning_curve(model=model,
                                     X=X,
                                     y=y,
                                     savepath=savepath,
@@ -135,11 +156,43 @@ class LearningCurve():
                                     cv=cv,
                                     scoring=scoring,
                                     selector=selector,
-                                    make_plot=make_plot)
+                                    make_plot=make_plot,
+                                    file_extension=file_extension)
+        if catalog is not None:
+            self._add_to_catalog(catalog, model, X, y, cv, scoring, selector, savepath, df_data, df_features,
+                                 time_started, file_extension)
         return
 
+    def _add_to_catalog(self, catalog, model, X, y, cv, scoring, selector, savepath, df_data, df_features, time_started,
+                        file_extension):
+        if scoring is None:
+            scoring = 'mean_absolute_error'
+        run_id = catalog.add_run(kind='learning_curve',
+                                 savepath=savepath,
+                                 dataset_hash=catalog.get_dataset_hash(X, y),
+                                 model=catalog.get_name(model),
+                                 splitter=catalog.get_name(cv),
+                                 selector=catalog.get_name(selector),
+                                 config={'model': catalog.get_params(model), 'cv': str(cv), 'scoring': scoring},
+                                 time_started=time_started)
+        for df, size_name in [(df_data, 'train_size_'), (df_features, 'n_features_')]:
+            for i in range(df.shape[0]):
+                for data_type in ['train', 'test']:
+                    catalog.add_metrics(run_id,
+                                        pd.DataFrame({scoring: [df[data_type+'_mean'].iloc[i], df[data_type+'_std'].iloc[i]]}),
+                                        data_type=data_type,
+                                        split=size_name+str(df['train_sizes'].iloc[i]))
+        # The summary scores are those of the model trained on the most data
+        for data_type in ['train', 'test']:
+            catalog.add_metrics(run_id,
+                                pd.DataFrame({scoring: [df_data[data_type+'_mean'].iloc[-1], df_data[data_type+'_std'].iloc[-1]]}),
+                                data_type=data_type)
+        catalog.add_artifact(run_id, 'data_learning_curve', os.path.join(savepath, 'data_learning_curve'+file_extension))
+        catalog.add_artifact(run_id, 'feature_learning_curve', os.path.join(savepath, 'feature_learning_curve'+file_extension))
+        return run_id
+
     def data_learning_curve(self, model, X, y, savepath=None, groups=None, train_sizes=None, cv=None, scoring=None,
-                            make_plot=True):
+                            make_plot=True, file_extension='.csv'):
 
         if savepath is None:
             savepath = os.getcwd()
@@ -175,7 +228,8 @@ class LearningCurve():
                     "train_std": train_stdev,
                     "test_mean": test_mean,
                     "test_std": test_stdev}
-        pd.DataFrame().from_dict(data=datadict).to_excel(os.path.join(savepath, 'data_learning_curve.xlsx'), index=False)
+        df = pd.DataFrame().from_dict(data=datadict)
+        save_data(df, os.path.join(savepath, 'data_learning_curve'+file_extension), index=False)
 
         if make_plot is True:
             Line().plot_learning_curve(train_sizes=train_sizes,
@@ -187,9 +241,10 @@ class LearningCurve():
                                        score_name=score_name,
                                        savepath=savepath)
 
-        return
+        return df
 
-    def feature_learning_curve(self, model, X, y, savepath=None, groups=None, cv=None, scoring=None, selector=None, make_plot=True):
+    def feature_learning_curve(self, model, X, y, savepath=None, groups=None, cv=None, scoring=None, selector=None, make_plot=True,
+                               file_extension='.csv'):
 
         if savepath is None:
             savepath = os.getcwd()
@@ -291,7 +346,8 @@ class LearningCurve():
                     "train_std": train_stdev,
                     "test_mean": test_mean,
                     "test_std": test_stdev}
-        pd.DataFrame().from_dict(data=datadict).to_excel(os.path.join(savepath, 'feature_learning_curve.xlsx'), index=False)
+        df = pd.DataFrame().from_dict(data=datadict)
+        save_data(df, os.path.join(savepath, 'feature_learning_curve'+file_extension), index=False)
 
         if make_plot is True:
             Line().plot_learning_curve(train_sizes=train_sizes,
@@ -303,7 +359,7 @@ class LearningCurve():
                                        score_name=score_name,
                                        savepath=savepath)
 
-        return
+        return df
 
     def _setup_savedir(self, savepath):
         now = datetime.now()
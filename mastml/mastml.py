@@ -2,18 +2,32 @@
 This module contains routines to set up and manage the metadata for a MAST-ML run
 
 Mastml:
-    Class to set up directories for saving the output of a MAST-ML run, and for constructing and updating a
-    metadata summary file.
+    Class to set up directories for saving the output of a MAST-ML run, and for constructing and updating the run
+    metadata. The metadata is an append-only journal of compact JSON records (mastml_metadata.jsonl in the savepath):
+    a record of the run, then one record per update of a split (e.g. its model, stats and stage times). The data
+    arrays of a split (e.g. X_train, y_pred, residuals) aren't held in the records, which only hold the paths of the
+    data files the splits are saved to, so the metadata written grows linearly with the number of splits. Records are
+    only appended, so parallel workers can add the records of their splits to the same file.
+
+load_mastml_metadata:
+    Function to load the metadata of a MAST-ML run as a nested dict of the metadata of each split, with the data
+    arrays read back from their data files
 
 """
 
 import os
+import re
 from datetime import datetime
 from collections import OrderedDict
 import json
 from pathos.multiprocessing import ProcessingPool as Pool
 from functools import partial
 
+from mastml.file_formats import load_data
+
+# The metadata journal in the savepath of a run
+METADATA_FILE = 'mastml_metadata.jsonl'
+
 class Mastml():
     """
     Main helper class to initialize mastml runs and create and manage run metadata
@@ -23,38 +37,45 @@ class Mastml():
 
         mastml_metdata: (dict), dict of mastml metadata. If none, a new dict will be created
 
+        resume: (bool), whether to resume an interrupted run saved to savepath. The existing output folder is kept (rather than making a new, renamed one) along with its metadata. Pass the same savepath and resume=True to the evaluate method of the data splitter to only evaluate the missing splits. Default False.
+
     Methods:
-        _initialize_run: initializes run by making new metadata file or updating existing one, and initializing the output directory.
+        _initialize_run: initializes run by starting the metadata journal, and initializing the output directory.
             Args:
-                None
+                mastml_metadata: (dict), dict of mastml metadata of the run, or None to start it with the savepath info
 
             Returns:
                 None
 
-        _initialize_output: creates the output folder based on specified savepath and datetime information
+        _initialize_output: creates the output folder based on specified savepath and datetime information, or keeps the existing one when resuming a run
             Args:
                 None
 
             Returns:
                 None
 
-        _initialize_metadata: creates a new metadata file and saves the savepath info to it
+        _initialize_metadata: starts the metadata journal with a record of the savepath info (or the given metadata), or keeps the existing journal when resuming a run
             Args:
-                None
+                mastml_metadata: (dict), dict of mastml metadata of the run, or None to start it with the savepath info
 
             Returns:
                 None
 
-        _update_metadata: placeholder for updating the metadata file with new run information
+        _update_metadata: appends a record of the information of a split (e.g. its model, stats and the data files of its data arrays) to the metadata journal
             Args:
-                None
+                outerdir: (str), the save directory of the split results
 
-            Returns:
-                None
+                split_name: (str), the name of the split
 
-        _save_mastml_metadata: saves the metadata dict as a json file
-            Args:
-                None
+                train_columns: (list), list of the names of the X features of the training data
+
+                data_files: (dict), dict of the name of each data array of the split (e.g. 'X_train', 'y_pred', 'model_errors_test_cal') and the path of the data file it is saved in. Files that don't exist (e.g. removed with remove_split_dirs) are skipped when the metadata is loaded
+
+                stage_times: (dict), dict of the time in seconds spent in each stage of the split evaluation (see mastml.stage_timer)
+
+                failed_splits: (dict), dict of the name of each split that failed to be evaluated (e.g. went over its time or memory limit) and why it failed
+
+                see the method signature for the other (optional) information saved
 
             Returns:
                 None
@@ -66,7 +87,7 @@ class Mastml():
             Returns:
                 string specifying the savepath of the mastml run
 
-        get_mastml_metadata: returns the metadata file
+        get_mastml_metadata: returns the metadata of the run, loaded from the metadata journal
             Args:
                 None
 
@@ -74,21 +95,19 @@ class Mastml():
                 mastml metadata object (ordered dict)
 
     """
-    def __init__(self, savepath, mastml_metadata=None):
+    def __init__(self, savepath, mastml_metadata=None, resume=False):
         self.savepath = savepath
-        self.mastml_metadata = mastml_metadata
-        self._initialize_run()
+        self.resume = resume
+        self._initialize_run(mastml_metadata)
 
-    def _initialize_run(self):
+    def _initialize_run(self, mastml_metadata=None):
         self._initialize_output()
-        if self.mastml_metadata is None:
-            self._initialize_metadata()
-        #else:
-        #    self._update_metadata()
-        self._save_mastml_metadata()
+        self._initialize_metadata(mastml_metadata)
 
     def _initialize_output(self):
         # Make an output folder for the run to store all data to
+        if self.resume is True and os.path.exists(self.savepath):
+            return
         if os.path.exists(self.savepath):
             try:
                 os.rmdir(self.savepath)  # succeeds if empty
@@ -101,9 +120,21 @@ class Mastml():
         os.makedirs(self.savepath)
         return
 
-    def _initialize_metadata(self):
-        self.mastml_metadata = OrderedDict()
-        self.mastml_metadata['savepath'] = self.savepath
+    def _initialize_metadata(self, mastml_metadata=None):
+        if self.resume is True and os.path.exists(os.path.join(self.savepath, METADATA_FILE)):
+            return
+        if mastml_metadata is None:
+            mastml_metadata = OrderedDict([('savepath', self.savepath)])
+        self._append_record({'type': 'run', 'metadata': mastml_metadata})
+        return
+
+    def _append_record(self, record):
+        # Each record is a single line, written in one go and flushed to disk right away, so records appended by
+        # parallel workers aren't interleaved and survive the run being killed
+        with open(os.path.join(self.savepath, METADATA_FILE), 'a') as f:
+            f.write(json.dumps(record)+'\n')
+            f.flush()
+            os.fsync(f.fileno())
         return
 
     def _update_metadata(self,
@@ -117,117 +148,57 @@ class Mastml():
                          train_stats=None,
                          test_stats=None,
                          leaveout_stats=None,
-                         X_train=None,
-                         X_test=None,
-                         X_leaveout=None,
-                         X_extra_train=None,
-                         X_extra_test=None,
-                         X_extra_leaveout=None,
-                         y_train=None,
-                         y_test=None,
-                         y_test_domain=None,
-                         y_leaveout=None,
-                         y_pred_train=None,
-                         y_pred=None,
-                         y_pred_leaveout=None,
-                         residuals_train=None,
-                         residuals_test=None,
-                         residuals_leaveout=None,
-                         model_errors_train=None,
-                         model_errors_test=None,
-                         model_errors_leaveout=None,
-                         model_errors_train_cal=None,
-                         model_errors_test_cal=None,
-                         model_errors_leaveout_cal=None,
-                         dataset_stdev=None):
+                         train_columns=None,
+                         data_files=None,
+                         dataset_stdev=None,
+                         stage_times=None,
+                         failed_splits=None):
         # Update with new entry: (1) module, (2) class, (3) path executed, (4) paths to data used ???
-        if outerdir not in self.mastml_metadata.keys():
-            self.mastml_metadata[outerdir] = OrderedDict()
-        if split_name not in self.mastml_metadata[outerdir].keys():
-            self.mastml_metadata[outerdir][split_name] = OrderedDict()
+        entry = OrderedDict()
         if split_name == 'split_outer_dir':
-            self.mastml_metadata[outerdir][split_name]['splitdir'] = outerdir
+            entry['splitdir'] = outerdir
         else:
-            self.mastml_metadata[outerdir][split_name]['splitdir'] = split_name
+            entry['splitdir'] = split_name
         if model is not None:
             try:
                 model_name = model.model.__class__.__name__
             except:
                 model_name = model.__class__.__name__
-            self.mastml_metadata[outerdir][split_name]['model'] = model_name
+            entry['model'] = model_name
 
             if split_name == 'split_summary':
-                self.mastml_metadata[outerdir][split_name]['model_path'] = os.path.join(os.path.join(self.savepath, outerdir), model_name+'.pkl')
+                entry['model_path'] = os.path.join(os.path.join(self.savepath, outerdir), model_name+'.pkl')
             elif split_name == 'split_outer_summary':
-                self.mastml_metadata[outerdir][split_name]['model_path'] = os.path.join(outerdir, model_name+'.pkl')
+                entry['model_path'] = os.path.join(outerdir, model_name+'.pkl')
             else:
-                self.mastml_metadata[outerdir][split_name]['model_path'] = os.path.join(os.path.join(os.path.join(self.savepath, outerdir), split_name), model_name + '.pkl')
+                entry['model_path'] = os.path.join(os.path.join(os.path.join(self.savepath, outerdir), split_name), model_name + '.pkl')
         if splitter is not None:
-            self.mastml_metadata[outerdir][split_name]['splitter'] = splitter.splitter.__class__.__name__
+            entry['splitter'] = splitter.splitter.__class__.__name__
         if preprocessor is not None:
-            self.mastml_metadata[outerdir][split_name]['preprocessor'] = preprocessor.__class__.__name__
+            entry['preprocessor'] = preprocessor.__class__.__name__
         if selector is not None:
-            self.mastml_metadata[outerdir][split_name]['selector'] = selector.__class__.__name__
+            entry['selector'] = selector.__class__.__name__
         if hyperopt is not None:
-            self.mastml_metadata[outerdir][split_name]['hyperopt'] = hyperopt.__class__.__name__
+            entry['hyperopt'] = hyperopt.__class__.__name__
         if train_stats is not None:
-            self.mastml_metadata[outerdir][split_name]['train_stats'] = train_stats.to_json()
+            entry['train_stats'] = train_stats.to_json()
         if test_stats is not None:
-            self.mastml_metadata[outerdir][split_name]['test_stats'] = test_stats.to_json() #to_dict
+            entry['test_stats'] = test_stats.to_json() #to_dict
         if leaveout_stats is not None:
-            self.mastml_metadata[outerdir][split_name]['leaveout_stats'] = leaveout_stats.to_json()
-        if X_train is not None:
-            self.mastml_metadata[outerdir][split_name]['train_columns'] = X_train.columns.tolist()
-            self.mastml_metadata[outerdir][split_name]['X_train'] = X_train.to_json()
-        if X_test is not None:
-            self.mastml_metadata[outerdir][split_name]['X_test'] = X_test.to_json()
-        if X_leaveout is not None:
-            self.mastml_metadata[outerdir][split_name]['X_leaveout'] = X_leaveout.to_json()
-        if X_extra_train is not None:
-            self.mastml_metadata[outerdir][split_name]['X_extra_train'] = X_extra_train.to_json()
-        if X_extra_test is not None:
-            self.mastml_metadata[outerdir][split_name]['X_extra_test'] = X_extra_test.to_json()
-        if X_extra_leaveout is not None:
-            self.mastml_metadata[outerdir][split_name]['X_extra_leaveout'] = X_extra_leaveout.to_json()
-        if y_train is not None:
-            self.mastml_metadata[outerdir][split_name]['y_train'] = y_train.to_json()
-        if y_test is not None:
-            self.mastml_metadata[outerdir][split_name]['y_test'] = y_test.to_json()
-        if y_leaveout is not None:
-            self.mastml_metadata[outerdir][split_name]['y_leaveout'] = y_leaveout.to_json()
-        if y_pred_train is not None:
-            self.mastml_metadata[outerdir][split_name]['y_pred_train'] = y_pred_train.to_json()
-        if y_pred is not None:
-            self.mastml_metadata[outerdir][split_name]['y_pred'] = y_pred.to_json()
-        if y_pred_leaveout is not None:
-            self.mastml_metadata[outerdir][split_name]['y_pred_leaveout'] = y_pred_leaveout.to_json()
-        if y_test_domain is not None:
-            self.mastml_metadata[outerdir][split_name]['y_test_domain'] = y_test_domain.to_json()
-        if residuals_train is not None:
-            self.mastml_metadata[outerdir][split_name]['residuals_train'] = residuals_train.to_json()
-        if residuals_test is not None:
-            self.mastml_metadata[outerdir][split_name]['residuals_test'] = residuals_test.to_json()
-        if residuals_leaveout is not None:
-            self.mastml_metadata[outerdir][split_name]['residuals_leaveout'] = residuals_leaveout.to_json()
-        if model_errors_train is not None:
-            self.mastml_metadata[outerdir][split_name]['model_errors_train'] = model_errors_train.to_json()
-        if model_errors_test is not None:
-            self.mastml_metadata[outerdir][split_name]['model_errors_test'] = model_errors_test.to_json()
-        if model_errors_leaveout is not None:
-            self.mastml_metadata[outerdir][split_name]['model_errors_leaveout'] = model_errors_leaveout.to_json()
-        if model_errors_train_cal is not None:
-            self.mastml_metadata[outerdir][split_name]['model_errors_train_cal'] = model_errors_train_cal.to_json()
-        if model_errors_test_cal is not None:
-            self.mastml_metadata[outerdir][split_name]['model_errors_test_cal'] = model_errors_test_cal.to_json()
-        if model_errors_leaveout_cal is not None:
-            self.mastml_metadata[outerdir][split_name]['model_errors_leaveout_cal'] = model_errors_leaveout_cal.to_json()
+            entry['leaveout_stats'] = leaveout_stats.to_json()
+        if train_columns is not None:
+            entry['train_columns'] = list(train_columns)
+        if data_files is not None and len(data_files) > 0:
+            # The data files are recorded relative to the savepath, so the run can be moved
+            entry['data_files'] = OrderedDict([(key, os.path.relpath(path, self.savepath))
+                                               for key, path in data_files.items()])
         if dataset_stdev is not None:
-            self.mastml_metadata[outerdir][split_name]['dataset_stdev'] = dataset_stdev
-        return
-
-    def _save_mastml_metadata(self):
-        with open(os.path.join(self.savepath, 'mastml_metadata.json'), 'w') as f:
-            json.dump(self.mastml_metadata, f)
+            entry['dataset_stdev'] = float(dataset_stdev)
+        if stage_times is not None:
+            entry['stage_times'] = dict(stage_times)
+        if failed_splits is not None:
+            entry['failed_splits'] = dict(failed_splits)
+        self._append_record({'type': 'split', 'outerdir': outerdir, 'split': split_name, 'metadata': entry})
         return
 
     @property
@@ -236,24 +207,90 @@ class Mastml():
 
     @property
     def get_mastml_metadata(self):
-        return self.mastml_metadata
+        # The metadata is read from disk, where the parallel worker processes also save theirs
+        return load_mastml_metadata(self.savepath)
+
 
-def parallel(func, x, *args, **kwargs):
+def load_mastml_metadata(savepath, load_data_files=True):
+    '''
+    Function to load the metadata of a MAST-ML run from its metadata journal, as a nested dict of
+    metadata[outerdir][split_name][key], in the form of the mastml_metadata.json file of earlier versions of MAST-ML
+
+    Args:
+        savepath: (str), the savepath of the MAST-ML run
+
+        load_data_files: (bool), whether to read the data arrays of each split (e.g. X_train, y_pred) back from their
+            data files. Default True. If False, the paths of the data files are kept as the data_files entry of each split
+
+    Returns:
+        mastml_metadata: (OrderedDict), the metadata of the run. The data arrays of each split are JSON strings (made
+            with the pandas to_json method), with a range index, as the data files don't keep the index of the data.
+            The X data is the data the splits are saved with, i.e. of the selected but not preprocessed features. Data
+            of the individual splits is only available if its files were written (see write_split_files of evaluate)
+    '''
+    mastml_metadata = OrderedDict()
+    metadata_path = os.path.join(savepath, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        return mastml_metadata
+    splits = OrderedDict()
+    with open(metadata_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line, object_pairs_hook=OrderedDict)
+            except ValueError:
+                # The last record may be partly written by an interrupted run
+                continue
+            if record['type'] == 'run':
+                mastml_metadata.update(record['metadata'])
+                continue
+            # A split updated again (e.g. the summary of left-out data) has its records merged
+            split_entry = splits.setdefault(record['outerdir'], OrderedDict()).setdefault(record['split'], OrderedDict())
+            data_files = split_entry.get('data_files', OrderedDict())
+            data_files.update(record['metadata'].get('data_files', dict()))
+            split_entry.update(record['metadata'])
+            if len(data_files) > 0:
+                split_entry['data_files'] = data_files
+
+    def _natural_key(name):
+        # So split_2 comes before split_10
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+    for outerdir in sorted(splits.keys(), key=_natural_key):
+        mastml_metadata[outerdir] = OrderedDict()
+        for split_name in sorted(splits[outerdir].keys(), key=_natural_key):
+            split_entry = splits[outerdir][split_name]
+            if load_data_files is True and 'data_files' in split_entry:
+                for key, path in split_entry.pop('data_files').items():
+                    path = os.path.join(savepath, path)
+                    if not os.path.exists(path):
+                        continue
+                    df = load_data(path)
+                    # The X data are dataframes, and the other data arrays series
+                    if key.startswith('X_'):
+                        split_entry[key] = df.to_json()
+                    else:
+                        split_entry[key] = df.iloc[:, 0].to_json()
+            mastml_metadata[outerdir][split_name] = split_entry
+    return mastml_metadata
+
+def parallel(func, x, *args, n_jobs=None, **kwargs):
     '''
     Run some function in parallel.
 
     inputs:
         func = The function to apply.
         x = The list of items to apply function on.
+        n_jobs = The number of worker processes to use. Defaults to the number of cores.
 
     outputs:
         data = List of items returned by func.
     '''
 
-    pool = Pool(os.cpu_count())
+    if n_jobs is None:
+        n_jobs = os.cpu_count()
     part_func = partial(func, *args, **kwargs)
 
-    with Pool(os.cpu_count()) as pool:
+    with Pool(n_jobs) as pool:
         data = list(pool.imap(part_func, x))
 
     return data
@@ -12,16 +12,18 @@ import joblib
 import numpy as np
 import os
 from mastml import feature_generators
+from mastml.file_formats import load_data, get_file_extensions
+from mastml.profiler import Profiler
 
 def make_prediction(X_test, model, X_test_extra=None, preprocessor=None, calibration_file=None, featurize=False,
-                    featurizer=None, features_to_keep=None, featurize_on=None, **kwargs):
+                    featurizer=None, features_to_keep=None, featurize_on=None, profile=None, savepath=None, **kwargs):
     '''
     Method used to take a saved preprocessor, model and calibration file and output predictions and calibrated uncertainties
     on new test data
 
     Args:
         X_test: (pd.DataFrame or str), dataframe of featurized test data to be used to make prediction, or string of path
-            containing featurized test data in .xlsx or .csv format ready for import with pandas. Only the features used
+            containing featurized test data in a supported file format (e.g. .xlsx, .csv or .parquet). Only the features used
             to fit the original model should be included, and they should be in the same order as the training data used
             to fit the original model.
 
@@ -29,7 +31,7 @@ def make_prediction(X_test, model, X_test_extra=None, preprocessor=None, calibra
 
         X_test_extra: (pd.DataFrame, list or str), dataframe containing the extra data associated with X_test, or a
             list of strings denoting extra columns present in X_test not to be used in prediction.
-            If a string is provided, it is interpreted as a path to a .xlsx or .csv file containing the extra column data
+            If a string is provided, it is interpreted as a path to a file (e.g. .xlsx or .csv) containing the extra column data
 
         preprocessor: (str), path of saved preprocessor in .pkl format (e.g., StandardScaler.pkl)
 
@@ -43,6 +45,12 @@ def make_prediction(X_test, model, X_test_extra=None, preprocessor=None, calibra
 
         featurize_on: (str), string of column name in X_test to perform featurization on
 
+        profile: (bool or str), whether to profile the prediction, and what to profile (see mastml.profiler.Profiler).
+            Default None means no profiling
+
+        savepath: (str), directory to save the profiles to, as make_prediction_profile files. Default None uses the
+            current directory
+
         **kwargs: additional key-value pairs of parameters for feature generator, e.g., composition_df=composition_df['Compositions'] if
             running ElementalFeatureGenerator
 
@@ -50,35 +58,30 @@ def make_prediction(X_test, model, X_test_extra=None, preprocessor=None, calibra
         pred_df: (pd.DataFrame), dataframe containing column of model predictions (y_pred) and, if applicable, calibrated uncertainties (y_err).
             Will also include any extra columns denoted in extra_columns parameter.
     '''
+    with Profiler(profile=profile).record(savepath=savepath, name='make_prediction_profile'):
+        pred_df = _make_prediction(X_test, model, X_test_extra=X_test_extra, preprocessor=preprocessor,
+                                   calibration_file=calibration_file, featurize=featurize, featurizer=featurizer,
+                                   features_to_keep=features_to_keep, featurize_on=featurize_on, **kwargs)
+    return pred_df
+
 
+def _make_prediction(X_test, model, X_test_extra=None, preprocessor=None, calibration_file=None, featurize=False,
+                     featurizer=None, features_to_keep=None, featurize_on=None, **kwargs):
     # Load model:
     model = joblib.load(model)
 
     # Check if recalibration params exist:
     if calibration_file is not None:
-        if '.xlsx' in calibration_file:
-            recal_params = pd.read_excel(calibration_file, engine='openpyxl')
-        elif '.csv' in calibration_file:
-            recal_params = pd.read_csv(calibration_file)
-        else:
-            raise ValueError('calibration_file should be either a .csv or .xlsx file to be loaded using pandas')
+        recal_params = load_data(calibration_file)
     else:
          recal_params = None
 
     if isinstance(X_test, str):
-        if '.xlsx' in X_test:
-            X_test = pd.read_excel(X_test, engine='openpyxl')
-        elif '.csv' in X_test:
-            X_test = pd.read_csv(X_test)
-        else:
-            raise ValueError('You must provide X_test as .xlsx or .csv file, or loaded pandas DataFrame')
+        X_test = load_data(X_test)
 
     if X_test_extra is not None:
         if isinstance(X_test_extra, str):
-            if '.xlsx' in X_test_extra:
-                df_extra = pd.read_excel(X_test_extra, engine='openpyxl')
-            elif '.csv' in X_test_extra:
-                df_extra = pd.read_csv(X_test_extra)
+            df_extra = load_data(X_test_extra)
         elif isinstance(X_test_extra, list):
             df_extra = X_test[X_test_extra]
             X_test = X_test.drop(X_test_extra, axis=1)
@@ -156,7 +159,7 @@ def make_prediction_dlhub(input_dict):
 
     Things that need to be uploaded:
         model.pkl (must have this name)
-        X_train.xlsx (or X_train.csv) (must have this name)
+        X_train.xlsx (or X_train.csv, or another supported file format) (must have this name)
     Optional to upload:
         preprocessor.pkl (must have this name)
 
@@ -188,19 +191,18 @@ def make_prediction_dlhub(input_dict):
     model = joblib.load(os.path.join(os.getcwd(), 'model.pkl'))
 
     # Load training data:
-    if os.path.exists('X_train.xlsx'):
-        X_train = pd.read_excel(os.path.join(os.getcwd(), 'X_train.xlsx'), engine='openpyxl')
-    elif os.path.exists('X_train.csv'):
-        X_train = pd.read_csv(os.path.join(os.getcwd(), 'X_train.csv'))
+    for file_extension in get_file_extensions():
+        if os.path.exists('X_train'+file_extension):
+            X_train = load_data(os.path.join(os.getcwd(), 'X_train'+file_extension))
+            break
     features_to_keep = X_train.columns.tolist()
 
     # Check if recalibration params exist:
-    if os.path.exists('calibration_file.xlsx'):
-         recal_params = pd.read_excel(os.path.join(os.getcwd(), 'calibration_file.xlsx'), engine='openpyxl')
-    elif os.path.exists('calibration_file.csv'):
-        recal_params = pd.read_csv(os.path.join(os.getcwd(), 'calibration_file.csv'))
-    else:
-        recal_params = None
+    recal_params = None
+    for file_extension in get_file_extensions():
+        if os.path.exists('calibration_file'+file_extension):
+            recal_params = load_data(os.path.join(os.getcwd(), 'calibration_file'+file_extension))
+            break
 
     if featurize == False:
         df_test = X_test
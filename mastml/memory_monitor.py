@@ -0,0 +1,214 @@
+"""
+This module contains a monitor of the memory used by a unit of work (e.g. the evaluation of one data split), used to
+report the peak resident memory (RSS) of each task of a run, and to stop a task going over a hard memory limit before
+it takes down the machine, or going over a time limit before it stalls the run. The memory is sampled by a background
+thread, so the monitor can be left on for every task.
+
+MemoryLimitError:
+    Exception raised in a unit of work going over its memory limit
+
+TimeLimitError:
+    Exception raised in a unit of work going over its time limit
+
+MemoryMonitor:
+    Class to record the peak memory of a unit of work, and stop it if it goes over a memory limit
+
+get_rss:
+    Method to get the resident memory (RSS) of the current process
+
+"""
+
+import os
+import sys
+import time
+import signal
+import _thread
+import threading
+from contextlib import contextmanager
+
+# psutil is an optional dependency, used to read the memory of the process on any platform
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class MemoryLimitError(MemoryError):
+    """
+    Exception raised in a unit of work going over its memory limit
+    """
+    pass
+
+
+class TimeLimitError(Exception):
+    """
+    Exception raised in a unit of work going over its time limit
+    """
+    pass
+
+
+def get_rss():
+    '''
+    Method to get the resident memory (RSS) of the current process
+
+    Args:
+        None
+
+    Returns:
+        rss: (int), the resident memory of the process in bytes, or None if it can't be read on this platform
+    '''
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # Without psutil or /proc, only the peak memory of the process can be read
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss*1024
+    except ImportError:
+        return None
+
+
+class MemoryMonitor():
+    """
+    Class to record the peak resident memory (RSS) of a unit of work, and stop it if it goes over a memory or time
+    limit. The memory of the process is sampled by a background thread while the unit runs. A unit going over the memory
+    (or time) limit is stopped with a MemoryLimitError (or TimeLimitError) raised at its next Python instruction, or once
+    it is done if it isn't run in the main thread (or the platform has no SIGUSR1 signal to interrupt it with)
+
+    Args:
+        memory_limit: (float), the memory limit of the unit in GB. Default None means no limit
+
+        interval: (float), the time between samples of the memory in seconds. Default 0.01
+
+        time_limit: (float), the time limit of the unit in seconds. Default None means no limit
+
+        relative_limit: (bool), whether the memory limit is on the memory the unit adds to the process, i.e. the
+            increase of the RSS over its value when the unit starts, rather than on the RSS of the whole process. Used
+            for units run in a process holding other memory, e.g. the main process of a serial run. Default False
+
+    Methods:
+        record: context manager to monitor the memory of the unit of work run in its block
+            Args:
+                None
+
+            Returns:
+                None
+
+        get_report: method to get the memory used by the last recorded unit
+            Args:
+                None
+
+            Returns:
+                report: (dict), dict of the pid of the process, the rss at the start of the unit and its peak during
+                    the unit (rss_start_mb and rss_peak_mb, in MB), the time the unit took (time_s, in seconds), and
+                    the status of the unit, 'done', 'memory_limit_exceeded' or 'time_limit_exceeded'
+    """
+    def __init__(self, memory_limit=None, interval=0.01, time_limit=None, relative_limit=False):
+        self.memory_limit = memory_limit
+        self.interval = interval
+        self.time_limit = time_limit
+        self.relative_limit = relative_limit
+        self.rss_start = None
+        self.rss_peak = None
+        self.exceeded = False
+        self.timed_out = False
+        self.time = None
+
+    @contextmanager
+    def record(self):
+        limit = self.memory_limit*1024**3 if self.memory_limit is not None else None
+        self.rss_start = get_rss()
+        self.rss_peak = self.rss_start
+        rss_base = self.rss_start if self.relative_limit is True and self.rss_start is not None else 0
+        self.exceeded = False
+        self.timed_out = False
+        self.time = None
+        time_started = time.time()
+        # The unit can only be interrupted by a signal handler, which can only be set in the main thread
+        interrupt = ((limit is not None or self.time_limit is not None) and hasattr(signal, 'SIGUSR1') and
+                     threading.current_thread() is threading.main_thread())
+        # Whether the signal stopping the unit was handled while it ran
+        interrupted = [False]
+        if interrupt:
+            def _handler(signum, frame):
+                interrupted[0] = True
+                if self.timed_out is True:
+                    raise TimeLimitError('Time limit of '+str(self.time_limit)+' s exceeded')
+                raise MemoryLimitError('Memory limit of '+str(self.memory_limit)+' GB exceeded')
+            old_handler = signal.signal(signal.SIGUSR1, _handler)
+        main_thread = threading.main_thread().ident
+        stop = threading.Event()
+
+        def _interrupt():
+            # A signal sent to the main thread also interrupts a blocking call (e.g. sleep or waiting on I/O), which
+            # interrupt_main alone doesn't
+            if hasattr(signal, 'pthread_kill'):
+                signal.pthread_kill(main_thread, signal.SIGUSR1)
+            else:
+                _thread.interrupt_main(signal.SIGUSR1)
+
+        def _sample():
+            while not stop.wait(self.interval):
+                # The unit is only interrupted once, for whichever limit it goes over first
+                stopped = self.exceeded or self.timed_out
+                if self.time_limit is not None and time.time() - time_started > self.time_limit and not stopped:
+                    self.timed_out = True
+                    stopped = True
+                    if interrupt:
+                        _interrupt()
+                rss = get_rss()
+                if rss is None:
+                    continue
+                self.rss_peak = rss if self.rss_peak is None else max(self.rss_peak, rss)
+                if limit is not None and rss - rss_base > limit and not stopped:
+                    self.exceeded = True
+                    if interrupt:
+                        _interrupt()
+
+        sampler = threading.Thread(target=_sample, daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            try:
+                try:
+                    # Stop the sampler, and ignore a signal it sends before it stops, as the unit is already done
+                    stop.set()
+                    if interrupt:
+                        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+                    sampler.join()
+                except (MemoryLimitError, TimeLimitError):
+                    # The unit is only sent one signal, which landed here before it could be ignored
+                    interrupted[0] = False
+                    stop.set()
+                    sampler.join()
+            finally:
+                if interrupt:
+                    signal.signal(signal.SIGUSR1, old_handler)
+            self.time = time.time() - time_started
+            rss = get_rss()
+            if rss is not None:
+                self.rss_peak = rss if self.rss_peak is None else max(self.rss_peak, rss)
+        if interrupt and interrupted[0] is False:
+            # A unit that can be interrupted is stopped by the signal. If the signal didn't land while it ran, the unit
+            # was done first, so it isn't failed
+            self.exceeded = False
+            self.timed_out = False
+            return
+        if self.exceeded is True:
+            raise MemoryLimitError('Memory limit of '+str(self.memory_limit)+' GB exceeded')
+        if self.timed_out is True:
+            raise TimeLimitError('Time limit of '+str(self.time_limit)+' s exceeded')
+        return
+
+    def get_report(self):
+        return {'pid': os.getpid(),
+                'rss_start_mb': self.rss_start/1024**2 if self.rss_start is not None else None,
+                'rss_peak_mb': self.rss_peak/1024**2 if self.rss_peak is not None else None,
+                'time_s': self.time,
+                'status': 'memory_limit_exceeded' if self.exceeded else 'time_limit_exceeded' if self.timed_out else 'done'}
@@ -38,6 +38,7 @@ from sklearn.exceptions import NotFittedError
 
 from mastml.metrics import Metrics
 from mastml.error_analysis import ErrorUtils
+from mastml.file_formats import save_data, load_data
 
 import matplotlib
 from matplotlib import pyplot as plt
@@ -98,6 +99,8 @@ class Scatter():
 
                 show_figure: (bool), whether or not to show the figure output (e.g. when using Jupyter notebook)
 
+                split_results: (mastml.split_results.SplitResults), in-memory results of each split. If None, the data is read from the split folders in savepath
+
             Returns:
                 None
 
@@ -113,6 +116,8 @@ class Scatter():
 
                 show_figure: (bool), whether or not to show the figure output (e.g. when using Jupyter notebook)
 
+                split_results: (mastml.split_results.SplitResults), in-memory results of each split. If None, the data is read from the split folders in savepath
+
             Returns:
                 None
 
@@ -128,6 +133,8 @@ class Scatter():
 
                 show_figure: (bool), whether or not to show the figure output (e.g. when using Jupyter notebook)
 
+                split_results: (mastml.split_results.SplitResults), in-memory results of each split. If None, the data is read from the split folders in savepath
+
             Returns:
                 None
 
@@ -219,10 +226,7 @@ class Scatter():
                                                                                       y_pred=np.array(y_pred)[np.where(groups==group)])
             stats_dict_group['Overall'] = Metrics(metrics_list=metrics_list).evaluate(y_true=y_true, y_pred=y_pred)
             stats_group_df = pd.DataFrame().from_dict(stats_dict_group, orient='index', columns=metrics_list)
-            if file_extension == '.xlsx':
-                stats_group_df.to_excel(os.path.join(savepath, str(data_type)+ '_stats_pergroup_summary' +'.xlsx'))
-            elif file_extension == '.csv':
-                stats_group_df.to_csv(os.path.join(savepath, str(data_type)+'_stats_pergroup_summary' +'.csv'))
+            save_data(stats_group_df, os.path.join(savepath, str(data_type)+'_stats_pergroup_summary' +file_extension))
 
             cls.plot_metric_vs_group(groups_unique, stats_group_df, metrics_list, savepath, data_type, show_figure, file_extension, image_dpi)
 
@@ -235,10 +239,7 @@ class Scatter():
             df = pd.DataFrame({'y true': y_true,
                                'y pred': y_pred,
                                'y err': ebars})
-            if file_extension == '.xlsx':
-                df.to_excel(os.path.join(savepath, 'parity_plot_withcalibratederrorbars_' + str(data_type) + '.xlsx'), index=False)
-            elif file_extension == '.csv':
-                df.to_csv(os.path.join(savepath, 'parity_plot_withcalibratederrorbars_' + str(data_type) + '.csv'), index=False)
+            save_data(df, os.path.join(savepath, 'parity_plot_withcalibratederrorbars_' + str(data_type) + file_extension), index=False)
         else:
             if groups is not None:
                 fig.savefig(os.path.join(savepath, 'parity_plot_grouplabels_' + str(data_type) + '.png'), dpi=image_dpi, bbox_inches='tight')
@@ -246,10 +247,7 @@ class Scatter():
                 fig.savefig(os.path.join(savepath, 'parity_plot_'+str(data_type) + '.png'), dpi=image_dpi, bbox_inches='tight')
             df = pd.DataFrame({'y true': y_true,
                                'y pred': y_pred})
-            if file_extension == '.xlsx':
-                df.to_excel(os.path.join(savepath, 'parity_plot_' + str(data_type) + '.xlsx'), index=False)
-            elif file_extension == '.csv':
-                df.to_csv(os.path.join(savepath, 'parity_plot_' + str(data_type) + '.csv'), index=False)
+            save_data(df, os.path.join(savepath, 'parity_plot_' + str(data_type) + file_extension), index=False)
 
         if show_figure == True:
             plt.show()
@@ -258,18 +256,19 @@ class Scatter():
         return
 
     @classmethod
-    def plot_best_worst_split(cls, savepath, data_type, x_label, metrics_list, show_figure=False, file_extension='.csv', image_dpi=250):
+    def plot_best_worst_split(cls, savepath, data_type, x_label, metrics_list, show_figure=False, file_extension='.csv', image_dpi=250,
+                              split_results=None):
 
-        dirs = os.listdir(savepath)
-        splitdirs = [d for d in dirs if 'split_' in d and '.png' not in d]
+        if split_results is not None:
+            stats_files_dict = split_results.get_stats(data_type=data_type)
+        else:
+            dirs = os.listdir(savepath)
+            splitdirs = [d for d in dirs if 'split_' in d and '.png' not in d]
 
-        stats_files_dict = dict()
-        for splitdir in splitdirs:
-            if file_extension == '.xlsx':
-                stats_files_dict[splitdir] = pd.read_excel(os.path.join(os.path.join(savepath, splitdir), data_type + '_stats_summary.xlsx'), engine='openpyxl').to_dict('records')[0]
-            elif file_extension == '.csv':
+            stats_files_dict = dict()
+            for splitdir in splitdirs:
                 stats_files_dict[splitdir] = \
-                pd.read_csv(os.path.join(os.path.join(savepath, splitdir), data_type + '_stats_summary.csv')).to_dict('records')[0]
+                load_data(os.path.join(os.path.join(savepath, splitdir), data_type + '_stats_summary'+file_extension)).to_dict('records')[0]
 
         # Find best/worst splits based on RMSE value
         rmse_best = 10**20
@@ -281,28 +280,28 @@ class Scatter():
             if stats_dict['root_mean_squared_error'] > rmse_worst:
                 worst_split = split
                 rmse_worst = stats_dict['root_mean_squared_error']
-        if file_extension == '.xlsx':
+        if split_results is not None:
             if data_type == 'test':
-                y_true_best = pd.read_excel(os.path.join(os.path.join(savepath, best_split), 'y_test.xlsx'), engine='openpyxl')
-                y_pred_best = pd.read_excel(os.path.join(os.path.join(savepath, best_split), 'y_pred.xlsx'), engine='openpyxl')
-                y_true_worst = pd.read_excel(os.path.join(os.path.join(savepath, worst_split), 'y_test.xlsx'), engine='openpyxl')
-                y_pred_worst = pd.read_excel(os.path.join(os.path.join(savepath, worst_split), 'y_pred.xlsx'), engine='openpyxl')
+                y_true_best = split_results[best_split]['y_test']
+                y_pred_best = split_results[best_split]['y_pred']
+                y_true_worst = split_results[worst_split]['y_test']
+                y_pred_worst = split_results[worst_split]['y_pred']
             elif data_type == 'train':
-                y_true_best = pd.read_excel(os.path.join(os.path.join(savepath, best_split), 'y_train.xlsx'), engine='openpyxl')
-                y_pred_best = pd.read_excel(os.path.join(os.path.join(savepath, best_split), 'y_pred_train.xlsx'), engine='openpyxl')
-                y_true_worst = pd.read_excel(os.path.join(os.path.join(savepath, worst_split), 'y_train.xlsx'), engine='openpyxl')
-                y_pred_worst = pd.read_excel(os.path.join(os.path.join(savepath, worst_split), 'y_pred_train.xlsx'), engine='openpyxl')
-        elif file_extension == '.csv':
+                y_true_best = split_results[best_split]['y_train']
+                y_pred_best = split_results[best_split]['y_pred_train']
+                y_true_worst = split_results[worst_split]['y_train']
+                y_pred_worst = split_results[worst_split]['y_pred_train']
+        else:
             if data_type == 'test':
-                y_true_best = pd.read_csv(os.path.join(os.path.join(savepath, best_split), 'y_test.csv'))
-                y_pred_best = pd.read_csv(os.path.join(os.path.join(savepath, best_split), 'y_pred.csv'))
-                y_true_worst = pd.read_csv(os.path.join(os.path.join(savepath, worst_split), 'y_test.csv'))
-                y_pred_worst = pd.read_csv(os.path.join(os.path.join(savepath, worst_split), 'y_pred.csv'))
+                y_true_best = load_data(os.path.join(os.path.join(savepath, best_split), 'y_test'+file_extension))
+                y_pred_best = load_data(os.path.join(os.path.join(savepath, best_split), 'y_pred'+file_extension))
+                y_true_worst = load_data(os.path.join(os.path.join(savepath, worst_split), 'y_test'+file_extension))
+                y_pred_worst = load_data(os.path.join(os.path.join(savepath, worst_split), 'y_pred'+file_extension))
             elif data_type == 'train':
-                y_true_best = pd.read_csv(os.path.join(os.path.join(savepath, best_split), 'y_train.csv'))
-                y_pred_best = pd.read_csv(os.path.join(os.path.join(savepath, best_split), 'y_pred_train.csv'))
-                y_true_worst = pd.read_csv(os.path.join(os.path.join(savepath, worst_split), 'y_train.csv'))
-                y_pred_worst = pd.read_csv(os.path.join(os.path.join(savepath, worst_split), 'y_pred_train.csv'))
+                y_true_best = load_data(os.path.join(os.path.join(savepath, best_split), 'y_train'+file_extension))
+                y_pred_best = load_data(os.path.join(os.path.join(savepath, best_split), 'y_pred_train'+file_extension))
+                y_true_worst = load_data(os.path.join(os.path.join(savepath, worst_split), 'y_train'+file_extension))
+                y_pred_worst = load_data(os.path.join(os.path.join(savepath, worst_split), 'y_pred_train'+file_extension))
 
 
         # Make the dataframe/array 1D if it isn't
@@ -346,7 +345,8 @@ class Scatter():
         return
 
     @classmethod
-    def plot_best_worst_per_point(cls, savepath, data_type, x_label, metrics_list, show_figure=False, file_extension='.csv', image_dpi=250):
+    def plot_best_worst_per_point(cls, savepath, data_type, x_label, metrics_list, show_figure=False, file_extension='.csv', image_dpi=250,
+                                  split_results=None):
 
         # Get lists of all ytrue and ypred for each split
         dirs = os.listdir(savepath)
@@ -355,24 +355,17 @@ class Scatter():
         y_true_list = list()
         y_pred_list = list()
         index_list = list()
-        if file_extension == '.xlsx':
-            for splitdir in splitdirs:
-                y_true_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_'+str(data_type)+'.xlsx'), engine='openpyxl'))
-                if data_type == 'test':
-                    y_pred_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_pred.xlsx'), engine='openpyxl'))
-                    index_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'test_inds.xlsx'), engine='openpyxl'))
-                elif data_type == 'train':
-                    y_pred_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_pred_train.xlsx'), engine='openpyxl'))
-                    index_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'train_inds.xlsx'), engine='openpyxl'))
-        elif file_extension == '.csv':
+        if split_results is not None:
+            y_true_list, y_pred_list, index_list, _ = split_results.get_plot_data(data_type=data_type)
+        else:
             for splitdir in splitdirs:
-                y_true_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_'+str(data_type)+'.csv')))
+                y_true_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_'+str(data_type)+file_extension)))
                 if data_type == 'test':
-                    y_pred_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_pred.csv')))
-                    index_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'test_inds.csv')))
+                    y_pred_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_pred'+file_extension)))
+                    index_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'test_inds'+file_extension)))
                 elif data_type == 'train':
-                    y_pred_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_pred_train.csv')))
-                    index_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'train_inds.csv')))
+                    y_pred_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_pred_train'+file_extension)))
+                    index_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'train_inds'+file_extension)))
 
         all_y_true = list()
         all_y_pred = list()
@@ -447,7 +440,7 @@ class Scatter():
 
     @classmethod
     def plot_predicted_vs_true_bars(cls, savepath, x_label, data_type, metrics_list, show_figure=False, ebars=None,
-                                    file_extension='.csv', image_dpi=250, groups=None):
+                                    file_extension='.csv', image_dpi=250, groups=None, split_results=None):
 
         # Get lists of all ytrue and ypred for each split
         dirs = os.listdir(savepath)
@@ -457,42 +450,26 @@ class Scatter():
         y_pred_list = list()
         data_ind_list = list()
         groups_list = list()
-        if file_extension == '.xlsx':
-            for splitdir in splitdirs:
-                y_true_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_'+str(data_type)+'.xlsx'), engine='openpyxl'))
-                if data_type == 'test':
-                    y_pred_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_pred.xlsx'), engine='openpyxl'))
-                    data_ind_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'test_inds.xlsx'), engine='openpyxl'))
-                    if groups is not None:
-                        groups_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'test_groups.xlsx'), engine='openpyxl'))
-                elif data_type == 'train':
-                    y_pred_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_pred_train.xlsx'), engine='openpyxl'))
-                    data_ind_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'train_inds.xlsx'), engine='openpyxl'))
-                    if groups is not None:
-                        groups_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'train_groups.xlsx'), engine='openpyxl'))
-                elif data_type == 'leaveout':
-                    y_pred_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'y_pred_leaveout.xlsx'), engine='openpyxl'))
-                    data_ind_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'leaveout_inds.xlsx'), engine='openpyxl'))
-                    if groups is not None:
-                        groups_list.append(pd.read_excel(os.path.join(os.path.join(savepath, splitdir), 'leaveout_groups.xlsx'), engine='openpyxl'))
-        elif file_extension == '.csv':
+        if split_results is not None:
+            y_true_list, y_pred_list, data_ind_list, groups_list = split_results.get_plot_data(data_type=data_type)
+        else:
             for splitdir in splitdirs:
-                y_true_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_' + str(data_type) + '.csv')))
+                y_true_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_' + str(data_type) + file_extension)))
                 if data_type == 'test':
-                    y_pred_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_pred.csv')))
-                    data_ind_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'test_inds.csv')))
+                    y_pred_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_pred'+file_extension)))
+                    data_ind_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'test_inds'+file_extension)))
                     if groups is not None:
-                        groups_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'test_groups.csv')))
+                        groups_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'test_groups'+file_extension)))
                 elif data_type == 'train':
-                    y_pred_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_pred_train.csv')))
-                    data_ind_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'train_inds.csv')))
+                    y_pred_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_pred_train'+file_extension)))
+                    data_ind_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'train_inds'+file_extension)))
                     if groups is not None:
-                        groups_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'train_groups.csv')))
+                        groups_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'train_groups'+file_extension)))
                 elif data_type == 'leaveout':
-                    y_pred_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'y_pred_leaveout.csv')))
-                    data_ind_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'leaveout_inds.csv')))
+                    y_pred_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'y_pred_leaveout'+file_extension)))
+                    data_ind_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'leaveout_inds'+file_extension)))
                     if groups is not None:
-                        groups_list.append(pd.read_csv(os.path.join(os.path.join(savepath, splitdir), 'leaveout_groups.csv')))
+                        groups_list.append(load_data(os.path.join(os.path.join(savepath, splitdir), 'leaveout_groups'+file_extension)))
 
         all_y_true = list()
         all_y_pred = list()
@@ -611,13 +588,15 @@ class Scatter():
                         markerfacecolor='blue', markeredgecolor='black', ecolor='blue',
                         markersize=10, alpha=0.7, capsize=3)
 
-        stats_files_dict = dict()
-        for splitdir in splitdirs:
-            if file_extension == '.xlsx':
-                stats_files_dict[splitdir] = pd.read_excel(os.path.join(os.path.join(savepath, splitdir), data_type + '_stats_summary.xlsx'), engine='openpyxl').to_dict('records')[0]
-            elif file_extension == '.csv':
-                stats_files_dict[splitdir] = pd.read_csv(os.path.join(os.path.join(savepath, splitdir), data_type + '_stats_summary.csv')).to_dict('records')[0]
-            metrics_list = list(stats_files_dict[splitdir].keys())
+        if split_results is not None:
+            stats_files_dict = split_results.get_stats(data_type=data_type)
+            splitdirs = list(stats_files_dict.keys())
+            metrics_list = list(stats_files_dict[splitdirs[0]].keys())
+        else:
+            stats_files_dict = dict()
+            for splitdir in splitdirs:
+                stats_files_dict[splitdir] = load_data(os.path.join(os.path.join(savepath, splitdir), data_type + '_stats_summary'+file_extension)).to_dict('records')[0]
+                metrics_list = list(stats_files_dict[splitdir].keys())
 
         avg_stats = dict()
         for metric in metrics_list:
@@ -638,10 +617,7 @@ class Scatter():
             df = pd.DataFrame({'y true': trues,
                                'average predicted values': preds,
                                'error bar values': df_avg['ebars']})
-            if file_extension == '.xlsx':
-                df.to_excel(os.path.join(savepath, 'parity_plot_allsplits_average_withcalibratederrorbars_' + str(data_type) + '.xlsx'), index=False)
-            elif file_extension == '.csv':
-                df.to_csv(os.path.join(savepath, 'parity_plot_allsplits_average_withcalibratederrorbars_' + str(data_type) + '.csv'), index=False)
+            save_data(df, os.path.join(savepath, 'parity_plot_allsplits_average_withcalibratederrorbars_' + str(data_type) + file_extension), index=False)
         else:
             if groups is not None:
                 fig.savefig(os.path.join(savepath, 'parity_plot_allsplits_average_grouplabels_' + str(data_type) + '.png'), dpi=image_dpi, bbox_inches='tight')
@@ -651,16 +627,10 @@ class Scatter():
             df = pd.DataFrame({'y true': trues,
                                'average predicted values': preds,
                                'error bar values': df_std['all_y_pred']})
-            if file_extension == '.xlsx':
-                df.to_excel(os.path.join(savepath, 'parity_plot_allsplits_average_'+str(data_type)+'.xlsx'), index=False)
-            elif file_extension == '.csv':
-                df.to_csv(os.path.join(savepath, 'parity_plot_allsplits_average_' + str(data_type) + '.csv'), index=False)
+            save_data(df, os.path.join(savepath, 'parity_plot_allsplits_average_' + str(data_type) + file_extension), index=False)
 
         df_stats = pd.DataFrame().from_dict(avg_stats)
-        if file_extension == '.xlsx':
-            df_stats.to_excel(os.path.join(savepath, str(data_type)+'_average_stdev_stats_summary.xlsx'), index=False)
-        elif file_extension == '.csv':
-            df_stats.to_csv(os.path.join(savepath, str(data_type) + '_average_stdev_stats_summary.csv'), index=False)
+        save_data(df_stats, os.path.join(savepath, str(data_type) + '_average_stdev_stats_summary'+file_extension), index=False)
 
         if show_figure == True:
             plt.show()
@@ -880,10 +850,7 @@ class Error():
             maxy = max(max(density_residuals(x)), max(norm.pdf(x, mu, sigma)))
             miny = min(min(density_residuals(x)), min(norm.pdf(x, mu, sigma)))
 
-        if file_extension == '.xlsx':
-            pd.DataFrame(data_dict).to_excel(os.path.join(savepath, 'normalized_error_data_'+str(data_type)+'.xlsx'))
-        elif file_extension == '.csv':
-            pd.DataFrame(data_dict).to_csv(os.path.join(savepath, 'normalized_error_data_' + str(data_type) + '.csv'))
+        save_data(pd.DataFrame(data_dict), os.path.join(savepath, 'normalized_error_data_' + str(data_type) + file_extension))
         ax.legend(loc=0, fontsize=12, frameon=False)
         ax.set_xlabel(r"$\mathrm{x}/\mathit{\sigma}$", fontsize=18)
         ax.set_ylabel("Probability density", fontsize=18)
@@ -937,10 +904,7 @@ class Error():
                 "model residuals": n_residuals}
         # Save this way to avoid issue with different array sizes in data_dict
         df = pd.DataFrame(dict([(k, pd.Series(v)) for k, v in data_dict.items()]))
-        if file_extension == '.xlsx':
-            df.to_excel(os.path.join(savepath, 'cumulative_normalized_errors_'+str(data_type)+'.xlsx'), index=False)
-        elif file_extension == '.csv':
-            df.to_csv(os.path.join(savepath, 'cumulative_normalized_errors_'+str(data_type)+'.csv'), index=False)
+        save_data(df, os.path.join(savepath, 'cumulative_normalized_errors_'+str(data_type)+file_extension), index=False)
 
         ax.legend(loc=0, fontsize=14, frameon=False)
         xlabels = np.linspace(2, 3, 3)
@@ -1399,12 +1363,8 @@ class Histogram():
         plot_stats(fig, dict(df.describe()), x_align=x_align, y_align=0.90, fontsize=12)
 
         # Save data to excel file and image
-        if file_extension == '.xlsx':
-            df.to_excel(os.path.join(savepath, file_name + '.xlsx'))
-            df.describe().to_excel(os.path.join(savepath, file_name + '_statistics.xlsx'))
-        elif file_extension == '.csv':
-            df.to_csv(os.path.join(savepath, file_name + '.csv'))
-            df.describe().to_csv(os.path.join(savepath, file_name + '_statistics.csv'))
+        save_data(df, os.path.join(savepath, file_name + file_extension))
+        save_data(df.describe(), os.path.join(savepath, file_name + '_statistics'+file_extension))
         fig.savefig(os.path.join(savepath, file_name + '.png'), dpi=image_dpi, bbox_inches='tight')
         if show_figure == True:
             plt.show()
@@ -1572,7 +1532,7 @@ class Classification():
             report_as_array.append([meta_names[i]] + meta_values[i])
 
         # EXCEL
-        pd.DataFrame(report_as_array).to_excel(os.path.join(savepath, 'classification_report_'+str(data_type)+'.xlsx'), index=False, header=None)
+        save_data(pd.DataFrame(report_as_array), os.path.join(savepath, 'classification_report_'+str(data_type)+'.xlsx'), index=False, header=None)
 
         # PLOT
         plot_metric_names = all_metric_names[:-1]
@@ -1680,7 +1640,7 @@ def plot_avg_score_vs_occurrence(savepath, occurrence, score, std_score):
 
 def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, residuals, model_errors, has_model_errors,
                savepath, data_type, X_test=None, show_figure=False, recalibrate_errors=False, model_errors_cal=None, splits_summary=False,
-               file_extension='.csv', image_dpi=250):
+               file_extension='.csv', image_dpi=250, split_results=None):
     """
     Helper function to make collections of different types of plots after a single or multiple data splits are evaluated.
 
@@ -1717,6 +1677,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
 
         splits_summary: (bool), whether or not the data used in the plots comes from a collection of many splits (default False), False denotes a single split folder
 
+        split_results: (mastml.split_results.SplitResults), in-memory results of each split used for the all-split summary plots. If None, the per-split data is read from the split folders in savepath
+
     Returns:
         None.
 
@@ -1793,7 +1755,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
                                                   metrics_list=metrics,
                                                   show_figure=show_figure,
                                                   file_extension=file_extension,
-                                                  image_dpi=image_dpi)
+                                                  image_dpi=image_dpi,
+                                                  split_results=split_results)
                 except:
                     print('Warning: unable to make Scatter.plot_best_worst_split plot. Skipping...')
                 try:
@@ -1803,7 +1766,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
                                                       metrics_list=metrics,
                                                       show_figure=show_figure,
                                                       file_extension=file_extension,
-                                                      image_dpi=image_dpi)
+                                                      image_dpi=image_dpi,
+                                                      split_results=split_results)
                 except:
                     print('Warning: unable to make Scatter.plot_best_worst_per_point plot. Skipping...')
             try:
@@ -1814,7 +1778,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
                                                     show_figure=show_figure,
                                                     file_extension=file_extension,
                                                     image_dpi=image_dpi,
-                                                    groups=None)
+                                                    groups=None,
+                                                    split_results=split_results)
                 if groups is not None:
                     Scatter.plot_predicted_vs_true_bars(savepath=savepath,
                                                         data_type=data_type,
@@ -1823,7 +1788,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
                                                         show_figure=show_figure,
                                                         file_extension=file_extension,
                                                         image_dpi=image_dpi,
-                                                        groups=groups)
+                                                        groups=groups,
+                                                        split_results=split_results)
                 if recalibrate_errors == True:
                     Scatter.plot_predicted_vs_true_bars(savepath=savepath,
                                                         data_type=data_type,
@@ -1833,7 +1799,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
                                                         ebars=model_errors_cal,
                                                         file_extension=file_extension,
                                                         image_dpi=image_dpi,
-                                                        groups=None)
+                                                        groups=None,
+                                                        split_results=split_results)
                     if groups is not None:
                         Scatter.plot_predicted_vs_true_bars(savepath=savepath,
                                                             data_type=data_type,
@@ -1843,7 +1810,8 @@ def make_plots(plots, y_true, y_pred, groups, dataset_stdev, metrics, model, res
                                                             ebars=model_errors_cal,
                                                             file_extension=file_extension,
                                                             image_dpi=image_dpi,
-                                                            groups=groups)
+                                                            groups=groups,
+                                                            split_results=split_results)
             except:
                 print('Warning: unable to make Scatter.plot_predicted_vs_true_bars plot. Skipping...')
 
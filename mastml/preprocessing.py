@@ -28,6 +28,8 @@ import joblib
 
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from mastml.file_formats import save_data
+
 class BasePreprocessor(BaseEstimator, TransformerMixin):
     """
     Base class to provide new methods beyond sklearn fit_transform, such as dataframe support and directory management
@@ -53,7 +55,9 @@ class BasePreprocessor(BaseEstimator, TransformerMixin):
 
                 savepath: (str), string containing main savepath to construct splits for saving output
 
-                file_extension: (str), must be either '.xlsx' or '.csv', determines data file type for saving
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
+
+                write_data: (bool), whether to save the preprocessed data to file. The fitted preprocessor is saved either way. Default True.
 
             Returns:
                 Xnew (pd.DataFrame or numpy array), dataframe or array of the preprocessed X features
@@ -96,7 +100,7 @@ class BasePreprocessor(BaseEstimator, TransformerMixin):
             return pd.DataFrame(self.preprocessor.fit_transform(X=X), columns=X.columns, index=X.index)
         return self.preprocessor.fit_transform(X=X)
 
-    def evaluate(self, X, y=None, savepath=None, file_name='', make_new_dir=False, file_extension='.csv'):
+    def evaluate(self, X, y=None, savepath=None, file_name='', make_new_dir=False, file_extension='.csv', write_data=True):
         if not savepath:
             savepath = os.getcwd()
         if make_new_dir is True:
@@ -105,13 +109,12 @@ class BasePreprocessor(BaseEstimator, TransformerMixin):
             savepath = splitdir
         if self.as_frame:
             Xnew = pd.DataFrame(self.preprocessor.fit_transform(X=X), columns=X.columns, index=X.index)
-            if file_extension == '.xlsx':
-                Xnew.to_excel(os.path.join(savepath, 'data_preprocessed_'+file_name+'.xlsx'))
-            elif file_extension == '.csv':
-                Xnew.to_csv(os.path.join(savepath, 'data_preprocessed_' + file_name + '.csv'))
+            if write_data is True:
+                save_data(Xnew, os.path.join(savepath, 'data_preprocessed_' + file_name + file_extension))
         else:
             Xnew = self.preprocessor.fit_transform(X=X)
-            np.savetxt(os.path.join(savepath, 'data_preprocessed_'+file_name+'.csv'), Xnew)
+            if write_data is True:
+                np.savetxt(os.path.join(savepath, 'data_preprocessed_'+file_name+'.csv'), Xnew)
 
         # Save the fitted preprocessor, will be needed for DLHub upload later on
         joblib.dump(self, os.path.join(savepath, str(self.preprocessor.__class__.__name__) + ".pkl"))
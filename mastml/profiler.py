@@ -0,0 +1,147 @@
+"""
+This module contains an opt-in profiler of units of work (e.g. the evaluation of one data split), used to find where
+the time and memory of a slow unit go. A unit can be profiled with cProfile (the time spent in each function),
+tracemalloc (the lines allocating the most memory), or a sampling profiler (pyinstrument, if installed). The profiles
+of each unit are saved next to its output, and the profiles of many units can be merged into one profile, e.g. of a
+full evaluate run whose splits were run in parallel workers.
+
+Profiler:
+    Class to profile units of work, save their profiles and merge the profiles of several units
+
+"""
+
+import os
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+from mastml.file_formats import save_data, load_data
+
+# pyinstrument is an optional dependency, only needed for the sampling profiler
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+
+class Profiler():
+    """
+    Class to profile units of work, save their profiles and merge the profiles of several units
+
+    Args:
+        profile: (bool or str), what to profile. True or 'all' profiles the time (with cProfile) and memory (with
+            tracemalloc), 'cpu' only profiles the time, 'memory' only profiles the memory, and 'sampling' profiles the
+            time with the pyinstrument sampling profiler (or cProfile if pyinstrument isn't installed). None or False
+            turns the profiler off, so recording a unit does nothing
+
+        top_allocations: (int), number of the lines allocating the most memory to save in the memory profiles.
+            Default 25
+
+    Methods:
+        record: context manager to profile the unit of work run in its block, and save its profiles
+            Args:
+                savepath: (str), directory to save the profiles to. Default None uses the current directory
+
+                name: (str), base name of the saved profile files. The time profile is saved as <name>.pstats (or
+                    <name>_sampling.txt for the sampling profiler) and the memory profile as <name>_allocations.csv,
+                    with the file and line, total size (KB) and number of the largest allocations still held at the
+                    end of the unit. Default 'profile'
+
+            Returns:
+                None
+
+        merge: method to merge the profiles of several units into one, e.g. of all the splits of a run
+            Args:
+                paths: (list), list of the profile paths of the units, i.e. the savepath joined with the name of each
+                    unit. Missing profiles are skipped. Sampling profiles aren't merged
+
+                savepath: (str), directory to save the merged profiles to
+
+                name: (str), base name of the merged profile files. The merged time profile is saved as <name>.pstats,
+                    with a text report of the functions taking the most cumulative time as <name>.txt, and the merged
+                    memory profile, with the allocations of each line summed over the units, as
+                    <name>_allocations.csv
+
+            Returns:
+                None
+    """
+    def __init__(self, profile=True, top_allocations=25):
+        if profile is True:
+            profile = 'all'
+        if profile not in [None, False, 'all', 'cpu', 'memory', 'sampling']:
+            raise ValueError("profile must be one of None, False, True, 'all', 'cpu', 'memory' or 'sampling'")
+        if profile == 'sampling' and pyinstrument is None:
+            print('Warning: pyinstrument is not installed, so cProfile is used instead of the sampling profiler. To '
+                  'use the sampling profiler, do "pip install pyinstrument"')
+            profile = 'cpu'
+        self.profile = profile
+        self.top_allocations = top_allocations
+
+    @contextmanager
+    def record(self, savepath=None, name='profile'):
+        if self.profile in [None, False]:
+            yield
+            return
+        if savepath is None:
+            savepath = os.getcwd()
+        cpu_profiler = None
+        sampling_profiler = None
+        if self.profile in ['all', 'cpu']:
+            cpu_profiler = cProfile.Profile()
+        elif self.profile == 'sampling':
+            sampling_profiler = pyinstrument.Profiler()
+        # Leave an already running tracemalloc (e.g. of an enclosing unit) running once this unit is done
+        trace_memory = self.profile in ['all', 'memory']
+        stop_tracing = trace_memory and not tracemalloc.is_tracing()
+        if stop_tracing:
+            tracemalloc.start()
+        if cpu_profiler is not None:
+            cpu_profiler.enable()
+        if sampling_profiler is not None:
+            sampling_profiler.start()
+        try:
+            yield
+        finally:
+            if cpu_profiler is not None:
+                cpu_profiler.disable()
+                cpu_profiler.dump_stats(os.path.join(savepath, name+'.pstats'))
+            if sampling_profiler is not None:
+                sampling_profiler.stop()
+                with open(os.path.join(savepath, name+'_sampling.txt'), 'w') as f:
+                    f.write(sampling_profiler.output_text())
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                if stop_tracing:
+                    tracemalloc.stop()
+                self._save_allocations(snapshot, os.path.join(savepath, name+'_allocations.csv'))
+        return
+
+    def _save_allocations(self, snapshot, path):
+        # Leave out the allocations of the profiling itself
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                           tracemalloc.Filter(False, __file__)])
+        rows = list()
+        for stat in snapshot.statistics('lineno')[:self.top_allocations]:
+            frame = stat.traceback[0]
+            rows.append({'location': frame.filename+':'+str(frame.lineno),
+                         'size_kb': stat.size/1024,
+                         'count': stat.count})
+        save_data(pd.DataFrame(rows, columns=['location', 'size_kb', 'count']), path, index=False)
+        return
+
+    def merge(self, paths, savepath, name='profile_merged'):
+        pstats_paths = [p+'.pstats' for p in paths if os.path.exists(p+'.pstats')]
+        if len(pstats_paths) > 0:
+            stats = pstats.Stats(*pstats_paths)
+            stats.dump_stats(os.path.join(savepath, name+'.pstats'))
+            with open(os.path.join(savepath, name+'.txt'), 'w') as f:
+                stats.stream = f
+                stats.sort_stats('cumulative').print_stats(50)
+        allocations = [load_data(p+'_allocations.csv') for p in paths if os.path.exists(p+'_allocations.csv')]
+        if len(allocations) > 0:
+            df = pd.concat(allocations).groupby('location', as_index=False)[['size_kb', 'count']].sum()
+            df = df.sort_values('size_kb', ascending=False).head(self.top_allocations)
+            save_data(df, os.path.join(savepath, name+'_allocations.csv'), index=False)
+        return
@@ -0,0 +1,319 @@
+"""
+This module contains a catalog of the results of MAST-ML runs, kept in a local SQLite database, so the results of many
+past runs (e.g. the best model for a dataset) can be found with an indexed query rather than by walking the save
+directories of each run and reading their stats summary files. Data splitter evaluate runs, learning curves and
+hyperparameter optimizations register into the catalog when one is passed to them. Each run is recorded with its
+configuration, a hash of its dataset, its start and finish times, its per-split and summary metrics, and the paths of
+its main output files.
+
+ResultsCatalog:
+    Class to register the results of runs in the catalog database, and query them
+
+"""
+
+import os
+import json
+import time
+import sqlite3
+import joblib
+import pandas as pd
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT,
+    savepath TEXT,
+    dataset_hash TEXT,
+    model TEXT,
+    splitter TEXT,
+    preprocessor TEXT,
+    selector TEXT,
+    hyperopt TEXT,
+    config TEXT,
+    time_started REAL,
+    time_finished REAL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER REFERENCES runs(run_id) ON DELETE CASCADE,
+    split TEXT,
+    data_type TEXT,
+    metric TEXT,
+    value REAL,
+    stdev REAL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT,
+    path TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_dataset ON runs (dataset_hash, kind);
+CREATE INDEX IF NOT EXISTS metrics_summary ON metrics (metric, data_type, split, value);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id);
+'''
+
+_RUN_COLUMNS = ['run_id', 'kind', 'savepath', 'dataset_hash', 'model', 'splitter', 'preprocessor', 'selector',
+                'hyperopt', 'config', 'time_started', 'time_finished']
+
+
+class ResultsCatalog():
+    """
+    Class to register the results of runs in a catalog database, and query them. The database is made if it doesn't
+    exist, and can be shared by any number of runs
+
+    Args:
+        db_path: (str), path of the SQLite database file of the catalog, e.g. 'mastml_catalog.db'
+
+    Methods:
+        get_dataset_hash: method to get the hash of a dataset, used to find the runs done on the same data
+            Args:
+                X: (pd.DataFrame), dataframe of X feature data
+
+                y: (pd.Series), series of y target data
+
+            Returns:
+                dataset_hash: (str), the hash of the dataset
+
+        get_name: method to get the name of a run component, e.g. the class name of the model of a MAST-ML model
+            Args:
+                obj: (object), the component, e.g. a mastml.models instance, or None
+
+            Returns:
+                name: (str), the class name of the component, or None
+
+        get_params: method to get the parameters of a run component, to save in the run configuration
+            Args:
+                obj: (object), the component, e.g. a mastml.models instance, or None
+
+            Returns:
+                params: (dict), dict of the parameters of the component
+
+        add_run: method to register a run
+            Args:
+                kind: (str), the kind of run, e.g. 'evaluate', 'learning_curve' or 'hyperopt'
+
+                savepath: (str), path of the save directory of the run, saved as an absolute path
+
+                dataset_hash: (str), the hash of the dataset of the run, made with get_dataset_hash
+
+                model: (str), name of the model of the run
+
+                splitter: (str), name of the data splitter of the run
+
+                preprocessor: (str), name of the preprocessor of the run
+
+                selector: (str), name of the feature selector of the run
+
+                hyperopt: (str), name of the hyperparameter optimizer of the run
+
+                config: (dict), dict of the configuration of the run, e.g. the parameters of its components. Values
+                    that aren't JSON serializable are saved as strings
+
+                time_started: (float), time the run started, in seconds since the epoch
+
+                time_finished: (float), time the run finished, in seconds since the epoch. Default None uses the
+                    current time
+
+            Returns:
+                run_id: (int), the id of the run in the catalog
+
+        add_metrics: method to register the metrics of a run, of one split or of the summary over the splits
+            Args:
+                run_id: (int), the id of the run
+
+                metrics: (dict or pd.DataFrame), dict of {metric name: value}, or dataframe of the average (first row)
+                    and standard deviation (second row) of each metric over the splits, as made by
+                    SplitResults.get_average_stdev_stats
+
+                data_type: (str), the data the metrics are of, e.g. 'train', 'test' or 'leaveout'
+
+                split: (str), name of the split the metrics are of. Default None means the metrics are the summary
+                    over the splits of the run
+
+            Returns:
+                None
+
+        add_artifact: method to register the path of an output file of a run
+            Args:
+                run_id: (int), the id of the run
+
+                name: (str), name of the output, e.g. 'model'
+
+                path: (str), path of the output file or directory, saved as an absolute path
+
+            Returns:
+                None
+
+        get_runs: method to get the runs of the catalog, optionally only those matching some run fields
+            Args:
+                **kwargs: run fields to match, e.g. kind='evaluate', dataset_hash='...' or model='Ridge'
+
+            Returns:
+                df_runs: (pd.DataFrame), dataframe of the matching runs
+
+        get_top_runs: method to get the best runs by a summary metric
+            Args:
+                metric: (str), name of the metric to rank the runs by, e.g. 'root_mean_squared_error'
+
+                k: (int), number of runs to get. Default 10
+
+                data_type: (str), the data of the metric to rank by, e.g. 'test' or 'leaveout'. Default 'test'
+
+                greater_is_better: (bool), whether a larger metric is better. Default None looks it up in the
+                    MAST-ML metrics, and otherwise takes a smaller metric as better
+
+                **kwargs: run fields to match, e.g. kind='evaluate' or dataset_hash='...'
+
+            Returns:
+                df_runs: (pd.DataFrame), dataframe of the best runs, with the metric value and stdev, best first
+
+        get_metrics: method to get all the metrics of a run
+            Args:
+                run_id: (int), the id of the run
+
+            Returns:
+                df_metrics: (pd.DataFrame), dataframe of the split, data_type, metric, value and stdev of each metric
+
+        get_artifacts: method to get the output files of a run
+            Args:
+                run_id: (int), the id of the run
+
+            Returns:
+                artifacts: (dict), dict of {output name: path}
+
+        remove_run: method to remove a run and its metrics and output paths from the catalog
+            Args:
+                run_id: (int), the id of the run
+
+            Returns:
+                None
+    """
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # A connection per call keeps the catalog picklable, and lets several processes share the database. The
+        # timeout waits for a write by another process to finish rather than failing
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def get_dataset_hash(self, X, y=None):
+        return joblib.hash([X, y])
+
+    def get_name(self, obj):
+        if obj is None:
+            return None
+        if isinstance(obj, str):
+            return obj
+        for attr in ['model', 'splitter', 'preprocessor', 'selector']:
+            if hasattr(obj, attr) and not isinstance(getattr(obj, attr), (str, type(None))):
+                return getattr(obj, attr).__class__.__name__
+        return obj.__class__.__name__
+
+    def get_params(self, obj):
+        if obj is None:
+            return dict()
+        params = None
+        for o in [getattr(obj, attr, None) for attr in ['model', 'splitter', 'preprocessor', 'selector']] + [obj]:
+            if o is not None and not isinstance(o, str) and hasattr(o, 'get_params'):
+                try:
+                    params = o.get_params(deep=False)
+                except TypeError:
+                    params = o.get_params()
+                break
+        if params is None:
+            params = {k: v for k, v in vars(obj).items() if not k.startswith('_')}
+        # Some components hold themselves as a parameter (e.g. NoPreprocessor), which can't be saved as a string
+        return {k: v.__class__.__name__ if v is obj or v is o else v for k, v in params.items()}
+
+    def add_run(self, kind, savepath=None, dataset_hash=None, model=None, splitter=None, preprocessor=None,
+                selector=None, hyperopt=None, config=None, time_started=None, time_finished=None):
+        if time_finished is None:
+            time_finished = time.time()
+        if config is not None:
+            config = json.dumps(config, default=str)
+        if savepath is not None:
+            savepath = os.path.abspath(savepath)
+        with self._connect() as conn:
+            cursor = conn.execute('INSERT INTO runs (kind, savepath, dataset_hash, model, splitter, preprocessor, '
+                                  'selector, hyperopt, config, time_started, time_finished) '
+                                  'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                  (kind, savepath, dataset_hash, model, splitter, preprocessor, selector, hyperopt,
+                                   config, time_started, time_finished))
+            run_id = cursor.lastrowid
+        conn.close()
+        return run_id
+
+    def add_metrics(self, run_id, metrics, data_type, split=None):
+        if metrics is None:
+            return
+        rows = list()
+        if isinstance(metrics, pd.DataFrame):
+            for metric in metrics.columns:
+                rows.append((int(run_id), split, data_type, metric, float(metrics[metric].iloc[0]),
+                             float(metrics[metric].iloc[1]) if metrics.shape[0] > 1 else None))
+        else:
+            for metric, value in metrics.items():
+                rows.append((int(run_id), split, data_type, metric, float(value), None))
+        with self._connect() as conn:
+            conn.executemany('INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?)', rows)
+        conn.close()
+        return
+
+    def add_artifact(self, run_id, name, path):
+        with self._connect() as conn:
+            conn.execute('INSERT INTO artifacts VALUES (?, ?, ?)', (int(run_id), name, os.path.abspath(path)))
+        conn.close()
+        return
+
+    def _get_where(self, kwargs, prefix='runs.'):
+        for key in kwargs.keys():
+            if key not in _RUN_COLUMNS:
+                raise ValueError('Unknown run field '+str(key)+'. The run fields are '+str(_RUN_COLUMNS))
+        where = ' AND '.join([prefix+key+' = ?' for key in kwargs.keys()])
+        return where, list(kwargs.values())
+
+    def _query(self, sql, params):
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+        return df
+
+    def get_runs(self, **kwargs):
+        where, params = self._get_where(kwargs, prefix='')
+        sql = 'SELECT * FROM runs'
+        if where:
+            sql += ' WHERE '+where
+        return self._query(sql+' ORDER BY run_id', params)
+
+    def get_top_runs(self, metric, k=10, data_type='test', greater_is_better=None, **kwargs):
+        if greater_is_better is None:
+            from mastml.metrics import Metrics
+            metrics = Metrics(metrics_list=None)._metric_zoo()
+            greater_is_better = metrics[metric][0] if metric in metrics else False
+        where, params = self._get_where(kwargs)
+        sql = ('SELECT runs.*, metrics.value AS value, metrics.stdev AS stdev FROM metrics '
+               'JOIN runs ON runs.run_id = metrics.run_id '
+               'WHERE metrics.metric = ? AND metrics.data_type = ? AND metrics.split IS NULL')
+        if where:
+            sql += ' AND '+where
+        sql += ' ORDER BY metrics.value '+('DESC' if greater_is_better else 'ASC')+' LIMIT ?'
+        return self._query(sql, [metric, data_type]+params+[int(k)])
+
+    def get_metrics(self, run_id):
+        return self._query('SELECT split, data_type, metric, value, stdev FROM metrics WHERE run_id = ?', [int(run_id)])
+
+    def get_artifacts(self, run_id):
+        df = self._query('SELECT name, path FROM artifacts WHERE run_id = ?', [int(run_id)])
+        return dict(zip(df['name'], df['path']))
+
+    def remove_run(self, run_id):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM runs WHERE run_id = ?', (int(run_id),))
+        conn.close()
+        return
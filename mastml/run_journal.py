@@ -0,0 +1,229 @@
+"""
+This module contains a journal of the work done by a data splitter evaluate run, so an interrupted run (e.g. killed by
+a walltime limit or running out of memory) can be resumed rather than restarted. The journal is an append-only file in
+the run save directory, recording the save directory of each (model, selector) job, each split evaluated for a job,
+and each job fully summarized. The splits of the run are saved with the journal, so a resumed run uses the same splits.
+Several evaluate runs (e.g. of different splitters) can share a save directory and journal, as the jobs and splits are
+recorded under the name of their run.
+
+RunJournal:
+    Class to record and look up the work done by an evaluate run
+
+"""
+
+import os
+import json
+import inspect
+import joblib
+
+from mastml.split_plan import SplitPlan
+
+
+class RunJournal():
+    """
+    Class to record and look up the work done by an evaluate run. The journal entries are loaded from the journal file
+    of the save directory, if any, and new entries are appended to it
+
+    Args:
+        savepath: (str), path of the save directory of the run
+
+    Methods:
+        get_run_name: method to get the name of an evaluate run, from its splitter
+            Args:
+                splitter: (mastml.data_splitters instance), the splitter of the run
+
+            Returns:
+                run_name: (str), the name of the run
+
+        start_run: method to record the start of a new (not resumed) run, which drops the entries of the previous runs of the same name
+            Args:
+                run_name: (str), the name of the run
+
+            Returns:
+                None
+
+        get_job_key: method to get the key of a job, from its run, its position in the run and what it evaluates
+            Args:
+                run_name: (str), the name of the run
+
+                job_count: (int), position of the job in the run
+
+                model: (mastml.models instance), the (unfitted) model of the job
+
+                selector: (mastml.feature_selectors instance), the (unfitted) selector of the job
+
+                preprocessor: (mastml.preprocessing instance), the (unfitted) preprocessor of the job
+
+                hyperopt: (mastml.hyperopt instance), the hyperparameter optimizer of the job, or None
+
+            Returns:
+                job_key: (str), the key of the job
+
+        get_splitdir: method to get the save directory of a job, if recorded
+            Args:
+                job_key: (str), the key of the job
+
+            Returns:
+                splitdir: (str), the path of the save directory of the job, or None if the job isn't recorded
+
+        add_job: method to record the save directory of a job
+            Args:
+                job_key: (str), the key of the job
+
+                splitdir: (str), the path of the save directory of the job
+
+            Returns:
+                None
+
+        add_split: method to record a split evaluated for a job
+            Args:
+                job_key: (str), the key of the job
+
+                split_key: (tuple), the (outer split name or None, split name) of the split
+
+            Returns:
+                None
+
+        get_splits_done: method to get the splits evaluated for a job
+            Args:
+                job_key: (str), the key of the job
+
+            Returns:
+                split_keys: (set), set of the (outer split name or None, split name) of the evaluated splits
+
+        add_job_done: method to record a job fully summarized
+            Args:
+                job_key: (str), the key of the job
+
+            Returns:
+                None
+
+        is_job_done: method to get whether a job was fully summarized
+            Args:
+                job_key: (str), the key of the job
+
+            Returns:
+                job_done: (bool), whether the job was fully summarized
+
+        save_splits: method to save the splits of the run
+            Args:
+                run_name: (str), the name of the run
+
+                split_plan: (mastml.split_plan.SplitPlan), the plan of the splits of the run (e.g. the train/test splits and left-out indices), saved as a compact .npz file
+
+            Returns:
+                None
+
+        load_splits: method to load the splits of the run
+            Args:
+                run_name: (str), the name of the run
+
+            Returns:
+                split_plan: (mastml.split_plan.SplitPlan), the plan of the splits of the run, or None if they weren't saved
+    """
+    def __init__(self, savepath):
+        self.savepath = savepath
+        self.journal_path = os.path.join(savepath, 'run_journal.jsonl')
+        self.splitdirs = dict()
+        self.splits_done = dict()
+        self.jobs_done = set()
+        if os.path.exists(self.journal_path):
+            self._load()
+
+    def _load(self):
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partly written last entry of an interrupted run
+                    continue
+                if entry['type'] == 'run':
+                    # A new (not resumed) run drops the entries of the previous runs of the same name
+                    self._drop_run(entry['run'])
+                    continue
+                job_key = entry['job']
+                if entry['type'] == 'job':
+                    self.splitdirs[job_key] = entry['splitdir']
+                elif entry['type'] == 'split':
+                    self.splits_done.setdefault(job_key, set()).add((entry['outer'], entry['split']))
+                elif entry['type'] == 'job_done':
+                    self.jobs_done.add(job_key)
+        return
+
+    def _drop_run(self, run_name):
+        for entries in [self.splitdirs, self.splits_done]:
+            for job_key in [k for k in entries.keys() if k.startswith(run_name+'_')]:
+                del entries[job_key]
+        self.jobs_done = set([k for k in self.jobs_done if not k.startswith(run_name+'_')])
+        return
+
+    def _append(self, entry):
+        # Each entry is flushed to disk right away, so it survives the run being killed
+        with open(self.journal_path, 'a') as f:
+            f.write(json.dumps(entry)+'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return
+
+    def get_run_name(self, splitter):
+        # Only the constructor parameters of the splitter are hashed, not the attributes filled in by split (e.g. caches)
+        # or evaluate, so the name is the same before and after the splitter is used
+        params = dict()
+        for name, param in inspect.signature(splitter.__class__.__init__).parameters.items():
+            if name == 'self' or param.kind in [param.VAR_POSITIONAL, param.VAR_KEYWORD]:
+                continue
+            value = getattr(splitter, name, None)
+            # A scikit-learn object made from a parameter (e.g. the splitter or clustering method, which is fit in place)
+            # is hashed by its own parameters, which hold the keyword arguments it was made with
+            if hasattr(value, 'get_params'):
+                value = [value.__class__.__name__, value.get_params()]
+            params[name] = value
+        return splitter.__class__.__name__+'_'+joblib.hash(params)[:10]
+
+    def start_run(self, run_name):
+        self._drop_run(run_name)
+        self._append({'type': 'run', 'run': run_name})
+        return
+
+    def get_job_key(self, run_name, job_count, model, selector, preprocessor, hyperopt=None):
+        return run_name+'_'+str(job_count)+'_'+joblib.hash([model, selector, preprocessor, hyperopt])[:10]
+
+    def get_splitdir(self, job_key):
+        if job_key not in self.splitdirs:
+            return None
+        # Directories are recorded relative to the save directory, so the run can be moved before resuming it
+        return os.path.join(self.savepath, self.splitdirs[job_key])
+
+    def add_job(self, job_key, splitdir):
+        self.splitdirs[job_key] = os.path.relpath(splitdir, self.savepath)
+        self._append({'type': 'job', 'job': job_key, 'splitdir': self.splitdirs[job_key]})
+        return
+
+    def add_split(self, job_key, split_key):
+        self.splits_done.setdefault(job_key, set()).add(tuple(split_key))
+        self._append({'type': 'split', 'job': job_key, 'outer': split_key[0], 'split': split_key[1]})
+        return
+
+    def get_splits_done(self, job_key):
+        return set(self.splits_done.get(job_key, set()))
+
+    def add_job_done(self, job_key):
+        self.jobs_done.add(job_key)
+        self._append({'type': 'job_done', 'job': job_key})
+        return
+
+    def is_job_done(self, job_key):
+        return job_key in self.jobs_done
+
+    def _get_splits_path(self, run_name):
+        return os.path.join(self.savepath, 'run_journal_splits_'+run_name+'.npz')
+
+    def save_splits(self, run_name, split_plan):
+        split_plan.save(self._get_splits_path(run_name))
+        return
+
+    def load_splits(self, run_name):
+        if not os.path.exists(self._get_splits_path(run_name)):
+            return None
+        return SplitPlan.load(self._get_splits_path(run_name))
@@ -0,0 +1,117 @@
+"""
+This module contains helpers to share the data of a parallel run (e.g. the X feature matrix, y data and groups) with
+the worker processes without pickling it into every task. The data is saved once to a temporary directory: numeric
+data as a .npy file that each worker memory-maps (so all processes read the same pages rather than holding their own
+copy), and other data (e.g. string-valued X_extra or groups) as a joblib pickle that each worker loads once. The tasks
+sent to the workers then only need to hold the split indices and the lightweight SharedData handles.
+
+SharedData:
+    Class holding the location of a dataframe or series saved for sharing with worker processes. It is cheap to pickle
+    and loads the data once per process.
+
+share_data:
+    Function to save a list of dataframes/series to a directory and return a list of SharedData handles to them
+
+load_shared_data:
+    Function to load a list of SharedData handles back to dataframes/series (items that are not SharedData are
+    returned as is)
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import joblib
+
+# The shared data loaded in this process, keyed by file path, so each worker process only loads the data once
+_loaded_data = dict()
+
+
+class SharedData():
+    """
+    Class holding the location of a dataframe or series saved for sharing with the worker processes of a parallel run
+
+    Args:
+        data: (pd.DataFrame or pd.Series), the data to share
+
+        filepath: (str), path of the file to save the data to, without a file extension
+
+    Methods:
+        load: method to load the shared data. The data is loaded once per process, and numeric data is memory-mapped
+            (read-only) rather than read into memory
+            Args:
+                None
+
+            Returns:
+                data: (pd.DataFrame or pd.Series), the shared data
+    """
+    def __init__(self, data, filepath):
+        self.filepath = filepath
+        if isinstance(data, pd.Series):
+            dtypes = [data.dtype]
+        else:
+            dtypes = list(data.dtypes)
+        # Only data of a single numeric dtype can be memory-mapped without changing the dtypes of the columns
+        self.is_mmap = len(set(dtypes)) == 1 and isinstance(dtypes[0], np.dtype) and dtypes[0].kind in 'biuf'
+        if self.is_mmap is True:
+            np.save(filepath+'.npy', np.ascontiguousarray(data.to_numpy()))
+            if isinstance(data, pd.Series):
+                meta = {'index': data.index, 'name': data.name}
+            else:
+                meta = {'index': data.index, 'columns': data.columns}
+            joblib.dump(meta, filepath+'_meta.pkl')
+        else:
+            joblib.dump(data, filepath+'.pkl')
+
+    def load(self):
+        if self.filepath not in _loaded_data:
+            # Drop the data of previous parallel runs (the worker processes of a pathos pool are reused between runs)
+            for filepath in list(_loaded_data.keys()):
+                if os.path.dirname(filepath) != os.path.dirname(self.filepath):
+                    del _loaded_data[filepath]
+            _loaded_data[self.filepath] = self._load()
+        return _loaded_data[self.filepath]
+
+    def _load(self):
+        if self.is_mmap is False:
+            return joblib.load(self.filepath+'.pkl')
+        values = np.load(self.filepath+'.npy', mmap_mode='r')
+        meta = joblib.load(self.filepath+'_meta.pkl')
+        if 'columns' in meta:
+            return pd.DataFrame(values, index=meta['index'], columns=meta['columns'], copy=False)
+        return pd.Series(values, index=meta['index'], name=meta['name'], copy=False)
+
+
+def share_data(data, savepath):
+    '''
+    Function to save a list of dataframes/series for sharing with the worker processes of a parallel run
+
+    Args:
+        data: (list), list of pd.DataFrame or pd.Series to share. None entries are kept as None.
+
+        savepath: (str), path of the (temporary) directory to save the data files to
+
+    Returns:
+        shared: (list), list of SharedData handles to the saved data
+    '''
+    shared = list()
+    for i, d in enumerate(data):
+        if d is None:
+            shared.append(None)
+        else:
+            shared.append(SharedData(data=d, filepath=os.path.join(savepath, 'shared_data_'+str(i))))
+    return shared
+
+
+def load_shared_data(data):
+    '''
+    Function to load a list of shared data
+
+    Args:
+        data: (list), list of SharedData handles. Other entries (e.g. dataframes when running serially, or None) are
+            returned as is.
+
+    Returns:
+        data: (list), list of the loaded data
+    '''
+    return [d.load() if isinstance(d, SharedData) else d for d in data]
@@ -0,0 +1,272 @@
+"""
+This module contains a plan of the data splits of an evaluate run, i.e. the train/test indices of each split (and for
+nested cross validation, the left-out indices and the inner splits of each outer split). A plan is made once by a data
+splitter and can then be reused to evaluate other models, in other runs or on other machines, without remaking the
+splits, which is costly for some splitters (e.g. LeaveOutTwinCV or LeaveCloseCompositionsOut) and not reproducible for
+others. The plan is saved as a single compressed .npz file holding the indices of all the splits as int32 arrays, with
+a fingerprint of the data it was made for, so it isn't used on different data by mistake.
+
+PackedSplits:
+    Class holding the train/test indices of a set of splits compactly, made one split at a time from a split generator
+
+SplitPlan:
+    Class holding the train/test indices of the splits of a run, which can be checked against the data, saved and loaded
+
+"""
+
+import numpy as np
+import joblib
+
+
+def _compact(inds):
+    # Indices are held as int32 unless there are too many rows
+    inds = np.asarray(inds)
+    if inds.size == 0 or (inds.min() >= np.iinfo(np.int32).min and inds.max() <= np.iinfo(np.int32).max):
+        return inds.astype(np.int32)
+    return inds.astype(np.int64)
+
+
+def _pack(arrays, name, inds):
+    # The index arrays are concatenated into one array, with the offset of each array in it
+    arrays[name] = _compact(np.concatenate(inds)) if len(inds) > 0 else np.array([], dtype=np.int32)
+    arrays[name+'_offsets'] = np.cumsum([0]+[len(i) for i in inds]).astype(np.int64)
+    return
+
+
+def _unpack(arrays, name):
+    values = arrays[name]
+    offsets = arrays[name+'_offsets']
+    return [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+class PackedSplits():
+    """
+    Class holding the train/test indices of a set of splits compactly. The splits are added one at a time (e.g. straight
+    from the split generator of a splitter, which is never held as a list), and the indices of each split are kept as
+    int32 arrays. A training set that is all the rows not in the test set, as made by most splitters, isn't kept, but
+    remade when the split is used, so e.g. the many splits of leave-one-out style splitters only hold their test indices.
+    The splits can be counted, indexed and iterated over like a list of (train indices, test indices)
+
+    Args:
+        splits: (iterable), iterable of the (train indices, test indices) of each split. Default None makes an empty set
+
+    Methods:
+        append: method to add a split
+            Args:
+                train: (numpy array), array of the train indices of the split
+
+                test: (numpy array), array of the test indices of the split
+
+            Returns:
+                None
+    """
+    def __init__(self, splits=None):
+        self._trains = list()
+        self._tests = list()
+        # The number of rows of the splits whose training set is the rows not in their test set, and -1 for the others
+        self._sizes = list()
+        if splits is not None:
+            for train, test in splits:
+                self.append(train, test)
+
+    def append(self, train, test):
+        # The indices may be given as the tuple made by np.where for a 1d array
+        train = np.asarray(train).ravel()
+        test = np.asarray(test).ravel()
+        size = len(train) + len(test)
+        is_complement = False
+        if len(test) == 0 or (test.min() >= 0 and test.max() < size):
+            is_test = np.zeros(size, dtype=bool)
+            is_test[test] = True
+            is_complement = np.array_equal(train, np.flatnonzero(~is_test))
+        self._tests.append(_compact(test))
+        self._trains.append(None if is_complement else _compact(train))
+        self._sizes.append(size if is_complement else -1)
+        return
+
+    def __len__(self):
+        return len(self._tests)
+
+    def __getitem__(self, i):
+        test = self._tests[i].astype(np.intp)
+        if self._sizes[i] >= 0:
+            is_test = np.zeros(self._sizes[i], dtype=bool)
+            is_test[test] = True
+            return np.flatnonzero(~is_test), test
+        return self._trains[i].astype(np.intp), test
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @classmethod
+    def _save_arrays(cls, arrays, name, packed_splits):
+        # Pack several sets of splits together, e.g. the inner splits of all the outer splits
+        _pack(arrays, name+'train', [t if t is not None else np.array([], dtype=np.int32)
+                                     for splits in packed_splits for t in splits._trains])
+        _pack(arrays, name+'test', [t for splits in packed_splits for t in splits._tests])
+        arrays[name+'sizes'] = np.array([s for splits in packed_splits for s in splits._sizes], dtype=np.int64)
+        arrays[name+'counts'] = np.array([len(splits) for splits in packed_splits], dtype=np.int64)
+        return
+
+    @classmethod
+    def _load_arrays(cls, arrays, name):
+        trains = _unpack(arrays, name+'train')
+        tests = _unpack(arrays, name+'test')
+        sizes = arrays[name+'sizes'].tolist()
+        bounds = np.cumsum(np.concatenate([[0], arrays[name+'counts']])).astype(int)
+        packed_splits = list()
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            splits = cls()
+            splits._tests = tests[start:stop]
+            splits._sizes = sizes[start:stop]
+            splits._trains = [train if size < 0 else None for train, size in zip(trains[start:stop], sizes[start:stop])]
+            packed_splits.append(splits)
+        return packed_splits
+
+
+class SplitPlan():
+    """
+    Class holding the train/test indices of the data splits of an evaluate run. Plans are made with the make_split_plan
+    method of a data splitter, and used by passing them as the split_plan of its evaluate method
+
+    Args:
+        splits: (iterable or PackedSplits), iterable of the (train indices, test indices) of each split. Default None,
+            for a plan of nested cross validation
+
+        leaveout_inds: (list), list of the arrays of indices of the data left out of each outer split of nested cross
+            validation, as labels of the index of X (as the leaveout_inds of evaluate). Default None
+
+        inner_splits: (list), list of the inner splits of each outer split of nested cross validation, each an iterable
+            of (train indices, test indices) in the rows of the outer split. Default None
+
+        n_rows: (int), number of rows of the data the splits were made for. Default None
+
+        fingerprint: (str), hash of the data the splits were made for, see get_fingerprint. Default None
+
+        splitter_name: (str), name of the splitter that made the splits. Default None
+
+    Methods:
+        get_fingerprint: method to get the hash of the data of a plan
+            Args:
+                X: (pd.DataFrame), dataframe of X features
+
+                y: (pd.Series), series of y target data. Default None
+
+                groups: (pd.Series), series of group designations. Default None
+
+            Returns:
+                fingerprint: (str), hash of the values of the data
+
+        check: method to check the plan was made for the given data, which raises a ValueError if it wasn't
+            Args:
+                X: (pd.DataFrame), dataframe of X features
+
+                y: (pd.Series), series of y target data. Default None
+
+                groups: (pd.Series), series of group designations. Default None
+
+            Returns:
+                None
+
+        get_n_splits: method to get the number of (outer) splits of the plan
+            Args:
+                X, y, groups: not used, for compatibility with the scikit-learn splitters
+
+            Returns:
+                (int), number of splits
+
+        split: method to get the train/test indices of the splits of the plan, after checking them against the data
+            Args:
+                X: (pd.DataFrame), dataframe of X features. Default None doesn't check the data
+
+                y: (pd.Series), series of y target data. Default None
+
+                groups: (pd.Series), series of group designations. Default None
+
+            Returns:
+                (iterator), iterator of the (train indices, test indices) of each split, or of the left-out data of
+                    each outer split of nested cross validation, as positions of the rows of X
+
+        save: method to save the plan to a compressed .npz file
+            Args:
+                filepath: (str), path of the file. The .npz extension is added if missing
+
+            Returns:
+                filepath: (str), path of the saved file
+
+        load: method to load a plan saved with save
+            Args:
+                filepath: (str), path of the file
+
+            Returns:
+                plan: (SplitPlan), the loaded plan
+    """
+    def __init__(self, splits=None, leaveout_inds=None, inner_splits=None, n_rows=None, fingerprint=None,
+                 splitter_name=None):
+        self.splits = self._get_packed(splits) if splits is not None else None
+        self.leaveout_inds = [np.asarray(inds) for inds in leaveout_inds] if leaveout_inds is not None else None
+        self.inner_splits = [self._get_packed(splits_) for splits_ in inner_splits] if inner_splits is not None else None
+        self.n_rows = n_rows
+        self.fingerprint = fingerprint
+        self.splitter_name = splitter_name
+
+    @classmethod
+    def _get_packed(cls, splits):
+        return splits if isinstance(splits, PackedSplits) else PackedSplits(splits)
+
+    @classmethod
+    def get_fingerprint(cls, X, y=None, groups=None):
+        # The values are hashed rather than the dataframes, so the hash doesn't depend on the pandas version
+        return joblib.hash([np.asarray(d) if d is not None else None for d in [X, y, groups]])
+
+    def check(self, X, y=None, groups=None):
+        if self.n_rows is not None and X.shape[0] != self.n_rows:
+            raise ValueError('The split plan was made for data with '+str(self.n_rows)+' rows, not '+str(X.shape[0]))
+        if self.fingerprint is not None and self.get_fingerprint(X, y, groups) != self.fingerprint:
+            raise ValueError('The split plan was made for different data (X, y or groups) than the data given')
+        return
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        if self.splits is not None:
+            return len(self.splits)
+        return len(self.leaveout_inds)
+
+    def split(self, X=None, y=None, groups=None):
+        if X is not None:
+            self.check(X, y, groups)
+        if self.splits is not None:
+            return iter(self.splits)
+        # For nested cross validation, the outer splits leave out each set of left-out indices. These are labels of the
+        # index of X, as in evaluate, and the splits are the positions of the rows with and without those labels
+        index = X.index if hasattr(X, 'index') else np.arange(self.n_rows)
+        return ((np.flatnonzero(~np.isin(index, leaveout)), np.flatnonzero(np.isin(index, leaveout)))
+                for leaveout in self.leaveout_inds)
+
+    def save(self, filepath):
+        if not filepath.endswith('.npz'):
+            filepath = filepath+'.npz'
+        arrays = dict()
+        if self.splits is not None:
+            PackedSplits._save_arrays(arrays, '', [self.splits])
+        if self.leaveout_inds is not None:
+            _pack(arrays, 'leaveout', self.leaveout_inds)
+        if self.inner_splits is not None:
+            PackedSplits._save_arrays(arrays, 'inner_', self.inner_splits)
+        arrays['n_rows'] = np.array(-1 if self.n_rows is None else self.n_rows, dtype=np.int64)
+        arrays['fingerprint'] = np.array('' if self.fingerprint is None else self.fingerprint)
+        arrays['splitter_name'] = np.array('' if self.splitter_name is None else self.splitter_name)
+        np.savez_compressed(filepath, **arrays)
+        return filepath
+
+    @classmethod
+    def load(cls, filepath):
+        with np.load(filepath, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        splits = PackedSplits._load_arrays(arrays, '')[0] if 'train' in arrays else None
+        leaveout_inds = [inds.astype(np.intp) for inds in _unpack(arrays, 'leaveout')] if 'leaveout' in arrays else None
+        inner_splits = PackedSplits._load_arrays(arrays, 'inner_') if 'inner_train' in arrays else None
+        n_rows = int(arrays['n_rows'])
+        return cls(splits=splits, leaveout_inds=leaveout_inds, inner_splits=inner_splits,
+                   n_rows=n_rows if n_rows >= 0 else None, fingerprint=str(arrays['fingerprint']) or None,
+                   splitter_name=str(arrays['splitter_name']) or None)
@@ -0,0 +1,279 @@
+"""
+This module contains a container for holding the results of a set of evaluated data splits in memory, so that the
+all-split aggregation, recalibration, best-split selection and summary plots can be done without re-reading the per-split
+output files from disk.
+
+SplitResults:
+    Class that accumulates the arrays (y data, predictions, residuals, model errors, indices, groups) and the summary
+    statistics of each evaluated split. The accumulated data can be concatenated over all splits, used to find the best
+    split, summarized as average and standard deviation statistics, and optionally exported to per-split files. The X
+    data of each split is not held per split, but rebuilt when needed from the full data, the row indices and the
+    selected features of the split.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from mastml.metrics import Metrics
+from mastml.file_formats import save_data
+
+
+class SplitResults():
+    """
+    Class to accumulate the results of each evaluated data split in memory
+
+    Args:
+        X: (pd.DataFrame), dataframe of the full X features the splits were made from, used to rebuild the X_train and X_test data of each split from its train_rows, test_rows and selected_features. Default None.
+
+        X_extra: (pd.DataFrame), dataframe of the full extra X data, used to rebuild the X_extra_train and X_extra_test data of each split. Default None.
+
+        X_force_train: (pd.DataFrame), dataframe of X features added to the training data of every split. Default None.
+
+    Methods:
+        add: method to add the results of a single split
+            Args:
+                split_name: (str), name of the split, e.g. 'split_0'
+
+                results: (dict), dictionary of split results, keyed by the name of the data (e.g. 'y_test', 'y_pred', 'test_stats')
+
+            Returns:
+                None
+
+        add_failed: method to record a split that failed to be evaluated (e.g. went over its time or memory limit), and is left out of the results
+            Args:
+                split_name: (str), name of the split, e.g. 'split_0'
+
+                status: (str), why the split failed, e.g. 'time_limit_exceeded'
+
+            Returns:
+                None
+
+        get: method to get a data type of a single split. The X data of a split is rebuilt from the full data, and the X data of an outer split of nested CV is collected from its inner split results (held as 'split_results')
+            Args:
+                split_name: (str), name of the split, e.g. 'split_0'
+
+                key: (str), name of the data, e.g. 'X_train'
+
+            Returns:
+                data: the data, or None if the split has no data of this type
+
+        collect: method to concatenate a single-column data type (e.g. y_test) over all splits
+            Args:
+                key: (str), name of the data to collect, e.g. 'y_pred'
+
+            Returns:
+                data: (pd.Series), series of the data concatenated over all splits
+
+        collect_df: method to concatenate a dataframe data type (e.g. X_train) over all splits
+            Args:
+                key: (str), name of the data to collect, e.g. 'X_test'
+
+            Returns:
+                data: (pd.DataFrame), dataframe of the data concatenated over all splits
+
+        get_stats: method to get the summary statistics of each split
+            Args:
+                data_type: (str), the data type of the stats, e.g. 'test', 'train' or 'leaveout'
+
+            Returns:
+                stats: (OrderedDict), dict of split name to stats dict
+
+        get_best_split: method to find the best performing split by a given metric
+            Args:
+                best_run_metric: (str), name of the metric to use to find the best performing split
+
+                data_type: (str), the data type of the stats to compare, default 'test'
+
+            Returns:
+                best_split: (str), name of the best split
+
+        get_average_stdev_stats: method to get the average and standard deviation of each metric over all splits
+            Args:
+                data_type: (str), the data type of the stats, e.g. 'test', 'train' or 'leaveout'
+
+            Returns:
+                df_stats: (pd.DataFrame), dataframe with the average (row 0) and stdev (row 1) of each metric
+
+        get_plot_data: method to get the per-split true values, predicted values, data indices and groups used in the all-split summary plots
+            Args:
+                data_type: (str), the data type, e.g. 'test', 'train' or 'leaveout'
+
+            Returns:
+                y_true_list: (list), list of arrays of true values for each split
+
+                y_pred_list: (list), list of arrays of predicted values for each split
+
+                ind_list: (list), list of arrays of data indices for each split
+
+                groups_list: (list), list of arrays of group labels for each split (empty if no groups)
+
+        export: method to write the accumulated per-split data to files in each split directory
+            Args:
+                savepath: (str), string denoting the directory containing the split directories
+
+                file_extension: (str), one of '.csv', '.xlsx', '.parquet', '.feather' or '.npz', determines data file type for saving
+
+            Returns:
+                None
+    """
+    # Column name used when a series is saved to file, matching the names expected when reading them back
+    _column_names = {'residuals_test': 'residuals',
+                     'residuals_train': 'residuals',
+                     'residuals_leaveout': 'residuals',
+                     'model_errors_test': 'model_errors',
+                     'model_errors_train': 'model_errors',
+                     'model_errors_leaveout': 'model_errors',
+                     'model_errors_leaveout_calibrated': 'model_errors',
+                     'num_removed_learners_test': 'num_removed_learners',
+                     'num_removed_learners_train': 'num_removed_learners',
+                     'num_removed_learners_leaveout': 'num_removed_learners'}
+
+    _pred_names = {'test': 'y_pred', 'train': 'y_pred_train', 'leaveout': 'y_pred_leaveout'}
+
+    # X data types rebuilt from the full data when needed, rather than held in memory for each split
+    _frame_keys = ['X_train', 'X_test', 'X_extra_train', 'X_extra_test']
+
+    # Split data used to rebuild the X data or reuse the split preprocessing, which is not exported to file
+    _row_keys = ['train_rows', 'test_rows', 'selected_features', 'split_results', 'prepared_files']
+
+    def __init__(self, X=None, X_extra=None, X_force_train=None):
+        self.X = X
+        self.X_extra = X_extra
+        self.X_force_train = X_force_train
+        self.splits = OrderedDict()
+        # Splits that failed to be evaluated, with why they failed
+        self.failed = OrderedDict()
+        # Results computed over all the splits, e.g. the recalibration parameters
+        self.summary = dict()
+
+    def __len__(self):
+        return len(self.splits)
+
+    def __getitem__(self, split_name):
+        return self.splits[split_name]
+
+    def add(self, split_name, results):
+        self.splits[split_name] = results
+        return
+
+    def add_failed(self, split_name, status):
+        self.failed[split_name] = status
+        return
+
+    def collect(self, key):
+        data = [np.array(r[key]).ravel() for r in self.splits.values() if r.get(key) is not None]
+        if len(data) == 0:
+            return None
+        return pd.Series(np.concatenate(data))
+
+    def get(self, split_name, key):
+        r = self.splits[split_name]
+        if r.get(key) is not None or key not in self._frame_keys:
+            return r.get(key)
+        if r.get('split_results') is not None:
+            return r['split_results'].collect_df(key)
+        if r.get('train_rows') is None or self.X is None:
+            return None
+        data_type = key.split('_')[-1]
+        if key.startswith('X_extra'):
+            if self.X_extra is None:
+                return None
+            X = self.get(split_name, 'X_'+data_type)
+            return self.X_extra.loc[X.index.values, :]
+        X = self.X.iloc[r[data_type+'_rows']]
+        if data_type == 'train' and self.X_force_train is not None:
+            X = pd.concat([X, self.X_force_train])
+        return X[r['selected_features']]
+
+    def collect_df(self, key):
+        data = list()
+        for split_name in self.splits.keys():
+            df = self.get(split_name, key)
+            if df is not None:
+                data.append(pd.DataFrame(df))
+        if len(data) == 0:
+            return None
+        return pd.concat(data, ignore_index=True)
+
+    def get_stats(self, data_type='test'):
+        stats = OrderedDict()
+        for split_name, r in self.splits.items():
+            if r.get(data_type+'_stats') is not None:
+                stats[split_name] = r[data_type+'_stats']
+        return stats
+
+    def get_best_split(self, best_run_metric, data_type='test'):
+        stats = self.get_stats(data_type=data_type)
+        greater_is_better = Metrics(metrics_list=[best_run_metric])._metric_zoo()[best_run_metric][0]
+        if greater_is_better == False:
+            metric_best = 10**20
+        else:
+            metric_best = 0
+        # Start with best_split being the first split so doesn't throw an error later
+        best_split = list(stats.keys())[0]
+        for split_name, stats_dict in stats.items():
+            if greater_is_better == False:
+                if stats_dict[best_run_metric] < metric_best:
+                    best_split = split_name
+                    metric_best = stats_dict[best_run_metric]
+            else:
+                if stats_dict[best_run_metric] > metric_best:
+                    best_split = split_name
+                    metric_best = stats_dict[best_run_metric]
+        return best_split
+
+    def get_average_stdev_stats(self, data_type='test'):
+        stats = self.get_stats(data_type=data_type)
+        if len(stats) == 0:
+            return None
+        metrics_list = list(list(stats.values())[0].keys())
+        avg_stats = dict()
+        for metric in metrics_list:
+            vals = [s[metric] for s in stats.values()]
+            avg_stats[metric] = (np.mean(vals), np.std(vals))
+        return pd.DataFrame().from_dict(avg_stats)
+
+    def get_plot_data(self, data_type='test'):
+        y_true_list = list()
+        y_pred_list = list()
+        ind_list = list()
+        groups_list = list()
+        for r in self.splits.values():
+            y_true_list.append(np.array(r['y_'+str(data_type)]).ravel())
+            y_pred_list.append(np.array(r[self._pred_names[data_type]]).ravel())
+            ind_list.append(np.array(r[str(data_type)+'_inds']).ravel())
+            if r.get(str(data_type)+'_groups') is not None:
+                groups_list.append(np.array(r[str(data_type)+'_groups']).ravel())
+        return y_true_list, y_pred_list, ind_list, groups_list
+
+    def export(self, savepath, file_extension='.csv'):
+        for split_name, r in self.splits.items():
+            splitpath = os.path.join(savepath, split_name)
+            if not os.path.exists(splitpath):
+                os.mkdir(splitpath)
+            # The X data of the split is rebuilt one split at a time, so only one split's copy is in memory
+            data = OrderedDict()
+            for key, val in r.items():
+                if key in self._row_keys:
+                    continue
+                data[key] = val
+            for key in self._frame_keys:
+                if data.get(key) is None:
+                    data[key] = self.get(split_name, key)
+            for key, val in data.items():
+                if val is None:
+                    continue
+                if key.endswith('_stats'):
+                    df = pd.DataFrame().from_records([val])
+                    key = key + '_summary'
+                elif isinstance(val, pd.DataFrame):
+                    df = val
+                elif isinstance(val, (pd.Series, np.ndarray, list)):
+                    df = pd.DataFrame({self._column_names.get(key, key): np.array(val).ravel()})
+                else:
+                    continue
+                save_data(df, os.path.join(splitpath, key+file_extension), index=False)
+        return
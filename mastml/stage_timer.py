@@ -0,0 +1,75 @@
+"""
+This module contains a lightweight timer of the stages of a computation (e.g. the preprocessing, model fit and plots of
+a data split), used to record where the time of an evaluate run goes. A stage is timed by marking its end, so timing
+a computation only takes one clock read per stage, and the timer can be left on for every run.
+
+StageTimer:
+    Class to record the time spent in each stage of a computation
+
+"""
+
+import time
+from collections import OrderedDict
+
+
+class StageTimer():
+    """
+    Class to record the time spent in each stage of a computation. The time of a stage is the time since the end of the
+    previous stage (or the start of the timer), so stages are marked done in the order they are run. The times of a
+    stage run several times are added up
+
+    Args:
+        None
+
+    Methods:
+        start: method to (re)start timing from now, e.g. to leave out the time since the last stage
+            Args:
+                None
+
+            Returns:
+                None
+
+        lap: method to mark a stage done, adding the time since the end of the previous stage to it
+            Args:
+                stage: (str), name of the stage, e.g. 'model_fit'
+
+            Returns:
+                None
+
+        add: method to add the stage times of another timer, e.g. to sum the times of several splits
+            Args:
+                times: (dict), dict of {stage name: time in seconds}
+
+            Returns:
+                None
+
+        get_times: method to get the time spent in each stage
+            Args:
+                None
+
+            Returns:
+                times: (OrderedDict), dict of {stage name: time in seconds}, in the order the stages were first run
+    """
+    def __init__(self):
+        self.times = OrderedDict()
+        self.start()
+
+    def start(self):
+        self.last = time.perf_counter()
+        return
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.times[stage] = self.times.get(stage, 0.0) + now - self.last
+        self.last = now
+        return
+
+    def add(self, times):
+        if times is None:
+            return
+        for stage, t in times.items():
+            self.times[stage] = self.times.get(stage, 0.0) + t
+        return
+
+    def get_times(self):
+        return OrderedDict(self.times)
@@ -0,0 +1,297 @@
+"""
+This module contains a simple scheduler to run a graph of tasks with dependencies, either serially or on a single pool
+of parallel workers. A task is submitted to the pool as soon as the tasks it depends on are done, and the result of
+each task is returned as soon as it is done, so the pool is kept busy over all the tasks (e.g. the splits of every
+model and selector being compared) while the results of the finished tasks are used in the main process. The peak
+memory of each task is recorded, and can be used to cap the number of tasks run at once within a memory budget. Tasks
+going over a memory or time limit fail, rather than stalling or taking down the run, and the other tasks go on. The time
+of each task is recorded too, and tasks much quicker than the cost of sending a task to a worker are sent in batches.
+
+TaskGraph:
+    Class to add tasks, which may depend on other tasks, and run them, yielding the result of each task when it is done
+
+"""
+
+import os
+import gc
+import time
+import shutil
+import signal
+import tempfile
+from collections import deque
+from functools import partial
+from pathos.multiprocessing import ProcessingPool as Pool
+
+from mastml.memory_monitor import MemoryMonitor, MemoryLimitError, TimeLimitError
+
+# Time in seconds a parallel task may run past its time limit, e.g. stuck in compiled code that can't be interrupted,
+# before its worker process is killed
+KILL_GRACE = 5.0
+
+
+def _run_task(func, memory_limit, time_limit, started_dir, task_id, task, relative_limit=False):
+    # Record the worker and start time of the task, so it can be killed if it can't be stopped at its time limit
+    if started_dir is not None:
+        with open(os.path.join(started_dir, str(task_id)), 'w') as f:
+            f.write(str(os.getpid())+' '+str(time.time()))
+    # Run a task, recording its peak memory. A task going over the memory or time limit fails, and its memory is freed
+    monitor = MemoryMonitor(memory_limit=memory_limit, time_limit=time_limit, relative_limit=relative_limit)
+    try:
+        with monitor.record():
+            result = func(task)
+    except MemoryLimitError:
+        result = None
+        monitor.exceeded = True
+        gc.collect()
+    except TimeLimitError:
+        result = None
+        monitor.timed_out = True
+        gc.collect()
+    return result, monitor.get_report()
+
+
+def _run_batch(func, memory_limit, time_limit, started_dir, batch):
+    # Run a batch of (task_id, task) tuples one after the other, in a single round trip to the worker
+    return [(task_id,) + _run_task(func, memory_limit, time_limit, started_dir, task_id, task) for task_id, task in batch]
+
+
+class TaskGraph():
+    """
+    Class to run a graph of tasks with dependencies, either serially or on a single pool of parallel workers
+
+    Args:
+        func: (function), the function to apply to each task, called as func(*args, task, **kwargs)
+
+        *args: extra arguments passed to func before the task (e.g. data shared by all the tasks)
+
+        **kwargs: extra keyword arguments passed to func
+
+    Methods:
+        add: method to add a task to the graph
+            Args:
+                task: (object or function), the task to pass to func, or a function making the task from the results
+                    of the tasks it depends on (passed in the order of depends_on), which is called when the task is
+                    submitted
+
+                depends_on: (list), list of the ids of the tasks that need to be done before this task. Default None
+                    means the task can be run right away
+
+                fallback: (object or function), the task to run instead if a task it depends on fails, made without
+                    the result of the failed task. Default None means the task fails too
+
+            Returns:
+                task_id: (int), the id of the added task
+
+        run: method to run all the tasks. Tasks that are ready are run in the order they were added (serially) or
+            submitted together to the pool of workers (in parallel). The peak memory of each task is kept in
+            memory_reports, and the tasks going over the memory or time limit (and the tasks depending on them, unless
+            they have a fallback) are kept in failed rather than returned. The number of tasks of each submission to
+            the pool of workers is kept in batch_sizes
+            Args:
+                parallel_run: (bool), whether to run the tasks on a pool of parallel workers
+
+                n_jobs: (int), number of worker processes used when parallel_run is True. Default None uses all
+                    available cores.
+
+                memory_budget: (float), total memory in GB the tasks run at once may use, when parallel_run is True.
+                    The first task is run alone, then the number of tasks run at once is capped at the budget divided
+                    by the largest peak memory of the tasks done so far. Default None runs n_jobs tasks at once
+
+                memory_limit: (float), memory limit of each task in GB, i.e. of the worker process running it, or of
+                    the memory the task adds to the main process when parallel_run is False. A task going over it is
+                    stopped and fails. Default None means no limit
+
+                time_limit: (float), time limit of each task in seconds. A task going over it is stopped and fails. In
+                    parallel, a task that can't be stopped (e.g. hung in compiled code) is killed with its worker
+                    KILL_GRACE seconds later, and the pool replaces the worker. Default None means no limit
+
+                batch_time: (float), time in seconds to aim for when sending quick tasks to the workers in batches,
+                    when parallel_run is True. The first tasks are sent one at a time, then the ready tasks are sent
+                    in batches of about batch_time over the average time of the tasks done so far (but no more than
+                    the ready tasks shared between the workers), so quick tasks don't pay the cost of sending each
+                    task to a worker, and slow tasks are still sent one at a time. Tasks aren't batched with a time
+                    limit, so a killed worker only takes its own task down. Default 0.5. None sends every task alone
+
+            Returns:
+                results: (generator), generator of (task_id, result) tuples, in the order the tasks are done
+    """
+    def __init__(self, func, *args, **kwargs):
+        self.func = partial(func, *args, **kwargs)
+        self.tasks = list()
+        self.depends_on = list()
+        self.dependents = list()
+        self.fallbacks = list()
+        self.memory_reports = dict()
+        self.failed = dict()
+        self.batch_sizes = list()
+
+    def add(self, task, depends_on=None, fallback=None):
+        task_id = len(self.tasks)
+        if depends_on is None:
+            depends_on = list()
+        self.tasks.append(task)
+        self.fallbacks.append(fallback)
+        self.depends_on.append(list(depends_on))
+        self.dependents.append(list())
+        for d in depends_on:
+            self.dependents[d].append(task_id)
+        return task_id
+
+    def run(self, parallel_run=False, n_jobs=None, memory_budget=None, memory_limit=None, time_limit=None,
+            batch_time=0.5):
+        # Parallel tasks with a time limit record when they start, in a scratch directory
+        if parallel_run is True and time_limit is not None:
+            started_dir = tempfile.mkdtemp(prefix='mastml_tasks_')
+        else:
+            started_dir = None
+        # A serial task runs in the main process, which holds the whole run, so its limit is on the memory it adds
+        func = partial(_run_task, self.func, memory_limit, time_limit, started_dir,
+                       relative_limit=parallel_run is False)
+        if time_limit is not None:
+            batch_time = None
+        num_depends_on = [len(d) for d in self.depends_on]
+        num_dependents = [len(d) for d in self.dependents]
+        ready = deque([task_id for task_id, n in enumerate(num_depends_on) if n == 0])
+        # Results of done tasks, kept until all the tasks depending on them are submitted
+        results_kept = dict()
+
+        def _get_task(task_id):
+            task = self.tasks[task_id]
+            if callable(task):
+                task = task(*[results_kept[d] for d in self.depends_on[task_id]])
+            for d in self.depends_on[task_id]:
+                num_dependents[d] -= 1
+                if num_dependents[d] == 0:
+                    del results_kept[d]
+            # The task (and anything it holds) is no longer needed by the graph once submitted
+            self.tasks[task_id] = None
+            self.fallbacks[task_id] = None
+            return task
+
+        def _fail(task_id, report):
+            # The tasks depending on a failed task are never run, unless they have a fallback task to run instead
+            self.failed[task_id] = report
+            for d in self.dependents[task_id]:
+                if d in self.failed:
+                    continue
+                if self.fallbacks[d] is not None:
+                    self.tasks[d] = self.fallbacks[d]
+                    self.fallbacks[d] = None
+                    self.depends_on[d].remove(task_id)
+                    num_depends_on[d] -= 1
+                    if num_depends_on[d] == 0:
+                        ready.append(d)
+                else:
+                    _fail(d, {'status': 'dependency_failed'})
+
+        def _done(task_id, result, report):
+            self.memory_reports[task_id] = report
+            if report['status'] != 'done':
+                _fail(task_id, report)
+                return False
+            if num_dependents[task_id] > 0:
+                results_kept[task_id] = result
+            # Tasks whose dependencies are all done are ready to run
+            for d in self.dependents[task_id]:
+                num_depends_on[d] -= 1
+                if num_depends_on[d] == 0:
+                    ready.append(d)
+            return True
+
+        if parallel_run is False:
+            while ready:
+                task_id = ready.popleft()
+                result, report = func(task_id, _get_task(task_id))
+                if _done(task_id, result, report):
+                    yield task_id, result
+            return
+
+        if n_jobs is None:
+            n_jobs = os.cpu_count()
+
+        def _get_max_pending():
+            # Without a memory budget, all the ready tasks are submitted, so the workers always have tasks queued. When
+            # batching, only a few tasks (or batches) are queued for each worker, so the next batches are made from
+            # the time of the tasks done so far
+            if memory_budget is None:
+                return 2*n_jobs if batch_time is not None else len(self.tasks)
+            peaks = [r['rss_peak_mb'] for r in self.memory_reports.values() if r.get('rss_peak_mb') is not None]
+            if len(peaks) == 0:
+                return 1
+            return int(min(n_jobs, max(1, memory_budget*1024 // max(peaks))))
+
+        def _get_batch_size():
+            times = [r['time_s'] for r in self.memory_reports.values() if r.get('time_s') is not None]
+            if batch_time is None or len(times) == 0:
+                return 1
+            # The latest tasks are the most like the ready tasks, e.g. the splits of the same model
+            task_time = max(sum(times[-20:]) / len(times[-20:]), 1e-6)
+            return int(max(1, min(batch_time // task_time, -(-len(ready) // n_jobs))))
+
+        batch_func = partial(_run_batch, self.func, memory_limit, time_limit, started_dir)
+        with Pool(n_jobs) as pool:
+            pending = dict()
+            killed = list()
+
+            def _submit():
+                max_pending = _get_max_pending()
+                while ready and len(pending) < max_pending:
+                    batch_size = min(_get_batch_size(), len(ready))
+                    self.batch_sizes.append(batch_size)
+                    if batch_size == 1:
+                        task_id = ready.popleft()
+                        pending[task_id] = pool.apipe(func, task_id, _get_task(task_id))
+                    else:
+                        batch = [ready.popleft() for _ in range(batch_size)]
+                        # A batch is pending under the id of its first task, and returns the results of all its tasks
+                        pending[batch[0]] = pool.apipe(batch_func, [(task_id, _get_task(task_id)) for task_id in batch])
+
+            def _kill_stalled():
+                # Kill the workers of the tasks still running well past their time limit, which never return
+                for task_id in list(pending):
+                    try:
+                        with open(os.path.join(started_dir, str(task_id)), 'r') as f:
+                            pid, time_started = f.read().split()
+                    except (OSError, ValueError):
+                        continue
+                    if time.time() - float(time_started) < time_limit + KILL_GRACE:
+                        continue
+                    try:
+                        os.kill(int(pid), signal.SIGKILL)
+                    except OSError:
+                        pass
+                    del pending[task_id]
+                    killed.append(task_id)
+                    _done(task_id, None, {'pid': int(pid), 'rss_start_mb': None, 'rss_peak_mb': None,
+                                          'status': 'time_limit_exceeded'})
+
+            try:
+                while ready or pending:
+                    _submit()
+                    done = [task_id for task_id, r in pending.items() if r.ready()]
+                    if len(done) == 0:
+                        if started_dir is not None:
+                            _kill_stalled()
+                        time.sleep(0.005)
+                        continue
+                    results = list()
+                    for pending_id in done:
+                        task_results = pending.pop(pending_id).get()
+                        if not isinstance(task_results, list):
+                            task_results = [(pending_id,) + task_results]
+                        for task_id, result, report in task_results:
+                            if _done(task_id, result, report):
+                                results.append((task_id, result))
+                    # Submit the tasks released by the done tasks before handing their results back, as the caller
+                    # may take a while to use them
+                    _submit()
+                    for task_id, result in results:
+                        yield task_id, result
+            finally:
+                if started_dir is not None:
+                    shutil.rmtree(started_dir, ignore_errors=True)
+                # The pool is kept for later runs, but not with the jobs of the killed tasks, which never finish
+                if len(killed) > 0:
+                    pool.terminate()
+                    pool.clear()
+        return
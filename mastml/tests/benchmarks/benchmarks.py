@@ -0,0 +1,277 @@
+"""
+This module contains a suite of performance benchmarks of the main MAST-ML routines (featurization, feature selection,
+data splitting, model error estimation and recalibration, full evaluate runs and predictions) on synthetic data of a
+few size tiers. The timings are saved as JSON, so the results of different versions can be compared to catch
+performance regressions and to check the effect of speedups. The suite can be run from the command line, e.g.
+
+    python -m mastml.tests.benchmarks.benchmarks --tiers small medium --output benchmark_results.json
+
+and given a previous results file with --baseline, prints how the times changed.
+
+BenchmarkSuite:
+    Class to run the benchmarks for a set of size tiers, and save their timings as JSON
+
+compare_benchmarks:
+    Method to compare the timings of two benchmark runs, e.g. before and after a change
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from collections import OrderedDict
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.model_selection import KFold
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from mastml.tests.benchmarks.synthetic_data import make_compositions, make_gaussian_data
+from mastml.feature_generators import ElementalFeatureGenerator, OneHotElementEncoder
+from mastml.feature_selectors import PearsonSelector, MASTMLFeatureSelector
+from mastml.data_splitters import SklearnDataSplitter, LeaveOutTwinCV
+from mastml.error_analysis import ErrorUtils, CorrectionFactors
+from mastml.mastml_predictor import make_prediction
+from mastml.models import SklearnModel
+
+# Number of data points and features of each size tier
+TIERS = OrderedDict([('small', {'n_samples': 100, 'n_features': 20}),
+                     ('medium', {'n_samples': 1000, 'n_features': 50}),
+                     ('large', {'n_samples': 5000, 'n_features': 100})])
+
+
+def _bench_elemental_feature_generator(n_samples, n_features, seed, workdir):
+    composition_df = make_compositions(n_samples, seed=seed)
+    X = pd.DataFrame(index=composition_df.index)
+    def run():
+        ElementalFeatureGenerator(composition_df=composition_df).fit_transform(X)
+    return run
+
+
+def _bench_one_hot_element_encoder(n_samples, n_features, seed, workdir):
+    composition_df = make_compositions(n_samples, seed=seed)
+    X = pd.DataFrame(index=composition_df.index)
+    def run():
+        OneHotElementEncoder(composition_df=composition_df).fit_transform(X)
+    return run
+
+
+def _bench_pearson_selector(n_samples, n_features, seed, workdir):
+    # Redundant features make sure enough features are flagged as highly correlated to select from
+    X, y = make_gaussian_data(n_samples, n_features, n_redundant=n_features//4, seed=seed)
+    def run():
+        PearsonSelector(threshold_between_features=0.3, threshold_with_target=0.3,
+                        flag_highly_correlated_features=True, n_features_to_select=min(5, n_features//4)).fit(X, y)
+    return run
+
+
+def _bench_mastml_feature_selector(n_samples, n_features, seed, workdir):
+    X, y = make_gaussian_data(n_samples, n_features, seed=seed)
+    def run():
+        MASTMLFeatureSelector(model=SklearnModel(model='LinearRegression'), n_features_to_select=min(5, n_features),
+                              cv=KFold(n_splits=3, shuffle=True, random_state=seed)).fit(X, y)
+    return run
+
+
+def _bench_leave_out_twin_cv_split(n_samples, n_features, seed, workdir):
+    X, y = make_gaussian_data(n_samples, n_features, seed=seed)
+    # Make one in ten points a near twin of the point before it
+    twins = np.arange(0, n_samples-1, 10)
+    X.iloc[twins+1] = X.iloc[twins].values + 1e-3
+    def run():
+        LeaveOutTwinCV(threshold=0.1).split(X, y)
+    return run
+
+
+def _bench_get_model_errors(n_samples, n_features, seed, workdir):
+    X, y = make_gaussian_data(n_samples, n_features, seed=seed)
+    model = SklearnModel(model='RandomForestRegressor', n_estimators=20, random_state=seed)
+    model.fit(X, y)
+    def run():
+        ErrorUtils._get_model_errors(model=model, X=X, X_train=X, X_test=X, error_method='stdev_weak_learners')
+    return run
+
+
+def _bench_correction_factors_nll(n_samples, n_features, seed, workdir):
+    rng = np.random.default_rng(seed)
+    model_errors = rng.uniform(low=0.1, high=1.0, size=n_samples)
+    residuals = 1.5*model_errors*rng.standard_normal(size=n_samples)
+    def run():
+        CorrectionFactors(residuals=residuals, model_errors=model_errors).nll()
+    return run
+
+
+def _bench_evaluate(n_samples, n_features, seed, workdir):
+    X, y = make_gaussian_data(n_samples, n_features, seed=seed)
+    models = [SklearnModel(model='LinearRegression'),
+              SklearnModel(model='RandomForestRegressor', n_estimators=20, random_state=seed)]
+    def run():
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=5, random_state=seed)
+        splitter.evaluate(X=X, y=y, models=models, savepath=tempfile.mkdtemp(dir=workdir), plots=list(),
+                          file_extension='.csv', verbosity=0)
+    return run
+
+
+def _bench_make_prediction(n_samples, n_features, seed, workdir):
+    X, y = make_gaussian_data(n_samples, n_features, seed=seed)
+    model = SklearnModel(model='RandomForestRegressor', n_estimators=20, random_state=seed)
+    model.fit(X, y)
+    model_path = os.path.join(workdir, 'RandomForestRegressor.pkl')
+    joblib.dump(model, model_path)
+    def run():
+        make_prediction(X_test=X, model=model_path)
+    return run
+
+
+# The benchmarks, each a function of the data size, seed and a scratch directory returning the function to time
+BENCHMARKS = OrderedDict([('ElementalFeatureGenerator', _bench_elemental_feature_generator),
+                          ('OneHotElementEncoder', _bench_one_hot_element_encoder),
+                          ('PearsonSelector', _bench_pearson_selector),
+                          ('MASTMLFeatureSelector', _bench_mastml_feature_selector),
+                          ('LeaveOutTwinCV.split', _bench_leave_out_twin_cv_split),
+                          ('ErrorUtils._get_model_errors', _bench_get_model_errors),
+                          ('CorrectionFactors.nll', _bench_correction_factors_nll),
+                          ('BaseSplitter.evaluate', _bench_evaluate),
+                          ('make_prediction', _bench_make_prediction)])
+
+
+class BenchmarkSuite():
+    """
+    Class to run the benchmarks for a set of size tiers, and save their timings as JSON. Each benchmark is timed
+    n_repeats times per tier, leaving out the time to make its data and set it up (e.g. fit the model to predict with)
+
+    Args:
+        tiers: (list or dict), the size tiers to run, either a list of tier names in TIERS ('small', 'medium' and
+            'large'), or a dict of {tier name: {'n_samples': int, 'n_features': int}}. Default None runs all of TIERS
+
+        benchmarks: (list), names of the benchmarks to run, from the keys of BENCHMARKS. Default None runs all of them
+
+        n_repeats: (int), number of times to time each benchmark per tier. Default 3
+
+        seed: (int), seed of the synthetic data. Default 0
+
+    Methods:
+        run: method to run the benchmarks, and optionally save their timings
+            Args:
+                savepath: (str), path of the JSON file to save the results to. Default None doesn't save them
+
+            Returns:
+                results: (dict), dict with the 'metadata' of the run (versions, platform, time) and the 'results', a
+                    list with a dict per benchmark and tier of its name, tier, n_samples, n_features, the time in
+                    seconds of each repeat, and their min, median and mean
+    """
+    def __init__(self, tiers=None, benchmarks=None, n_repeats=3, seed=0):
+        if tiers is None:
+            tiers = list(TIERS.keys())
+        if not isinstance(tiers, dict):
+            for tier in tiers:
+                if tier not in TIERS:
+                    raise ValueError('Unknown tier '+str(tier)+'. The tiers are '+str(list(TIERS.keys())))
+            tiers = OrderedDict([(tier, TIERS[tier]) for tier in tiers])
+        if benchmarks is None:
+            benchmarks = list(BENCHMARKS.keys())
+        for benchmark in benchmarks:
+            if benchmark not in BENCHMARKS:
+                raise ValueError('Unknown benchmark '+str(benchmark)+'. The benchmarks are '+str(list(BENCHMARKS.keys())))
+        self.tiers = tiers
+        self.benchmarks = benchmarks
+        self.n_repeats = n_repeats
+        self.seed = seed
+
+    def run(self, savepath=None):
+        results = list()
+        for tier, sizes in self.tiers.items():
+            for benchmark in self.benchmarks:
+                workdir = tempfile.mkdtemp()
+                try:
+                    func = BENCHMARKS[benchmark](sizes['n_samples'], sizes['n_features'], self.seed, workdir)
+                    times = list()
+                    for _ in range(self.n_repeats):
+                        start = time.perf_counter()
+                        func()
+                        times.append(time.perf_counter() - start)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                results.append({'benchmark': benchmark,
+                                'tier': tier,
+                                'n_samples': sizes['n_samples'],
+                                'n_features': sizes['n_features'],
+                                'times': times,
+                                'min': float(np.min(times)),
+                                'median': float(np.median(times)),
+                                'mean': float(np.mean(times))})
+                print('{} ({}): {:.4f} s'.format(benchmark, tier, results[-1]['min']))
+        results = {'metadata': self._get_metadata(), 'results': results}
+        if savepath is not None:
+            with open(savepath, 'w') as f:
+                json.dump(results, f, indent=2)
+        return results
+
+    def _get_metadata(self):
+        try:
+            from importlib.metadata import version
+            mastml_version = version('mastml')
+        except Exception:
+            mastml_version = None
+        return {'mastml': mastml_version,
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'sklearn': sklearn.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'n_repeats': self.n_repeats,
+                'seed': self.seed,
+                'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def compare_benchmarks(baseline, new, tolerance=0.1):
+    '''
+    Method to compare the timings of two benchmark runs, e.g. before and after a change. The fastest time of the repeats
+    of each benchmark and tier is compared, as it is the least affected by other load on the machine
+
+    Args:
+        baseline: (dict or str), the results of the baseline run, as returned by BenchmarkSuite.run, or the path of
+            its JSON file
+
+        new: (dict or str), the results of the new run, or the path of its JSON file
+
+        tolerance: (float), the fractional change in time to flag as a regression or speedup. Default 0.1
+
+    Returns:
+        df_compare: (pd.DataFrame), dataframe of the benchmarks and tiers run in both, with their baseline and new
+            times, the speedup (baseline time / new time), and a status of 'regression', 'speedup' or 'same'
+    '''
+    dfs = list()
+    for results in [baseline, new]:
+        if isinstance(results, str):
+            with open(results, 'r') as f:
+                results = json.load(f)
+        dfs.append(pd.DataFrame(results['results'])[['benchmark', 'tier', 'n_samples', 'n_features', 'min']])
+    df = pd.merge(dfs[0], dfs[1], on=['benchmark', 'tier', 'n_samples', 'n_features'], suffixes=('_baseline', '_new'))
+    df = df.rename(columns={'min_baseline': 'time_baseline', 'min_new': 'time_new'})
+    df['speedup'] = df['time_baseline'] / df['time_new']
+    df['status'] = 'same'
+    df.loc[df['time_new'] > (1+tolerance)*df['time_baseline'], 'status'] = 'regression'
+    df.loc[df['time_new'] < (1-tolerance)*df['time_baseline'], 'status'] = 'speedup'
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the MAST-ML performance benchmarks')
+    parser.add_argument('--tiers', nargs='+', default=list(TIERS.keys()), help='size tiers to run')
+    parser.add_argument('--benchmarks', nargs='+', default=None, help='benchmarks to run (default all)')
+    parser.add_argument('--repeats', type=int, default=3, help='number of times to time each benchmark per tier')
+    parser.add_argument('--output', default='benchmark_results.json', help='path of the JSON results file')
+    parser.add_argument('--baseline', default=None, help='path of a previous JSON results file to compare with')
+    args = parser.parse_args()
+    results = BenchmarkSuite(tiers=args.tiers, benchmarks=args.benchmarks, n_repeats=args.repeats).run(savepath=args.output)
+    if args.baseline is not None:
+        print(compare_benchmarks(args.baseline, results).to_string(index=False))
@@ -0,0 +1,84 @@
+"""
+This module contains generators of synthetic datasets of a chosen size, used to benchmark MAST-ML at scale without
+having to download or store large datasets. The data is random, so only the time and memory used to process it are
+meaningful, not the fitted models or their errors.
+
+make_compositions:
+    Method to make random material composition strings, e.g. to use with the elemental feature generators
+
+make_gaussian_data:
+    Method to make a dataset of Gaussian features, some of them redundant, and a target that depends linearly on them,
+    plus noise
+
+"""
+
+import numpy as np
+import pandas as pd
+
+# Elements with complete elemental property data, so featurizing their compositions doesn't drop many features
+ELEMENTS = ['Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'K', 'Ca', 'Sc', 'Ti', 'V',
+            'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 'Ga', 'Ge', 'As', 'Se', 'Br', 'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo',
+            'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Sb', 'Te', 'I', 'Cs', 'Ba', 'La', 'Hf', 'Ta', 'W', 'Re', 'Os',
+            'Ir', 'Pt', 'Au', 'Pb', 'Bi']
+
+
+def make_compositions(n_samples, max_elements=4, seed=0):
+    '''
+    Method to make random material composition strings, e.g. 'Al0.25Cu0.5Ni0.25'. Each composition has between one and
+    max_elements distinct elements, with random fractions summing to one
+
+    Args:
+        n_samples: (int), number of compositions to make
+
+        max_elements: (int), maximum number of elements in a composition. Default 4
+
+        seed: (int), seed of the random number generator, so the same compositions are made each time. Default 0
+
+    Returns:
+        composition_df: (pd.DataFrame), dataframe with a single 'composition' column of composition strings
+    '''
+    rng = np.random.default_rng(seed)
+    compositions = list()
+    for n_elements in rng.integers(1, max_elements+1, size=n_samples):
+        elements = rng.choice(ELEMENTS, size=n_elements, replace=False)
+        fractions = rng.dirichlet(np.ones(n_elements))
+        compositions.append(''.join([element+'{:.3f}'.format(fraction) for element, fraction in zip(elements, fractions)]))
+    return pd.DataFrame({'composition': compositions})
+
+
+def make_gaussian_data(n_samples, n_features, n_informative=None, n_redundant=0, noise=0.1, seed=0):
+    '''
+    Method to make a dataset of standard normal features, and a target that is a random linear combination of the first
+    n_informative features plus Gaussian noise. The last n_redundant features are noisy copies of the informative
+    features, so they are highly correlated with them, like many generated materials features are
+
+    Args:
+        n_samples: (int), number of data points
+
+        n_features: (int), number of features
+
+        n_informative: (int), number of features the target depends on. Default None uses half of the features
+
+        n_redundant: (int), number of features that are noisy copies of the informative features. Default 0
+
+        noise: (float), standard deviation of the noise added to the target. Default 0.1
+
+        seed: (int), seed of the random number generator, so the same data is made each time. Default 0
+
+    Returns:
+        X: (pd.DataFrame), dataframe of X feature data, with columns named feature_0, feature_1, etc.
+
+        y: (pd.Series), series of y target data, named target
+    '''
+    rng = np.random.default_rng(seed)
+    if n_informative is None:
+        n_informative = max(1, n_features // 2)
+    X = rng.standard_normal(size=(n_samples, n_features))
+    for i in range(n_features-n_redundant, n_features):
+        X[:, i] = X[:, i % n_informative] + 0.5*X[:, i]
+    coefs = np.zeros(n_features)
+    coefs[:n_informative] = rng.uniform(low=-1.0, high=1.0, size=n_informative)
+    y = X @ coefs + noise*rng.standard_normal(size=n_samples)
+    X = pd.DataFrame(X, columns=['feature_'+str(i) for i in range(n_features)])
+    y = pd.Series(y, name='target')
+    return X, y
@@ -0,0 +1,39 @@
+import unittest
+import os
+import sys
+import json
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.tests.benchmarks.synthetic_data import make_compositions, make_gaussian_data
+from mastml.tests.benchmarks.benchmarks import BenchmarkSuite, compare_benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_synthetic_data(self):
+        composition_df = make_compositions(20, max_elements=3)
+        self.assertEqual(composition_df.shape, (20, 1))
+        self.assertTrue(composition_df.equals(make_compositions(20, max_elements=3)))
+        X, y = make_gaussian_data(50, 8, n_redundant=2)
+        self.assertEqual(X.shape, (50, 8))
+        self.assertEqual(y.shape, (50,))
+        self.assertTrue(abs(X['feature_7'].corr(X['feature_3'])) > 0.7)
+        return
+
+    def test_benchmark_suite(self):
+        savepath = os.path.join(os.getcwd(), 'benchmark_results.json')
+        suite = BenchmarkSuite(tiers={'tiny': {'n_samples': 30, 'n_features': 8}},
+                               benchmarks=['PearsonSelector', 'CorrectionFactors.nll', 'make_prediction'], n_repeats=2)
+        results = suite.run(savepath=savepath)
+        with open(savepath, 'r') as f:
+            self.assertEqual(json.load(f), results)
+        self.assertEqual(len(results['results']), 3)
+        self.assertEqual(len(results['results'][0]['times']), 2)
+        df = compare_benchmarks(savepath, results)
+        self.assertEqual(list(df['status']), ['same']*3)
+        with self.assertRaises(ValueError):
+            BenchmarkSuite(tiers=['huge'])
+        os.remove(savepath)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
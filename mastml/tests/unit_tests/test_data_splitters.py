@@ -4,13 +4,39 @@ import numpy as np
 import os
 import shutil
 import sys
+import time
 import sklearn.datasets as sk
+from sklearn.linear_model import LinearRegression, Ridge
+from scipy.spatial.distance import cdist
 
 sys.path.insert(0, os.path.abspath('../../../'))
 
 from mastml.models import SklearnModel
+from mastml.feature_selectors import SklearnFeatureSelector
 from mastml.data_splitters import NoSplit, SklearnDataSplitter, LeaveCloseCompositionsOut, LeaveOutPercent, \
-    Bootstrap, JustEachGroup, LeaveOutTwinCV, LeaveOutClusterCV
+    Bootstrap, JustEachGroup, LeaveOutTwinCV, LeaveOutClusterCV, LeaveMultiGroupOut
+from mastml.run_journal import RunJournal
+
+class _SlowRegressor(LinearRegression):
+    # Slow to fit on the largest training split of a KFold that can't split the data evenly
+    def fit(self, X, y, sample_weight=None):
+        if X.shape[0] == 14:
+            time.sleep(0.9)
+        return super(_SlowRegressor, self).fit(X, y, sample_weight=sample_weight)
+
+class _LargeFitMixin():
+    # Uses a lot of memory to fit
+    def fit(self, X, y, sample_weight=None):
+        data = bytearray(200*1024**2)
+        time.sleep(0.1)
+        del data
+        return super(_LargeFitMixin, self).fit(X, y, sample_weight=sample_weight)
+
+class _LargeRegressor(_LargeFitMixin, LinearRegression):
+    pass
+
+class _LargeRidge(_LargeFitMixin, Ridge):
+    pass
 
 class TestSplitters(unittest.TestCase):
 
@@ -36,6 +62,155 @@ class TestSplitters(unittest.TestCase):
             shutil.rmtree(d)
         return
 
+    def test_shared_selection(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='Ridge')]
+        selector = SklearnFeatureSelector(selector='SelectKBest', k=3)
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=models, selectors=[selector], savepath=os.getcwd(), plots=list())
+        # The feature selection of each split is done for the first model and reused for the second model
+        self.assertEqual(len(splitter.splitdirs), 2)
+        for i in range(4):
+            splitpaths = [os.path.join(d, 'split_'+str(i)) for d in splitter.splitdirs]
+            features = [open(os.path.join(p, 'selected_features.txt')).read() for p in splitpaths]
+            self.assertEqual(features[0], features[1])
+            self.assertTrue(os.path.exists(os.path.join(splitpaths[1], 'selected_features.csv')))
+            X_train = [pd.read_csv(os.path.join(p, 'X_train.csv')) for p in splitpaths]
+            self.assertTrue(X_train[0].equals(X_train[1]))
+        for d in splitter.splitdirs:
+            shutil.rmtree(d)
+        return
+
+    def test_stage_times(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='Ridge')]
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=models, savepath=os.getcwd(), plots=list())
+        # One row for each split and the summary of each model, and one summed row for each model
+        self.assertEqual(splitter.stage_times.shape[0], 10)
+        self.assertTrue(splitter.stage_times['model_fit'].sum() > 0)
+        self.assertEqual(list(splitter.stage_times_summary['model']), ['LinearRegression', 'Ridge'])
+        self.assertAlmostEqual(splitter.stage_times_summary['model_fit'].sum(), splitter.stage_times['model_fit'].sum())
+        for d in splitter.splitdirs:
+            self.assertEqual(pd.read_csv(os.path.join(d, 'stage_times.csv')).shape[0], 5)
+            shutil.rmtree(d)
+        return
+
+    def test_profile(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        savepath = os.path.join(os.getcwd(), 'test_profile')
+        os.makedirs(savepath, exist_ok=True)
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=3)
+        splitter.evaluate(X=X, y=y, models=[SklearnModel(model='LinearRegression')], savepath=savepath, plots=list(),
+                          profile=True)
+        for d in splitter.splitdirs:
+            self.assertTrue(os.path.exists(os.path.join(d, 'split_0', 'profile.pstats')))
+            self.assertTrue(os.path.exists(os.path.join(d, 'split_0', 'profile_allocations.csv')))
+            self.assertTrue(os.path.exists(os.path.join(d, 'profile_merged.pstats')))
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'profile_merged.pstats')))
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'profile_merged_allocations.csv')))
+        shutil.rmtree(savepath)
+        return
+
+    def test_memory_report(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        savepath = os.path.join(os.getcwd(), 'test_memory_report')
+        os.makedirs(savepath, exist_ok=True)
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='Ridge')]
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=3)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), memory_budget=16)
+        self.assertEqual(splitter.memory_report.shape[0], 6)
+        self.assertEqual(list(splitter.memory_report['status'].unique()), ['done'])
+        self.assertTrue((splitter.memory_report['rss_peak_mb'] > 0).all())
+        for d in splitter.splitdirs:
+            self.assertEqual(pd.read_csv(os.path.join(d, 'memory_report.csv')).shape[0], 3)
+
+        # Splits going over the memory limit fail, and the other models then preprocess the splits themselves
+        splitter.evaluate(X=X, y=y, models=[_LargeRegressor(), _LargeRidge()], savepath=savepath, plots=list(),
+                          memory_limit=0.1)
+        self.assertEqual(list(splitter.memory_report['status']), ['memory_limit_exceeded']*6)
+        self.assertEqual(splitter.stage_times.shape[0], 0)
+        shutil.rmtree(savepath)
+        return
+
+    def test_time_limit(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        savepath = os.path.join(os.getcwd(), 'test_time_limit')
+        os.makedirs(savepath, exist_ok=True)
+        models = [_SlowRegressor(), SklearnModel(model='Ridge')]
+        splitter = SklearnDataSplitter(splitter='KFold', n_splits=3)
+        start = time.time()
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), time_limit=0.4)
+        self.assertTrue(time.time() - start < 10)
+        # The slow split fails, and the slow model is summarized over the other splits
+        self.assertEqual(list(splitter.memory_report['status']), ['done', 'done', 'time_limit_exceeded']+['done']*3)
+        self.assertEqual(list(splitter.stage_times['split']), ['split_0', 'split_1', 'summary']+
+                         ['split_0', 'split_1', 'split_2', 'summary'])
+        shutil.rmtree(savepath)
+        return
+
+    def test_racing(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(40, 5)))
+        y = pd.Series(np.dot(X.values, np.arange(5)) + np.random.uniform(low=0.0, high=1, size=(40,)))
+        savepath = os.path.join(os.getcwd(), 'test_racing')
+        os.makedirs(savepath, exist_ok=True)
+        # Models from the best to the worst
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='Ridge', alpha=10000),
+                  SklearnModel(model='DummyRegressor'), SklearnModel(model='DummyRegressor', strategy='constant', constant=-1000)]
+        splitter = SklearnDataSplitter(splitter='RepeatedKFold', n_splits=4, n_repeats=2)
+        with self.assertRaises(ValueError):
+            splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), racing=True, racing_keep=1)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), racing=True, checkpoint=True)
+        # 4 models on 2 splits, then the best 2 on 4 splits, then the winner on all 8 splits
+        self.assertEqual(list(splitter.racing_results['n_splits']), [2, 2, 2, 2, 4, 4, 8])
+        self.assertEqual(list(splitter.racing_results['status']), ['kept', 'kept', 'dropped', 'dropped', 'kept', 'dropped', 'winner'])
+        self.assertEqual(splitter.racing_results['model'].iloc[-1], 'LinearRegression')
+        self.assertEqual(list(splitter.stage_times_summary['model']), ['LinearRegression'])
+        self.assertEqual(splitter.memory_report.shape[0], 2*4+2*2+4)
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'racing_results.csv')))
+        # The dropped models keep their racing results, and are done so a resumed run doesn't race them again
+        for splitdir in splitter.splitdirs[1:]:
+            self.assertTrue(os.path.exists(os.path.join(splitdir, 'racing_results.csv')))
+        self.assertEqual(len(RunJournal(savepath).jobs_done), 4)
+        shutil.rmtree(savepath)
+        return
+
+    def test_adaptive_repeats(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(40, 5)))
+        y = pd.Series(np.dot(X.values, np.arange(5)) + np.random.uniform(low=0.0, high=1, size=(40,)))
+        savepath = os.path.join(os.getcwd(), 'test_adaptive_repeats')
+        os.makedirs(savepath, exist_ok=True)
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='DummyRegressor')]
+        splitter = SklearnDataSplitter(splitter='RepeatedKFold', n_splits=4, n_repeats=6)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), adaptive_repeats=True,
+                          repeats_tolerance=0.1)
+        # The linear model converges after the first 3 repeats, the dummy model is noisy and uses all 6 repeats
+        df = splitter.repeats_results
+        self.assertEqual(list(df[df['model'] == 'LinearRegression']['status']), ['converged'])
+        self.assertEqual(list(df[df['model'] == 'DummyRegressor']['n_repeats']), [3, 4, 5, 6])
+        self.assertEqual(list(df[df['model'] == 'DummyRegressor']['status']), ['continued']*3+['max_repeats'])
+        self.assertEqual(list(splitter.stage_times_summary['model']), ['LinearRegression', 'DummyRegressor'])
+        self.assertEqual(splitter.memory_report.shape[0], 3*4+6*4)
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'repeats_results.csv')))
+        # No more repeats are started once the time budget runs out
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), adaptive_repeats=True,
+                          repeats_tolerance=0.1, repeats_time_budget=0)
+        self.assertEqual(list(splitter.repeats_results['status']), ['converged', 'time_budget'])
+
+        # The repeats of the MAST-ML splitters are read from the splitter itself
+        splitter = LeaveOutPercent(percent_leave_out=0.25, n_repeats=8, random_state=0)
+        splitter.evaluate(X=X, y=y, models=models[:1], savepath=savepath, plots=list(), adaptive_repeats=True,
+                          repeats_tolerance=0.1)
+        self.assertEqual(list(splitter.repeats_results['status']), ['converged'])
+        self.assertTrue(splitter.memory_report.shape[0] < 8)
+        shutil.rmtree(savepath)
+        return
+
     def test_close_comps(self):
         # Make entries at a 10% spacing
         composition_df = pd.DataFrame({'composition': ['Al{}Cu{}'.format(i, 10-i) for i in range(11)]})
@@ -50,6 +225,14 @@ class TestSplitters(unittest.TestCase):
         for d in splitter.splitdirs:
             self.assertTrue(os.path.exists(d))
             shutil.rmtree(d)
+
+        # Adjacent entries are sqrt(2)*0.1 apart, so each entry is left out with its neighbors
+        splitter = LeaveCloseCompositionsOut(composition_df=composition_df, dist_threshold=0.15)
+        splits = list(splitter.split(X))
+        self.assertEqual(len(splits), 11)
+        for i, (train, test) in enumerate(splits):
+            self.assertEqual(test.tolist(), list(range(max(0, i-1), min(11, i+2))))
+            self.assertEqual(sorted(train.tolist()+test.tolist()), list(range(11)))
         return
 
     def test_leaveoutpercent(self):
@@ -87,6 +270,32 @@ class TestSplitters(unittest.TestCase):
             shutil.rmtree(d)
         return
 
+    def test_leavemultigroupout(self):
+        groups = np.array([3, 0, 1, 2, 0, 3, 1, 2, 2, 0])
+        X = np.zeros((10, 2))
+        splitter = LeaveMultiGroupOut(multigroup_size=2)
+        splits = splitter.split(X, None, groups)
+        self.assertEqual(splitter.get_n_splits(groups=groups), 6)
+        self.assertEqual(len(splits), 6)
+        # The first split leaves out groups 0 and 1
+        train, test = splits[0]
+        self.assertEqual(list(test), [1, 4, 9, 2, 6])
+        self.assertEqual(list(train), [0, 3, 5, 7, 8])
+
+        # A random subset of the combinations is left out when there are too many, without making all of them
+        groups = np.repeat(np.arange(40), 250)
+        X = np.zeros((10000, 2))
+        splitter = LeaveMultiGroupOut(multigroup_size=3, max_splits=20, random_state=0)
+        self.assertEqual(LeaveMultiGroupOut(multigroup_size=3).get_n_splits(groups=groups), 9880)
+        self.assertEqual(splitter.get_n_splits(groups=groups), 20)
+        splits = splitter.split(X, None, groups)
+        self.assertEqual(len(splits), 20)
+        self.assertEqual(len(set([tuple(test) for train, test in splits])), 20)
+        self.assertTrue(all([len(train) + len(test) == 10000 and len(test) == 750 for train, test in splits]))
+        self.assertEqual([list(test) for train, test in splits],
+                         [list(test) for train, test in LeaveMultiGroupOut(multigroup_size=3, max_splits=20, random_state=0).split(X, None, groups)])
+        return
+
     def test_leaveoutcluster(self):
         X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(5, 10)))
         y = pd.Series(np.random.uniform(low=0.0, high=100, size=(5,)))
@@ -96,6 +305,22 @@ class TestSplitters(unittest.TestCase):
         for d in splitter.splitdirs:
             self.assertTrue(os.path.exists(d))
             shutil.rmtree(d)
+
+        # The clustering is only fit once for the same data
+        X, _ = sk.make_blobs(n_samples=300, n_features=2, centers=3, cluster_std=0.1, random_state=0)
+        splitter = LeaveOutClusterCV(cluster='KMeans', n_clusters=3, random_state=0)
+        self.assertEqual(splitter.get_n_splits(X), 3)
+        labels = splitter._labels_cache[1]
+        splits = list(splitter.split(X))
+        self.assertTrue(splitter.labels(X) is labels)
+        self.assertEqual(sum([len(test[0]) for train, test in splits]), 300)
+
+        # Sampled KMedoids finds the same clusters as fitting on all the data
+        sampled = LeaveOutClusterCV(cluster='KMedoids', n_clusters=3, random_state=0, sample_size=50, n_samplings=3)
+        sampled_labels = sampled.labels(X)
+        self.assertEqual(len(sampled_labels), 300)
+        self.assertEqual(len(np.unique(sampled_labels)), 3)
+        self.assertEqual(len(set(zip(labels, sampled_labels))), 3)
         return
 
     def test_leaveouttwins(self):
@@ -105,6 +330,9 @@ class TestSplitters(unittest.TestCase):
         splitter = LeaveOutTwinCV(threshold=0, auto_threshold=True)
         model = SklearnModel(model='LinearRegression')
         splitter.evaluate(X=X, y=y, models=[model], groups=None, savepath=os.getcwd(), plots=list())
+        # The thresholds tried are saved with the file extension of the run
+        splitter.split(X, y)
+        self.assertTrue(os.path.exists(os.path.join(splitter.splitdir, 'autothreshold_num_twins.csv')))
         for d in splitter.splitdirs:
             self.assertTrue(os.path.exists(d))
             shutil.rmtree(d)
@@ -158,6 +386,20 @@ class TestSplitters(unittest.TestCase):
         for r in ret:
             self.assertTrue(len(r[0]) == numTwins or len(r[1]) == numTwins)
 
+        # The twins are the points with another point within the threshold, as found by comparing all the pairs
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=10, size=(200, 3)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(200,)))
+        for ord in [1, 2]:
+            splitter = LeaveOutTwinCV(threshold=1, ord=ord)
+            distances = cdist(X.values, X.values, 'minkowski', p=ord)
+            np.fill_diagonal(distances, np.inf)
+            twins = np.flatnonzero(distances.min(axis=1) <= 1).tolist()
+            self.assertEqual(splitter.split(X, y)[1][0], twins)
+            # The twins are cached, so get_n_splits doesn't search again
+            cache = splitter._twins_cache
+            self.assertEqual(splitter.get_n_splits(X, y), 2)
+            self.assertTrue(splitter._twins_cache is cache)
+
         # plt.scatter(v[0][:, 0], v[0][:, 1], c=v[1])
         # plt.savefig("./test.png")
         # self.assertTrue(False, msg="In Progress")
@@ -4,17 +4,28 @@ import numpy as np
 import os
 import shutil
 import sys
+import time
 import sklearn.datasets as sk
+from sklearn.linear_model import LinearRegression
 
 sys.path.insert(0, os.path.abspath('../../../'))
 
 from mastml.models import SklearnModel
+from mastml.feature_selectors import NoSelect, SklearnFeatureSelector
 from mastml.data_splitters import NoSplit, SklearnDataSplitter, LeaveCloseCompositionsOut, LeaveOutPercent, \
     Bootstrap, JustEachGroup, LeaveOutTwinCV, LeaveOutClusterCV
 
 parallel_run = False  # Condition to run in parallel
 
 
+class _SlowRegressor(LinearRegression):
+    # Slow to fit on the largest training split of a KFold that can't split the data evenly
+    def fit(self, X, y, sample_weight=None):
+        if X.shape[0] == 14:
+            time.sleep(0.9)
+        return super(_SlowRegressor, self).fit(X, y, sample_weight=sample_weight)
+
+
 class TestSplitters(unittest.TestCase):
 
     def test_nosplit(self):
@@ -28,6 +39,55 @@ class TestSplitters(unittest.TestCase):
             shutil.rmtree(d)
         return
 
+    def test_nested_cv_parallel(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        model = SklearnModel(model='LinearRegression')
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=[model], savepath=os.getcwd(), plots=list(), nested_CV=True,
+                          parallel_run=True, n_jobs=2)
+        for d in splitter.splitdirs:
+            for i in range(4):
+                self.assertTrue(os.path.exists(os.path.join(d, 'split_outer_'+str(i), 'y_pred_leaveout.csv')))
+            self.assertEqual(pd.read_csv(os.path.join(d, 'y_pred_leaveout.csv')).shape[0], 20)
+            shutil.rmtree(d)
+        return
+
+    def test_models_selectors_parallel(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='Ridge')]
+        selectors = [NoSelect(), SklearnFeatureSelector(selector='SelectKBest', k=3)]
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=models, selectors=selectors, savepath=os.getcwd(), plots=list(),
+                          parallel_run=True, n_jobs=2)
+        # The splits of all the model and selector pairs are evaluated on one pool of workers
+        self.assertEqual(len(splitter.splitdirs), 4)
+        for d in splitter.splitdirs:
+            self.assertEqual(pd.read_csv(os.path.join(d, 'y_pred.csv')).shape[0], 20)
+            for i in range(4):
+                self.assertTrue(os.path.exists(os.path.join(d, 'split_'+str(i), 'selected_features.txt')))
+            shutil.rmtree(d)
+        return
+
+    def test_time_limit_parallel(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        savepath = os.path.join(os.getcwd(), 'test_time_limit_parallel')
+        os.makedirs(savepath, exist_ok=True)
+        models = [_SlowRegressor(), SklearnModel(model='Ridge')]
+        splitter = SklearnDataSplitter(splitter='KFold', n_splits=3)
+        start = time.time()
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), time_limit=0.4,
+                          parallel_run=True, n_jobs=2)
+        self.assertTrue(time.time() - start < 30)
+        # The slow split fails in its worker, and the slow model is summarized over the other splits
+        self.assertEqual(list(splitter.memory_report['status']), ['done', 'done', 'time_limit_exceeded']+['done']*3)
+        self.assertEqual(list(splitter.stage_times['split']), ['split_0', 'split_1', 'summary']+
+                         ['split_0', 'split_1', 'split_2', 'summary'])
+        shutil.rmtree(savepath)
+        return
+
     def test_sklearnsplitter(self):
         X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(10, 10)))
         y = pd.Series(np.random.uniform(low=0.0, high=100, size=(10,)))
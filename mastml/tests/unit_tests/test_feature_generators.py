@@ -58,15 +58,17 @@ class TestGenerators(unittest.TestCase):
         composition_df = pd.DataFrame({'composition': ['Al2O3', 'SrTiO3']})
         X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(2,10)))
         y = pd.Series(np.random.uniform(low=0.0, high=100, size=(2,)))
+        # The generated features are saved in their own folder, so none are left in the working directory
+        savepath = os.path.join(os.getcwd(), 'test_onehotelement')
+        os.makedirs(savepath, exist_ok=True)
         generator = OneHotElementEncoder(composition_df=composition_df, remove_constant_columns=False)
-        Xgenerated, y = generator.evaluate(X=X, y=y)
+        Xgenerated, y = generator.evaluate(X=X, y=y, savepath=savepath)
         self.assertEqual(Xgenerated.shape, (2, 14))
         generator = OneHotElementEncoder(composition_df=composition_df, remove_constant_columns=True)
-        Xgenerated, y = generator.evaluate(X=X, y=y)
+        Xgenerated, y = generator.evaluate(X=X, y=y, savepath=savepath)
         self.assertEqual(Xgenerated.shape, (2, 13))
-        Xgenerated, y = generator.evaluate(X=X, y=y, savepath=os.getcwd())
         self.assertTrue(os.path.exists(generator.splitdir))
-        shutil.rmtree(generator.splitdir)
+        shutil.rmtree(savepath)
         return
 
     #TODO: this will need to be updated with the latest Mat Proj API
@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import pandas as pd
+import os
+import sys
+import shutil
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.file_formats import save_data, load_data, check_file_extension, get_file_format
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter
+
+class TestFileFormats(unittest.TestCase):
+
+    def test_save_load(self):
+        df = pd.DataFrame({'a': np.random.uniform(size=10), 'b': np.arange(10), 'c': ['x']*10})
+        for file_extension in ['.csv', '.xlsx', '.parquet', '.feather', '.npz']:
+            if not get_file_format(file_extension).is_available():
+                continue
+            save_data(df, 'test_data'+file_extension, index=False)
+            df_loaded = load_data('test_data'+file_extension)
+            self.assertEqual(df_loaded.shape, (10, 3))
+            self.assertTrue(np.allclose(df_loaded['a'], df['a']))
+            self.assertEqual(list(df_loaded['c']), list(df['c']))
+            os.remove('test_data'+file_extension)
+
+        # Series are saved as a single column dataframe
+        save_data(pd.Series(np.arange(5), name='y_test'), 'test_data.npz', index=False)
+        self.assertEqual(list(load_data('test_data.npz')['y_test']), list(range(5)))
+        os.remove('test_data.npz')
+
+        # The .npz files hold no pickled objects, and keep the missing values and column name types of object data
+        df = pd.DataFrame({0: np.arange(3), 'comp': ['Al', None, 'Cu']})
+        save_data(df, 'test_data.npz', index=False)
+        with np.load('test_data.npz', allow_pickle=False) as f:
+            self.assertEqual(f['col_1'].dtype.kind, 'U')
+        df_loaded = load_data('test_data.npz')
+        self.assertEqual(df_loaded.columns.tolist(), [0, 'comp'])
+        self.assertEqual(list(df_loaded['comp']), ['Al', None, 'Cu'])
+        os.remove('test_data.npz')
+        return
+
+    def test_check_file_extension(self):
+        self.assertEqual(check_file_extension('.npz'), '.npz')
+        self.assertEqual(check_file_extension('.txt'), '.csv')
+        with self.assertRaises(ValueError):
+            save_data(pd.DataFrame(), 'test_data.txt')
+        return
+
+    def test_evaluate_npz(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(10, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(10,)))
+        model = SklearnModel(model='LinearRegression')
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=5)
+        splitter.evaluate(X=X, y=y, models=[model], savepath=os.getcwd(), plots=list(), file_extension='.npz')
+        for d in splitter.splitdirs:
+            self.assertEqual(load_data(os.path.join(d, 'y_pred.npz')).shape[0], 10)
+            self.assertEqual(load_data(os.path.join(d, 'split_0', 'X_train.npz')).shape, (8, 10))
+            shutil.rmtree(d)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import pandas as pd
+import os
+import sys
+import shutil
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.fit_cache import FitCache
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter
+
+class TestFitCache(unittest.TestCase):
+
+    def test_fit_cache(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        cache_dir = os.path.join(os.getcwd(), 'test_fit_cache')
+        fit_cache = FitCache(cache_dir=cache_dir)
+        y_preds = list()
+        for i in range(2):
+            model = SklearnModel(model='RandomForestRegressor', n_estimators=5, random_state=0)
+            splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4, random_state=0)
+            splitter.evaluate(X=X, y=y, models=[model], savepath=os.getcwd(), plots=list(), fit_cache=fit_cache)
+            y_preds.append(pd.read_csv(os.path.join(splitter.splitdirs[0], 'y_pred.csv')))
+            # The second run reuses the models fit in the first run
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+            for d in splitter.splitdirs:
+                shutil.rmtree(d)
+        self.assertTrue(y_preds[0].equals(y_preds[1]))
+
+        # A different model is a different entry
+        key = fit_cache.get_key(X_train=X, y_train=y, X_test=X, model=SklearnModel(model='Ridge'), preprocessor=None)
+        self.assertNotEqual(key, fit_cache.get_key(X_train=X, y_train=y, X_test=X, model=SklearnModel(model='Lasso'),
+                                                   preprocessor=None))
+        self.assertIsNone(fit_cache.load(key))
+
+        # The least recently used entries are removed to keep the cache size below max_size
+        fit_cache.max_size = fit_cache.get_size()/2
+        fit_cache.save(key, {'y_pred': y})
+        self.assertTrue(fit_cache.get_size() <= fit_cache.max_size)
+        self.assertIsNotNone(fit_cache.load(key))
+
+        fit_cache.clear()
+        self.assertEqual(fit_cache.get_size(), 0)
+        shutil.rmtree(cache_dir)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,14 @@ import unittest
 import shutil
 import os
 import sys
+import json
+import numpy as np
+import pandas as pd
 sys.path.insert(0, os.path.abspath('../../../'))
 
-from mastml.mastml import Mastml
+from mastml.mastml import Mastml, load_mastml_metadata
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter
 
 class TestMastml(unittest.TestCase):
 
@@ -12,9 +17,40 @@ class TestMastml(unittest.TestCase):
         mastml = Mastml(savepath='testdir')
         savepath = mastml.get_savepath
         metadata = mastml.get_mastml_metadata
-        self.assertTrue(os.path.exists(os.path.join(savepath, 'mastml_metadata.json')))
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'mastml_metadata.jsonl')))
+        self.assertEqual(metadata['savepath'], 'testdir')
+        shutil.rmtree(savepath)
+        return
+
+    def test_metadata_files(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(10, 3)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(10,)))
+        mastml = Mastml(savepath='testdir')
+        savepath = mastml.get_savepath
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=2)
+        splitter.evaluate(X=X, y=y, models=[SklearnModel(model='LinearRegression')], mastml=mastml, savepath=savepath,
+                          plots=list())
+        outerdir = os.path.basename(splitter.splitdirs[0])
+        # The metadata journal only holds compact records, one per update, with the paths of the data files
+        with open(os.path.join(savepath, 'mastml_metadata.jsonl'), 'r') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r['type'] for r in records], ['run', 'split', 'split', 'split'])
+        self.assertEqual(records[1]['metadata']['data_files']['y_pred'], os.path.join(outerdir, 'split_0', 'y_pred.csv'))
+        self.assertFalse('y_pred' in records[1]['metadata'])
+
+        # The loaded metadata has the data arrays read back from their files, as JSON strings
+        metadata = mastml.get_mastml_metadata
+        self.assertEqual(list(metadata[outerdir].keys()), ['split_0', 'split_1', 'split_summary'])
+        self.assertEqual(metadata[outerdir]['split_0']['model'], 'LinearRegression')
+        y_pred = pd.read_json(metadata[outerdir]['split_0']['y_pred'], typ='series')
+        self.assertEqual(y_pred.shape[0], 5)
+        self.assertTrue(np.allclose(y_pred, pd.read_csv(os.path.join(splitter.splitdirs[0], 'split_0', 'y_pred.csv'))['y_pred']))
+        X_train = pd.read_json(metadata[outerdir]['split_summary']['X_train'])
+        self.assertEqual(X_train.shape, (10, 3))
+        metadata = load_mastml_metadata(savepath, load_data_files=False)
+        self.assertTrue('data_files' in metadata[outerdir]['split_summary'])
         shutil.rmtree(savepath)
         return
 
 if __name__=='__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import time
+import signal
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.memory_monitor import MemoryMonitor, MemoryLimitError, TimeLimitError, get_rss
+
+class TestMemoryMonitor(unittest.TestCase):
+
+    def test_memory_monitor(self):
+        monitor = MemoryMonitor()
+        with monitor.record():
+            data = bytearray(100*1024**2)
+            time.sleep(0.05)
+        report = monitor.get_report()
+        self.assertEqual(report['status'], 'done')
+        self.assertTrue(report['rss_peak_mb'] - report['rss_start_mb'] > 50)
+        del data
+
+        # A unit going over the limit is stopped before using all the memory it asks for
+        monitor = MemoryMonitor(memory_limit=get_rss()/1024**3 + 0.05)
+        data = list()
+        with self.assertRaises(MemoryLimitError):
+            with monitor.record():
+                for i in range(500):
+                    data.append(bytearray(1024**2))
+                    time.sleep(0.001)
+        self.assertTrue(len(data) < 500)
+        self.assertEqual(monitor.get_report()['status'], 'memory_limit_exceeded')
+
+        # A unit going over the time limit is stopped
+        monitor = MemoryMonitor(time_limit=0.1)
+        start = time.time()
+        with self.assertRaises(TimeLimitError):
+            with monitor.record():
+                time.sleep(10)
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(monitor.get_report()['status'], 'time_limit_exceeded')
+
+        # The signal handler is put back once the unit is done, whether it was stopped or not
+        self.assertEqual(signal.getsignal(signal.SIGUSR1), signal.SIG_DFL)
+        return
+
+    def test_relative_limit(self):
+        # The limit is on the memory the unit adds, so a unit using little memory isn't stopped whatever the process uses
+        monitor = MemoryMonitor(memory_limit=get_rss()/1024**3/2, relative_limit=True)
+        with monitor.record():
+            data = bytearray(1024**2)
+            time.sleep(0.05)
+        self.assertEqual(monitor.get_report()['status'], 'done')
+        del data
+
+        data = list()
+        with self.assertRaises(MemoryLimitError):
+            with monitor.record():
+                for i in range(500):
+                    data.append(bytearray(1024**2))
+                    time.sleep(0.001)
+        self.assertTrue(len(data) < 500)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
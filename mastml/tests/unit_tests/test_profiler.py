@@ -0,0 +1,40 @@
+import unittest
+import os
+import sys
+import shutil
+import pandas as pd
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.profiler import Profiler
+
+class TestProfiler(unittest.TestCase):
+
+    def test_profiler(self):
+        savepath = os.path.join(os.getcwd(), 'test_profiler')
+        os.makedirs(savepath, exist_ok=True)
+        profiler = Profiler(profile=True)
+        paths = list()
+        for i in range(2):
+            with profiler.record(savepath=savepath, name='unit'+str(i)):
+                data = [list(range(1000)) for _ in range(100)]
+            paths.append(os.path.join(savepath, 'unit'+str(i)))
+            self.assertTrue(os.path.exists(os.path.join(savepath, 'unit'+str(i)+'.pstats')))
+            self.assertTrue(os.path.exists(os.path.join(savepath, 'unit'+str(i)+'_allocations.csv')))
+        profiler.merge(paths+[os.path.join(savepath, 'missing')], savepath=savepath)
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'profile_merged.pstats')))
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'profile_merged.txt')))
+        df = pd.read_csv(os.path.join(savepath, 'profile_merged_allocations.csv'))
+        self.assertEqual(list(df.columns), ['location', 'size_kb', 'count'])
+        self.assertTrue(df.shape[0] > 0)
+
+        # A profiler that is off saves nothing
+        with Profiler(profile=None).record(savepath=savepath, name='off'):
+            data = list(range(1000))
+        self.assertFalse(os.path.exists(os.path.join(savepath, 'off.pstats')))
+        with self.assertRaises(ValueError):
+            Profiler(profile='gpu')
+        shutil.rmtree(savepath)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import pandas as pd
+import os
+import shutil
+import sys
+from sklearn.model_selection import KFold
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.results_catalog import ResultsCatalog
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter
+from mastml.hyper_opt import GridSearch
+from mastml.learning_curve import LearningCurve
+
+class TestResultsCatalog(unittest.TestCase):
+
+    def test_catalog(self):
+        savepath = os.path.join(os.getcwd(), 'test_results_catalog')
+        os.mkdir(savepath)
+        catalog = ResultsCatalog(db_path=os.path.join(savepath, 'catalog.db'))
+        run_ids = list()
+        for i, rmse in enumerate([2.0, 1.0, 3.0]):
+            run_id = catalog.add_run(kind='evaluate', dataset_hash='data', model='model_'+str(i), config={'alpha': i})
+            catalog.add_metrics(run_id, pd.DataFrame({'root_mean_squared_error': [rmse, 0.1]}), data_type='test')
+            catalog.add_metrics(run_id, {'root_mean_squared_error': rmse+1}, data_type='test', split='split_0')
+            catalog.add_artifact(run_id, 'model', 'model_'+str(i)+'.pkl')
+            run_ids.append(run_id)
+        df_top = catalog.get_top_runs(metric='root_mean_squared_error', k=2, dataset_hash='data')
+        self.assertEqual(list(df_top['model']), ['model_1', 'model_0'])
+        self.assertAlmostEqual(df_top['stdev'][0], 0.1)
+        self.assertEqual(catalog.get_top_runs(metric='r2_score', k=2).shape[0], 0)
+        self.assertEqual(catalog.get_metrics(run_ids[0]).shape[0], 2)
+        self.assertEqual(catalog.get_artifacts(run_ids[2]), {'model': os.path.abspath('model_2.pkl')})
+        catalog.remove_run(run_ids[1])
+        self.assertEqual(catalog.get_runs(kind='evaluate').shape[0], 2)
+        self.assertEqual(catalog.get_metrics(run_ids[1]).shape[0], 0)
+        with self.assertRaises(ValueError):
+            catalog.get_runs(metric='root_mean_squared_error')
+        shutil.rmtree(savepath)
+        return
+
+    def test_catalog_runs(self):
+        savepath = os.path.join(os.getcwd(), 'test_results_catalog_runs')
+        os.mkdir(savepath)
+        catalog = ResultsCatalog(db_path=os.path.join(savepath, 'catalog.db'))
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 3)), columns=['a', 'b', 'c'])
+        y = pd.Series(X['a']*2+np.random.uniform(size=20))
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='DummyRegressor')]
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=3)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), catalog=catalog)
+        dataset_hash = catalog.get_dataset_hash(X, y)
+        df_top = catalog.get_top_runs(metric='root_mean_squared_error', k=1, kind='evaluate', dataset_hash=dataset_hash)
+        self.assertEqual(list(df_top['model']), ['LinearRegression'])
+        self.assertEqual(df_top['splitter'][0], 'KFold')
+        # Each split is registered, along with the summary over the splits
+        df_metrics = catalog.get_metrics(df_top['run_id'][0])
+        self.assertEqual(sorted(df_metrics['split'].dropna().unique()), ['split_0', 'split_1', 'split_2'])
+        self.assertTrue(os.path.exists(catalog.get_artifacts(df_top['run_id'][0])['model']))
+
+        GridSearch(param_names='alpha', param_values='0.1 1 3 lin float').fit(X=X, y=y, model=SklearnModel(model='Ridge'),
+                                                                        cv=KFold(n_splits=3), savepath=savepath,
+                                                                        catalog=catalog)
+        df_runs = catalog.get_runs(kind='hyperopt')
+        self.assertEqual(df_runs['hyperopt'][0], 'GridSearch')
+        # One score for each of the 3 parameter sets, plus the best score as the summary
+        self.assertEqual(catalog.get_metrics(df_runs['run_id'][0]).shape[0], 4)
+        self.assertTrue(catalog.get_top_runs(metric='mean_absolute_error', kind='hyperopt')['value'][0] > 0)
+
+        LearningCurve().evaluate(model=SklearnModel(model='LinearRegression'), X=X, y=y, savepath=savepath,
+                                 train_sizes=[0.5, 1.0], cv=KFold(n_splits=3), make_plot=False, catalog=catalog)
+        df_runs = catalog.get_runs(kind='learning_curve', dataset_hash=dataset_hash)
+        self.assertEqual(df_runs.shape[0], 1)
+        self.assertTrue(os.path.exists(catalog.get_artifacts(df_runs['run_id'][0])['data_learning_curve']))
+        shutil.rmtree(savepath)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
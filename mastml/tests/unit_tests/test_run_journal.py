@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+import pandas as pd
+import os
+import sys
+import shutil
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.run_journal import RunJournal
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter, LeaveOutClusterCV
+
+class TestRunJournal(unittest.TestCase):
+
+    def test_resume(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        savepath = os.path.join(os.getcwd(), 'test_resume')
+        os.mkdir(savepath)
+        models = [SklearnModel(model='LinearRegression'), SklearnModel(model='Ridge')]
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), nested_CV=True, checkpoint=True)
+        splitdirs = splitter.splitdirs
+        y_pred_leaveout = [pd.read_csv(os.path.join(d, 'y_pred_leaveout.csv')) for d in splitdirs]
+
+        # Make the journal look like the run was interrupted during the second model, after 5 of its 16 splits
+        journal_path = os.path.join(savepath, 'run_journal.jsonl')
+        with open(journal_path, 'r') as f:
+            lines = f.readlines()
+        job_done = [i for i, line in enumerate(lines) if '"job_done"' in line]
+        split_lines = [i for i, line in enumerate(lines[job_done[0]+1:]) if '"split"' in line]
+        with open(journal_path, 'w') as f:
+            f.writelines(lines[:job_done[0]+1+split_lines[4]+1])
+        journal = RunJournal(savepath)
+        job_keys = list(journal.splitdirs.keys())
+        self.assertTrue(journal.is_job_done(job_keys[0]))
+        self.assertEqual(len(journal.get_splits_done(job_keys[1])), 5)
+        for split in ['split_0', 'split_1']:
+            with open(os.path.join(splitdirs[1], 'split_outer_1', split, 'marker.txt'), 'w') as f:
+                f.write('done')
+
+        # The resumed run uses the same directories and splits, and only evaluates the missing splits
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), nested_CV=True, resume=True)
+        self.assertEqual(splitter.splitdirs, splitdirs)
+        self.assertTrue(os.path.exists(os.path.join(splitdirs[1], 'split_outer_1', 'split_0', 'marker.txt')))
+        self.assertFalse(os.path.exists(os.path.join(splitdirs[1], 'split_outer_1', 'split_1', 'marker.txt')))
+        for d, y_pred in zip(splitdirs, y_pred_leaveout):
+            self.assertTrue(np.allclose(pd.read_csv(os.path.join(d, 'y_pred_leaveout.csv')), y_pred))
+        journal = RunJournal(savepath)
+        self.assertTrue(journal.is_job_done(job_keys[1]))
+        shutil.rmtree(savepath)
+        return
+
+    def test_resume_used_splitter(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        savepath = os.path.join(os.getcwd(), 'test_resume_used_splitter')
+        os.mkdir(savepath)
+        models = [SklearnModel(model='LinearRegression')]
+        splitter = LeaveOutClusterCV(cluster='KMeans', n_clusters=3, random_state=0)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), checkpoint=True)
+        splitdirs = splitter.splitdirs
+
+        # Make the journal look like the run was interrupted after its first split
+        journal_path = os.path.join(savepath, 'run_journal.jsonl')
+        with open(journal_path, 'r') as f:
+            lines = f.readlines()
+        split_lines = [i for i, line in enumerate(lines) if '"split"' in line]
+        with open(journal_path, 'w') as f:
+            f.writelines(lines[:split_lines[0]+1])
+        with open(os.path.join(splitdirs[0], 'split_0', 'marker.txt'), 'w') as f:
+            f.write('done')
+
+        # A splitter that was used (fitting its clustering and filling its cache) has the same run name, so the run is
+        # resumed rather than restarted
+        splitter = LeaveOutClusterCV(cluster='KMeans', n_clusters=3, random_state=0)
+        run_name = RunJournal(savepath).get_run_name(splitter)
+        splitter.split(X)
+        self.assertEqual(RunJournal(savepath).get_run_name(splitter), run_name)
+        splitter.evaluate(X=X, y=y, models=models, savepath=savepath, plots=list(), resume=True)
+        self.assertEqual(splitter.splitdirs, splitdirs)
+        self.assertTrue(os.path.exists(os.path.join(splitdirs[0], 'split_0', 'marker.txt')))
+        self.assertTrue(RunJournal(savepath).is_job_done(list(RunJournal(savepath).splitdirs.keys())[0]))
+        shutil.rmtree(savepath)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
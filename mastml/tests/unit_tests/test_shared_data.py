@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import pandas as pd
+import os
+import sys
+import shutil
+import tempfile
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.shared_data import share_data, load_shared_data
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter
+
+class TestSharedData(unittest.TestCase):
+
+    def test_share_data(self):
+        X = pd.DataFrame(np.random.uniform(size=(20, 5)), columns=['a', 'b', 'c', 'd', 'e'])
+        y = pd.Series(np.random.uniform(size=(20,)), name='y')
+        groups = pd.Series(['g1', 'g2']*10, name='groups')
+        shared_dir = tempfile.mkdtemp()
+        shared = share_data([X, y, groups, None], savepath=shared_dir)
+        # Numeric data is memory-mapped, string data is pickled
+        self.assertTrue(shared[0].is_mmap)
+        self.assertTrue(shared[1].is_mmap)
+        self.assertFalse(shared[2].is_mmap)
+        self.assertIsNone(shared[3])
+        X_loaded, y_loaded, groups_loaded, none_loaded = load_shared_data(shared)
+        self.assertTrue(X_loaded.equals(X))
+        self.assertTrue(y_loaded.equals(y))
+        self.assertTrue(groups_loaded.equals(groups))
+        self.assertIsNone(none_loaded)
+        shutil.rmtree(shared_dir)
+        return
+
+    def test_parallel_force_train(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)))
+        X_force_train = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(5, 5)), index=np.arange(20, 25))
+        y_force_train = pd.Series(np.random.uniform(low=0.0, high=100, size=(5,)), index=np.arange(20, 25))
+        model = SklearnModel(model='LinearRegression')
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=4)
+        splitter.evaluate(X=X, y=y, models=[model], savepath=os.getcwd(), plots=list(), X_force_train=X_force_train,
+                          y_force_train=y_force_train, parallel_run=True, n_jobs=2)
+        for d in splitter.splitdirs:
+            self.assertEqual(pd.read_csv(os.path.join(d, 'split_0', 'X_train.csv')).shape[0], 20)
+            self.assertEqual(pd.read_csv(os.path.join(d, 'y_pred.csv')).shape[0], 20)
+            shutil.rmtree(d)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
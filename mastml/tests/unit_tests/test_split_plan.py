@@ -0,0 +1,96 @@
+import unittest
+import pandas as pd
+import numpy as np
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.split_plan import SplitPlan, PackedSplits
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter, LeaveOutPercent, Bootstrap
+
+class TestSplitPlan(unittest.TestCase):
+
+    def test_split_plan(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(30, 5)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(30,)))
+        savepath = os.path.join(os.getcwd(), 'test_split_plan')
+        os.mkdir(savepath)
+
+        # The splits are saved as int32 indices and loaded back the same, including repeated bootstrap indices
+        plan = Bootstrap(n=30, n_bootstraps=4).make_split_plan(X, y)
+        filepath = plan.save(os.path.join(savepath, 'split_plan'))
+        self.assertTrue(filepath.endswith('.npz'))
+        with np.load(filepath) as data:
+            self.assertEqual(data['train'].dtype, np.int32)
+        loaded = SplitPlan.load(filepath)
+        self.assertEqual(loaded.get_n_splits(), 4)
+        self.assertEqual(loaded.splitter_name, 'Bootstrap')
+        for (train, test), (train_, test_) in zip(plan.split(X, y), loaded.split(X, y)):
+            self.assertTrue(np.array_equal(train, train_))
+            self.assertTrue(np.array_equal(test, test_))
+
+        # The plan can't be used on other data
+        with self.assertRaises(ValueError):
+            loaded.check(X, y+1)
+
+        # The nested splits are kept too, and evaluate uses the splits of the plan
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=3)
+        plan = splitter.make_split_plan(X, y, nested_CV=True)
+        loaded = SplitPlan.load(plan.save(os.path.join(savepath, 'nested_plan.npz')))
+        self.assertEqual(len(loaded.inner_splits), 3)
+        self.assertEqual(len(loaded.inner_splits[0]), 3)
+        splitter.evaluate(X=X, y=y, models=[SklearnModel(model='LinearRegression')], savepath=savepath, plots=list(),
+                          split_plan=loaded)
+        splitdir = splitter.splitdirs[0]
+
+        # The left-out data is part of the plan, so it can't also be given
+        with self.assertRaises(ValueError):
+            splitter.evaluate(X=X, y=y, models=[SklearnModel(model='LinearRegression')], savepath=savepath,
+                              plots=list(), split_plan=loaded, leaveout_inds=[np.arange(3)])
+        for i, leaveout_ind in enumerate(plan.leaveout_inds):
+            test_inds = pd.read_csv(os.path.join(splitdir, 'split_outer_'+str(i), 'leaveout_inds.csv'))
+            self.assertEqual(sorted(test_inds.values.ravel()), sorted(leaveout_ind))
+        shutil.rmtree(savepath)
+        return
+
+    def test_leaveout_labels(self):
+        # The left-out indices are labels of the index of X, as in evaluate, so the outer splits of the plan leave out
+        # the rows with those labels
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)), index=np.random.permutation(20)+100)
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(20,)), index=X.index)
+        leaveout_inds = [np.array([100, 105, 110]), np.array([101, 119])]
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=3)
+        plan = splitter.make_split_plan(X, y, leaveout_inds=leaveout_inds)
+        for (train, test), leaveout_ind in zip(plan.split(X, y), leaveout_inds):
+            self.assertEqual(sorted(X.index[test]), sorted(leaveout_ind))
+            self.assertEqual(sorted(X.index[train]), sorted(X.index[~X.index.isin(leaveout_ind)]))
+        return
+
+    def test_packed_splits(self):
+        # The splits are read from the generator one at a time, and a training set that is the complement of its test
+        # set isn't kept
+        def _splits():
+            yield np.array([0, 2, 3]), np.array([1])
+            yield np.array([3, 3, 0]), np.array([1, 2])
+        splits = PackedSplits(_splits())
+        self.assertEqual(len(splits), 2)
+        self.assertTrue(splits._trains[0] is None)
+        self.assertEqual(splits._tests[0].dtype, np.int32)
+        self.assertEqual([list(train) for train, test in splits], [[0, 2, 3], [3, 3, 0]])
+        self.assertEqual(list(splits[1][1]), [1, 2])
+        return
+
+    def test_leaveoutpercent_seed(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(20, 5)))
+        splits = [LeaveOutPercent(percent_leave_out=0.2, n_repeats=3, random_state=0).split(X) for i in range(2)]
+        for (train, test), (train_, test_) in zip(splits[0], splits[1]):
+            self.assertEqual(list(test), list(test_))
+        # The repeats are all different
+        self.assertEqual(len(set([tuple(sorted(test)) for train, test in splits[0]])), 3)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
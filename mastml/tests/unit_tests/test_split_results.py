@@ -0,0 +1,83 @@
+import unittest
+import pandas as pd
+import numpy as np
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.split_results import SplitResults
+from mastml.models import SklearnModel
+from mastml.data_splitters import SklearnDataSplitter
+
+class TestSplitResults(unittest.TestCase):
+
+    def test_split_results(self):
+        split_results = SplitResults()
+        for i, rmse in enumerate([2.0, 1.0, 3.0]):
+            y_test = pd.Series(np.arange(3)+3*i, name='y_test')
+            split_results.add('split_'+str(i), {'y_test': y_test,
+                                                'y_pred': y_test+rmse,
+                                                'test_inds': np.arange(3)+3*i,
+                                                'test_stats': {'root_mean_squared_error': rmse},
+                                                'X_test': pd.DataFrame({'a': y_test})})
+        self.assertEqual(len(split_results), 3)
+        self.assertEqual(split_results.collect('y_test').shape[0], 9)
+        self.assertEqual(split_results.collect_df('X_test').shape, (9, 1))
+        self.assertEqual(split_results.get_best_split(best_run_metric='root_mean_squared_error'), 'split_1')
+        df_stats = split_results.get_average_stdev_stats(data_type='test')
+        self.assertAlmostEqual(df_stats['root_mean_squared_error'][0], 2.0)
+
+        savepath = os.path.join(os.getcwd(), 'test_split_results')
+        os.mkdir(savepath)
+        split_results.export(savepath=savepath, file_extension='.csv')
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'split_0', 'y_pred.csv')))
+        self.assertTrue(os.path.exists(os.path.join(savepath, 'split_0', 'test_stats_summary.csv')))
+        shutil.rmtree(savepath)
+        return
+
+    def test_split_rows(self):
+        X = pd.DataFrame(np.random.uniform(size=(10, 3)), columns=['a', 'b', 'c'])
+        X_extra = pd.DataFrame({'comp': ['c'+str(i) for i in range(10)]})
+        split_results = SplitResults(X=X, X_extra=X_extra)
+        split_results.add('split_0', {'train_rows': np.arange(0, 6), 'test_rows': np.arange(6, 10),
+                                      'selected_features': ['a', 'c']})
+        split_results.add('split_1', {'train_rows': np.arange(4, 10), 'test_rows': np.arange(0, 4),
+                                      'selected_features': ['a', 'c']})
+        # The X data of each split is rebuilt from the full data
+        self.assertTrue(split_results.get('split_0', 'X_test').equals(X.iloc[6:10][['a', 'c']]))
+        self.assertEqual(list(split_results.get('split_1', 'X_extra_test')['comp']), ['c0', 'c1', 'c2', 'c3'])
+        self.assertEqual(split_results.collect_df('X_train').shape, (12, 2))
+
+        # The X data of an outer split is collected from its inner split results
+        outer_results = SplitResults()
+        outer_results.add('split_outer_0', {'split_results': split_results})
+        self.assertEqual(outer_results.collect_df('X_test').shape, (8, 2))
+
+        savepath = os.path.join(os.getcwd(), 'test_split_rows')
+        os.mkdir(savepath)
+        split_results.export(savepath=savepath, file_extension='.csv')
+        self.assertEqual(pd.read_csv(os.path.join(savepath, 'split_0', 'X_train.csv')).shape, (6, 2))
+        self.assertFalse(os.path.exists(os.path.join(savepath, 'split_0', 'train_rows.csv')))
+        shutil.rmtree(savepath)
+        return
+
+    def test_no_split_files(self):
+        X = pd.DataFrame(np.random.uniform(low=0.0, high=100, size=(10, 10)))
+        y = pd.Series(np.random.uniform(low=0.0, high=100, size=(10,)))
+        model = SklearnModel(model='LinearRegression')
+        splitter = SklearnDataSplitter(splitter='KFold', shuffle=True, n_splits=5)
+        splitter.evaluate(X=X, y=y, models=[model], savepath=os.getcwd(), plots=list(), write_split_files=False)
+        for d in splitter.splitdirs:
+            self.assertTrue(os.path.exists(os.path.join(d, 'y_pred.csv')))
+            self.assertFalse(os.path.exists(os.path.join(d, 'split_0', 'y_pred.csv')))
+            # The preprocessed and selected data of each split are not saved either
+            self.assertFalse(os.path.exists(os.path.join(d, 'split_0', 'data_preprocessed_train.csv')))
+            self.assertFalse(os.path.exists(os.path.join(d, 'split_0', 'selected_features.csv')))
+            self.assertTrue(os.path.exists(os.path.join(d, 'split_0', 'selected_features.txt')))
+            shutil.rmtree(d)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.stage_timer import StageTimer
+
+class TestStageTimer(unittest.TestCase):
+
+    def test_stage_timer(self):
+        timer = StageTimer()
+        time.sleep(0.01)
+        timer.lap('first')
+        timer.lap('second')
+        time.sleep(0.01)
+        timer.lap('first')
+        times = timer.get_times()
+        self.assertEqual(list(times.keys()), ['first', 'second'])
+        self.assertTrue(times['first'] >= 0.02)
+        self.assertTrue(times['second'] < 0.01)
+        timer.add({'second': 1.0, 'third': 2.0})
+        self.assertTrue(timer.get_times()['second'] >= 1.0)
+        self.assertEqual(timer.get_times()['third'], 2.0)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from mastml.task_graph import TaskGraph
+
+def _allocate(size_mb):
+    data = [bytearray(1024**2) for i in range(size_mb)]
+    return size_mb
+
+def _sleep(seconds):
+    try:
+        time.sleep(seconds)
+    except Exception:
+        # Ignore being stopped, like a task hung in compiled code
+        time.sleep(seconds)
+    return seconds
+
+class TestTaskGraph(unittest.TestCase):
+
+    def test_task_graph(self):
+        for parallel_run in [False, True]:
+            graph = TaskGraph(lambda offset, x: x + offset, 10)
+            first = [graph.add(i) for i in range(4)]
+            # Dependent tasks are made from the results of the tasks they depend on
+            second = [graph.add(lambda r: r * 2, depends_on=[t]) for t in first]
+            last = graph.add(lambda *r: sum(r), depends_on=second)
+            results = dict(graph.run(parallel_run=parallel_run, n_jobs=2))
+            self.assertEqual(len(results), 9)
+            self.assertEqual([results[t] for t in second], [30, 32, 34, 36])
+            self.assertEqual(results[last], 142)
+            self.assertEqual(len(graph.memory_reports), 9)
+        return
+
+    def test_task_graph_batches(self):
+        graph = TaskGraph(lambda x: x * 2)
+        tasks = [graph.add(i) for i in range(200)]
+        results = dict(graph.run(parallel_run=True, n_jobs=2, batch_time=0.5))
+        self.assertEqual(results, {t: t * 2 for t in tasks})
+        # The first tasks are sent alone to measure their time, then the quick tasks are sent in batches
+        self.assertEqual(sum(graph.batch_sizes), 200)
+        self.assertEqual(graph.batch_sizes[0], 1)
+        self.assertTrue(max(graph.batch_sizes) > 1)
+        self.assertTrue(all([r['time_s'] >= 0 for r in graph.memory_reports.values()]))
+        return
+
+    def test_task_graph_memory(self):
+        for parallel_run in [False, True]:
+            graph = TaskGraph(_allocate)
+            small = graph.add(1)
+            large = graph.add(2000)
+            dependent = graph.add(lambda r: r, depends_on=[large])
+            results = dict(graph.run(parallel_run=parallel_run, n_jobs=2, memory_budget=4, memory_limit=1))
+            # The task going over the limit and the task depending on it fail, the other task is done
+            self.assertEqual(results, {small: 1})
+            self.assertEqual(graph.failed[large]['status'], 'memory_limit_exceeded')
+            self.assertEqual(graph.failed[dependent]['status'], 'dependency_failed')
+            self.assertTrue(graph.memory_reports[small]['rss_peak_mb'] > 0)
+        return
+
+    def test_task_graph_time_limit(self):
+        for parallel_run in [False, True]:
+            graph = TaskGraph(time.sleep)
+            fast = graph.add(0.01)
+            slow = graph.add(60)
+            # The task depending on the slow task runs its fallback task instead
+            dependent = graph.add(lambda r: r, depends_on=[slow], fallback=0.02)
+            start = time.time()
+            results = dict(graph.run(parallel_run=parallel_run, n_jobs=2, time_limit=0.5))
+            self.assertTrue(time.time() - start < 30)
+            self.assertEqual(set(results.keys()), {fast, dependent})
+            self.assertEqual(graph.failed[slow]['status'], 'time_limit_exceeded')
+
+        # A parallel task that can't be stopped is killed with its worker
+        graph = TaskGraph(_sleep)
+        fast = graph.add(0.01)
+        hung = graph.add(60)
+        start = time.time()
+        results = dict(graph.run(parallel_run=True, n_jobs=2, time_limit=0.5))
+        self.assertTrue(time.time() - start < 30)
+        self.assertEqual(results, {fast: 0.01})
+        self.assertEqual(graph.failed[hung]['status'], 'time_limit_exceeded')
+        return
+
+if __name__ == '__main__':
+    unittest.main()
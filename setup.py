@@ -28,7 +28,7 @@ except EnvironmentError:
 
 setup(
     name="mastml",
-    packages=['mastml', 'mastml.magpie', 'mastml.tests.unit_tests', 'mastml.data'],
+    packages=['mastml', 'mastml.magpie', 'mastml.tests.unit_tests', 'mastml.tests.benchmarks', 'mastml.data'],
     package_data={'mastml.magpie': ["*.*"], 'mastml.tests.unit_tests': ["*.*"], 'mastml.data': ["*.*"]},
     include_package_data = True,
     version=verstr,